@@ -1,5 +1,5 @@
-from fastapi import APIRouter, Depends, Request
-from fastapi.responses import Response as FastAPIResponse
+from fastapi import APIRouter, Depends, Query, Request
+from fastapi.responses import Response as FastAPIResponse, StreamingResponse
 from app.models.oaipmh import OAIPMHRequest
 from app.services.oaipmh.protocol import OAIPMHProtocol
 from typing import Optional
@@ -21,7 +21,7 @@ async def handle_oaipmh_request(
     verb: Optional[str] = None,
     identifier: Optional[str] = None,
     metadataPrefix: Optional[str] = None,
-    from_: Optional[str] = None,
+    from_: Optional[str] = Query(None, alias="from"),
     until: Optional[str] = None,
     set: Optional[str] = None,
     resumptionToken: Optional[str] = None,
@@ -55,7 +55,6 @@ async def handle_oaipmh_request(
             set=set,
             resumptionToken=resumptionToken,
         )
-        xml_response = await protocol.handle_request(oaipmh_req)
     except Exception:
         # If Pydantic validation fails (e.g. invalid verb), we should return badVerb or badArgument.
         # We can construct a minimal "bad verb" response manually or use a helper in protocol.
@@ -88,4 +87,7 @@ async def handle_oaipmh_request(
   <error code="badVerb">Illegal or missing verb</error>
 </OAI-PMH>"""
 
-    return FastAPIResponse(content=xml_response, media_type="text/xml")
+        return FastAPIResponse(content=xml_response, media_type="text/xml")
+
+    # 中文注释: ListRecords 等大页按块流式输出，不在内存中拼整份 XML。
+    return StreamingResponse(protocol.stream_request(oaipmh_req), media_type="text/xml")
@@ -5,7 +5,9 @@ from datetime import datetime, timezone
 import re
 from pydantic import BaseModel, Field, field_validator
 
+from app.core import profile_cache
 from app.core.auth_utils import get_current_user
+from app.core.email_templates import get_email_template_registry
 from app.core.roles import require_any_role
 from app.services.user_management import UserManagementService
 from app.lib.api_client import supabase_admin
@@ -378,6 +380,7 @@ def _sync_required_role_scopes(
             )
         except Exception as e:
             raise HTTPException(status_code=500, detail=f"Failed to deactivate journal scope: {e}") from e
+    profile_cache.invalidate_user(str(user_id))
 
 
 def _deactivate_required_role_scopes(*, user_id: str, roles: list[str]) -> None:
@@ -398,6 +401,7 @@ def _deactivate_required_role_scopes(*, user_id: str, roles: list[str]) -> None:
             if _is_missing_table_error(str(e), _SCOPE_TABLE):
                 raise HTTPException(status_code=500, detail=f"DB not migrated: {_SCOPE_TABLE} table missing") from e
             raise HTTPException(status_code=500, detail=f"Failed to deactivate journal scopes: {e}") from e
+    profile_cache.invalidate_user(str(user_id))
 
 
 def _fallback_journal_rows(rows: list[dict[str, Any]], *, include_inactive: bool) -> list[dict[str, Any]]:
@@ -498,6 +502,7 @@ async def upsert_journal_scope(
         rows = getattr(resp, "data", None) or []
         if not rows:
             raise HTTPException(status_code=500, detail="Failed to upsert journal scope")
+        profile_cache.invalidate_user(str(request.user_id))
         return rows[0]
     except HTTPException:
         raise
@@ -531,6 +536,7 @@ async def deactivate_journal_scope(
         rows = getattr(resp, "data", None) or []
         if not rows:
             raise HTTPException(status_code=404, detail="Journal scope not found")
+        profile_cache.invalidate_user(str(rows[0].get("user_id") or ""))
         return rows[0]
     except HTTPException:
         raise
@@ -982,6 +988,7 @@ async def create_admin_email_template(
         rows = getattr(resp, "data", None) or []
         if not rows:
             raise HTTPException(status_code=500, detail="Failed to create email template")
+        get_email_template_registry().register(rows[0])
         return rows[0]
     except HTTPException:
         raise
@@ -1026,6 +1033,8 @@ async def update_admin_email_template(
         rows = getattr(resp, "data", None) or []
         if not rows:
             raise HTTPException(status_code=404, detail="Email template not found")
+        # 中文注释: 新版本 (id, updated_at) 立即重新编译，旧版本的编译结果随之失效。
+        get_email_template_registry().register(rows[0])
         return rows[0]
     except HTTPException:
         raise
@@ -1064,6 +1073,7 @@ async def deactivate_admin_email_template(
         rows = getattr(resp, "data", None) or []
         if not rows:
             raise HTTPException(status_code=404, detail="Email template not found")
+        get_email_template_registry().invalidate(str(template_id))
         return rows[0]
     except HTTPException:
         raise
@@ -6,7 +6,8 @@ Analytics API Router
 - /summary: 返回 KPI 汇总数据
 - /trends: 返回投稿趋势、状态流水线、决定分布
 - /geo: 返回作者地理分布
-- /export: 导出分析报告（XLSX/CSV）
+- /export: 导出分析报告（XLSX/CSV）；scope=manuscripts 时流式导出稿件级明细
+- /export/jobs: 稿件级明细后台导出（写入 Storage，返回签名链接）
 
 安全要求:
 - 所有端点需要 JWT 认证
@@ -15,7 +16,7 @@ Analytics API Router
 
 import logging
 from uuid import UUID
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query
 from fastapi.responses import StreamingResponse
 
 from app.core.journal_scope import get_user_scope_journal_ids, is_scope_enforcement_enabled
@@ -202,6 +203,7 @@ async def get_geo(
 )
 async def export_report(
     format: str = Query("xlsx", pattern="^(xlsx|csv)$", description="导出格式"),
+    scope: str = Query("summary", pattern="^(summary|manuscripts)$", description="导出范围：汇总 / 稿件明细"),
     current_user: dict = Depends(get_current_user),
     analytics_service: AnalyticsService = Depends(get_analytics_service),
 ):
@@ -212,14 +214,16 @@ async def export_report(
     - 支持 XLSX 和 CSV 两种格式
     - 使用 Pandas 生成报告
     - 报告包含 KPI、趋势、地理分布数据
+    - scope=manuscripts: 稿件级明细，分页读取并以生成器流式输出（行数不影响内存峰值）
     """
     roles = _require_analytics_access(current_user)
     user_id = str(current_user.get("id") or "")
     journal_ids = _resolve_scope_journal_ids(user_id=user_id, roles=roles)
 
     logger.info(
-        "Analytics export (%s) requested by user %s (roles=%s, scope=%s)",
+        "Analytics export (%s, %s) requested by user %s (roles=%s, scope=%s)",
         format,
+        scope,
         user_id or "unknown",
         sorted(list(roles)),
         "all" if journal_ids is None else len(journal_ids),
@@ -227,7 +231,16 @@ async def export_report(
 
     try:
         # 动态导入 ExportService（避免启动时依赖 Pandas）
-        from app.core.export_service import ExportService
+        from app.core.export_service import XLSX_MEDIA_TYPE, ExportService, ManuscriptRowExporter
+
+        if scope == "manuscripts":
+            exporter = ManuscriptRowExporter(analytics_service.client, journal_ids)
+            filename = f"analytics_manuscripts.{format}"
+            return StreamingResponse(
+                exporter.iter_xlsx() if format == "xlsx" else exporter.iter_csv(),
+                media_type=XLSX_MEDIA_TYPE if format == "xlsx" else "text/csv",
+                headers={"Content-Disposition": f"attachment; filename={filename}"},
+            )
 
         export_service = ExportService(
             analytics_service=analytics_service,
@@ -236,9 +249,7 @@ async def export_report(
 
         if format == "xlsx":
             file_content = await export_service.generate_xlsx()
-            media_type = (
-                "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-            )
+            media_type = XLSX_MEDIA_TYPE
             filename = "analytics_report.xlsx"
         else:
             file_content = await export_service.generate_csv()
@@ -255,6 +266,54 @@ async def export_report(
         raise HTTPException(status_code=500, detail="导出报告失败")
 
 
+@router.post(
+    "/export/jobs",
+    summary="后台导出稿件明细",
+    description="异步生成稿件级明细（XLSX/CSV），完成后通过 GET /export/jobs/{job_id} 获取签名下载链接",
+    status_code=202,
+)
+async def create_export_job(
+    background_tasks: BackgroundTasks,
+    format: str = Query("csv", pattern="^(xlsx|csv)$", description="导出格式"),
+    current_user: dict = Depends(get_current_user),
+    analytics_service: AnalyticsService = Depends(get_analytics_service),
+):
+    from app.core.export_service import ManuscriptRowExporter, create_export_job as _create_job, run_export_job
+
+    roles = _require_analytics_access(current_user)
+    user_id = str(current_user.get("id") or "")
+    journal_ids = _resolve_scope_journal_ids(user_id=user_id, roles=roles)
+
+    job = _create_job(owner_id=user_id, format=format)
+    logger.info(
+        "Analytics export job %s (%s) queued by user %s (scope=%s)",
+        job.id,
+        format,
+        user_id or "unknown",
+        "all" if journal_ids is None else len(journal_ids),
+    )
+    # 中文注释: run_export_job 为同步函数，BackgroundTasks 会放到线程池执行，不阻塞事件循环。
+    background_tasks.add_task(run_export_job, job, ManuscriptRowExporter(analytics_service.client, journal_ids))
+    return {"success": True, "data": job.to_dict()}
+
+
+@router.get(
+    "/export/jobs/{job_id}",
+    summary="查询后台导出任务",
+)
+async def get_export_job_status(
+    job_id: str,
+    current_user: dict = Depends(get_current_user),
+):
+    from app.core.export_service import get_export_job
+
+    _require_analytics_access(current_user)
+    job = get_export_job(job_id, owner_id=str(current_user.get("id") or ""))
+    if job is None:
+        raise HTTPException(status_code=404, detail="Export job not found")
+    return {"success": True, "data": job.to_dict()}
+
+
 @router.get(
     "/management",
     response_model=AnalyticsManagementResponse,
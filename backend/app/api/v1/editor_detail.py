@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from fastapi import APIRouter, Depends, Query, Request
+from fastapi import APIRouter, Depends, Query, Request, Response
 
 from app.api.v1 import editor_detail_handlers as detail_handlers
 from app.api.v1.editor_common import get_signed_url as _get_signed_url_default
@@ -24,6 +24,7 @@ def _sync_handler_overrides() -> None:
 @router.get("/manuscripts/{id}")
 async def get_editor_manuscript_detail(
     request: Request,
+    response: Response,
     id: str,
     skip_cards: bool = Query(False, description="首屏详情是否跳过统计卡片计算"),
     include_heavy: bool = Query(False, description="在 skip_cards=true 时是否补齐 files/invites/revisions 等重区块"),
@@ -38,6 +39,7 @@ async def get_editor_manuscript_detail(
         include_heavy=include_heavy,
         current_user=current_user,
         profile=profile,
+        response=response,
     )
 
 
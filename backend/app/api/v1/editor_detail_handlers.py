@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from fastapi import Request
+from fastapi import Request, Response
 
 from app.api.v1 import editor_detail_runtime as runtime
 from app.api.v1.editor_common import get_signed_url as _get_signed_url_default
@@ -26,6 +26,7 @@ async def get_editor_manuscript_detail_impl(
     include_heavy: bool,
     current_user: dict,
     profile: dict,
+    response: Response | None = None,
 ):
     _sync_runtime_overrides()
     return await _detail_impl(
@@ -35,6 +36,7 @@ async def get_editor_manuscript_detail_impl(
         include_heavy=include_heavy,
         current_user=current_user,
         profile=profile,
+        response=response,
     )
 
 
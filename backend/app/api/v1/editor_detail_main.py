@@ -5,9 +5,10 @@ from datetime import datetime, timezone
 from time import perf_counter
 from typing import Any
 
-from fastapi import Request
+from fastapi import Request, Response
 
 from app.api.v1 import editor_detail_runtime as runtime
+from app.core.concurrent_loader import BlockingBlock, format_server_timing, run_blocking_blocks
 from app.models.internal_task import InternalTaskStatus
 from app.models.manuscript import ManuscriptStatus, normalize_status
 
@@ -141,6 +142,157 @@ def _load_reviewer_assignments_for_detail(manuscript_id: str) -> list[dict[str,
     return []
 
 
+def _load_invoice_for_detail(manuscript_id: str) -> dict[str, Any] | None:
+    # 票据/支付状态（容错：没有 invoice 也不应 500）
+    try:
+        inv_resp = (
+            runtime.supabase_admin.table("invoices")
+            .select("id,manuscript_id,amount,status,confirmed_at,invoice_number,pdf_path,pdf_generated_at,pdf_error")
+            .eq("manuscript_id", manuscript_id)
+            .single()
+            .execute()
+        )
+        return getattr(inv_resp, "data", None) or None
+    except Exception:
+        return None
+
+
+def _load_manuscript_files_for_detail(manuscript_id: str) -> list[dict[str, Any]]:
+    # Feature 033: 内部文件（cover letter / editor peer review attachments）
+    try:
+        mf = (
+            runtime.supabase_admin.table("manuscript_files")
+            .select("id,file_type,bucket,path,original_filename,content_type,created_at,uploaded_by")
+            .eq("manuscript_id", manuscript_id)
+            .order("created_at", desc=True)
+            .execute()
+        )
+        return getattr(mf, "data", None) or []
+    except Exception as e:
+        # 中文注释: 云端未应用 migration 时不应导致详情页 500
+        if not runtime._is_missing_table_error(str(e)):
+            logger.warning("[ManuscriptFiles] load manuscript_files failed (ignored): %s", e)
+        return []
+
+
+def _load_review_reports_for_detail(manuscript_id: str) -> list[dict[str, Any]]:
+    # 审稿报告（用于附件 + submitted_at 聚合），尽量复用同一查询结果，避免重复打 DB。
+    try:
+        rr = (
+            runtime.supabase_admin.table("review_reports")
+            .select("id,reviewer_id,attachment_path,created_at,status")
+            .eq("manuscript_id", manuscript_id)
+            .order("created_at", desc=True)
+            .execute()
+        )
+        return getattr(rr, "data", None) or []
+    except Exception as e:
+        logger.warning("[ReviewReports] load failed (ignored): %s", e)
+        return []
+
+
+def _load_reviewer_invites_with_email_events(manuscript_id: str) -> dict[str, Any]:
+    """
+    Reviewer 邀请时间线 + 邮件事件。
+
+    中文注释: email_logs 依赖 assignment ids，因此两者在同一个并发区块内串行执行，
+    并分别回报耗时（review_assignments / email_logs）。
+    """
+    ra_rows: list[dict[str, Any]] = []
+    t0 = perf_counter()
+    try:
+        ra_rows = _load_reviewer_assignments_for_detail(manuscript_id)
+    except Exception as e:
+        logger.warning("[ReviewerInvites] load failed (ignored): %s", e)
+    ra_ms = round((perf_counter() - t0) * 1000, 1)
+
+    t0 = perf_counter()
+    email_log_rows: list[dict[str, Any]] = []
+    assignment_ids = [str(row.get("id") or "").strip() for row in ra_rows if str(row.get("id") or "").strip()]
+    email_events_map = _load_assignment_email_events(assignment_ids=assignment_ids)
+    for assignment_id in assignment_ids:
+        email_log_rows.extend(email_events_map.get(assignment_id, []))
+    email_ms = round((perf_counter() - t0) * 1000, 1)
+
+    return {
+        "review_assignments": ra_rows,
+        "email_logs": email_log_rows,
+        "timings": {"review_assignments": ra_ms, "email_logs": email_ms},
+    }
+
+
+def _load_status_logs_for_detail(manuscript_id: str) -> list[dict[str, Any]]:
+    # 预审时间线
+    try:
+        tl_resp = (
+            runtime.supabase_admin.table("status_transition_logs")
+            .select("id,created_at,comment,payload")
+            .eq("manuscript_id", manuscript_id)
+            .order("created_at", desc=False)
+            .limit(300)
+            .execute()
+        )
+        return getattr(tl_resp, "data", None) or []
+    except Exception as e:
+        logger.warning("[PrecheckTimeline] load failed (ignored): %s", e)
+        return []
+
+
+def _empty_task_summary() -> dict[str, Any]:
+    return {
+        "open_tasks_count": 0,
+        "overdue_tasks_count": 0,
+        "is_overdue": False,
+        "nearest_due_at": None,
+    }
+
+
+def _load_task_summary_for_detail(manuscript_id: str) -> dict[str, Any]:
+    # Feature 045: 稿件级任务逾期摘要（详情页右侧摘要使用）
+    try:
+        t_resp = (
+            runtime.supabase_admin.table("internal_tasks")
+            .select("id,status,due_at")
+            .eq("manuscript_id", manuscript_id)
+            .execute()
+        )
+        t_rows = getattr(t_resp, "data", None) or []
+        open_rows = [r for r in t_rows if str(r.get("status") or "").lower() != InternalTaskStatus.DONE.value]
+        overdue_count = 0
+        nearest_due: str | None = None
+        now = datetime.now(timezone.utc)
+        for row in open_rows:
+            due_raw = str(row.get("due_at") or "")
+            if not due_raw:
+                continue
+            try:
+                due_at = datetime.fromisoformat(due_raw.replace("Z", "+00:00")).astimezone(timezone.utc)
+            except Exception:
+                continue
+            if due_at < now:
+                overdue_count += 1
+            if not nearest_due:
+                nearest_due = due_at.isoformat()
+            else:
+                try:
+                    prev = datetime.fromisoformat(nearest_due.replace("Z", "+00:00")).astimezone(timezone.utc)
+                    if due_at < prev:
+                        nearest_due = due_at.isoformat()
+                except Exception:
+                    nearest_due = due_at.isoformat()
+
+        return {
+            "open_tasks_count": len(open_rows),
+            "overdue_tasks_count": overdue_count,
+            "is_overdue": overdue_count > 0,
+            "nearest_due_at": nearest_due,
+        }
+    except Exception as e:
+        if not runtime._is_missing_table_error(str(e)):
+            logger.warning("[InternalTasks] task summary failed (ignored): %s", e)
+        return _empty_task_summary()
+
+
 async def get_editor_manuscript_detail_impl(
     request: Request,
     id: str,
@@ -148,9 +300,12 @@ async def get_editor_manuscript_detail_impl(
     include_heavy: bool,
     current_user: dict,
     profile: dict,
+    response: Response | None = None,
 ):
     """
     Feature 028 / US2: Editor 专用稿件详情（包含 invoice_metadata、owner/editor profile、journal 信息）。
+
+    各区块耗时通过 `Server-Timing` 响应头返回（需传入 response）。
     """
     runtime._require_action_or_403(action="manuscript:view_detail", roles=profile.get("roles") or [])
 
@@ -174,24 +329,9 @@ async def get_editor_manuscript_detail_impl(
     load_heavy_blocks = (not skip_cards) or bool(include_heavy)
     ms["is_deferred_context_loaded"] = bool(load_heavy_blocks)
 
-    # 票据/支付状态（容错：没有 invoice 也不应 500）
-    invoice = None
-    t0 = perf_counter()
-    try:
-        inv_resp = (
-            runtime.supabase_admin.table("invoices")
-            .select("id,manuscript_id,amount,status,confirmed_at,invoice_number,pdf_path,pdf_generated_at,pdf_error")
-            .eq("manuscript_id", id)
-            .single()
-            .execute()
-        )
-        invoice = getattr(inv_resp, "data", None) or None
-    except Exception:
-        invoice = None
-    _mark("invoice", t0)
-    ms["invoice"] = invoice
-
-    # 重区块上下文（files/reviewer invites/revisions）：
+    # 详情上下文 fan-out：invoice / files / reports / revisions / invites(+email logs) / timeline / tasks
+    # 之间互不依赖，放进专用线程池并发执行（每块独立超时，失败或超时降级为空结果）。
+    # 重区块（files/reviewer invites/revisions）：
     # - 首屏轻量请求默认跳过；
     # - include_heavy=true 或 skip_cards=false 时加载；
     # - 用短缓存削峰，并允许 x-sf-force-refresh 强制绕过。
@@ -199,89 +339,79 @@ async def get_editor_manuscript_detail_impl(
     rr_rows: list[dict[str, Any]] = []
     ra_rows: list[dict[str, Any]] = []
     email_log_rows: list[dict[str, Any]] = []
+    tl_rows: list[dict[str, Any]] = []
     ms["latest_author_response_letter"] = None
     ms["latest_author_response_submitted_at"] = None
     ms["latest_author_response_round"] = None
     ms["author_response_history"] = []
+    ms["task_summary"] = _empty_task_summary()
+
+    blocks: list[BlockingBlock] = [BlockingBlock("invoice", lambda: _load_invoice_for_detail(id), None)]
+    heavy_cache_key = f"mid={id}|{runtime._editor_detail_data_source_marker()}"
+    heavy_ctx: dict[str, Any] | None = None
+    load_heavy_from_db = False
     if load_heavy_blocks:
-        heavy_cache_key = f"mid={id}|{runtime._editor_detail_data_source_marker()}"
-        heavy_ctx: dict[str, Any] | None = None
         t0 = perf_counter()
         if not force_refresh:
             heavy_ctx = runtime._detail_heavy_block_cache.get(heavy_cache_key)
-        if heavy_ctx is not None:
-            _mark("heavy_ctx_cache", t0)
-            mf_rows = list(heavy_ctx.get("manuscript_files") or [])
-            rr_rows = list(heavy_ctx.get("review_reports") or [])
-            ra_rows = list(heavy_ctx.get("review_assignments") or [])
-            email_log_rows = list(heavy_ctx.get("email_logs") or [])
-            ms["latest_author_response_letter"] = heavy_ctx.get("latest_author_response_letter")
-            ms["latest_author_response_submitted_at"] = heavy_ctx.get("latest_author_response_submitted_at")
-            ms["latest_author_response_round"] = heavy_ctx.get("latest_author_response_round")
-            ms["author_response_history"] = list(heavy_ctx.get("author_response_history") or [])
-            timings["manuscript_files"] = 0.0
-            timings["review_reports"] = 0.0
-            timings["revisions"] = 0.0
-            timings["review_assignments"] = 0.0
-            timings["email_logs"] = 0.0
-        else:
-            _mark("heavy_ctx_cache", t0)
-            # Feature 033: 内部文件（cover letter / editor peer review attachments）
-            t0 = perf_counter()
-            try:
-                mf = (
-                    runtime.supabase_admin.table("manuscript_files")
-                    .select("id,file_type,bucket,path,original_filename,content_type,created_at,uploaded_by")
-                    .eq("manuscript_id", id)
-                    .order("created_at", desc=True)
-                    .execute()
-                )
-                mf_rows = getattr(mf, "data", None) or []
-            except Exception as e:
-                # 中文注释: 云端未应用 migration 时不应导致详情页 500
-                if not runtime._is_missing_table_error(str(e)):
-                    logger.warning("[ManuscriptFiles] load manuscript_files failed (ignored): %s", e)
-            _mark("manuscript_files", t0)
-
-            # 审稿报告（用于附件 + submitted_at 聚合），尽量复用同一查询结果，避免重复打 DB。
-            t0 = perf_counter()
-            try:
-                rr = (
-                    runtime.supabase_admin.table("review_reports")
-                    .select("id,reviewer_id,attachment_path,created_at,status")
-                    .eq("manuscript_id", id)
-                    .order("created_at", desc=True)
-                    .execute()
-                )
-                rr_rows = getattr(rr, "data", None) or []
-            except Exception as e:
-                logger.warning("[ReviewReports] load failed (ignored): %s", e)
-            _mark("review_reports", t0)
-
-            # 作者最近一次修回说明（Response Letter）
-            t0 = perf_counter()
-            revision_snapshot = runtime._load_revision_response_snapshot(id)
-            ms["latest_author_response_letter"] = revision_snapshot.get("latest_author_response_letter")
-            ms["latest_author_response_submitted_at"] = revision_snapshot.get("latest_author_response_submitted_at")
-            ms["latest_author_response_round"] = revision_snapshot.get("latest_author_response_round")
-            ms["author_response_history"] = list(revision_snapshot.get("author_response_history") or [])
-            _mark("revisions", t0)
-
-            # Reviewer 邀请时间线
-            t0 = perf_counter()
-            try:
-                ra_rows = _load_reviewer_assignments_for_detail(id)
-            except Exception as e:
-                logger.warning("[ReviewerInvites] load failed (ignored): %s", e)
-            _mark("review_assignments", t0)
-
-            t0 = perf_counter()
-            assignment_ids = [str(row.get("id") or "").strip() for row in ra_rows if str(row.get("id") or "").strip()]
-            email_events_map = _load_assignment_email_events(assignment_ids=assignment_ids)
-            for assignment_id in assignment_ids:
-                email_log_rows.extend(email_events_map.get(assignment_id, []))
-            _mark("email_logs", t0)
+        _mark("heavy_ctx_cache", t0)
+        if heavy_ctx is None:
+            load_heavy_from_db = True
+            blocks.extend(
+                [
+                    BlockingBlock("manuscript_files", lambda: _load_manuscript_files_for_detail(id), []),
+                    BlockingBlock("review_reports", lambda: _load_review_reports_for_detail(id), []),
+                    # 作者最近一次修回说明（Response Letter）
+                    BlockingBlock("revisions", lambda: runtime._load_revision_response_snapshot(id), {}),
+                    BlockingBlock(
+                        "review_assignments",
+                        lambda: _load_reviewer_invites_with_email_events(id),
+                        {"review_assignments": [], "email_logs": [], "timings": {}},
+                    ),
+                ]
+            )
+    if not skip_cards:
+        blocks.extend(
+            [
+                BlockingBlock("status_logs", lambda: _load_status_logs_for_detail(id), []),
+                BlockingBlock("task_summary", lambda: _load_task_summary_for_detail(id), _empty_task_summary()),
+            ]
+        )
 
+    t0 = perf_counter()
+    fanout = await run_blocking_blocks(blocks, timings=timings)
+    _mark("fanout", t0)
+    degraded_blocks = list(fanout.degraded)
+
+    ms["invoice"] = fanout.values.get("invoice")
+
+    if heavy_ctx is not None:
+        mf_rows = list(heavy_ctx.get("manuscript_files") or [])
+        rr_rows = list(heavy_ctx.get("review_reports") or [])
+        ra_rows = list(heavy_ctx.get("review_assignments") or [])
+        email_log_rows = list(heavy_ctx.get("email_logs") or [])
+        ms["latest_author_response_letter"] = heavy_ctx.get("latest_author_response_letter")
+        ms["latest_author_response_submitted_at"] = heavy_ctx.get("latest_author_response_submitted_at")
+        ms["latest_author_response_round"] = heavy_ctx.get("latest_author_response_round")
+        ms["author_response_history"] = list(heavy_ctx.get("author_response_history") or [])
+        for name in ("manuscript_files", "review_reports", "revisions", "review_assignments", "email_logs"):
+            timings[name] = 0.0
+    elif load_heavy_from_db:
+        mf_rows = list(fanout.values.get("manuscript_files") or [])
+        rr_rows = list(fanout.values.get("review_reports") or [])
+        revision_snapshot = fanout.values.get("revisions") or {}
+        ms["latest_author_response_letter"] = revision_snapshot.get("latest_author_response_letter")
+        ms["latest_author_response_submitted_at"] = revision_snapshot.get("latest_author_response_submitted_at")
+        ms["latest_author_response_round"] = revision_snapshot.get("latest_author_response_round")
+        ms["author_response_history"] = list(revision_snapshot.get("author_response_history") or [])
+        invites_ctx = fanout.values.get("review_assignments") or {}
+        ra_rows = list(invites_ctx.get("review_assignments") or [])
+        email_log_rows = list(invites_ctx.get("email_logs") or [])
+        timings.update(invites_ctx.get("timings") or {})
+        timings.setdefault("email_logs", 0.0)
+
+        # 中文注释: 任一重区块降级时不写缓存，避免把不完整结果缓存给后续请求。
+        if not any(name in degraded_blocks for name in ("manuscript_files", "review_reports", "revisions", "review_assignments")):
             runtime._detail_heavy_block_cache.set(
                 heavy_cache_key,
                 {
@@ -297,81 +427,15 @@ async def get_editor_manuscript_detail_impl(
                 ttl_sec=runtime._DETAIL_HEAVY_BLOCK_CACHE_TTL_SEC,
             )
     else:
-        timings["manuscript_files"] = 0.0
-        timings["review_reports"] = 0.0
-        timings["revisions"] = 0.0
-        timings["review_assignments"] = 0.0
-        timings["email_logs"] = 0.0
+        for name in ("manuscript_files", "review_reports", "revisions", "review_assignments", "email_logs"):
+            timings[name] = 0.0
 
-    # 预审时间线
-    tl_rows: list[dict[str, Any]] = []
-    t0 = perf_counter()
-    if not skip_cards:
-        try:
-            tl_resp = (
-                runtime.supabase_admin.table("status_transition_logs")
-                .select("id,created_at,comment,payload")
-                .eq("manuscript_id", id)
-                .order("created_at", desc=False)
-                .limit(300)
-                .execute()
-            )
-            tl_rows = getattr(tl_resp, "data", None) or []
-        except Exception as e:
-            logger.warning("[PrecheckTimeline] load failed (ignored): %s", e)
-    _mark("status_logs", t0)
-
-    # Feature 045: 稿件级任务逾期摘要（详情页右侧摘要使用）
-    ms["task_summary"] = {
-        "open_tasks_count": 0,
-        "overdue_tasks_count": 0,
-        "is_overdue": False,
-        "nearest_due_at": None,
-    }
-    t0 = perf_counter()
     if not skip_cards:
-        try:
-            t_resp = (
-                runtime.supabase_admin.table("internal_tasks")
-                .select("id,status,due_at")
-                .eq("manuscript_id", id)
-                .execute()
-            )
-            t_rows = getattr(t_resp, "data", None) or []
-            open_rows = [r for r in t_rows if str(r.get("status") or "").lower() != InternalTaskStatus.DONE.value]
-            overdue_count = 0
-            nearest_due: str | None = None
-            now = datetime.now(timezone.utc)
-            for row in open_rows:
-                due_raw = str(row.get("due_at") or "")
-                if not due_raw:
-                    continue
-                try:
-                    due_at = datetime.fromisoformat(due_raw.replace("Z", "+00:00")).astimezone(timezone.utc)
-                except Exception:
-                    continue
-                if due_at < now:
-                    overdue_count += 1
-                if not nearest_due:
-                    nearest_due = due_at.isoformat()
-                else:
-                    try:
-                        prev = datetime.fromisoformat(nearest_due.replace("Z", "+00:00")).astimezone(timezone.utc)
-                        if due_at < prev:
-                            nearest_due = due_at.isoformat()
-                    except Exception:
-                        nearest_due = due_at.isoformat()
-
-            ms["task_summary"] = {
-                "open_tasks_count": len(open_rows),
-                "overdue_tasks_count": overdue_count,
-                "is_overdue": overdue_count > 0,
-                "nearest_due_at": nearest_due,
-            }
-        except Exception as e:
-            if not runtime._is_missing_table_error(str(e)):
-                logger.warning("[InternalTasks] task summary failed (ignored): %s", e)
-    _mark("task_summary", t0)
+        tl_rows = list(fanout.values.get("status_logs") or [])
+        ms["task_summary"] = fanout.values.get("task_summary") or _empty_task_summary()
+    else:
+        timings["status_logs"] = 0.0
+        timings["task_summary"] = 0.0
 
     # 合并构建 profile id，减少 user_profiles 的重复查询。
     profile_ids: set[str] = set()
@@ -797,5 +861,11 @@ async def get_editor_manuscript_detail_impl(
     total_ms = round((perf_counter() - t_total_start) * 1000, 1)
     timing_text = " ".join([f"{k}={v}ms" for k, v in timings.items()])
     logger.info("[EditorDetail:%s] total=%sms %s", id, total_ms, timing_text)
+    if response is not None:
+        response.headers["Server-Timing"] = format_server_timing(
+            timings,
+            total_ms=total_ms,
+            degraded=degraded_blocks,
+        )
 
     return {"success": True, "data": ms}
@@ -1,7 +1,6 @@
 from __future__ import annotations
 
 from datetime import datetime, timezone
-from io import BytesIO
 from typing import Literal
 
 from fastapi import APIRouter, Body, Depends, HTTPException, Query
@@ -38,10 +37,13 @@ async def get_finance_invoices(
     page_size: int = Query(20, ge=1, le=100),
     sort_by: Literal["updated_at", "amount", "status"] = Query("updated_at"),
     sort_order: Literal["asc", "desc"] = Query("desc"),
+    cursor: str | None = Query(None, max_length=512, description="上一页 meta.next_cursor（keyset 翻页）"),
     _profile: dict = Depends(require_any_role(["managing_editor", "admin"])),
 ):
     """
     Feature 046: Finance 页面真实账单列表（内部角色）。
+
+    中文注释: 传 cursor 时按 keyset 翻页（不返回 total），否则按 page 翻页；两种方式都会返回 meta.next_cursor。
     """
     try:
         result = EditorService().list_finance_invoices(
@@ -52,6 +54,7 @@ async def get_finance_invoices(
                 page_size=page_size,
                 sort_by=sort_by,
                 sort_order=sort_order,
+                cursor=cursor,
             )
         )
         return {"success": True, "data": result["rows"], "meta": result["meta"]}
@@ -84,7 +87,6 @@ async def export_finance_invoices_csv(
                 sort_order=sort_order,
             )
         )
-        csv_text = result.get("csv_text", "")
         snapshot_at = str(result.get("snapshot_at") or datetime.now(timezone.utc).isoformat())
         empty = bool(result.get("empty"))
         filename = f"finance_invoices_{status}_{datetime.now(timezone.utc).strftime('%Y%m%d%H%M%S')}.csv"
@@ -93,8 +95,9 @@ async def export_finance_invoices_csv(
             "X-Export-Snapshot-At": snapshot_at,
             "X-Export-Empty": "1" if empty else "0",
         }
+        # 中文注释: 逐批生成的 CSV 直接流式输出，不在内存里拼完整文件。
         return StreamingResponse(
-            BytesIO(csv_text.encode("utf-8")),
+            (chunk.encode("utf-8") for chunk in result["chunks"]),
             media_type="text/csv",
             headers=headers,
         )
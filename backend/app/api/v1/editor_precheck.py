@@ -3,7 +3,7 @@ from __future__ import annotations
 from typing import Any
 from uuid import UUID
 
-from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, Request
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, Request, Response
 from pydantic import BaseModel, ConfigDict, EmailStr, field_validator
 
 from app.api.v1.editor_common import (
@@ -187,6 +187,14 @@ def _is_force_refresh_request(request: Request) -> bool:
     return token in {"1", "true", "yes", "on"}
 
 
+def _workspace_page_rows(response: Response, result: dict[str, Any]) -> list[dict[str, Any]]:
+    # 中文注释: 响应体保持数组不变（兼容现有前端），翻页信息放在响应头。
+    response.headers["X-Has-More"] = "true" if result.get("has_more") else "false"
+    if result.get("next_cursor"):
+        response.headers["X-Next-Cursor"] = str(result["next_cursor"])
+    return result.get("rows") or []
+
+
 # --- Feature 038: Pre-check Role Workflow Endpoints ---
 
 @router.get("/intake")
@@ -424,8 +432,10 @@ async def mark_technical_revision_email_external_sent(
 @router.get("/workspace")
 async def get_ae_workspace(
     request: Request,
+    response: Response,
     page: int = 1,
     page_size: int = 20,
+    cursor: str | None = Query(None, max_length=512),
     current_user: dict = Depends(get_current_user),
     _profile: dict = Depends(require_any_role(["assistant_editor", "admin"])),
 ):
@@ -437,17 +447,24 @@ async def get_ae_workspace(
     - under_review
     - major_revision / minor_revision / resubmitted
     - decision
+
+    中文注释: 传 cursor（上一页响应头 X-Next-Cursor）时按 keyset 翻页并忽略 page；是否还有下一页见 X-Has-More。
     """
     try:
         user_id = str(current_user.get("id") or "")
-        cache_key = f"uid={user_id}|page={max(page, 1)}|size={max(page_size, 1)}"
+        cache_key = f"uid={user_id}|page={max(page, 1)}|size={max(page_size, 1)}|cursor={cursor or ''}"
         if not _is_force_refresh_request(request):
             cached = _ae_workspace_cache.get(cache_key)
             if cached is not None:
-                return cached
-        rows = EditorService().get_ae_workspace(current_user["id"], page, page_size)
-        _ae_workspace_cache.set(cache_key, rows, ttl_sec=_AE_WORKSPACE_CACHE_TTL_SEC)
-        return rows
+                return _workspace_page_rows(response, cached)
+        result = EditorService().get_ae_workspace_page(
+            current_user["id"],
+            page=page,
+            page_size=page_size,
+            cursor=cursor,
+        )
+        _ae_workspace_cache.set(cache_key, result, ttl_sec=_AE_WORKSPACE_CACHE_TTL_SEC)
+        return _workspace_page_rows(response, result)
     except HTTPException:
         raise
     except Exception as e:
@@ -458,15 +475,18 @@ async def get_ae_workspace(
 @router.get("/managing-workspace")
 async def get_managing_workspace(
     request: Request,
+    response: Response,
     page: int = 1,
     page_size: int = 20,
     q: str | None = Query(None, max_length=100),
+    cursor: str | None = Query(None, max_length=512),
     current_user: dict = Depends(get_current_user),
     profile: dict = Depends(require_any_role(["managing_editor", "admin"])),
 ):
     """
     Managing Editor Workspace:
     - 按状态分桶返回 ME 需要跟进的非终态稿件。
+    - 传 cursor（上一页响应头 X-Next-Cursor）时按 keyset 翻页并忽略 page；是否还有下一页见 X-Has-More。
     """
     try:
         viewer_user_id = str(current_user.get("id") or "")
@@ -474,22 +494,23 @@ async def get_managing_workspace(
         role_key = ",".join(sorted(normalize_roles(viewer_roles)))
         cache_key = (
             f"uid={viewer_user_id}|roles={role_key}|page={max(page, 1)}|size={max(page_size, 1)}"
-            f"|q={str(q or '').strip().lower()}"
+            f"|q={str(q or '').strip().lower()}|cursor={cursor or ''}"
         )
         if not _is_force_refresh_request(request):
             cached = _me_workspace_cache.get(cache_key)
             if cached is not None:
-                return cached
+                return _workspace_page_rows(response, cached)
 
-        rows = EditorService().get_managing_workspace(
+        result = EditorService().get_managing_workspace_page(
             viewer_user_id=str(current_user.get("id") or ""),
             viewer_roles=profile.get("roles") or [],
             page=page,
             page_size=page_size,
             q=q,
+            cursor=cursor,
         )
-        _me_workspace_cache.set(cache_key, rows, ttl_sec=_ME_WORKSPACE_CACHE_TTL_SEC)
-        return rows
+        _me_workspace_cache.set(cache_key, result, ttl_sec=_ME_WORKSPACE_CACHE_TTL_SEC)
+        return _workspace_page_rows(response, result)
     except HTTPException:
         raise
     except Exception as e:
@@ -1,3 +1,4 @@
+import asyncio
 import json
 import logging
 import os
@@ -5,7 +6,7 @@ from uuid import UUID
 
 import httpx
 import resend
-from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, Request
 
 from app.core.config import get_admin_api_key
 from app.models.platform_readiness import (
@@ -15,7 +16,10 @@ from app.models.platform_readiness import (
     PlatformReadinessStatus,
 )
 from app.core.scheduler import ChaseScheduler
+from app.core.mail_dispatcher import get_mail_metrics
+from app.core.parse_pool import get_parse_pool_metrics
 from app.core.security import require_admin_key
+from app.lib.supabase_pool import get_pool_metrics
 from app.models.release_validation import (
     CreateRunRequest,
     FinalizeRequest,
@@ -24,6 +28,7 @@ from app.models.release_validation import (
 )
 from app.services.release_validation_service import ReleaseValidationService
 from app.services.doi_service import DOIService
+from app.services.matchmaking_service import MatchmakingService
 
 router = APIRouter(prefix="/internal", tags=["Internal"])
 logger = logging.getLogger(__name__)
@@ -355,18 +360,33 @@ def _derive_platform_readiness_status(checks: list[PlatformReadinessCheck]) -> P
 
 
 @router.post("/cron/chase-reviews")
-async def chase_reviews(_admin: None = Depends(require_admin_key)):
+async def chase_reviews(
+    dry_run: bool = False,
+    cursor: str | None = None,
+    limit: int | None = None,
+    _admin: None = Depends(require_admin_key),
+):
     """
     触发自动催办逻辑（内部接口）
+
+    中文注释:
+    - dry_run=true 只返回将要催办的 assignment 清单（report），不发信、不写 last_reminded_at。
+    - limit 限定单次处理量；未处理完时响应里的 next_cursor 作为下次调用的 cursor 续跑。
     """
     scheduler = ChaseScheduler()
-    result = scheduler.run()
+    result = await asyncio.to_thread(
+        scheduler.run,
+        dry_run=dry_run,
+        cursor=cursor,
+        max_assignments=max(limit, 1) if limit is not None else None,
+    )
     return {"success": True, **result}
 
 
 @router.post("/cron/doi-tasks")
 async def run_doi_tasks(
     limit: int = Query(default=5, ge=1, le=50),
+    concurrency: int | None = Query(default=None, ge=1, le=16),
     _admin: None = Depends(require_admin_key),
 ):
     """
@@ -374,11 +394,30 @@ async def run_doi_tasks(
 
     中文注释:
     - 用于 Hugging Face / CI cron 定时调用，避免单独常驻 worker 进程。
+    - 一次领取最多 limit 个任务，按 concurrency（缺省 DOI_TASK_CONCURRENCY）并发注册。
     """
-    result = await DOIService().process_due_tasks(limit=limit)
+    result = await DOIService().process_due_tasks(limit=limit, concurrency=concurrency)
     return {"success": True, "data": result}
 
 
+@router.post("/cron/reindex-reviewers")
+async def reindex_reviewers(
+    background_tasks: BackgroundTasks,
+    batch_size: int = Query(default=256, ge=1, le=2000),
+    force: bool = Query(default=False),
+    _admin: None = Depends(require_admin_key),
+):
+    """
+    触发审稿人 embedding 全量重建（内部接口）。
+
+    中文注释:
+    - 全量重建耗时较长，放到后台执行，接口立即返回；
+    - source_text_hash 未变化的审稿人会被跳过，force=true 时强制重算。
+    """
+    background_tasks.add_task(MatchmakingService().reindex_reviewers, batch_size=batch_size, force=force)
+    return {"success": True, "data": {"scheduled": True, "batch_size": batch_size, "force": force}}
+
+
 @router.get("/sentry/test-error")
 async def sentry_test_error(_admin: None = Depends(require_admin_key)):
     """
@@ -420,6 +459,42 @@ async def get_runtime_version(_admin: None = Depends(require_admin_key)):
     return PlatformRuntimeVersionResponse(deploy_sha=deploy_sha)
 
 
+@router.get("/metrics/supabase-pool")
+async def get_supabase_pool_metrics(_admin: None = Depends(require_admin_key)):
+    """
+    Supabase/PostgREST 共享连接池指标（内部接口）。
+
+    中文注释:
+    - in_use/idle 为当前连接快照；waits_total/pool_timeouts_total 为进程启动以来累计值。
+    - 仅当前 worker 进程内有效（多 worker 需分别采集）。
+    """
+    return {"success": True, "data": get_pool_metrics()}
+
+
+@router.get("/metrics/parse-pool")
+async def get_parse_pool_metrics_endpoint(_admin: None = Depends(require_admin_key)):
+    """
+    稿件解析进程池指标（内部接口）。
+
+    中文注释:
+    - queue_depth/running 为当前快照；p95_ms 基于最近 512 次解析耗时；
+    - kills_total 为超时被强制终止的子进程累计数。
+    """
+    return {"success": True, "data": get_parse_pool_metrics()}
+
+
+@router.get("/metrics/mail")
+async def get_mail_metrics_endpoint(_admin: None = Depends(require_admin_key)):
+    """
+    出站邮件发送指标（内部接口）。
+
+    中文注释:
+    - sent_total/failed_total 按 provider 累计；last_batch 为最近一次批量分发的吞吐；
+    - smtp_pools 为各 SMTP 连接池的 idle/in_use 快照与重连计数（仅当前 worker 进程）。
+    """
+    return {"success": True, "data": get_mail_metrics()}
+
+
 @router.post("/webhooks/resend")
 async def receive_resend_webhook(request: Request):
     """
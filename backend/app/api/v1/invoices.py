@@ -1,11 +1,12 @@
 from __future__ import annotations
 
+import asyncio
 from datetime import datetime, timezone
 from typing import Any
 from uuid import UUID
 
-from fastapi import APIRouter, Body, Depends, HTTPException
-from pydantic import BaseModel, ConfigDict, EmailStr, field_validator
+from fastapi import APIRouter, BackgroundTasks, Body, Depends, HTTPException
+from pydantic import BaseModel, ConfigDict, EmailStr, Field, field_validator
 
 from app.api.v1.editor_common import resolve_author_notification_target
 from app.core.auth_utils import get_current_user
@@ -17,11 +18,18 @@ from app.models.email_log import EmailStatus
 from app.services.invoice_pdf_service import (
     generate_and_store_invoice_pdf,
     get_invoice_pdf_signed_url,
+    regenerate_invoice_pdfs,
 )
 
 router = APIRouter(prefix="/invoices", tags=["Invoices"])
 
 
+class InvoicePdfBulkRegeneratePayload(BaseModel):
+    model_config = ConfigDict(extra="ignore")
+
+    invoice_ids: list[UUID] = Field(min_length=1, max_length=5000)
+
+
 class InvoiceEmailActionPayload(BaseModel):
     model_config = ConfigDict(extra="ignore")
 
@@ -318,7 +326,7 @@ async def get_invoice_pdf_signed(
     pdf_path = (inv.get("pdf_path") or "").strip()
     pdf_error = (inv.get("pdf_error") or "").strip()
     if (not pdf_path) or pdf_error:
-        res = generate_and_store_invoice_pdf(invoice_id=invoice_id)
+        res = await asyncio.to_thread(generate_and_store_invoice_pdf, invoice_id=invoice_id)
         if res.pdf_error:
             print(f"[InvoicePDF] generate failed for invoice={invoice_id}: {res.pdf_error}")
             raise HTTPException(
@@ -345,6 +353,25 @@ async def get_invoice_pdf_signed(
     }
 
 
+@router.post("/pdf/regenerate", status_code=202)
+async def regenerate_invoice_pdfs_bulk(
+    payload: InvoicePdfBulkRegeneratePayload,
+    background_tasks: BackgroundTasks,
+    _current_user: dict = Depends(get_current_user),
+    _profile: dict = Depends(require_any_role(["managing_editor", "admin"])),
+):
+    """
+    批量重新生成 Invoice PDF（Editor/Admin），例如月底统一重出账单。
+
+    中文注释:
+    - 立即返回 202，生成在后台进行：渲染在 invoice 渲染进程池，上传在专用线程池，不占用事件循环。
+    - 每张发票的结果回填在 invoices.pdf_path / pdf_error，可通过 finance 列表查看；同样不改变支付状态。
+    """
+    invoice_ids = list(dict.fromkeys(payload.invoice_ids))
+    background_tasks.add_task(regenerate_invoice_pdfs, invoice_ids)
+    return {"success": True, "data": {"accepted": len(invoice_ids)}}
+
+
 @router.post("/{invoice_id}/pdf/regenerate")
 async def regenerate_invoice_pdf(
     invoice_id: UUID,
@@ -359,7 +386,7 @@ async def regenerate_invoice_pdf(
     - 再生成只更新 pdf 字段，不得改变支付状态。
     """
     try:
-        res = generate_and_store_invoice_pdf(invoice_id=invoice_id)
+        res = await asyncio.to_thread(generate_and_store_invoice_pdf, invoice_id=invoice_id)
         if res.pdf_error:
             raise HTTPException(status_code=500, detail=f"Failed to regenerate invoice pdf: {res.pdf_error}")
         return {
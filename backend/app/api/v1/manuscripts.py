@@ -6,8 +6,10 @@ from fastapi import (
     HTTPException,
     Body,
     Depends,
+    Query,
 )
 from fastapi.responses import Response
+import asyncio
 import httpx
 import logging
 from app.core.pdf_processor import extract_text_and_layout_from_pdf
@@ -21,6 +23,13 @@ from app.lib.api_client import supabase, supabase_admin
 from app.core.auth_utils import get_current_user
 from app.core.roles import require_any_role, get_current_profile
 from app.services.owner_binding_service import validate_internal_owner_id
+from app.services.public_search_index import (
+    decode_cursor,
+    encode_cursor,
+    get_public_search_index,
+    is_public_search_index_enabled,
+    project_fields,
+)
 from app.api.v1.manuscripts_detail import router as manuscripts_detail_router
 from app.api.v1.manuscripts_public import router as manuscripts_public_router
 from app.api.v1.manuscripts_reviews import router as manuscripts_reviews_router
@@ -36,6 +45,7 @@ from app.models.production_workspace import SubmitProofreadingRequest
 from pydantic import ValidationError
 from uuid import UUID
 import os
+import re
 import time
 from datetime import datetime, timezone
 from typing import Optional, Any
@@ -515,7 +525,7 @@ async def download_invoice_pdf(
 
     # 若尚未生成或上次失败，则同步触发一次生成（作者点击下载时体验更直观）
     if (not pdf_path) or pdf_error:
-        res = generate_and_store_invoice_pdf(invoice_id=invoice_id)
+        res = await asyncio.to_thread(generate_and_store_invoice_pdf, invoice_id=invoice_id)
         if res.pdf_error:
             logger.error(
                 "[InvoicePDF] generate failed for manuscript=%s: %s",
@@ -833,26 +843,81 @@ async def get_my_manuscripts(current_user: dict = Depends(get_current_user)):
         return {"success": False, "data": []}
 
 
+_PUBLIC_SEARCH_DEFAULT_LIMIT = 20
+_PUBLIC_SEARCH_MAX_LIMIT = 100
+# 中文注释: PostgREST or_ 语法的保留字符，拼进过滤条件前剔除，避免构造出非法/越权的过滤表达式。
+_POSTGREST_RESERVED_RE = re.compile(r"[,()%*\\\"]")
+
+
+def _search_fallback_articles(
+    q: str, *, limit: int, fields: tuple[str, ...], after_id: Optional[str]
+) -> dict:
+    """
+    索引未就绪时的数据库检索：仍带 limit / 投影 / keyset（按 id），但无相关性排序。
+    """
+    select_cols = ",".join("journals(title,slug)" if f == "journals" else f for f in fields)
+    term = _POSTGREST_RESERVED_RE.sub(" ", q).strip()
+    match = f"title.ilike.%{term}%,abstract.ilike.%{term}%" if term else ""
+    after = f'id.gt."{after_id}"' if after_id else ""
+    query = supabase.table("manuscripts").select(select_cols).eq("status", "published")
+    if match and after:
+        query = query.or_(f"and(or({match}),{after})")
+    elif match or after:
+        query = query.or_(match or after)
+    response = query.order("id").limit(limit + 1).execute()
+    rows = list(getattr(response, "data", None) or [])
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        # 中文注释: 无相关性分数，score 固定为 0；游标格式与索引路径一致。
+        next_cursor = encode_cursor(0.0, str(rows[-1].get("id") or ""))
+    return {"success": True, "results": rows, "next_cursor": next_cursor, "ranked": False}
+
+
 @router.get("/manuscripts/search")
-async def public_search(q: str, mode: str = "articles"):
-    """公开检索"""
+async def public_search(
+    q: str,
+    mode: str = "articles",
+    limit: int = Query(_PUBLIC_SEARCH_DEFAULT_LIMIT, ge=1, le=_PUBLIC_SEARCH_MAX_LIMIT),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
+):
+    """
+    公开检索
+
+    中文注释:
+    - articles：优先走进程内倒排索引（BM25 排序 + snippet），next_cursor 为 keyset 游标；
+      索引未就绪时退回数据库 ilike（同样分页/投影，无排序），并在后台触发索引加载。
+    - fields：逗号分隔的投影列（白名单见 PROJECTABLE_FIELDS）。
+    """
     try:
         if mode == "articles":
-            response = (
-                supabase.table("manuscripts")
-                .select("*, journals(title)")
-                .eq("status", "published")
-                .or_(f"title.ilike.%{q}%,abstract.ilike.%{q}%")
-                .execute()
-            )
-        else:
-            response = (
-                supabase.table("journals")
-                .select("*")
-                .ilike("title", f"%{q}%")
-                .execute()
+            projected = project_fields(fields)
+            position = decode_cursor(cursor)
+            if cursor and position is None:
+                raise HTTPException(status_code=422, detail="Invalid cursor")
+            index = get_public_search_index() if is_public_search_index_enabled() else None
+            if index is not None:
+                index.maybe_refresh_in_background(supabase_admin)
+            if index is not None and index.ready:
+                results, next_cursor = index.search(
+                    q, limit=limit, cursor=position, fields=projected
+                )
+                return {"success": True, "results": results, "next_cursor": next_cursor, "ranked": True}
+            return _search_fallback_articles(
+                q, limit=limit, fields=projected, after_id=position[1] if position else None
             )
+        term = _POSTGREST_RESERVED_RE.sub(" ", q).strip()
+        response = (
+            supabase.table("journals")
+            .select("*")
+            .ilike("title", f"%{term}%")
+            .limit(limit)
+            .execute()
+        )
         return {"success": True, "results": response.data}
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error("公开搜索异常: %s", e)
         return {"success": False, "results": []}
@@ -1,6 +1,6 @@
 import asyncio
+import hashlib
 import os
-import shutil
 import tempfile
 import time
 from datetime import datetime, timezone
@@ -11,12 +11,17 @@ from fastapi import APIRouter, BackgroundTasks, Body, Depends, File, Form, HTTPE
 from fastapi.responses import JSONResponse
 
 from app.api.v1.editor_common import resolve_author_notification_target
+from app.core import profile_cache
 from app.core.auth_utils import get_current_user
 from app.core.email_normalization import normalize_email
+from app.core.gemini_metadata import metadata_strategy_fingerprint
 from app.core.mail import EmailService
+from app.core.parse_cache import get_parse_cache, is_parse_cache_enabled, parse_cache_key
+from app.core.parse_pool import ParseJobError, ParsePoolBusy, ParseTimeout, get_parse_pool
 from app.models.manuscript import ManuscriptStatus
 from app.models.revision import RevisionSubmitResponse
 from app.models.schemas import ManuscriptCreate
+from app.services.dashboard_counter_service import invalidate_dashboard_counters
 from app.services.notification_service import NotificationService
 from app.services.plagiarism_service import PlagiarismService
 from app.services.revision_service import RevisionService
@@ -63,6 +68,20 @@ def _resolve_metadata_timeout_sec() -> float:
     return max(base_timeout, gemini_timeout + 2.0)
 
 
+def _is_cacheable_metadata(metadata: dict, metadata_strategy: str) -> bool:
+    """
+    中文注释:
+    - 超时结果不缓存；
+    - 已配置 Gemini 却只拿到本地结果，说明 Gemini 本次失败（可能是瞬时故障），也不缓存，下次重试。
+    """
+    source = str((metadata or {}).get("parser_source") or "")
+    if source == "timeout":
+        return False
+    if metadata_strategy.startswith("gemini") and source == "local":
+        return False
+    return True
+
+
 def _ensure_author_role_membership(user_id: str, email: str | None) -> None:
     """
     投稿成功后，确保当前用户具备 author 角色。
@@ -103,6 +122,7 @@ def _ensure_author_role_membership(user_id: str, email: str | None) -> None:
                     .eq("id", target_user_id)
                     .execute()
                 )
+                profile_cache.invalidate_user(target_user_id)
             return
 
         (
@@ -116,6 +136,7 @@ def _ensure_author_role_membership(user_id: str, email: str | None) -> None:
             )
             .execute()
         )
+        profile_cache.invalidate_user(target_user_id)
     except Exception as e:
         print(f"[SubmissionAuthorRole] failed to ensure author role: {e}", flush=True)
 
@@ -175,9 +196,16 @@ async def upload_manuscript(
     trace_id = str(manuscript_id)[:8]
     try:
         suffix = ".pdf" if is_pdf else ".docx" if is_docx else ".doc"
+        content_hash = hashlib.sha256()
         with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as tmp:
             temp_path = tmp.name
-            shutil.copyfileobj(file.file, tmp)
+            # 中文注释: 边写临时文件边计算 SHA-256，供解析结果缓存寻址。
+            while True:
+                chunk = file.file.read(1024 * 1024)
+                if not chunk:
+                    break
+                content_hash.update(chunk)
+                tmp.write(chunk)
 
         file_size_bytes = os.path.getsize(temp_path) if temp_path and os.path.exists(temp_path) else 0
         file_size_mb = file_size_bytes / (1024 * 1024) if file_size_bytes > 0 else 0.0
@@ -208,44 +236,87 @@ async def upload_manuscript(
 
         parser_mode = "pdf" if is_pdf else "docx"
 
-        if is_pdf:
+        if not (is_pdf or is_docx):
+            # 中文注释：历史 .doc 二进制格式在无外部依赖条件下不做自动抽取，直接降级手填。
+            print(
+                f"[UploadManuscript:{trace_id}] legacy .doc uploaded, skip auto parsing",
+                flush=True,
+            )
+            return {
+                "success": True,
+                "id": manuscript_id,
+                "trace_id": trace_id,
+                "data": {"title": "", "abstract": "", "authors": [], "author_contacts": []},
+                "message": "检测到 .doc（旧格式），暂不支持自动抽取，请手动填写标题与摘要。",
+            }
+
+        metadata_strategy = metadata_strategy_fingerprint()
+        cache_key: Optional[str] = None
+        cached_entry: Optional[dict] = None
+        if is_parse_cache_enabled():
+            cache_key = parse_cache_key(
+                content_hash.hexdigest(),
+                parser_mode=parser_mode,
+                max_pages=max_pages,
+                max_chars=max_chars,
+                layout_max_pages=layout_max_pages_override,
+                metadata_strategy=metadata_strategy,
+            )
+            cached_entry = await asyncio.to_thread(get_parse_cache().get, cache_key)
+
+        if cached_entry is not None:
+            # 中文注释: 同一文件 + 同一解析配置，直接复用文本/版面，不再占用解析进程。
+            text = cached_entry.get("text")
+            layout_lines = cached_entry.get("layout_lines") or []
+        else:
+            parse_pool = get_parse_pool()
+            parse_label = "PDF" if is_pdf else "DOCX"
             try:
-                text, layout_lines = await asyncio.wait_for(
-                    asyncio.to_thread(
+                if is_pdf:
+                    text, layout_lines = await parse_pool.run(
                         _m().extract_text_and_layout_from_pdf,
                         temp_path,
+                        timeout_sec=timeout_sec,
                         max_pages=max_pages,
                         max_chars=max_chars,
                         layout_max_pages=layout_max_pages_override,
-                    ),
-                    timeout=timeout_sec,
-                )
-            except asyncio.TimeoutError:
+                    )
+                elif is_docx:
+                    text = await parse_pool.run(
+                        _m().extract_text_from_docx,
+                        temp_path,
+                        timeout_sec=timeout_sec,
+                        max_chars=max_chars,
+                    )
+                    layout_lines = []
+            except ParsePoolBusy:
                 print(
-                    f"[UploadManuscript:{trace_id}] timeout in pdf extraction (> {timeout_sec:.1f}s), fallback manual fill",
+                    f"[UploadManuscript:{trace_id}] parse queue full, defer {parser_mode} extraction",
                     flush=True,
                 )
                 return {
                     "success": True,
                     "id": manuscript_id,
                     "trace_id": trace_id,
+                    "parse_deferred": True,
                     "data": {"title": "", "abstract": "", "authors": [], "author_contacts": []},
-                    "message": f"PDF 解析超时（>{timeout_sec:.0f}s），已跳过 AI 解析，可手动填写。",
+                    "message": f"当前解析任务较多，已跳过 {parse_label} 自动解析，可稍后重新上传或手动填写。",
                 }
-        elif is_docx:
-            try:
-                text = await asyncio.wait_for(
-                    asyncio.to_thread(
-                        _m().extract_text_from_docx,
-                        temp_path,
-                        max_chars=max_chars,
-                    ),
-                    timeout=timeout_sec,
+            except ParseTimeout:
+                print(
+                    f"[UploadManuscript:{trace_id}] timeout in {parser_mode} extraction (> {timeout_sec:.1f}s), fallback manual fill",
+                    flush=True,
                 )
-                layout_lines = []
-            except asyncio.TimeoutError:
+                return {
+                    "success": True,
+                    "id": manuscript_id,
+                    "trace_id": trace_id,
+                    "data": {"title": "", "abstract": "", "authors": [], "author_contacts": []},
+                    "message": f"{parse_label} 解析超时（>{timeout_sec:.0f}s），已跳过 AI 解析，可手动填写。",
+                }
+            except ParseJobError as e:
                 print(
-                    f"[UploadManuscript:{trace_id}] timeout in docx extraction (> {timeout_sec:.1f}s), fallback manual fill",
+                    f"[UploadManuscript:{trace_id}] {parser_mode} extraction failed: {e}, fallback manual fill",
                     flush=True,
                 )
                 return {
@@ -253,57 +324,60 @@ async def upload_manuscript(
                     "id": manuscript_id,
                     "trace_id": trace_id,
                     "data": {"title": "", "abstract": "", "authors": [], "author_contacts": []},
-                    "message": f"DOCX 解析超时（>{timeout_sec:.0f}s），已跳过 AI 解析，可手动填写。",
+                    "message": f"{parse_label} 解析失败，已跳过 AI 解析，可手动填写。",
                 }
-        else:
-            # 中文注释：历史 .doc 二进制格式在无外部依赖条件下不做自动抽取，直接降级手填。
-            text = None
-            layout_lines = []
-            print(
-                f"[UploadManuscript:{trace_id}] legacy .doc uploaded, skip auto parsing",
-                flush=True,
-            )
-            return {
-                "success": True,
-                "id": manuscript_id,
-                "trace_id": trace_id,
-                "data": {"title": "", "abstract": "", "authors": [], "author_contacts": []},
-                "message": "检测到 .doc（旧格式），暂不支持自动抽取，请手动填写标题与摘要。",
-            }
 
         meta_start = time.monotonic()
         meta_timeout_sec = _resolve_metadata_timeout_sec()
 
-        try:
-            metadata = await asyncio.wait_for(
-                _m().extract_manuscript_metadata(
-                    text or "",
-                    parser_mode=parser_mode,
-                    layout_lines=layout_lines or [],
-                ),
-                timeout=meta_timeout_sec,
-            )
-        except asyncio.TimeoutError:
-            print(
-                f"[UploadManuscript:{trace_id}] timeout in metadata parsing (> {meta_timeout_sec:.1f}s), fallback manual fill",
-                flush=True,
-            )
-            metadata = {
-                "title": "",
-                "abstract": "",
-                "authors": [],
-                "author_contacts": [],
-                "parser_source": "timeout",
-            }
-            message = f"元数据解析超时（>{meta_timeout_sec:.0f}s），已跳过自动预填，可手动填写。"
-        else:
+        cached_metadata = (cached_entry or {}).get("metadata")
+        if isinstance(cached_metadata, dict):
+            metadata = dict(cached_metadata)
             message = ""
+        else:
+            try:
+                metadata = await asyncio.wait_for(
+                    _m().extract_manuscript_metadata(
+                        text or "",
+                        parser_mode=parser_mode,
+                        layout_lines=layout_lines or [],
+                    ),
+                    timeout=meta_timeout_sec,
+                )
+            except asyncio.TimeoutError:
+                print(
+                    f"[UploadManuscript:{trace_id}] timeout in metadata parsing (> {meta_timeout_sec:.1f}s), fallback manual fill",
+                    flush=True,
+                )
+                metadata = {
+                    "title": "",
+                    "abstract": "",
+                    "authors": [],
+                    "author_contacts": [],
+                    "parser_source": "timeout",
+                }
+                message = f"元数据解析超时（>{meta_timeout_sec:.0f}s），已跳过自动预填，可手动填写。"
+            else:
+                message = ""
+            if cache_key and text:
+                # 中文注释: 元数据结果不可缓存时仍保存文本/版面，下次命中只重跑元数据提取。
+                cacheable = _is_cacheable_metadata(metadata, metadata_strategy)
+                await asyncio.to_thread(
+                    get_parse_cache().put,
+                    cache_key,
+                    {
+                        "text": text,
+                        "layout_lines": list(layout_lines or []),
+                        "metadata": metadata if cacheable else None,
+                    },
+                )
         meta_cost = time.monotonic() - meta_start
         total_cost = time.monotonic() - start
         print(
             f"[UploadManuscript:{trace_id}] parsed: mode={parser_mode} parse_timeout={timeout_sec:.1f}s max_pages={max_pages} "
             f"max_chars={max_chars} layout_override={layout_max_pages_override} meta_time={meta_cost:.2f}s total={total_cost:.2f}s"
-            f" text_len={len(text or '')} layout_lines={len(layout_lines or [])} parser_source={str(metadata.get('parser_source') or 'unknown')}",
+            f" text_len={len(text or '')} layout_lines={len(layout_lines or [])} parser_source={str(metadata.get('parser_source') or 'unknown')}"
+            f" cache={'hit' if cached_entry is not None else ('miss' if cache_key else 'off')}",
             flush=True,
         )
 
@@ -698,6 +772,7 @@ async def create_manuscript(
 
         if response.data:
             created = response.data[0]
+            invalidate_dashboard_counters(author_id=str(current_user_id))
 
             _ensure_author_role_membership(current_user_id, current_user.get("email"))
 
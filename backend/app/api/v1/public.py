@@ -5,6 +5,13 @@ from fastapi import APIRouter, HTTPException
 
 from app.core.short_ttl_cache import ShortTTLCache
 from app.lib.api_client import supabase_admin
+from app.services.public_search_index import (
+    SUBJECT_COLLECTION_RULES,
+    classify_subjects,
+    get_public_search_index,
+    is_public_search_index_enabled,
+    normalize_text,
+)
 
 router = APIRouter(prefix="/public", tags=["Public Resources"])
 _public_journals_cache = ShortTTLCache[dict[str, Any]](max_entries=16)
@@ -18,96 +25,8 @@ def _is_missing_column_error(error_text: str, column_name: str) -> bool:
     return col in lowered and "does not exist" in lowered
 
 
-# 中文注释:
-# - 由于当前 schema 里没有稳定的“学科分类表”，MVP 先用标题/摘要关键词做轻量归类。
-# - 后续若新增 journals.subject/category 字段，可直接切到数据库聚合而不是关键词匹配。
-_SUBJECT_COLLECTION_RULES = [
-    {
-        "id": "medicine",
-        "name": "Medicine",
-        "icon": "Stethoscope",
-        "query": "medicine",
-        "keywords": (
-            "medicine",
-            "medical",
-            "clinical",
-            "health",
-            "patient",
-            "disease",
-            "therapy",
-            "hospital",
-            "biomedical",
-            "oncology",
-        ),
-    },
-    {
-        "id": "technology",
-        "name": "Technology",
-        "icon": "Cpu",
-        "query": "technology",
-        "keywords": (
-            "technology",
-            "artificial intelligence",
-            "machine learning",
-            "deep learning",
-            "ai ",
-            "algorithm",
-            "software",
-            "computer",
-            "engineering",
-            "data science",
-            "robot",
-            "network",
-        ),
-    },
-    {
-        "id": "physics",
-        "name": "Physics",
-        "icon": "Atom",
-        "query": "physics",
-        "keywords": (
-            "physics",
-            "quantum",
-            "particle",
-            "optics",
-            "photon",
-            "thermodynamics",
-            "astrophysics",
-            "materials",
-            "nanostructure",
-        ),
-    },
-    {
-        "id": "social",
-        "name": "Social Sciences",
-        "icon": "Landmark",
-        "query": "social",
-        "keywords": (
-            "social",
-            "sociology",
-            "economics",
-            "policy",
-            "education",
-            "psychology",
-            "humanities",
-            "law",
-            "governance",
-            "ethics",
-            "management",
-        ),
-    },
-    {
-        "id": "general",
-        "name": "General Science",
-        "icon": "FlaskConical",
-        "query": "science",
-        "keywords": (),
-    },
-]
-
-
-def _normalize_text(value: str | None) -> str:
-    return " ".join(str(value or "").strip().lower().split())
+# 中文注释: 学科归类规则与检索索引共用（索引在写入时增量维护学科计数）。
+_SUBJECT_COLLECTION_RULES = SUBJECT_COLLECTION_RULES
 
 
 def _load_subject_source_rows() -> list[dict]:
@@ -144,25 +63,25 @@ def _load_subject_source_rows() -> list[dict]:
 def _aggregate_subject_counts(rows: list[dict]) -> dict[str, int]:
     counts = {rule["id"]: 0 for rule in _SUBJECT_COLLECTION_RULES}
     for row in rows:
-        text = _normalize_text(
+        text = normalize_text(
             f"{row.get('title') or ''} {row.get('abstract') or row.get('description') or ''}"
         )
-        if not text:
-            continue
-
-        matched = False
-        for rule in _SUBJECT_COLLECTION_RULES:
-            keywords = tuple(rule.get("keywords") or ())
-            if not keywords:
-                continue
-            if any(keyword in text for keyword in keywords):
-                counts[str(rule["id"])] += 1
-                matched = True
+        for subject in classify_subjects(text):
+            counts[subject] += 1
+    return counts
 
-        if not matched:
-            counts["general"] += 1
 
-    return counts
+def _indexed_subject_counts() -> dict[str, int] | None:
+    """
+    检索索引已就绪且非空时直接读取其增量维护的学科计数；否则返回 None（走数据库扫描）。
+    """
+    if not is_public_search_index_enabled():
+        return None
+    index = get_public_search_index()
+    index.maybe_refresh_in_background(supabase_admin)
+    if not index.ready or index.size == 0:
+        return None
+    return index.subject_counts()
 
 
 @router.get("/topics")
@@ -170,8 +89,9 @@ async def get_all_topics():
     """
     获取 Subject Collections（用于发现页）
     """
-    rows = _load_subject_source_rows()
-    counts = _aggregate_subject_counts(rows)
+    counts = _indexed_subject_counts()
+    if counts is None:
+        counts = _aggregate_subject_counts(_load_subject_source_rows())
 
     collections = []
     for rule in _SUBJECT_COLLECTION_RULES:
@@ -10,6 +10,7 @@ from app.core.auth_utils import get_current_user
 from app.core.roles import require_any_role
 from app.core.role_matrix import normalize_roles
 from app.core.email_normalization import normalize_email
+from app.core.email_templates import get_email_template_registry
 from app.core.storage_filename import sanitize_storage_filename
 from uuid import UUID
 from typing import Any, Dict, Optional
@@ -914,7 +915,7 @@ def _load_review_assignment_template(template_key: str) -> dict[str, Any] | None
             resp = (
                 supabase_admin.table(_EMAIL_TEMPLATE_TABLE)
                 .select(
-                    "template_key,display_name,description,scene,event_type,subject_template,body_html_template,body_text_template,is_active"
+                    "template_key,display_name,description,scene,event_type,subject_template,body_html_template,body_text_template,is_active,id,updated_at"
                 )
                 .eq("template_key", key)
                 .eq("is_active", True)
@@ -927,6 +928,7 @@ def _load_review_assignment_template(template_key: str) -> dict[str, Any] | None
             scene = str(row.get("scene") or "").strip().lower()
             if scene != _REVIEW_ASSIGNMENT_SCENE:
                 raise HTTPException(status_code=422, detail=f"Template scene mismatch: expected {_REVIEW_ASSIGNMENT_SCENE}")
+            get_email_template_registry().register(row)
             return row
         except HTTPException:
             raise
@@ -1,7 +1,9 @@
 from fastapi import APIRouter, Depends, HTTPException
 from app.core.auth_utils import get_current_user
+from app.core.journal_scope import resolve_visible_journal_ids
 from app.core.roles import require_any_role
 from app.lib.api_client import supabase
+from app.services.dashboard_counter_service import DashboardCounterService
 from datetime import datetime
 
 router = APIRouter(prefix="/stats", tags=["Dashboard Statistics"])
@@ -10,37 +12,25 @@ router = APIRouter(prefix="/stats", tags=["Dashboard Statistics"])
 async def get_author_stats(current_user: dict = Depends(get_current_user)):
     """
     作者视角统计：投稿、发表、待修改
+
+    中文注释: 计数由数据库聚合（DashboardCounterService），不再拉取作者全部稿件行。
     """
     try:
         # 中文注释: 真实统计以数据库为准（按当前登录作者过滤）
-        rows = (
-            supabase.table("manuscripts")
-            .select("status")
-            .eq("author_id", current_user["id"])
-            .execute()
-            .data
-        ) or []
-        total = len(rows)
-        published = sum(1 for r in rows if r.get("status") == "published")
-        under_review = sum(1 for r in rows if r.get("status") == "under_review")
-        revision_requested = sum(
-            1
-            for r in rows
-            if (r.get("status") in {"revision_before_review", "major_revision", "minor_revision", "revision_requested"})
-        )
-        rejected = sum(1 for r in rows if r.get("status") == "rejected")
+        counts = DashboardCounterService(supabase).author_counts(str(current_user["id"]))
+        revision_requested = int(counts.get("revision_requested", 0))
 
         return {
             "success": True,
             "data": {
-                "total_submissions": total,
-                "published": published,
-                "under_review": under_review,
+                "total_submissions": int(counts.get("total", 0)),
+                "published": int(counts.get("published", 0)),
+                "under_review": int(counts.get("under_review", 0)),
                 # MVP：等待作者修回
                 "revision_requested": revision_requested,
                 # 兼容旧前端字段（曾错误使用 revision_required 表示拒稿/退修）
                 "revision_required": revision_requested,
-                "rejected": rejected,
+                "rejected": int(counts.get("rejected", 0)),
             }
         }
     except Exception as e:
@@ -68,36 +58,21 @@ async def get_editor_stats(
 ):
     """
     编辑视角统计：待分配、逾期
+
+    中文注释: 计数按当前用户的 journal scope 下推到数据库，并按 scope 短缓存。
     """
     try:
-        pending_assignment = (
-            supabase.table("manuscripts")
-            .select("id")
-            .eq("status", "pre_check")
-            .execute()
-            .data
-        )
-        active_review_cycles = (
-            supabase.table("manuscripts")
-            .select("id")
-            .eq("status", "under_review")
-            .execute()
-            .data
-        )
-        overdue_reviews = (
-            supabase.table("manuscripts")
-            .select("id")
-            .eq("status", "decision")
-            .execute()
-            .data
+        journal_ids = resolve_visible_journal_ids(
+            user_id=str(current_user["id"]), roles=_profile.get("roles") or []
         )
+        counts = DashboardCounterService(supabase).editor_counts(journal_ids=journal_ids)
 
         return {
             "success": True,
             "data": {
-                "pending_assignment": len(pending_assignment or []),
-                "active_review_cycles": len(active_review_cycles or []),
-                "overdue_reviews": len(overdue_reviews or [])
+                "pending_assignment": int(counts.get("pending_assignment", 0)),
+                "active_review_cycles": int(counts.get("active_review_cycles", 0)),
+                "overdue_reviews": int(counts.get("overdue_reviews", 0)),
             }
         }
     except Exception as e:
@@ -15,6 +15,10 @@ from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from jose import jwt, JWTError
 from supabase import create_client
 
+from app.core import profile_cache
+from app.core.jwks import verify_asymmetric_token
+from app.lib.supabase_pool import get_pooled_client
+
 # === Auth 核心配置 ===
 SUPABASE_JWT_SECRET = os.environ.get("SUPABASE_JWT_SECRET", "")
 SUPABASE_URL = os.environ.get("SUPABASE_URL", "")
@@ -26,10 +30,10 @@ logger = logging.getLogger("scholarflow.auth")
 
 
 def get_supabase_admin():
-    """获取 Supabase 管理员客户端"""
+    """获取 Supabase 管理员客户端（进程级复用，共享连接池）"""
     if not SUPABASE_URL or not SUPABASE_SERVICE_KEY:
         return None
-    return create_client(SUPABASE_URL, SUPABASE_SERVICE_KEY)
+    return get_pooled_client(SUPABASE_URL, SUPABASE_SERVICE_KEY, factory=create_client)
 
 
 async def get_current_user(
@@ -75,6 +79,26 @@ async def get_current_user(
             except JWTError as e:
                 logger.debug("Local JWT decode failed, fallback to Supabase auth: %s", e)
 
+        # ES256/RS256（Supabase JWT Signing Keys）：优先用 JWKS 本地验签
+        try:
+            unverified_header = jwt.get_unverified_header(token)
+        except JWTError:
+            unverified_header = {}
+        try:
+            local_payload = verify_asymmetric_token(token, unverified_header)
+        except JWTError as e:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Token 验证失败或已过期",
+            ) from e
+        if local_payload is not None and local_payload.get("sub"):
+            roles = await _get_user_roles(local_payload["sub"])
+            return {
+                "id": local_payload["sub"],
+                "email": local_payload.get("email"),
+                "roles": roles,
+            }
+
         # Fallback: 通过 Supabase Auth API 验证
         supabase = get_supabase_admin()
         if supabase:
@@ -112,7 +136,16 @@ async def _get_user_roles(user_id: str) -> list[str]:
     中文注释:
     - 如果未找到用户配置，返回默认角色 ['author']
     - 角色存储在 roles 数组字段中
+    - 优先复用 profile_cache（请求级 memo + 进程级短 TTL）
     """
+    profile_cache.begin_request_scope()
+    cached_profile = profile_cache.lookup(profile_cache.profile_key(str(user_id)))
+    if not profile_cache.is_missing(cached_profile) and cached_profile.get("roles"):
+        return list(cached_profile["roles"])
+    cached_roles = profile_cache.lookup(profile_cache.roles_key(str(user_id)))
+    if not profile_cache.is_missing(cached_roles):
+        return list(cached_roles)
+
     try:
         supabase = get_supabase_admin()
         if not supabase:
@@ -127,6 +160,7 @@ async def _get_user_roles(user_id: str) -> list[str]:
         )
 
         if response.data and response.data.get("roles"):
+            profile_cache.store(profile_cache.roles_key(str(user_id)), list(response.data["roles"]))
             return response.data["roles"]
 
         return ["author"]
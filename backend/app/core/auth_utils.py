@@ -3,6 +3,7 @@ from typing import Optional
 from fastapi import Request, HTTPException, Depends
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from jose import jwt, JWTError
+from app.core.jwks import verify_asymmetric_token
 from app.lib.api_client import supabase
 
 # === Auth 核心配置 ===
@@ -22,8 +23,9 @@ async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(s
     token = credentials.credentials
     try:
         # 中文注释:
-        # 1. Supabase 新版可能使用 JWT Signing Keys（非 HS256），需要走 Auth API 获取用户。
-        # 2. 若仍为 HS256，则用本地密钥校验以减少外部请求。
+        # 1. 若仍为 HS256，则用本地密钥校验以减少外部请求。
+        # 2. Supabase 新版 JWT Signing Keys（ES256/RS256）：优先用缓存的 JWKS 本地验签；
+        #    仅在无法本地判定（JWKS 不可用 / kid 未知）时才走 Auth API 获取用户。
         header = jwt.get_unverified_header(token)
         if header.get("alg") == ALGORITHM and SUPABASE_JWT_SECRET:
             payload = jwt.decode(token, SUPABASE_JWT_SECRET, algorithms=[ALGORITHM], audience="authenticated")
@@ -32,6 +34,13 @@ async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(s
                 raise HTTPException(status_code=401, detail="无效的身份载荷")
             return {"id": user_id, "email": payload.get("email")}
 
+        payload = verify_asymmetric_token(token, header)
+        if payload is not None:
+            user_id = payload.get("sub")
+            if user_id is None:
+                raise HTTPException(status_code=401, detail="无效的身份载荷")
+            return {"id": user_id, "email": payload.get("email")}
+
         # fallback: 通过 Supabase Auth API 校验并获取用户信息
         try:
             response = supabase.auth.get_user(token)
@@ -0,0 +1,132 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from threading import Lock
+from time import perf_counter
+from typing import Any, Callable
+
+from app.core.config import env_float, env_int
+
+logger = logging.getLogger("scholarflow.concurrent_loader")
+
+
+@dataclass(frozen=True)
+class BlockingBlock:
+    """
+    一个可并发执行的只读区块。
+
+    中文注释:
+    - loader 为同步函数（supabase-py 是阻塞 IO），在专用线程池中执行；
+    - 超时或异常时回退为 default，不影响其它区块（部分结果降级）。
+    """
+
+    name: str
+    loader: Callable[[], Any]
+    default: Any = None
+
+
+@dataclass
+class BlockingBlocksResult:
+    values: dict[str, Any] = field(default_factory=dict)
+    degraded: list[str] = field(default_factory=list)
+
+
+_executor_lock = Lock()
+_executor: ThreadPoolExecutor | None = None
+
+
+def get_blocking_executor() -> ThreadPoolExecutor:
+    """
+    进程级专用线程池（与默认 executor 隔离，避免慢查询挤占 asyncio.to_thread 的线程）。
+    """
+    global _executor
+    if _executor is not None:
+        return _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=env_int("DETAIL_FANOUT_MAX_WORKERS", 16),
+                thread_name_prefix="sf-fanout",
+            )
+        return _executor
+
+
+def default_block_timeout_sec() -> float:
+    return max(0.1, env_float("DETAIL_FANOUT_BLOCK_TIMEOUT_SEC", 5.0))
+
+
+async def run_blocking_blocks(
+    blocks: list[BlockingBlock],
+    *,
+    timings: dict[str, float] | None = None,
+    timeout_sec: float | None = None,
+) -> BlockingBlocksResult:
+    """
+    并发执行多个相互独立的阻塞区块，并按区块记录耗时（毫秒）。
+
+    - 每个区块独立超时（timeout_sec，默认读取 DETAIL_FANOUT_BLOCK_TIMEOUT_SEC）；
+    - 超时/异常的区块使用 default，并记录在 result.degraded；
+    - 超时的线程无法被强制终止，但其结果会被丢弃，不阻塞响应。
+    """
+    out = BlockingBlocksResult()
+    if not blocks:
+        return out
+    block_timeout = float(timeout_sec) if timeout_sec is not None else default_block_timeout_sec()
+    loop = asyncio.get_running_loop()
+    executor = get_blocking_executor()
+
+    def _timed(block: BlockingBlock) -> tuple[Any, float]:
+        t0 = perf_counter()
+        value = block.loader()
+        return value, round((perf_counter() - t0) * 1000, 1)
+
+    async def _run_one(block: BlockingBlock) -> None:
+        t0 = perf_counter()
+        try:
+            value, elapsed_ms = await asyncio.wait_for(
+                loop.run_in_executor(executor, _timed, block),
+                timeout=block_timeout,
+            )
+            out.values[block.name] = value
+            if timings is not None:
+                timings[block.name] = elapsed_ms
+        except asyncio.TimeoutError:
+            logger.warning("[ConcurrentLoader] block %s timed out after %.1fs (degraded)", block.name, block_timeout)
+            out.values[block.name] = block.default
+            out.degraded.append(block.name)
+            if timings is not None:
+                timings[block.name] = round((perf_counter() - t0) * 1000, 1)
+        except Exception as e:
+            logger.warning("[ConcurrentLoader] block %s failed (degraded): %s", block.name, e)
+            out.values[block.name] = block.default
+            out.degraded.append(block.name)
+            if timings is not None:
+                timings[block.name] = round((perf_counter() - t0) * 1000, 1)
+
+    await asyncio.gather(*(_run_one(block) for block in blocks))
+    return out
+
+
+def format_server_timing(
+    timings: dict[str, float],
+    *,
+    total_ms: float | None = None,
+    degraded: list[str] | None = None,
+) -> str:
+    """
+    将区块耗时格式化为 `Server-Timing` 响应头（https://www.w3.org/TR/server-timing/）。
+    """
+    degraded_set = set(degraded or [])
+    parts: list[str] = []
+    for name, dur in timings.items():
+        metric = "".join(ch if (ch.isalnum() or ch in "_-") else "_" for ch in str(name)) or "block"
+        entry = f"{metric};dur={float(dur):.1f}"
+        if name in degraded_set:
+            entry += ';desc="degraded"'
+        parts.append(entry)
+    if total_ms is not None:
+        parts.append(f"total;dur={float(total_ms):.1f}")
+    return ", ".join(parts)
@@ -3,7 +3,7 @@ from dataclasses import dataclass
 from typing import Optional
 
 
-def _env_bool(key: str, default: bool) -> bool:
+def env_bool(key: str, default: bool) -> bool:
     raw = os.environ.get(key)
     if raw is None:
         return default
@@ -11,6 +11,50 @@ def _env_bool(key: str, default: bool) -> bool:
     return lowered in {"1", "true", "yes", "y", "on"}
 
 
+def env_int(key: str, default: int, *, minimum: int = 1, maximum: Optional[int] = None) -> int:
+    """
+    读取整数环境变量：未设置/非法时返回 default；合法值按 [minimum, maximum] 截断。
+    """
+    raw = os.environ.get(key)
+    if raw is None:
+        return default
+    try:
+        value = max(int(str(raw).strip()), minimum)
+    except Exception:
+        return default
+    if maximum is not None:
+        value = min(value, maximum)
+    return value
+
+
+def env_float(key: str, default: float, *, minimum: float = 0.0) -> float:
+    raw = os.environ.get(key)
+    if raw is None:
+        return default
+    try:
+        value = float(str(raw).strip())
+    except Exception:
+        return default
+    return max(value, minimum)
+
+
+def is_test_env() -> bool:
+    """
+    是否运行在测试环境（pytest 或 GO_ENV/ENVIRONMENT/APP_ENV=test）。
+
+    中文注释: 各进程内缓存/后台线程据此默认关闭，避免测试之间互相污染。
+    """
+    if os.environ.get("PYTEST_CURRENT_TEST"):
+        return True
+    mode = (
+        os.environ.get("GO_ENV")
+        or os.environ.get("ENVIRONMENT")
+        or os.environ.get("APP_ENV")
+        or ""
+    ).strip().lower()
+    return mode in {"test", "testing"}
+
+
 @dataclass(frozen=True)
 class AppConfig:
     """
@@ -89,7 +133,7 @@ class SMTPConfig:
             os.environ.get("SMTP_FROM_EMAIL") or user or "no-reply@scholarflow.local"
         ).strip()
 
-        use_starttls = _env_bool("SMTP_USE_STARTTLS", True)
+        use_starttls = env_bool("SMTP_USE_STARTTLS", True)
 
         return SMTPConfig(
             host=host,
@@ -131,7 +175,7 @@ class SentryConfig:
 
     @staticmethod
     def from_env() -> "SentryConfig":
-        enabled = _env_bool("SENTRY_ENABLED", True)
+        enabled = env_bool("SENTRY_ENABLED", True)
         dsn = (os.environ.get("SENTRY_DSN") or "").strip() or None
 
         environment = (
@@ -169,6 +213,8 @@ class MatchmakingConfig:
     threshold: float
     top_k: int
     min_reviewers: int
+    # 中文注释: rpc = 每次调用 match_reviewers（pgvector）；memory = 进程内向量索引（见 reviewer_vector_index）。
+    index_mode: str = "rpc"
 
     @staticmethod
     def from_env() -> "MatchmakingConfig":
@@ -195,11 +241,16 @@ class MatchmakingConfig:
         except ValueError:
             min_reviewers = 5
 
+        index_mode = (os.environ.get("MATCHMAKING_INDEX_MODE") or "rpc").strip().lower()
+        if index_mode not in {"rpc", "memory"}:
+            index_mode = "rpc"
+
         return MatchmakingConfig(
             model_name=model_name,
             threshold=threshold,
             top_k=top_k,
             min_reviewers=min_reviewers,
+            index_mode=index_mode,
         )
 
 
@@ -1,8 +1,7 @@
 import asyncio
 import logging
-from datetime import datetime, timezone
 
-from app.core.config import CrossrefConfig
+from app.core.config import CrossrefConfig, env_float, env_int
 from app.services.doi_service import DOIService
 
 logger = logging.getLogger("doi_worker")
@@ -10,29 +9,77 @@ logger = logging.getLogger("doi_worker")
 
 class DOIWorker:
     """
-    兼容保留的 DOI Worker 入口。
+    常驻 DOI Worker 入口。
 
     中文注释:
     - 实际处理逻辑委托给 DOIService，保证 internal cron 与独立 worker 行为一致。
+    - 最多 DOI_WORKER_CONCURRENCY 个注册任务同时在途：有空位就按空位数批量领取（claim_doi_tasks，SKIP LOCKED），
+      多个 worker 进程可以同时运行，互不抢同一行。
+    - 空闲等待自适应退避：领不到任务时从 DOI_WORKER_IDLE_MIN_SEC 起翻倍，最长 DOI_WORKER_IDLE_MAX_SEC；
+      一旦领到任务立即回到最短间隔，批量发布时几乎没有排队延迟，空闲时也不会频繁轮询数据库。
+    - DOI_DEPOSIT_MODE=batch 时，每个名额领取至多 DOI_DEPOSIT_BATCH_MAX_RECORDS 个任务，整体交给 run_tasks 合并成 doi_batch 投递。
     """
 
-    def __init__(self):
+    def __init__(self, *, doi_service: DOIService | None = None, concurrency: int | None = None):
         self.config = CrossrefConfig.from_env()
-        self.doi_service = DOIService(self.config)
-        self.worker_id = f"worker-{int(datetime.now(timezone.utc).timestamp())}"
+        self.doi_service = doi_service or DOIService(self.config)
+        self.worker_id = self.doi_service.worker_id
+        self.concurrency = concurrency or env_int("DOI_WORKER_CONCURRENCY", 8)
+        self.idle_min_sec = env_float("DOI_WORKER_IDLE_MIN_SEC", 0.5, minimum=0.01)
+        self.idle_max_sec = max(env_float("DOI_WORKER_IDLE_MAX_SEC", 15.0), self.idle_min_sec)
         self.running = False
+        self._inflight: set[asyncio.Task] = set()
 
     async def start(self):
-        logger.info("DOI Worker %s started", self.worker_id)
+        logger.info("DOI Worker %s started (concurrency=%s)", self.worker_id, self.concurrency)
         self.running = True
+        batch_mode = getattr(self.doi_service, "deposit_mode", "single") == "batch"
+        idle_delay = self.idle_min_sec
         while self.running:
-            try:
-                result = await self.doi_service.process_due_tasks(limit=1)
-                if int(result.get("processed_count") or 0) == 0:
-                    await asyncio.sleep(5)
-            except Exception as e:
-                logger.error("Worker loop error: %s", e)
-                await asyncio.sleep(5)
+            free = self.concurrency - len(self._inflight)
+            # 中文注释: batch 模式下一个名额对应一次 doi_batch 投递，按单批记录上限领取；single 模式一个名额对应一个任务。
+            claim_limit = self.doi_service.deposit_batch_max_records if batch_mode else free
+            claimed = []
+            if free > 0:
+                try:
+                    claimed = await asyncio.to_thread(self.doi_service.claim_tasks, claim_limit)
+                except Exception as e:
+                    logger.error("Worker claim error: %s", e)
+            if claimed and batch_mode:
+                self._spawn(self.doi_service.run_tasks(claimed))
+            else:
+                for task in claimed:
+                    self._spawn(self.doi_service.run_task(task))
+
+            if claimed:
+                idle_delay = self.idle_min_sec
+                if len(claimed) == claim_limit:
+                    # 中文注释: 满额领取说明队列还有积压；下一轮没有空位时会等待任一任务完成。
+                    continue
+            if free <= 0:
+                await asyncio.wait(self._inflight, return_when=asyncio.FIRST_COMPLETED)
+                continue
+
+            # 中文注释: 队列已空（或领取出错）：有在途任务就等其完成或超时，否则纯等待；间隔逐步放大。
+            if self._inflight:
+                await asyncio.wait(self._inflight, timeout=idle_delay, return_when=asyncio.FIRST_COMPLETED)
+            else:
+                await asyncio.sleep(idle_delay)
+            if not claimed:
+                idle_delay = min(idle_delay * 2, self.idle_max_sec)
+
+        if self._inflight:
+            await asyncio.gather(*self._inflight, return_exceptions=True)
+        logger.info("DOI Worker %s stopped", self.worker_id)
+
+    def _spawn(self, coro) -> None:
+        job = asyncio.create_task(coro)
+        self._inflight.add(job)
+        job.add_done_callback(self._inflight.discard)
+
+    def stop(self):
+        # 中文注释: 不再领取新任务；start() 会等在途任务跑完后返回。
+        self.running = False
 
 
 if __name__ == "__main__":
@@ -0,0 +1,187 @@
+"""
+进程级邮件模板注册表：文件模板与数据库（Admin 可配置）模板只编译一次。
+
+中文注释:
+- 旧实现每次 EmailService() 都新建一个 Jinja Environment，且 render_inline_template 每封邮件都 from_string 重新编译，
+  批量发送审稿邀请时同一模板会被编译成百上千次。
+- 这里全进程共享一个 Environment：文件模板走 Environment 自带的模板缓存；inline 模板按源码摘要缓存编译结果
+  （代码内置的默认模板没有 id，同样命中缓存）。
+- email_templates 行按 (template_id, updated_at) 登记：版本未变时直接复用；Admin 更新/停用模板后 invalidate，
+  旧版本的编译结果随之释放，新版本在下一次 register / 渲染时重新编译。
+- 启动时 warm() 预编译全部文件模板与启用中的数据库模板（EMAIL_TEMPLATE_WARMUP，测试环境默认关闭）。
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Mapping
+
+from jinja2 import Environment, FileSystemLoader, Template, select_autoescape
+
+from app.core.config import env_int, is_test_env
+
+logger = logging.getLogger(__name__)
+
+EMAIL_TEMPLATE_TABLE = "email_templates"
+_TEMPLATE_FIELDS = ("subject_template", "body_html_template", "body_text_template")
+
+
+def is_email_template_warmup_enabled() -> bool:
+    raw = os.environ.get("EMAIL_TEMPLATE_WARMUP")
+    if raw is None:
+        return not is_test_env()
+    return str(raw).strip().lower() in {"1", "true", "yes", "on"}
+
+
+def _source_digest(source: str) -> str:
+    return hashlib.sha256(source.encode("utf-8")).hexdigest()
+
+
+class EmailTemplateRegistry:
+    def __init__(self, templates_dir: Path | None = None, *, max_inline: int | None = None):
+        # Path to templates: backend/app/core/templates
+        directory = templates_dir or Path(__file__).resolve().parent / "templates"
+        self.env = Environment(
+            loader=FileSystemLoader(str(directory)),
+            autoescape=select_autoescape(["html", "xml"]),
+        )
+        self.max_inline = max_inline or env_int("EMAIL_TEMPLATE_CACHE_SIZE", 512, minimum=32)
+        self._lock = threading.Lock()
+        self._inline: OrderedDict[str, Template] = OrderedDict()
+        # 中文注释: template_id -> (updated_at, 该版本各字段的源码摘要)，用于版本比对与失效。
+        self._rows: dict[str, tuple[str, tuple[str, ...]]] = {}
+        self._compiles = 0
+        self._hits = 0
+
+    def get_file(self, template_name: str) -> Template:
+        return self.env.get_template(template_name)
+
+    def get_inline(self, source: str) -> Template:
+        digest = _source_digest(source)
+        with self._lock:
+            cached = self._inline.get(digest)
+            if cached is not None:
+                self._inline.move_to_end(digest)
+                self._hits += 1
+                return cached
+        # 中文注释: 编译放在锁外；并发首次编译同一源码时后写入者覆盖，结果等价。
+        compiled = self.env.from_string(source)
+        with self._lock:
+            self._compiles += 1
+            self._inline[digest] = compiled
+            self._inline.move_to_end(digest)
+            while len(self._inline) > self.max_inline:
+                self._inline.popitem(last=False)
+        return compiled
+
+    def register(self, row: Mapping[str, Any]) -> bool:
+        """
+        登记一行 email_templates 并预编译其 subject/html/text。
+
+        中文注释:
+        - 同一 (id, updated_at) 已登记时直接返回 False，不重复编译。
+        - 模板语法错误只记日志：渲染时仍会按原路径抛出，由调用方决定回退策略。
+        """
+        if not isinstance(row, Mapping):
+            return False
+        template_id = str(row.get("id") or "").strip()
+        if not template_id:
+            return False
+        version = str(row.get("updated_at") or "").strip()
+        with self._lock:
+            current = self._rows.get(template_id)
+        if current is not None and current[0] == version:
+            return False
+
+        self.invalidate(template_id)
+        digests: list[str] = []
+        for field_name in _TEMPLATE_FIELDS:
+            source = row.get(field_name)
+            if not source or not str(source).strip():
+                continue
+            try:
+                self.get_inline(str(source))
+            except Exception as e:
+                logger.warning("[EmailTemplates] compile failed: id=%s field=%s error=%s", template_id, field_name, e)
+                continue
+            digests.append(_source_digest(str(source)))
+        with self._lock:
+            self._rows[template_id] = (version, tuple(digests))
+        return True
+
+    def invalidate(self, template_id: str) -> None:
+        with self._lock:
+            entry = self._rows.pop(str(template_id), None)
+            if entry is None:
+                return
+            for digest in entry[1]:
+                self._inline.pop(digest, None)
+
+    def warm(self, client: Any) -> int:
+        """
+        预编译全部文件模板与启用中的数据库模板，返回编译的模板数。
+
+        中文注释: email_templates 表缺失/查询失败不影响文件模板预热。
+        """
+        count = 0
+        for name in self.env.list_templates(filter_func=lambda n: n.endswith(".html")):
+            try:
+                self.get_file(name)
+                count += 1
+            except Exception as e:
+                logger.warning("[EmailTemplates] warm file template failed: %s error=%s", name, e)
+        try:
+            resp = (
+                client.table(EMAIL_TEMPLATE_TABLE)
+                .select("id,updated_at," + ",".join(_TEMPLATE_FIELDS))
+                .eq("is_active", True)
+                .execute()
+            )
+            rows = getattr(resp, "data", None) or []
+        except Exception as e:
+            logger.warning("[EmailTemplates] warm db templates skipped: %s", e)
+            rows = []
+        for row in rows:
+            if self.register(row):
+                count += 1
+        return count
+
+    def clear(self) -> None:
+        with self._lock:
+            self._inline.clear()
+            self._rows.clear()
+        if self.env.cache is not None:
+            self.env.cache.clear()
+
+    def snapshot(self) -> dict[str, int]:
+        with self._lock:
+            return {
+                "inline_cached": len(self._inline),
+                "registered_rows": len(self._rows),
+                "compiles_total": self._compiles,
+                "hits_total": self._hits,
+            }
+
+
+_registry: EmailTemplateRegistry | None = None
+_registry_lock = threading.Lock()
+
+
+def get_email_template_registry() -> EmailTemplateRegistry:
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                _registry = EmailTemplateRegistry()
+    return _registry
+
+
+def reset_email_template_registry() -> None:
+    global _registry
+    with _registry_lock:
+        _registry = None
@@ -6,18 +6,356 @@ Export Service - 导出服务
 - 聚合 KPI、趋势、地理分布数据
 - 生成多 Sheet 的 Excel 报告
 - 生成单表 CSV 报告
+- 稿件级明细导出（ManuscriptRowExporter）：按 id keyset 分页读取，每页批量补齐状态流转、审稿周转与账单，
+  CSV 以生成器逐页输出，XLSX 使用 openpyxl write-only 模式写入临时文件；内存占用只与单页大小有关
+- 大批量导出可走后台任务：写入 Storage 后返回签名链接（ExportJob）
 """
 
 import csv
 import io
-from datetime import datetime
-from typing import TYPE_CHECKING
+import logging
+import os
+import tempfile
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import TYPE_CHECKING, Any, BinaryIO, Iterator, Optional
 
 from openpyxl import Workbook
 
+from app.core.config import env_int
+from app.core.short_ttl_cache import ShortTTLCache
+
 if TYPE_CHECKING:
     from app.services.analytics_service import AnalyticsService
 
+logger = logging.getLogger("scholarflow.export")
+
+XLSX_MEDIA_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+EXPORT_BUCKET = "analytics-exports"
+
+MANUSCRIPT_EXPORT_HEADERS = (
+    "manuscript_id",
+    "title",
+    "journal_id",
+    "status",
+    "submitted_at",
+    "updated_at",
+    "published_at",
+    "doi",
+    "author_name",
+    "author_country",
+    "status_transitions",
+    "status_history",
+    "reviewers_invited",
+    "reviews_completed",
+    "avg_review_turnaround_days",
+    "invoice_number",
+    "invoice_status",
+    "invoice_amount",
+    "invoice_confirmed_at",
+)
+_MANUSCRIPT_COLUMNS = "id,title,journal_id,author_id,status,created_at,updated_at,published_at,doi"
+_CHUNK_BYTES = 64 * 1024
+
+
+def _parse_dt(value: Any) -> Optional[datetime]:
+    if not value:
+        return None
+    try:
+        dt = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+    except Exception:
+        return None
+    return dt if dt.tzinfo else dt.replace(tzinfo=timezone.utc)
+
+
+def _days_between(start: Any, end: Any) -> Optional[float]:
+    a = _parse_dt(start)
+    b = _parse_dt(end)
+    if a is None or b is None or b < a:
+        return None
+    return (b - a).total_seconds() / 86400.0
+
+
+class ManuscriptRowExporter:
+    """
+    稿件级明细导出（有界内存）。
+
+    中文注释:
+    - journal_ids=None 表示不限期刊；空列表表示无可见期刊（只输出表头）。
+    - 每页最多 page_size 篇稿件（默认 ANALYTICS_EXPORT_PAGE_SIZE=200，同时限制 in_ 查询的 URL 长度），
+      子表（status_transition_logs / review_assignments / invoices / user_profiles）按该页 id 批量读取并 range 分页。
+    - openpyxl write-only 模式不在内存中保留行对象，但共享字符串表仍随“不同文本”数量增长（主要是标题），
+      远小于完整 Workbook；需要严格常量内存时用 CSV。
+    """
+
+    def __init__(self, client: Any, journal_ids: list[str] | None = None, *, page_size: Optional[int] = None):
+        self.client = client
+        self.journal_ids = journal_ids
+        self.page_size = page_size or env_int("ANALYTICS_EXPORT_PAGE_SIZE", 200)
+
+    # ---------------- 读取 ----------------
+
+    def _iter_manuscript_pages(self) -> Iterator[list[dict[str, Any]]]:
+        if self.journal_ids is not None and not self.journal_ids:
+            return
+        last_id: Optional[str] = None
+        while True:
+            query = self.client.table("manuscripts").select(_MANUSCRIPT_COLUMNS)
+            if self.journal_ids is not None:
+                query = query.in_("journal_id", self.journal_ids)
+            if last_id is not None:
+                query = query.gt("id", last_id)
+            resp = query.order("id").limit(self.page_size).execute()
+            page = list(getattr(resp, "data", None) or [])
+            if page:
+                yield page
+            if len(page) < self.page_size:
+                return
+            last_id = str(page[-1].get("id") or "")
+
+    def _fetch_children(self, table: str, columns: str, key: str, ids: list[str], order: str) -> list[dict[str, Any]]:
+        rows: list[dict[str, Any]] = []
+        if not ids:
+            return rows
+        batch = 1000
+        offset = 0
+        while True:
+            resp = (
+                self.client.table(table)
+                .select(columns)
+                .in_(key, ids)
+                .order(order)
+                .range(offset, offset + batch - 1)
+                .execute()
+            )
+            page = list(getattr(resp, "data", None) or [])
+            rows.extend(page)
+            if len(page) < batch:
+                return rows
+            offset += batch
+
+    def _safe_children(self, table: str, columns: str, key: str, ids: list[str], order: str) -> list[dict[str, Any]]:
+        try:
+            return self._fetch_children(table, columns, key, ids, order)
+        except Exception as e:
+            # 中文注释: 子表缺失/列未迁移时该列留空，不中断整份导出。
+            logger.warning("[Export] %s lookup failed: %s", table, e)
+            return []
+
+    def _build_rows(self, page: list[dict[str, Any]]) -> Iterator[tuple]:
+        ids = [str(m.get("id")) for m in page if m.get("id")]
+        author_ids = sorted({str(m.get("author_id")) for m in page if m.get("author_id")})
+
+        transitions: dict[str, list[dict[str, Any]]] = {}
+        for row in self._safe_children(
+            "status_transition_logs",
+            "manuscript_id,from_status,to_status,created_at",
+            "manuscript_id",
+            ids,
+            "created_at",
+        ):
+            transitions.setdefault(str(row.get("manuscript_id")), []).append(row)
+
+        reviews: dict[str, list[dict[str, Any]]] = {}
+        # 中文注释: 部分环境 review_assignments 尚无 submitted_at 列，用 * 读取避免列不存在报错。
+        for row in self._safe_children("review_assignments", "*", "manuscript_id", ids, "created_at"):
+            reviews.setdefault(str(row.get("manuscript_id")), []).append(row)
+
+        invoices = {
+            str(row.get("manuscript_id")): row
+            for row in self._safe_children(
+                "invoices",
+                "manuscript_id,invoice_number,status,amount,confirmed_at",
+                "manuscript_id",
+                ids,
+                "manuscript_id",
+            )
+        }
+        profiles = {
+            str(row.get("id")): row
+            for row in self._safe_children("user_profiles", "id,full_name,country", "id", author_ids, "id")
+        }
+
+        for ms in page:
+            mid = str(ms.get("id") or "")
+            logs = transitions.get(mid, [])
+            history = " > ".join(
+                "{} {}→{}".format(
+                    str(log.get("created_at") or "")[:10],
+                    log.get("from_status") or "-",
+                    log.get("to_status") or "-",
+                )
+                for log in logs
+            )
+            assignments = reviews.get(mid, [])
+            completed = [a for a in assignments if str(a.get("status") or "").lower() in {"completed", "submitted"}]
+            turnaround = [
+                d
+                for d in (
+                    _days_between(a.get("invited_at") or a.get("created_at"), a.get("submitted_at"))
+                    for a in completed
+                )
+                if d is not None
+            ]
+            invoice = invoices.get(mid) or {}
+            profile = profiles.get(str(ms.get("author_id") or "")) or {}
+            yield (
+                mid,
+                ms.get("title") or "",
+                ms.get("journal_id") or "",
+                ms.get("status") or "",
+                ms.get("created_at") or "",
+                ms.get("updated_at") or "",
+                ms.get("published_at") or "",
+                ms.get("doi") or "",
+                profile.get("full_name") or "",
+                profile.get("country") or "",
+                len(logs),
+                history,
+                len(assignments),
+                len(completed),
+                round(sum(turnaround) / len(turnaround), 1) if turnaround else "",
+                invoice.get("invoice_number") or "",
+                invoice.get("status") or "",
+                invoice.get("amount") if invoice.get("amount") is not None else "",
+                invoice.get("confirmed_at") or "",
+            )
+
+    def iter_rows(self) -> Iterator[tuple]:
+        for page in self._iter_manuscript_pages():
+            yield from self._build_rows(page)
+
+    # ---------------- 输出 ----------------
+
+    def iter_csv(self) -> Iterator[bytes]:
+        """
+        逐页产出 UTF-8 CSV 字节块（首块含表头）。
+        """
+        buf = io.StringIO()
+        writer = csv.writer(buf)
+        writer.writerow(MANUSCRIPT_EXPORT_HEADERS)
+        for page in self._iter_manuscript_pages():
+            writer.writerows(self._build_rows(page))
+            yield buf.getvalue().encode("utf-8")
+            buf.seek(0)
+            buf.truncate(0)
+        tail = buf.getvalue()
+        if tail:
+            yield tail.encode("utf-8")
+
+    def write_xlsx(self, fileobj: BinaryIO) -> int:
+        """
+        以 write-only 模式写入 fileobj，返回数据行数。
+        """
+        wb = Workbook(write_only=True)
+        ws = wb.create_sheet("Manuscripts")
+        ws.append(list(MANUSCRIPT_EXPORT_HEADERS))
+        count = 0
+        for row in self.iter_rows():
+            ws.append(list(row))
+            count += 1
+        wb.save(fileobj)
+        return count
+
+    def write_csv(self, fileobj: BinaryIO) -> None:
+        for chunk in self.iter_csv():
+            fileobj.write(chunk)
+
+    def iter_xlsx(self) -> Iterator[bytes]:
+        """
+        先写入磁盘临时文件（xlsx 为 zip，需要整体写完才能输出），再分块读出；生成器关闭时临时文件自动删除。
+        """
+        with tempfile.TemporaryFile() as fh:
+            self.write_xlsx(fh)
+            fh.seek(0)
+            while True:
+                chunk = fh.read(_CHUNK_BYTES)
+                if not chunk:
+                    return
+                yield chunk
+
+
+@dataclass
+class ExportJob:
+    id: str
+    owner_id: str
+    format: str
+    status: str = "queued"  # queued / running / completed / failed
+    path: Optional[str] = None
+    url: Optional[str] = None
+    expires_in: Optional[int] = None
+    error: Optional[str] = None
+    created_at: str = field(default_factory=lambda: datetime.now(timezone.utc).isoformat())
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "id": self.id,
+            "format": self.format,
+            "status": self.status,
+            "url": self.url,
+            "expires_in": self.expires_in,
+            "error": self.error,
+            "created_at": self.created_at,
+        }
+
+
+# 中文注释: 任务状态只在本进程内保留（签名链接有效期内）；文件本身在 Storage，多实例部署下轮询需粘性会话。
+_export_jobs = ShortTTLCache[ExportJob](max_entries=256)
+
+
+def _job_ttl_sec() -> int:
+    return env_int("ANALYTICS_EXPORT_URL_EXPIRES_SEC", 3600, minimum=60)
+
+
+def create_export_job(*, owner_id: str, format: str) -> ExportJob:
+    job = ExportJob(id=uuid.uuid4().hex, owner_id=str(owner_id), format=format)
+    _export_jobs.set(job.id, job, ttl_sec=float(_job_ttl_sec()))
+    return job
+
+
+def get_export_job(job_id: str, *, owner_id: str) -> Optional[ExportJob]:
+    job = _export_jobs.get(str(job_id))
+    if job is None or job.owner_id != str(owner_id):
+        return None
+    return job
+
+
+def run_export_job(job: ExportJob, exporter: ManuscriptRowExporter) -> ExportJob:
+    """
+    后台执行：写入临时文件 → 上传 Storage（文件句柄流式上传）→ 生成签名链接。
+    """
+    from app.services.storage_service import create_signed_url, upload_file
+
+    job.status = "running"
+    content_type = XLSX_MEDIA_TYPE if job.format == "xlsx" else "text/csv"
+    path = f"{job.owner_id}/{job.id}.{job.format}"
+    tmp_path: Optional[str] = None
+    try:
+        fd, tmp_path = tempfile.mkstemp(suffix=f".{job.format}")
+        with os.fdopen(fd, "wb") as fh:
+            if job.format == "xlsx":
+                exporter.write_xlsx(fh)
+            else:
+                exporter.write_csv(fh)
+        upload_file(bucket=EXPORT_BUCKET, path=path, file_path=tmp_path, content_type=content_type)
+        signed = create_signed_url(bucket=EXPORT_BUCKET, path=path, expires_in=_job_ttl_sec())
+        job.path = path
+        job.url = signed.url
+        job.expires_in = signed.expires_in
+        job.status = "completed"
+    except Exception as e:
+        logger.error("[Export] job %s failed: %s", job.id, e)
+        job.status = "failed"
+        job.error = "导出失败"
+    finally:
+        if tmp_path:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+    return job
+
 
 class ExportService:
     """
@@ -53,6 +53,17 @@ def _get_gemini_model() -> str:
     return model or "gemini-3.1-flash-lite-preview"
 
 
+def metadata_strategy_fingerprint() -> str:
+    """
+    当前元数据提取策略标识（用于解析结果缓存的 key）。
+
+    中文注释: 切换模型或启停 Gemini 后，旧缓存自然失效。
+    """
+    if _get_gemini_api_key():
+        return f"gemini:{_get_gemini_model()}"
+    return "local"
+
+
 def _build_response_schema() -> Dict[str, Any]:
     return {
         "type": "object",
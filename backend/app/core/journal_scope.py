@@ -5,6 +5,7 @@ from typing import Iterable
 
 from fastapi import HTTPException
 
+from app.core import profile_cache
 from app.core.role_matrix import ADMIN_ROLE, normalize_roles
 from app.lib.api_client import supabase_admin
 
@@ -47,6 +48,7 @@ def get_user_scope_journal_ids(*, user_id: str, roles: Iterable[str] | None) ->
     中文注释：
     - admin 不受 journal scope 限制，返回空集合由上层走 bypass。
     - 若 scope 表尚未迁移，返回空集合并由上层按策略处理。
+    - 结果走 profile_cache（scope 增删接口负责失效）。
     """
     role_set = normalize_roles(roles)
     if ADMIN_ROLE in role_set:
@@ -56,6 +58,11 @@ def get_user_scope_journal_ids(*, user_id: str, roles: Iterable[str] | None) ->
     if not scope_roles:
         return set()
 
+    cache_key = profile_cache.scope_key(str(user_id), scope_roles)
+    cached = profile_cache.lookup(cache_key)
+    if not profile_cache.is_missing(cached):
+        return set(cached)
+
     try:
         resp = (
             supabase_admin.table("journal_role_scopes")
@@ -76,6 +83,7 @@ def get_user_scope_journal_ids(*, user_id: str, roles: Iterable[str] | None) ->
         journal_id = str(row.get("journal_id") or "").strip()
         if journal_id:
             allowed_ids.add(journal_id)
+    profile_cache.store(cache_key, frozenset(allowed_ids))
     return allowed_ids
 
 
@@ -141,6 +149,28 @@ def ensure_manuscript_scope_access(
     return journal_id
 
 
+def resolve_visible_journal_ids(
+    *,
+    user_id: str,
+    roles: Iterable[str] | None,
+    allow_admin_bypass: bool = True,
+) -> set[str] | None:
+    """
+    返回用户可见的期刊集合；None 表示不受 scope 限制（与 filter_rows_by_journal_scope 的判定一致）。
+
+    中文注释: 计数/聚合类查询用它把 scope 下推到数据库，而不是拉全量行再裁剪。
+    """
+    role_set = normalize_roles(roles)
+    if allow_admin_bypass and ADMIN_ROLE in role_set:
+        return None
+
+    should_enforce = bool(role_set.intersection(_STRICT_SCOPE_ALWAYS_ROLES)) or is_scope_enforcement_enabled()
+    if not should_enforce:
+        return None
+
+    return get_user_scope_journal_ids(user_id=str(user_id), roles=role_set)
+
+
 def filter_rows_by_journal_scope(
     *,
     rows: list[dict],
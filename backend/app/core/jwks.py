@@ -0,0 +1,226 @@
+"""
+Supabase 非对称签名 JWT（ES256/RS256）的本地校验。
+
+中文注释:
+- Supabase 新版 JWT Signing Keys 使用非对称算法，公钥通过 `/auth/v1/.well-known/jwks.json` 公开。
+- 这里缓存 JWKS（TTL 刷新 + 遇到未知 kid 时按最小间隔强制刷新，兼容密钥轮换），
+  以便在本地完成验签，不再每个请求都调用 Auth API。
+- 已验签的 token 以 SHA-256 摘要存入 LRU，过期时间对齐 token 的 exp。
+- 任何“无法本地判定”的情况（未配置 URL、JWKS 拉取失败、kid 不存在）返回 None，由调用方回退到 Auth API。
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+from collections import OrderedDict
+from threading import Lock
+from time import monotonic, time
+from typing import Any, Optional
+
+from jose import jwt
+
+from app.core.config import app_config, env_bool, env_int
+from app.lib.supabase_pool import get_shared_http_client
+
+logger = logging.getLogger("scholarflow.jwks")
+
+ASYMMETRIC_ALGORITHMS = {"ES256", "RS256"}
+JWT_AUDIENCE = "authenticated"
+
+
+def _default_jwks_url() -> str:
+    explicit = (os.environ.get("SUPABASE_JWKS_URL") or "").strip()
+    if explicit:
+        return explicit
+    base = (app_config.supabase_url or "").strip().rstrip("/")
+    if not base:
+        return ""
+    return f"{base}/auth/v1/.well-known/jwks.json"
+
+
+class JWKSCache:
+    """
+    JWKS 公钥缓存（线程安全）。
+
+    - ttl_sec：常规刷新周期；
+    - min_refresh_interval_sec：遇到未知 kid / 拉取失败后，至少间隔多久才允许再次拉取（防止打爆 Auth 服务）。
+    """
+
+    def __init__(
+        self,
+        *,
+        url_provider=_default_jwks_url,
+        ttl_sec: Optional[int] = None,
+        min_refresh_interval_sec: Optional[int] = None,
+        fetch_timeout_sec: float = 3.0,
+    ) -> None:
+        self._url_provider = url_provider
+        self._ttl_sec = ttl_sec if ttl_sec is not None else env_int("SUPABASE_JWKS_TTL_SEC", 600)
+        self._min_refresh_interval_sec = (
+            min_refresh_interval_sec
+            if min_refresh_interval_sec is not None
+            else env_int("SUPABASE_JWKS_MIN_REFRESH_SEC", 30)
+        )
+        self._fetch_timeout_sec = fetch_timeout_sec
+        self._lock = Lock()
+        self._keys: dict[str, dict[str, Any]] = {}
+        self._fetched_at: float = 0.0
+        self._last_attempt_at: float = 0.0
+
+    def _fetch(self) -> Optional[dict[str, dict[str, Any]]]:
+        url = self._url_provider()
+        if not url:
+            return None
+        try:
+            resp = get_shared_http_client().get(url, timeout=self._fetch_timeout_sec)
+            resp.raise_for_status()
+            body = resp.json() or {}
+        except Exception as e:
+            logger.warning("[JWKS] fetch failed: %s", e)
+            return None
+        keys: dict[str, dict[str, Any]] = {}
+        for item in body.get("keys") or []:
+            if not isinstance(item, dict):
+                continue
+            kid = str(item.get("kid") or "").strip()
+            if kid:
+                keys[kid] = item
+        return keys
+
+    def _refresh_locked(self, now: float) -> None:
+        if self._last_attempt_at and now - self._last_attempt_at < self._min_refresh_interval_sec:
+            return
+        self._last_attempt_at = now
+        keys = self._fetch()
+        if keys is None:
+            return
+        self._keys = keys
+        self._fetched_at = now
+
+    def get_key(self, kid: str) -> Optional[dict[str, Any]]:
+        now = monotonic()
+        with self._lock:
+            stale = not self._fetched_at or now - self._fetched_at >= self._ttl_sec
+            if stale or kid not in self._keys:
+                # 中文注释: 未知 kid 通常意味着密钥轮换，触发一次（节流的）强制刷新。
+                self._refresh_locked(now)
+            return self._keys.get(kid)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._keys = {}
+            self._fetched_at = 0.0
+            self._last_attempt_at = 0.0
+
+
+class VerifiedTokenCache:
+    """
+    已验签 token 的 LRU（key 为 token 的 SHA-256 摘要，不保存原始 token）。
+    """
+
+    def __init__(self, *, max_entries: Optional[int] = None) -> None:
+        self._max_entries = max_entries or env_int("AUTH_VERIFIED_TOKEN_CACHE_SIZE", 4096, minimum=16)
+        self._store: "OrderedDict[str, tuple[float, dict[str, Any]]]" = OrderedDict()
+        self._lock = Lock()
+
+    @staticmethod
+    def digest(token: str) -> str:
+        return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+    def get(self, token: str) -> Optional[dict[str, Any]]:
+        key = self.digest(token)
+        now = time()
+        with self._lock:
+            row = self._store.get(key)
+            if row is None:
+                return None
+            expires_at, claims = row
+            if expires_at <= now:
+                self._store.pop(key, None)
+                return None
+            self._store.move_to_end(key)
+            return claims
+
+    def set(self, token: str, claims: dict[str, Any]) -> None:
+        try:
+            expires_at = float(claims.get("exp"))
+        except Exception:
+            # 中文注释: 没有 exp 的 token 不缓存（无法确定何时失效）。
+            return
+        if expires_at <= time():
+            return
+        key = self.digest(token)
+        with self._lock:
+            self._store[key] = (expires_at, claims)
+            self._store.move_to_end(key)
+            while len(self._store) > self._max_entries:
+                self._store.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._store.clear()
+
+
+jwks_cache = JWKSCache()
+verified_token_cache = VerifiedTokenCache()
+
+
+def is_local_jwks_enabled() -> bool:
+    return env_bool("SUPABASE_JWKS_LOCAL_VERIFY", True)
+
+
+def verify_asymmetric_token(token: str, header: dict[str, Any]) -> Optional[dict[str, Any]]:
+    """
+    本地校验 ES256/RS256 token，返回 claims。
+
+    - 命中已验签缓存：直接返回（常数时间）；
+    - 签名/过期/audience 不合法：抛出 JWTError（调用方按 401 处理）；
+    - 无法本地判定（未启用、无 kid、JWKS 不可用或 kid 不存在）：返回 None，调用方回退 Auth API。
+    """
+    if not is_local_jwks_enabled():
+        return None
+    alg = str(header.get("alg") or "")
+    kid = str(header.get("kid") or "").strip()
+    if alg not in ASYMMETRIC_ALGORITHMS or not kid:
+        return None
+
+    cached = verified_token_cache.get(token)
+    if cached is not None:
+        return cached
+
+    key = jwks_cache.get_key(kid)
+    if key is None:
+        return None
+    key_alg = str(key.get("alg") or alg)
+    if key_alg != alg:
+        return None
+
+    claims = jwt.decode(token, key, algorithms=[alg], audience=JWT_AUDIENCE)
+    verified_token_cache.set(token, claims)
+    return claims
+
+
+def verified_token_subject(token: str) -> Optional[str]:
+    """
+    不访问网络地返回“已验签” token 的 sub；无法在本地确认签名时返回 None。
+
+    中文注释:
+    - 供限流等热路径使用（事件循环内同步调用），因此不会拉取 JWKS、也不会回退 Auth API；
+    - HS256：用 SUPABASE_JWT_SECRET 本地验签（未显式配置密钥时不认）；
+    - ES256/RS256：只认已验签缓存（get_current_user 验签过的 token 会写入缓存）。
+    """
+    try:
+        claims = verified_token_cache.get(token)
+        if claims is None:
+            header = jwt.get_unverified_header(token)
+            secret = (os.environ.get("SUPABASE_JWT_SECRET") or "").strip()
+            if header.get("alg") != "HS256" or not secret:
+                return None
+            claims = jwt.decode(token, secret, algorithms=["HS256"], audience=JWT_AUDIENCE)
+            verified_token_cache.set(token, claims)
+    except Exception:
+        return None
+    sub = str(claims.get("sub") or "").strip()
+    return sub[:128] or None
@@ -7,16 +7,23 @@ from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
 from email.utils import COMMASPACE
 from html import unescape
-from pathlib import Path
 from typing import Any, Dict, Mapping, Optional, Sequence
 
 import resend
 from itsdangerous import URLSafeTimedSerializer, SignatureExpired, BadSignature
-from jinja2 import Environment, FileSystemLoader, select_autoescape
 from supabase import create_client, Client
 from tenacity import retry, retry_if_exception, stop_after_attempt, wait_exponential
 
 from app.core.config import SMTPConfig, app_config, ResendConfig
+from app.core.email_templates import get_email_template_registry
+from app.core.mail_dispatcher import (
+    DispatchResult,
+    MailDispatcher,
+    TemplateEmail,
+    get_smtp_pool,
+    is_smtp_pool_enabled,
+)
+from app.lib.supabase_pool import get_pooled_client
 from app.models.email_log import EmailStatus
 
 logger = logging.getLogger(__name__)
@@ -95,22 +102,20 @@ class EmailService:
         if self.resend_config:
             resend.api_key = self.resend_config.api_key
 
-        # Path to templates: backend/app/core/templates
-        templates_dir = Path(__file__).resolve().parent / "templates"
-        self._jinja = Environment(
-            loader=FileSystemLoader(str(templates_dir)),
-            autoescape=select_autoescape(["html", "xml"]),
-        )
+        # 中文注释: 模板 Environment 与编译结果进程内共享（见 app/core/email_templates.py），不随实例重建。
+        self._templates = get_email_template_registry()
+        self._jinja = self._templates.env
 
         # Use Supabase Service Key as secret for tokens (backend-only)
         self._serializer = URLSafeTimedSerializer(app_config.supabase_key or "dev-secret")
 
         # Service Role Client for logging (Sync client) — 缺省允许为空（单测/CI 不必强依赖）
+        # 中文注释: 同一 (url, key) 复用进程级 Client，避免每个 EmailService 实例各建一套连接。
         if supabase_client is self._SENTINEL:
             try:
                 if app_config.supabase_url and app_config.supabase_key:
-                    self._supabase = create_client(
-                        app_config.supabase_url, app_config.supabase_key
+                    self._supabase = get_pooled_client(
+                        app_config.supabase_url, app_config.supabase_key, factory=create_client
                     )
                 else:
                     self._supabase = None
@@ -150,10 +155,10 @@ class EmailService:
             return None
 
     def render_template(self, template_name: str, context: Dict[str, Any]) -> str:
-        return self._jinja.get_template(template_name).render(**context)
+        return self._templates.get_file(template_name).render(**context)
 
     def render_inline_template(self, template_source: str, context: Dict[str, Any]) -> str:
-        return self._jinja.from_string(template_source).render(**context)
+        return self._templates.get_inline(template_source).render(**context)
 
     def _normalize_idempotency_key(self, key: str | None) -> str | None:
         raw = str(key or "").strip()
@@ -534,6 +539,12 @@ class EmailService:
                     if envelope.reply_to_emails:
                         msg["Reply-To"] = COMMASPACE.join(envelope.reply_to_emails)
 
+                if is_smtp_pool_enabled():
+                    # 中文注释: 复用已认证长连接（见 mail_dispatcher.SMTPConnectionPool），不再逐封握手。
+                    get_smtp_pool(self.smtp_config).sendmail(
+                        self.smtp_config.from_email, recipients, msg.as_string()
+                    )
+                    return True
                 with smtplib.SMTP(self.smtp_config.host, self.smtp_config.port) as server:
                     if self.smtp_config.use_starttls:
                         server.starttls()
@@ -587,6 +598,21 @@ class EmailService:
             return False
         return self.send_email(to_email=to_email, subject=subject, html_body=html, text_body=text)
 
+    def send_template_batch(
+        self,
+        messages: Sequence[TemplateEmail],
+        *,
+        concurrency: int | None = None,
+    ) -> list[DispatchResult]:
+        """
+        批量发送模板邮件（催办等批处理场景）。
+
+        中文注释:
+        - SMTP: 有界并发 + 连接池复用；Resend: /emails/batch 每批 100 封。
+        - 结果与 messages 顺序一致；email_logs 按批 bulk insert。
+        """
+        return MailDispatcher(self, concurrency=concurrency).dispatch(messages)
+
     def send_email_background(
         self,
         to_email: str,
@@ -1030,7 +1056,45 @@ class EmailService:
             raise RuntimeError("Resend is not configured")
         resend.api_key = resend_cfg.api_key
 
-        params = {
+        params = self.build_resend_params(
+            to_email=to_email,
+            to_emails=to_emails,
+            cc_emails=cc_emails,
+            bcc_emails=bcc_emails,
+            reply_to_emails=reply_to_emails,
+            subject=subject,
+            html_body=html_body,
+            text_body=text_body,
+            attachments=attachments,
+            sender=sender,
+            tags=tags,
+            headers=headers,
+        )
+
+        options: dict[str, Any] | None = None
+        normalized_key = self._normalize_idempotency_key(idempotency_key)
+        if normalized_key:
+            options = {"idempotency_key": normalized_key}
+
+        return self._send_with_retry(params, options=options)
+
+    def build_resend_params(
+        self,
+        *,
+        to_email: str | None = None,
+        to_emails: Sequence[str] | None = None,
+        cc_emails: Sequence[str] | None = None,
+        bcc_emails: Sequence[str] | None = None,
+        reply_to_emails: Sequence[str] | None = None,
+        subject: str,
+        html_body: str,
+        text_body: str | None,
+        attachments: Sequence[Mapping[str, Any]] | None = None,
+        sender: str,
+        tags: Sequence[Mapping[str, str]] | None = None,
+        headers: Mapping[str, str] | None = None,
+    ) -> dict[str, Any]:
+        params: dict[str, Any] = {
             "from": sender or "ScholarFlow <no-reply@scholarflow.local>",
             "to": self._normalize_email_list(([to_email] if to_email else []) + list(to_emails or [])),
             "subject": subject,
@@ -1056,13 +1120,26 @@ class EmailService:
         normalized_tags = self._normalize_tags(tags)
         if normalized_tags:
             params["tags"] = normalized_tags
+        return params
 
-        options: dict[str, Any] | None = None
+    def send_resend_batch(
+        self,
+        params: Sequence[Dict[str, Any]],
+        *,
+        idempotency_key: str | None = None,
+    ) -> dict[str, Any]:
+        """
+        Resend 批量接口（单次最多 100 封，不支持附件）；permissive 模式下逐封返回校验错误。
+        """
+        resend_cfg = self._effective_resend_config()
+        if not resend_cfg:
+            raise RuntimeError("Resend is not configured")
+        resend.api_key = resend_cfg.api_key
+        options: dict[str, Any] = {"batch_validation": "permissive"}
         normalized_key = self._normalize_idempotency_key(idempotency_key)
         if normalized_key:
-            options = {"idempotency_key": normalized_key}
-
-        return self._send_with_retry(params, options=options)
+            options["idempotency_key"] = normalized_key
+        return self._send_batch_with_retry(list(params), options=options)
 
     @retry(
         stop=stop_after_attempt(3),
@@ -1073,6 +1150,125 @@ class EmailService:
     def _send_with_retry(self, params: Dict[str, Any], *, options: Dict[str, Any] | None = None):
         return resend.Emails.send(params, options)
 
+    @retry(
+        stop=stop_after_attempt(3),
+        wait=wait_exponential(multiplier=1, min=1, max=8),
+        retry=retry_if_exception(_is_retryable_resend_exception),
+        reraise=True,
+    )
+    def _send_batch_with_retry(self, params: list[Dict[str, Any]], *, options: Dict[str, Any] | None = None):
+        return resend.Batch.send(params, options)
+
+    def build_log_row(
+        self,
+        recipient: str,
+        subject: str,
+        template_name: str,
+        status: EmailStatus,
+        *,
+        provider_id: Optional[str] = None,
+        provider: Optional[str] = None,
+        error_message: Optional[str] = None,
+        to_recipients: Sequence[str] | None = None,
+        cc_recipients: Sequence[str] | None = None,
+        bcc_recipients: Sequence[str] | None = None,
+        reply_to_recipients: Sequence[str] | None = None,
+        attachment_manifest: Sequence[Mapping[str, Any]] | None = None,
+        audit_context: Mapping[str, Any] | None = None,
+    ) -> dict[str, Any]:
+        context = dict(audit_context or {})
+        normalized_to = self._normalize_email_list(to_recipients or [recipient])
+        normalized_cc = self._normalize_email_list(cc_recipients)
+        normalized_bcc = self._normalize_email_list(bcc_recipients)
+        normalized_reply_to = self._normalize_email_list(reply_to_recipients)
+        delivery_mode = str(context.get("delivery_mode") or "").strip() or None
+        raw_communication_status = str(context.get("communication_status") or "").strip()
+        if raw_communication_status in {"system_sent", "system_failed"}:
+            communication_status = "system_sent" if status == EmailStatus.SENT else "system_failed"
+        else:
+            communication_status = raw_communication_status or (
+                "system_sent" if status == EmailStatus.SENT else "system_failed"
+            )
+        normalized_provider = str(provider or context.get("provider") or "").strip() or None
+        normalized_attachment_manifest = self._build_attachment_manifest(attachment_manifest)
+        return {
+            "recipient": recipient,
+            "subject": subject,
+            "template_name": template_name,
+            "status": status.value,
+            "assignment_id": str(context.get("assignment_id") or "").strip() or None,
+            "manuscript_id": str(context.get("manuscript_id") or "").strip() or None,
+            "actor_user_id": str(context.get("actor_user_id") or "").strip() or None,
+            "idempotency_key": str(context.get("idempotency_key") or "").strip() or None,
+            "scene": str(context.get("scene") or "").strip() or None,
+            "event_type": str(context.get("event_type") or "").strip() or None,
+            "to_recipients": normalized_to,
+            "cc_recipients": normalized_cc,
+            "bcc_recipients": normalized_bcc,
+            "reply_to_recipients": normalized_reply_to,
+            "delivery_mode": delivery_mode,
+            "communication_status": communication_status,
+            "provider": normalized_provider,
+            "attachment_count": len(normalized_attachment_manifest),
+            "attachment_manifest": normalized_attachment_manifest,
+            "provider_id": provider_id,
+            "error_message": error_message,
+            # Simple retry count tracking logic: if failed, we likely retried 2 more times (total 3).
+            "retry_count": 3 if status == EmailStatus.FAILED else 0
+        }
+
+    def insert_log_rows(self, rows: Sequence[Mapping[str, Any]], *, chunk_size: int = 500) -> None:
+        """
+        email_logs 批量写入（一次 insert 多行）；扩展列未迁移时退回基础列再写一次。
+        """
+        if self._supabase is None or not rows:
+            return
+        for start in range(0, len(rows), chunk_size):
+            chunk = [dict(row) for row in rows[start : start + chunk_size]]
+            try:
+                self._supabase.table("email_logs").insert(chunk if len(chunk) > 1 else chunk[0]).execute()
+            except Exception as e:
+                lowered = str(e).lower()
+                if (
+                    "email_logs.assignment_id" in lowered
+                    or "email_logs.manuscript_id" in lowered
+                    or "email_logs.actor_user_id" in lowered
+                    or "email_logs.idempotency_key" in lowered
+                    or "email_logs.scene" in lowered
+                    or "email_logs.event_type" in lowered
+                    or "email_logs.to_recipients" in lowered
+                    or "email_logs.cc_recipients" in lowered
+                    or "email_logs.bcc_recipients" in lowered
+                    or "email_logs.reply_to_recipients" in lowered
+                    or "email_logs.delivery_mode" in lowered
+                    or "email_logs.communication_status" in lowered
+                    or "email_logs.provider" in lowered
+                    or "email_logs.attachment_count" in lowered
+                    or "email_logs.attachment_manifest" in lowered
+                    or "schema cache" in lowered
+                ):
+                    try:
+                        fallback_rows = [
+                            {
+                                "recipient": row.get("recipient"),
+                                "subject": row.get("subject"),
+                                "template_name": row.get("template_name"),
+                                "status": row.get("status"),
+                                "provider_id": row.get("provider_id"),
+                                "error_message": row.get("error_message"),
+                                "retry_count": row.get("retry_count"),
+                            }
+                            for row in chunk
+                        ]
+                        self._supabase.table("email_logs").insert(
+                            fallback_rows if len(fallback_rows) > 1 else fallback_rows[0]
+                        ).execute()
+                        continue
+                    except Exception as fallback_exc:
+                        logger.warning("[Email] Failed to log email attempt (fallback): %s", fallback_exc)
+                        continue
+                logger.warning("[Email] Failed to log email attempt: %s", e)
+
     def _log_attempt(
         self,
         recipient: str,
@@ -1089,85 +1285,28 @@ class EmailService:
         attachment_manifest: Sequence[Mapping[str, Any]] | None = None,
         audit_context: Mapping[str, Any] | None = None,
     ):
+        if self._supabase is None:
+            return
         try:
-            if self._supabase is None:
-                return
-            context = dict(audit_context or {})
-            normalized_to = self._normalize_email_list(to_recipients or [recipient])
-            normalized_cc = self._normalize_email_list(cc_recipients)
-            normalized_bcc = self._normalize_email_list(bcc_recipients)
-            normalized_reply_to = self._normalize_email_list(reply_to_recipients)
-            delivery_mode = str(context.get("delivery_mode") or "").strip() or None
-            raw_communication_status = str(context.get("communication_status") or "").strip()
-            if raw_communication_status in {"system_sent", "system_failed"}:
-                communication_status = "system_sent" if status == EmailStatus.SENT else "system_failed"
-            else:
-                communication_status = raw_communication_status or (
-                    "system_sent" if status == EmailStatus.SENT else "system_failed"
-                )
-            normalized_provider = str(provider or context.get("provider") or "").strip() or None
-            normalized_attachment_manifest = self._build_attachment_manifest(attachment_manifest)
-            data = {
-                "recipient": recipient,
-                "subject": subject,
-                "template_name": template_name,
-                "status": status.value,
-                "assignment_id": str(context.get("assignment_id") or "").strip() or None,
-                "manuscript_id": str(context.get("manuscript_id") or "").strip() or None,
-                "actor_user_id": str(context.get("actor_user_id") or "").strip() or None,
-                "idempotency_key": str(context.get("idempotency_key") or "").strip() or None,
-                "scene": str(context.get("scene") or "").strip() or None,
-                "event_type": str(context.get("event_type") or "").strip() or None,
-                "to_recipients": normalized_to,
-                "cc_recipients": normalized_cc,
-                "bcc_recipients": normalized_bcc,
-                "reply_to_recipients": normalized_reply_to,
-                "delivery_mode": delivery_mode,
-                "communication_status": communication_status,
-                "provider": normalized_provider,
-                "attachment_count": len(normalized_attachment_manifest),
-                "attachment_manifest": normalized_attachment_manifest,
-                "provider_id": provider_id,
-                "error_message": error_message,
-                # Simple retry count tracking logic: if failed, we likely retried 2 more times (total 3).
-                "retry_count": 3 if status == EmailStatus.FAILED else 0
-            }
-            self._supabase.table("email_logs").insert(data).execute()
+            row = self.build_log_row(
+                recipient,
+                subject,
+                template_name,
+                status,
+                provider_id=provider_id,
+                provider=provider,
+                error_message=error_message,
+                to_recipients=to_recipients,
+                cc_recipients=cc_recipients,
+                bcc_recipients=bcc_recipients,
+                reply_to_recipients=reply_to_recipients,
+                attachment_manifest=attachment_manifest,
+                audit_context=audit_context,
+            )
         except Exception as e:
-            lowered = str(e).lower()
-            if (
-                "email_logs.assignment_id" in lowered
-                or "email_logs.manuscript_id" in lowered
-                or "email_logs.actor_user_id" in lowered
-                or "email_logs.idempotency_key" in lowered
-                or "email_logs.scene" in lowered
-                or "email_logs.event_type" in lowered
-                or "email_logs.to_recipients" in lowered
-                or "email_logs.cc_recipients" in lowered
-                or "email_logs.bcc_recipients" in lowered
-                or "email_logs.reply_to_recipients" in lowered
-                or "email_logs.delivery_mode" in lowered
-                or "email_logs.communication_status" in lowered
-                or "email_logs.provider" in lowered
-                or "email_logs.attachment_count" in lowered
-                or "email_logs.attachment_manifest" in lowered
-                or "schema cache" in lowered
-            ):
-                try:
-                    fallback_data = {
-                        "recipient": recipient,
-                        "subject": subject,
-                        "template_name": template_name,
-                        "status": status.value,
-                        "provider_id": provider_id,
-                        "error_message": error_message,
-                        "retry_count": 3 if status == EmailStatus.FAILED else 0,
-                    }
-                    self._supabase.table("email_logs").insert(fallback_data).execute()
-                    return
-                except Exception as fallback_exc:
-                    logger.warning("[Email] Failed to log email attempt (fallback): %s", fallback_exc)
             logger.warning("[Email] Failed to log email attempt: %s", e)
+            return
+        self.insert_log_rows([row])
 
 # Global instance
 email_service = EmailService()
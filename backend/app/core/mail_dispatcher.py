@@ -0,0 +1,476 @@
+"""
+出站邮件分发：SMTP 长连接池 + 有界并发发送 + Resend 批量接口 + email_logs 批量写入。
+
+中文注释:
+- 旧实现每封邮件都 smtplib.SMTP(...) → STARTTLS → login → sendmail → quit，催办几百封时大部分时间花在握手上。
+- SMTPConnectionPool 维护最多 SMTP_POOL_SIZE 条已认证长连接：空闲超过 SMTP_POOL_NOOP_AFTER_SEC 的连接复用前先 NOOP 探活，
+  超过 SMTP_POOL_MAX_IDLE_SEC 直接关闭重建；发送时遇到断连丢弃该连接并用新连接重试一次。
+- MailDispatcher.dispatch 发送一批模板邮件：SMTP 走有界线程池（MAIL_DISPATCH_CONCURRENCY），
+  Resend 走 /emails/batch（每批最多 100 封，permissive 模式下单封地址错误不影响同批其他邮件），
+  发送结果对应的 email_logs 按批 bulk insert。
+- 发送量、失败数与单封耗时记录在进程内 MailMetrics（/internal/metrics/mail）。
+- 测试环境默认不启用连接池（未设置 SMTP_POOL_ENABLED 时），单测仍按“每封一次连接”的 smtplib patch 方式断言。
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+import smtplib
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from time import monotonic
+from typing import TYPE_CHECKING, Any, Mapping, Optional, Sequence
+
+from app.core.config import SMTPConfig, env_float, env_int, is_test_env
+from app.models.email_log import EmailStatus
+
+if TYPE_CHECKING:
+    from app.core.mail import EmailService
+
+logger = logging.getLogger("scholarflow.mail")
+
+RESEND_BATCH_LIMIT = 100
+# 中文注释: 连接中途断开/超时才换新连接重试；收件人被拒等协议错误直接返回失败（连接本身仍可用）。
+_RECONNECT_ERRORS = (smtplib.SMTPServerDisconnected, ConnectionError, TimeoutError)
+
+
+def is_smtp_pool_enabled() -> bool:
+    raw = os.environ.get("SMTP_POOL_ENABLED")
+    if raw is None:
+        return not is_test_env()
+    return str(raw).strip().lower() in {"1", "true", "yes", "on"}
+
+
+def _percentile(values: Sequence[float], pct: float) -> Optional[float]:
+    if not values:
+        return None
+    ordered = sorted(values)
+    idx = min(len(ordered) - 1, int(round(pct / 100.0 * (len(ordered) - 1))))
+    return round(ordered[idx], 1)
+
+
+def _quiet_close(server: Any) -> None:
+    try:
+        server.quit()
+    except Exception:
+        try:
+            server.close()
+        except Exception:
+            pass
+
+
+# ---------------- 指标 ----------------
+
+
+class MailMetrics:
+    """
+    进程内发送指标（按 provider 累计；耗时为最近 512 封的单封耗时）。
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._sent: dict[str, int] = {}
+        self._failed: dict[str, int] = {}
+        self._batches_total = 0
+        self._durations_ms: deque[float] = deque(maxlen=512)
+        self._last_batch: dict[str, Any] = {}
+
+    def record(self, provider: str, *, ok: bool, duration_ms: Optional[float] = None) -> None:
+        with self._lock:
+            bucket = self._sent if ok else self._failed
+            bucket[provider] = bucket.get(provider, 0) + 1
+            if duration_ms is not None:
+                self._durations_ms.append(duration_ms)
+
+    def record_batch(self, provider: str, *, size: int, sent: int, elapsed_sec: float) -> None:
+        with self._lock:
+            self._batches_total += 1
+            self._last_batch = {
+                "provider": provider,
+                "size": size,
+                "sent": sent,
+                "failed": size - sent,
+                "elapsed_ms": round(elapsed_sec * 1000.0, 1),
+                "per_sec": round(size / elapsed_sec, 1) if elapsed_sec > 0 else None,
+            }
+
+    def snapshot(self) -> dict[str, Any]:
+        with self._lock:
+            durations = list(self._durations_ms)
+            return {
+                "sent_total": dict(self._sent),
+                "failed_total": dict(self._failed),
+                "batches_total": self._batches_total,
+                "last_batch": dict(self._last_batch),
+                "p50_ms": _percentile(durations, 50),
+                "p95_ms": _percentile(durations, 95),
+            }
+
+
+_metrics = MailMetrics()
+
+
+def get_mail_metrics() -> dict[str, Any]:
+    pools = list(_pools.values())
+    return {
+        **_metrics.snapshot(),
+        "smtp_pool_enabled": is_smtp_pool_enabled(),
+        "smtp_pools": [p.snapshot() for p in pools],
+    }
+
+
+# ---------------- SMTP 连接池 ----------------
+
+
+class _PooledConnection:
+    __slots__ = ("server", "last_used")
+
+    def __init__(self, server: smtplib.SMTP) -> None:
+        self.server = server
+        self.last_used = monotonic()
+
+
+class SMTPConnectionPool:
+    """
+    已认证 SMTP 长连接池（线程安全）。并发上限 = size，超出的调用方在 acquire_timeout_sec 内等待。
+    """
+
+    def __init__(
+        self,
+        config: SMTPConfig,
+        *,
+        size: Optional[int] = None,
+        timeout_sec: Optional[float] = None,
+        noop_after_sec: Optional[float] = None,
+        max_idle_sec: Optional[float] = None,
+        acquire_timeout_sec: Optional[float] = None,
+    ) -> None:
+        self.config = config
+        self.size = size or env_int("SMTP_POOL_SIZE", 4)
+        self.timeout_sec = timeout_sec or env_float("SMTP_TIMEOUT_SEC", 30.0, minimum=1.0)
+        self.noop_after_sec = (
+            noop_after_sec if noop_after_sec is not None else env_float("SMTP_POOL_NOOP_AFTER_SEC", 30.0)
+        )
+        self.max_idle_sec = (
+            max_idle_sec if max_idle_sec is not None else env_float("SMTP_POOL_MAX_IDLE_SEC", 240.0)
+        )
+        self.acquire_timeout_sec = acquire_timeout_sec or env_float(
+            "SMTP_POOL_ACQUIRE_TIMEOUT_SEC", 30.0, minimum=1.0
+        )
+        self._slots = threading.BoundedSemaphore(self.size)
+        self._lock = threading.Lock()
+        self._idle: list[_PooledConnection] = []
+        self._in_use = 0
+        self._closed = False
+        self._connects_total = 0
+        self._reconnects_total = 0
+        self._stale_total = 0
+
+    def _connect(self) -> _PooledConnection:
+        cfg = self.config
+        server = smtplib.SMTP(cfg.host, cfg.port, timeout=self.timeout_sec)
+        try:
+            if cfg.use_starttls:
+                server.starttls()
+            if cfg.user and cfg.password:
+                server.login(cfg.user, cfg.password)
+        except Exception:
+            _quiet_close(server)
+            raise
+        with self._lock:
+            self._connects_total += 1
+        return _PooledConnection(server)
+
+    def _discard(self, conn: _PooledConnection) -> None:
+        _quiet_close(conn.server)
+
+    def _checkout(self) -> _PooledConnection:
+        while True:
+            with self._lock:
+                conn = self._idle.pop() if self._idle else None
+            if conn is None:
+                return self._connect()
+            idle = monotonic() - conn.last_used
+            if idle > self.max_idle_sec:
+                self._discard(conn)
+                with self._lock:
+                    self._stale_total += 1
+                continue
+            if idle > self.noop_after_sec:
+                try:
+                    code, _ = conn.server.noop()
+                    if code != 250:
+                        raise smtplib.SMTPServerDisconnected(f"NOOP returned {code}")
+                except Exception:
+                    self._discard(conn)
+                    with self._lock:
+                        self._stale_total += 1
+                    continue
+            return conn
+
+    def _checkin(self, conn: _PooledConnection) -> None:
+        conn.last_used = monotonic()
+        with self._lock:
+            if not self._closed:
+                self._idle.append(conn)
+                return
+        self._discard(conn)
+
+    def sendmail(self, from_addr: str, recipients: Sequence[str], message: str) -> None:
+        if not self._slots.acquire(timeout=self.acquire_timeout_sec):
+            raise TimeoutError("SMTP pool exhausted")
+        with self._lock:
+            self._in_use += 1
+        conn: Optional[_PooledConnection] = None
+        try:
+            conn = self._checkout()
+            try:
+                conn.server.sendmail(from_addr, list(recipients), message)
+            except _RECONNECT_ERRORS as e:
+                self._discard(conn)
+                conn = None
+                with self._lock:
+                    self._reconnects_total += 1
+                logger.info("[SMTPPool] connection lost (%s), reconnecting", e)
+                conn = self._connect()
+                conn.server.sendmail(from_addr, list(recipients), message)
+            self._checkin(conn)
+            conn = None
+        except _RECONNECT_ERRORS:
+            if conn is not None:
+                self._discard(conn)
+            raise
+        except Exception:
+            # 中文注释: 收件人被拒等协议错误后 smtplib 已 RSET，连接仍可复用。
+            if conn is not None:
+                self._checkin(conn)
+            raise
+        finally:
+            with self._lock:
+                self._in_use -= 1
+            self._slots.release()
+
+    def close(self) -> None:
+        with self._lock:
+            self._closed = True
+            idle = list(self._idle)
+            self._idle.clear()
+        for conn in idle:
+            self._discard(conn)
+
+    def snapshot(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "host": self.config.host,
+                "size": self.size,
+                "idle": len(self._idle),
+                "in_use": self._in_use,
+                "connects_total": self._connects_total,
+                "reconnects_total": self._reconnects_total,
+                "stale_total": self._stale_total,
+            }
+
+
+_pools_lock = threading.Lock()
+_pools: dict[tuple, SMTPConnectionPool] = {}
+
+
+def get_smtp_pool(config: SMTPConfig) -> SMTPConnectionPool:
+    key = (config.host, config.port, config.user, config.use_starttls)
+    pool = _pools.get(key)
+    if pool is not None:
+        return pool
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            pool = _pools[key] = SMTPConnectionPool(config)
+        return pool
+
+
+def shutdown_smtp_pools() -> None:
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.close()
+
+
+# ---------------- 批量分发 ----------------
+
+
+@dataclass(frozen=True)
+class TemplateEmail:
+    to_email: str
+    subject: str
+    template_name: str
+    context: Mapping[str, Any] = field(default_factory=dict)
+    idempotency_key: Optional[str] = None
+    tags: Optional[Sequence[Mapping[str, str]]] = None
+    audit_context: Optional[Mapping[str, Any]] = None
+
+
+@dataclass
+class DispatchResult:
+    ok: bool
+    provider: Optional[str] = None
+    provider_id: Optional[str] = None
+    error: Optional[str] = None
+
+
+@dataclass
+class _Rendered:
+    index: int
+    message: TemplateEmail
+    html: str
+    text: str
+
+
+class MailDispatcher:
+    """
+    一批模板邮件的渲染 + 发送 + 日志写入；返回结果与输入顺序一一对应。
+    """
+
+    def __init__(
+        self,
+        email_service: "EmailService",
+        *,
+        concurrency: Optional[int] = None,
+        log_attempts: bool = True,
+    ) -> None:
+        self.email = email_service
+        self.concurrency = concurrency or env_int("MAIL_DISPATCH_CONCURRENCY", 4)
+        self.log_attempts = log_attempts
+
+    def dispatch(self, messages: Sequence[TemplateEmail]) -> list[DispatchResult]:
+        results = [DispatchResult(ok=False) for _ in messages]
+        if not messages:
+            return results
+        if not self.email.is_configured():
+            for result in results:
+                result.error = "Email provider is not configured"
+            return results
+
+        log_rows: list[dict[str, Any]] = []
+        rendered: list[_Rendered] = []
+        for index, message in enumerate(messages):
+            try:
+                html = self.email.render_template(message.template_name, dict(message.context))
+                text = self.email.derive_plain_text_from_html(html)
+            except Exception as e:
+                logger.warning("[MailDispatcher] template render failed: %s", e)
+                results[index].error = str(e)
+                log_rows.append(self._log_row(message, results[index]))
+                continue
+            rendered.append(_Rendered(index, message, html, text))
+
+        started = monotonic()
+        if self.email.smtp_config:
+            provider = "smtp"
+            self._dispatch_smtp(rendered, results)
+        else:
+            provider = "resend"
+            self._dispatch_resend(rendered, results)
+        elapsed = monotonic() - started
+
+        for item in rendered:
+            log_rows.append(self._log_row(item.message, results[item.index]))
+        if self.log_attempts:
+            self.email.insert_log_rows(log_rows)
+
+        sent = sum(1 for r in results if r.ok)
+        _metrics.record_batch(provider, size=len(messages), sent=sent, elapsed_sec=elapsed)
+        logger.info(
+            "[MailDispatcher] %s batch: %s/%s sent in %.2fs", provider, sent, len(messages), elapsed
+        )
+        return results
+
+    def _log_row(self, message: TemplateEmail, result: DispatchResult) -> dict[str, Any]:
+        return self.email.build_log_row(
+            message.to_email,
+            message.subject,
+            message.template_name,
+            EmailStatus.SENT if result.ok else EmailStatus.FAILED,
+            provider=result.provider,
+            provider_id=result.provider_id,
+            error_message=None if result.ok else (result.error or "send failed"),
+            audit_context=message.audit_context,
+        )
+
+    def _dispatch_smtp(self, rendered: list[_Rendered], results: list[DispatchResult]) -> None:
+        def _send(item: _Rendered) -> None:
+            started = monotonic()
+            ok = self.email.send_email(
+                to_email=item.message.to_email,
+                subject=item.message.subject,
+                html_body=item.html,
+                text_body=item.text,
+            )
+            _metrics.record("smtp", ok=ok, duration_ms=(monotonic() - started) * 1000.0)
+            result = results[item.index]
+            result.ok = bool(ok)
+            result.provider = "smtp"
+            result.error = None if ok else "send failed"
+
+        if not rendered:
+            return
+        workers = max(1, min(self.concurrency, len(rendered)))
+        if workers == 1:
+            for item in rendered:
+                _send(item)
+            return
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="sf-mail") as pool:
+            list(pool.map(_send, rendered))
+
+    def _dispatch_resend(self, rendered: list[_Rendered], results: list[DispatchResult]) -> None:
+        resend_cfg = self.email._effective_resend_config()
+        for start in range(0, len(rendered), RESEND_BATCH_LIMIT):
+            chunk = rendered[start : start + RESEND_BATCH_LIMIT]
+            params = [
+                self.email.build_resend_params(
+                    to_email=item.message.to_email,
+                    subject=item.message.subject,
+                    html_body=item.html,
+                    text_body=item.text,
+                    sender=resend_cfg.sender if resend_cfg else "",
+                    tags=self.email._merge_inline_email_tags(
+                        template_key=item.message.template_name, tags=item.message.tags
+                    ),
+                )
+                for item in chunk
+            ]
+            keys = [self.email._normalize_idempotency_key(item.message.idempotency_key) for item in chunk]
+            batch_key = None
+            if all(keys):
+                # 中文注释: 批量接口只有一个 Idempotency-Key；整批都有 key 时用其摘要，重试同一批不会重复发送。
+                batch_key = "batch:" + hashlib.sha256("|".join(keys).encode("utf-8")).hexdigest()[:48]
+            started = monotonic()
+            try:
+                response = self.email.send_resend_batch(params, idempotency_key=batch_key)
+            except Exception as e:
+                logger.warning("[Resend] batch send failed: %s", e)
+                for item in chunk:
+                    results[item.index] = DispatchResult(ok=False, provider="resend", error=str(e))
+                    _metrics.record("resend", ok=False)
+                continue
+            per_message_ms = (monotonic() - started) * 1000.0 / max(len(chunk), 1)
+
+            data = list((response or {}).get("data") or []) if isinstance(response, dict) else []
+            errors = {
+                int(err.get("index")): str(err.get("message") or "rejected")
+                for err in ((response or {}).get("errors") or [] if isinstance(response, dict) else [])
+                if isinstance(err, dict) and err.get("index") is not None
+            }
+            accepted = iter(data)
+            for offset, item in enumerate(chunk):
+                if offset in errors:
+                    results[item.index] = DispatchResult(ok=False, provider="resend", error=errors[offset])
+                    _metrics.record("resend", ok=False)
+                    continue
+                created = next(accepted, None)
+                provider_id = created.get("id") if isinstance(created, dict) else None
+                results[item.index] = DispatchResult(ok=True, provider="resend", provider_id=provider_id)
+                _metrics.record("resend", ok=True, duration_ms=per_message_ms)
@@ -1,33 +1,63 @@
 import time
 import logging
-from fastapi import Request, HTTPException
+from fastapi import HTTPException
 from fastapi.responses import JSONResponse
-from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
 # === 结构化日志配置 ===
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("scholarflow")
 
-class ExceptionHandlerMiddleware(BaseHTTPMiddleware):
+class ExceptionHandlerMiddleware:
     """
     统一异常捕获中间件
     遵循章程：所有 User Story 必须包含异常处理、结构化日志
+
+    中文注释:
+    - 纯 ASGI 实现：不像 BaseHTTPMiddleware 那样为每个请求额外起 task + 内存流，StreamingResponse/BackgroundTasks 语义不变。
+    - 响应头发出后才抛出的异常已无法改写为 JSON，只记录日志并继续上抛。
     """
-    async def dispatch(self, request: Request, call_next):
-        start_time = time.time()
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start_time = time.perf_counter()
+        status_code = 500
+        response_started = False
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code, response_started
+            if message["type"] == "http.response.start":
+                response_started = True
+                status_code = int(message["status"])
+            await send(message)
+
         try:
-            response = await call_next(request)
-            process_time = time.time() - start_time
-            logger.info(f"Method: {request.method} Path: {request.url.path} Status: {response.status_code} Time: {process_time:.4f}s")
-            return response
+            await self.app(scope, receive, send_wrapper)
         except HTTPException as exc:
-            return JSONResponse(
+            if response_started:
+                raise
+            response = JSONResponse(
                 status_code=exc.status_code,
                 content={"detail": exc.detail, "type": "http_exception"}
             )
+            await response(scope, receive, send)
+            return
         except Exception as e:
             logger.error(f"Unhandled Exception: {str(e)}", exc_info=True)
-            return JSONResponse(
+            if response_started:
+                raise
+            response = JSONResponse(
                 status_code=500,
                 content={"detail": "内部系统错误，请联系管理员", "type": "server_error"}
             )
+            await response(scope, receive, send)
+            return
+
+        process_time = time.perf_counter() - start_time
+        logger.info(f"Method: {scope['method']} Path: {scope['path']} Status: {status_code} Time: {process_time:.4f}s")
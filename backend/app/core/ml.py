@@ -5,10 +5,25 @@ import re
 import threading
 from functools import lru_cache
 from pathlib import Path
-from typing import List
+from typing import List, Sequence
+
+from app.core.config import env_int
+
+try:
+    # 中文注释: numpy 为可选依赖（不强制安装，保持部署构建轻量）；缺失时走纯 Python 路径，结果一致。
+    import numpy as np  # type: ignore
+except Exception:  # pragma: no cover - 取决于部署环境
+    np = None
 
 
 _MODEL_LOCK = threading.Lock()
+EMBEDDING_DIM = 384
+_TOKEN_RE = re.compile(r"[a-zA-Z0-9]{2,}")
+_MAX_TOKENS = 2000
+
+
+def embed_batch_size() -> int:
+    return env_int("MATCHMAKING_EMBED_BATCH_SIZE", 64)
 
 
 def hash_source_text(text: str) -> str:
@@ -64,6 +79,19 @@ def _load_sentence_transformer(model_name: str):
             except TypeError:
                 return SentenceTransformer(model_name)
 
+@lru_cache(maxsize=65536)
+def _token_bucket(token: str) -> tuple[int, float]:
+    """
+    token -> (维度下标, 符号)。高频 token 重复出现，缓存后不必每次重算 sha256。
+    """
+    h = hashlib.sha256(token.encode("utf-8")).digest()
+    return h[0] % EMBEDDING_DIM, (1.0 if (h[1] % 2 == 0) else -1.0)
+
+
+def _tokenize(text: str) -> List[str]:
+    return _TOKEN_RE.findall((text or "").lower())[:_MAX_TOKENS]
+
+
 def _fallback_embed(text: str) -> List[float]:
     """
     纯 Python 降级 embedding（384 维）。
@@ -72,18 +100,42 @@ def _fallback_embed(text: str) -> List[float]:
     - 目标：让后端在“无 sentence-transformers/torch”的部署环境也能启动并提供基础排序能力。
     - 这不是语义向量，只是基于 token 哈希的稀疏计数向量（L2 normalize），足够用于 MVP 的“可用但不智能”。
     """
-    vec = [0.0] * 384
-    tokens = re.findall(r"[a-zA-Z0-9]{2,}", (text or "").lower())
-    for tok in tokens[:2000]:
-        h = hashlib.sha256(tok.encode("utf-8")).digest()
-        idx = h[0] % 384
-        sign = 1.0 if (h[1] % 2 == 0) else -1.0
+    vec = [0.0] * EMBEDDING_DIM
+    for tok in _tokenize(text):
+        idx, sign = _token_bucket(tok)
         vec[idx] += sign
 
     norm = math.sqrt(sum(v * v for v in vec)) or 1.0
     return [v / norm for v in vec]
 
 
+def _fallback_embed_batch(texts: Sequence[str]) -> List[List[float]]:
+    """
+    批量降级 embedding，与逐条 `_fallback_embed` 结果一致。
+
+    中文注释: 安装了 numpy 时，整批 token 一次性 scatter-add 到 (N, 384) 矩阵并按行归一化。
+    """
+    if np is None:
+        return [_fallback_embed(t) for t in texts]
+
+    rows: List[int] = []
+    cols: List[int] = []
+    signs: List[float] = []
+    for row, text in enumerate(texts):
+        for tok in _tokenize(text):
+            idx, sign = _token_bucket(tok)
+            rows.append(row)
+            cols.append(idx)
+            signs.append(sign)
+
+    matrix = np.zeros((len(texts), EMBEDDING_DIM), dtype=np.float64)
+    if rows:
+        np.add.at(matrix, (np.asarray(rows), np.asarray(cols)), np.asarray(signs))
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0.0] = 1.0
+    return (matrix / norms).tolist()
+
+
 def embed_text(text: str, model_name: str) -> List[float]:
     """
     将文本向量化为 384 维 embedding。
@@ -101,3 +153,28 @@ def embed_text(text: str, model_name: str) -> List[float]:
         # 中文注释: 降级（不影响主流程）
         print(f"[matchmaking] embed fallback: {e}")
         return _fallback_embed(text)
+
+
+def embed_texts(texts: Sequence[str], model_name: str, *, batch_size: int | None = None) -> List[List[float]]:
+    """
+    批量向量化（顺序与输入一致）。
+
+    中文注释:
+    - 使用 sentence-transformers 自带的 batch 推理，一次 encode 处理整批文本，避免逐条调用模型；
+    - 模型不可用时整批走降级 embedding。
+    """
+    items = [t or "" for t in texts]
+    if not items:
+        return []
+    try:
+        model = _load_sentence_transformer(model_name)
+        vectors = model.encode(
+            items,
+            batch_size=batch_size or embed_batch_size(),
+            normalize_embeddings=True,
+            show_progress_bar=False,
+        )
+        return [v.tolist() for v in vectors]
+    except Exception as e:
+        print(f"[matchmaking] embed fallback: {e}")
+        return _fallback_embed_batch(items)
@@ -0,0 +1,196 @@
+"""
+上传稿件解析结果的内容寻址缓存（本地磁盘 + LRU 淘汰）。
+
+中文注释:
+- 作者经常重复上传同一份 PDF（投稿向导重试、修回时首页未变），每次都要重跑 pdfplumber + 元数据提取（可能调用 Gemini）。
+- key = SHA-256(文件字节) + 解析配置（PDF_PARSE_MAX_PAGES / PDF_PARSE_MAX_CHARS / layout 覆盖 / parser_mode / 元数据策略），
+  配置变化后旧条目自然不再命中。
+- value 为 JSON：text、layout_lines（PdfLayoutLine 列表）与 metadata；元数据超时/Gemini 失败的结果不缓存 metadata，
+  下次命中只复用文本，仍会重新跑元数据提取。
+- 容量上限 PARSE_CACHE_MAX_MB，按最近访问时间（文件 mtime）淘汰；多个 worker 共享同一目录时也能正确淘汰。
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import tempfile
+from threading import Lock
+from typing import Any, Optional
+
+from app.core.config import env_int, is_test_env
+
+logger = logging.getLogger("scholarflow.parse_cache")
+
+# 中文注释: 缓存格式版本；解析逻辑有不兼容调整时递增即可整体失效。
+CACHE_FORMAT_VERSION = "1"
+
+
+def is_parse_cache_enabled() -> bool:
+    raw = os.environ.get("PARSE_CACHE_ENABLED")
+    if raw is None:
+        # 中文注释: 测试默认关闭，避免不同用例上传相同字节时互相命中。
+        return not is_test_env()
+    return str(raw).strip().lower() in {"1", "true", "yes", "on"}
+
+
+def parse_cache_key(
+    content_sha256: str,
+    *,
+    parser_mode: str,
+    max_pages: int,
+    max_chars: int,
+    layout_max_pages: Optional[int],
+    metadata_strategy: str,
+) -> str:
+    raw = "|".join(
+        [
+            CACHE_FORMAT_VERSION,
+            str(content_sha256),
+            str(parser_mode),
+            str(max_pages),
+            str(max_chars),
+            "default" if layout_max_pages is None else str(layout_max_pages),
+            str(metadata_strategy),
+        ]
+    )
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class ParseCache:
+    """
+    磁盘 JSON 存储（线程安全；跨进程写入使用原子 rename）。
+    """
+
+    def __init__(self, *, root_dir: Optional[str] = None, max_bytes: Optional[int] = None) -> None:
+        self.root_dir = root_dir or (
+            (os.environ.get("PARSE_CACHE_DIR") or "").strip()
+            or os.path.join(tempfile.gettempdir(), "scholarflow-parse-cache")
+        )
+        self.max_bytes = max_bytes or env_int("PARSE_CACHE_MAX_MB", 256) * 1024 * 1024
+        self._lock = Lock()
+        self._approx_bytes: Optional[int] = None
+
+    def _path(self, key: str) -> str:
+        # 中文注释: 两级目录，避免单目录文件过多。
+        return os.path.join(self.root_dir, key[:2], f"{key}.json")
+
+    def get(self, key: str) -> Optional[dict[str, Any]]:
+        path = self._path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as fh:
+                payload = json.load(fh)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning("[ParseCache] drop unreadable entry %s: %s", key, e)
+            self._remove(path)
+            return None
+        try:
+            # 中文注释: 以 mtime 作为最近访问时间，供 LRU 淘汰。
+            os.utime(path, None)
+        except OSError:
+            pass
+        return payload if isinstance(payload, dict) else None
+
+    def put(self, key: str, payload: dict[str, Any]) -> None:
+        path = self._path(key)
+        data = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+            try:
+                with os.fdopen(fd, "wb") as fh:
+                    fh.write(data)
+                os.replace(tmp_path, path)
+            except Exception:
+                self._remove(tmp_path)
+                raise
+        except Exception as e:
+            logger.warning("[ParseCache] write failed %s: %s", key, e)
+            return
+        with self._lock:
+            if self._approx_bytes is None:
+                self._approx_bytes = self._scan_total_bytes()
+            else:
+                self._approx_bytes += len(data)
+            over = self._approx_bytes > self.max_bytes
+        if over:
+            self.evict()
+
+    def _entries(self) -> list[tuple[float, int, str]]:
+        out: list[tuple[float, int, str]] = []
+        try:
+            shards = os.listdir(self.root_dir)
+        except FileNotFoundError:
+            return out
+        for shard in shards:
+            shard_dir = os.path.join(self.root_dir, shard)
+            try:
+                names = os.listdir(shard_dir)
+            except (NotADirectoryError, FileNotFoundError):
+                continue
+            for name in names:
+                if not name.endswith(".json"):
+                    continue
+                path = os.path.join(shard_dir, name)
+                try:
+                    st = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                out.append((st.st_mtime, st.st_size, path))
+        return out
+
+    def _scan_total_bytes(self) -> int:
+        return sum(size for _, size, _ in self._entries())
+
+    def evict(self) -> int:
+        """
+        按最近访问时间淘汰，直到总量降到上限的 90%。返回删除条目数。
+        """
+        with self._lock:
+            entries = sorted(self._entries())
+            total = sum(size for _, size, _ in entries)
+            target = int(self.max_bytes * 0.9)
+            removed = 0
+            for _, size, path in entries:
+                if total <= target:
+                    break
+                if self._remove(path):
+                    total -= size
+                    removed += 1
+            self._approx_bytes = total
+            return removed
+
+    @staticmethod
+    def _remove(path: str) -> bool:
+        try:
+            os.remove(path)
+            return True
+        except OSError:
+            return False
+
+    def stats(self) -> dict[str, Any]:
+        entries = self._entries()
+        return {
+            "root_dir": self.root_dir,
+            "entries": len(entries),
+            "bytes": sum(size for _, size, _ in entries),
+            "max_bytes": self.max_bytes,
+        }
+
+
+_cache_lock = Lock()
+_cache: Optional[ParseCache] = None
+
+
+def get_parse_cache() -> ParseCache:
+    global _cache
+    if _cache is not None:
+        return _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = ParseCache()
+        return _cache
@@ -0,0 +1,350 @@
+"""
+PDF / DOCX 解析专用进程池。
+
+中文注释:
+- 旧实现 `asyncio.wait_for(asyncio.to_thread(...))` 超时后线程仍会把 pdfplumber 跑完，
+  大文件突发时会占满默认 executor，拖慢所有 `to_thread` 调用方。
+- 这里改为固定数量的子进程（PARSE_POOL_WORKERS），每个任务有硬超时：超时直接终止该子进程并补一个新的。
+- 排队深度超过 PARSE_POOL_MAX_QUEUE 时立即抛 ParsePoolBusy，由调用方返回“稍后解析”，不再堆积。
+- 分发/等待在专用线程池内完成，不占用默认 executor。
+- 无法 pickle 的可调用对象（例如测试里 patch 的 Mock）退化为专用线程内执行（有超时但无法强杀）。
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import multiprocessing
+import os
+import pickle
+import queue
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from threading import Lock
+from time import monotonic
+from typing import Any, Callable, Optional
+
+from app.core.config import env_int
+
+logger = logging.getLogger("scholarflow.parse_pool")
+
+
+class ParsePoolBusy(RuntimeError):
+    """排队已满，调用方应提示稍后重试/手动填写。"""
+
+
+class ParseJobError(RuntimeError):
+    """子进程异常退出或任务抛错。"""
+
+
+class ParseTimeout(ParseJobError):
+    """任务超时（子进程已被终止）。"""
+
+
+def _worker_main(conn) -> None:
+    while True:
+        try:
+            msg = conn.recv()
+        except (EOFError, OSError):
+            return
+        if msg is None:
+            return
+        fn, args, kwargs = msg
+        try:
+            conn.send(("ok", fn(*args, **kwargs)))
+        except BaseException as e:  # noqa: BLE001 - 子进程内兜底，结果回传父进程
+            try:
+                conn.send(("err", f"{type(e).__name__}: {e}"))
+            except Exception:
+                return
+
+
+class _Worker:
+    def __init__(self, ctx) -> None:
+        parent_conn, child_conn = ctx.Pipe()
+        self.conn = parent_conn
+        self.process = ctx.Process(target=_worker_main, args=(child_conn,), daemon=True)
+        self.process.start()
+        child_conn.close()
+        self.jobs = 0
+
+    def alive(self) -> bool:
+        return self.process.is_alive()
+
+    def kill(self) -> None:
+        try:
+            self.process.terminate()
+            self.process.join(1.0)
+            if self.process.is_alive():
+                self.process.kill()
+                self.process.join(1.0)
+        except Exception:
+            pass
+        try:
+            self.conn.close()
+        except Exception:
+            pass
+
+    def stop(self) -> None:
+        try:
+            self.conn.send(None)
+            self.process.join(1.0)
+        except Exception:
+            pass
+        if self.process.is_alive():
+            self.kill()
+        else:
+            try:
+                self.conn.close()
+            except Exception:
+                pass
+
+
+def _is_picklable(fn: Callable[..., Any]) -> bool:
+    try:
+        pickle.dumps(fn)
+    except Exception:
+        return False
+    return True
+
+
+def _percentile(values: list[float], pct: float) -> Optional[float]:
+    if not values:
+        return None
+    ordered = sorted(values)
+    idx = min(len(ordered) - 1, max(0, int(round(pct / 100.0 * (len(ordered) - 1)))))
+    return ordered[idx]
+
+
+class ParsePool:
+    """
+    固定大小的解析进程池（线程安全）。
+
+    - workers：子进程数量（也是同时执行的任务上限）；
+    - max_queue：允许排队等待的任务数（不含正在执行的）；
+    - max_jobs_per_worker：单个子进程最多执行多少个任务后回收（防止解析库内存泄漏累积）。
+    """
+
+    def __init__(
+        self,
+        *,
+        workers: Optional[int] = None,
+        max_queue: Optional[int] = None,
+        max_jobs_per_worker: Optional[int] = None,
+        start_method: Optional[str] = None,
+    ) -> None:
+        self.workers = workers or env_int("PARSE_POOL_WORKERS", min(2, os.cpu_count() or 1))
+        self.max_queue = (
+            max_queue if max_queue is not None else env_int("PARSE_POOL_MAX_QUEUE", 8, minimum=0)
+        )
+        self.max_jobs_per_worker = max_jobs_per_worker or env_int("PARSE_POOL_MAX_JOBS_PER_WORKER", 200)
+        # 中文注释: 父进程有多线程，默认 spawn，避免 fork 继承锁状态。
+        self._ctx = multiprocessing.get_context(
+            start_method or (os.environ.get("PARSE_POOL_START_METHOD") or "spawn").strip()
+        )
+        self._lock = Lock()
+        self._dispatcher: Optional[ThreadPoolExecutor] = None
+        self._idle: "queue.Queue[Optional[_Worker]]" = queue.Queue()
+        for _ in range(self.workers):
+            # 中文注释: None 占位，首次使用时才真正启动子进程。
+            self._idle.put(None)
+        self._spawned: set[_Worker] = set()
+        self._pending = 0
+        self._running = 0
+        self._durations_ms: deque[float] = deque(maxlen=512)
+        self.completed_total = 0
+        self.timeouts_total = 0
+        self.kills_total = 0
+        self.errors_total = 0
+        self.rejected_total = 0
+
+    def _get_dispatcher(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._dispatcher is None:
+                self._dispatcher = ThreadPoolExecutor(
+                    max_workers=self.workers, thread_name_prefix="sf-parse"
+                )
+            return self._dispatcher
+
+    def _spawn(self) -> _Worker:
+        worker = _Worker(self._ctx)
+        with self._lock:
+            self._spawned.add(worker)
+        return worker
+
+    def _discard(self, worker: _Worker, *, killed: bool) -> None:
+        if killed:
+            worker.kill()
+        else:
+            worker.stop()
+        with self._lock:
+            self._spawned.discard(worker)
+            if killed:
+                self.kills_total += 1
+
+    def _record(self, started: float, *, ok: bool) -> None:
+        with self._lock:
+            self._durations_ms.append((monotonic() - started) * 1000.0)
+            if ok:
+                self.completed_total += 1
+            else:
+                self.errors_total += 1
+
+    def _run_in_process(self, fn, args, kwargs, timeout_sec: float) -> Any:
+        worker = self._idle.get()
+        with self._lock:
+            self._running += 1
+        started = monotonic()
+        try:
+            if worker is None or not worker.alive():
+                if worker is not None:
+                    self._discard(worker, killed=True)
+                worker = self._spawn()
+            try:
+                worker.conn.send((fn, args, kwargs))
+                ready = worker.conn.poll(timeout_sec)
+            except (EOFError, OSError) as e:
+                self._discard(worker, killed=True)
+                worker = None
+                self._record(started, ok=False)
+                raise ParseJobError(f"parse worker died: {e}") from e
+            if not ready:
+                # 中文注释: 硬超时——直接终止子进程，真正释放 CPU，而不是放任其跑完。
+                self._discard(worker, killed=True)
+                worker = None
+                with self._lock:
+                    self.timeouts_total += 1
+                self._record(started, ok=False)
+                raise ParseTimeout(f"parse exceeded {timeout_sec:.1f}s")
+            try:
+                status, payload = worker.conn.recv()
+            except (EOFError, OSError) as e:
+                self._discard(worker, killed=True)
+                worker = None
+                self._record(started, ok=False)
+                raise ParseJobError(f"parse worker died: {e}") from e
+            worker.jobs += 1
+            if worker.jobs >= self.max_jobs_per_worker:
+                self._discard(worker, killed=False)
+                worker = None
+            if status != "ok":
+                self._record(started, ok=False)
+                raise ParseJobError(str(payload))
+            self._record(started, ok=True)
+            return payload
+        finally:
+            with self._lock:
+                self._running -= 1
+            self._idle.put(worker)
+
+    def _run_inline(self, fn, args, kwargs) -> Any:
+        with self._lock:
+            self._running += 1
+        started = monotonic()
+        try:
+            result = fn(*args, **kwargs)
+        except Exception:
+            self._record(started, ok=False)
+            raise
+        finally:
+            with self._lock:
+                self._running -= 1
+        self._record(started, ok=True)
+        return result
+
+    async def run(self, fn: Callable[..., Any], *args: Any, timeout_sec: float, **kwargs: Any) -> Any:
+        """
+        在解析池中执行 fn(*args, **kwargs)。
+
+        - 排队已满：ParsePoolBusy；
+        - 超时：ParseTimeout（进程模式下子进程已被终止）；
+        - 子进程崩溃/任务异常：ParseJobError。
+        """
+        with self._lock:
+            if self._pending >= self.workers + self.max_queue:
+                self.rejected_total += 1
+                raise ParsePoolBusy("parse queue is full")
+            self._pending += 1
+        loop = asyncio.get_running_loop()
+        dispatcher = self._get_dispatcher()
+        try:
+            if _is_picklable(fn):
+                return await loop.run_in_executor(
+                    dispatcher, partial(self._run_in_process, fn, args, kwargs, timeout_sec)
+                )
+            try:
+                return await asyncio.wait_for(
+                    loop.run_in_executor(dispatcher, partial(self._run_inline, fn, args, kwargs)),
+                    timeout=timeout_sec,
+                )
+            except asyncio.TimeoutError as e:
+                with self._lock:
+                    self.timeouts_total += 1
+                raise ParseTimeout(f"parse exceeded {timeout_sec:.1f}s") from e
+        finally:
+            with self._lock:
+                self._pending -= 1
+
+    def metrics(self) -> dict[str, Any]:
+        with self._lock:
+            durations = list(self._durations_ms)
+            alive = sum(1 for w in self._spawned if w.alive())
+            return {
+                "workers": self.workers,
+                "alive_workers": alive,
+                "max_queue": self.max_queue,
+                "running": self._running,
+                "queue_depth": max(0, self._pending - self._running),
+                "completed_total": self.completed_total,
+                "errors_total": self.errors_total,
+                "timeouts_total": self.timeouts_total,
+                "kills_total": self.kills_total,
+                "rejected_total": self.rejected_total,
+                "p50_ms": _percentile(durations, 50),
+                "p95_ms": _percentile(durations, 95),
+            }
+
+    def shutdown(self) -> None:
+        with self._lock:
+            workers = list(self._spawned)
+            self._spawned.clear()
+            dispatcher = self._dispatcher
+            self._dispatcher = None
+        for worker in workers:
+            worker.stop()
+        if dispatcher is not None:
+            dispatcher.shutdown(wait=False, cancel_futures=True)
+
+
+_pool_lock = Lock()
+_pool: Optional[ParsePool] = None
+
+
+def get_parse_pool() -> ParsePool:
+    global _pool
+    if _pool is not None:
+        return _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ParsePool()
+            logger.info(
+                "[ParsePool] init workers=%s max_queue=%s", _pool.workers, _pool.max_queue
+            )
+        return _pool
+
+
+def get_parse_pool_metrics() -> dict[str, Any]:
+    pool = _pool
+    if pool is None:
+        return {"initialized": False}
+    return {"initialized": True, **pool.metrics()}
+
+
+def shutdown_parse_pool() -> None:
+    global _pool
+    with _pool_lock:
+        pool = _pool
+        _pool = None
+    if pool is not None:
+        pool.shutdown()
@@ -0,0 +1,13 @@
+from __future__ import annotations
+
+from typing import Any
+
+
+def postgrest_literal(value: Any) -> str:
+    """
+    把值转成 PostgREST or/and 逻辑树里的字面量。
+
+    中文注释: 时间戳/小数/uuid 含 ':' '.' ',' 等保留字符，统一加双引号，并转义反斜杠与双引号。
+    """
+    text = str(value).replace("\\", "\\\\").replace('"', '\\"')
+    return f'"{text}"'
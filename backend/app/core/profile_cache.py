@@ -0,0 +1,112 @@
+"""
+user_profiles / 角色 / journal scope 的两级缓存。
+
+中文注释:
+- L1：请求级 memo（ContextVar），同一请求内 get_current_profile / _get_user_roles /
+  get_user_scope_journal_ids 只读一次；
+- L2：进程级短 TTL 缓存（PROFILE_CACHE_TTL_SEC，默认 30s），跨请求复用；
+- 角色变更（UserManagementService.update_user_role）与 journal scope 增删接口需调用
+  `invalidate_user()`，保证权限变更立即生效（仅当前 worker 进程，其它进程最多滞后一个 TTL）。
+"""
+
+from __future__ import annotations
+
+import os
+from contextvars import ContextVar
+from typing import Any, Iterable, Optional
+
+from app.core.config import is_test_env
+from app.core.short_ttl_cache import ShortTTLCache
+
+_MISSING = object()
+
+_request_memo: ContextVar[Optional[dict[str, Any]]] = ContextVar("sf_profile_request_memo", default=None)
+_process_cache = ShortTTLCache[Any](max_entries=4096)
+
+
+def profile_cache_ttl_sec() -> float:
+    raw = os.environ.get("PROFILE_CACHE_TTL_SEC")
+    if raw is None:
+        # 中文注释: 测试环境默认关闭进程级缓存，避免用例之间通过 monkeypatch 的假数据串味。
+        return 0.0 if is_test_env() else 30.0
+    try:
+        return max(0.0, float(str(raw).strip()))
+    except Exception:
+        return 30.0
+
+
+def begin_request_scope() -> dict[str, Any]:
+    """
+    确保当前请求存在 L1 memo（幂等）。应在请求链路最早的 async 依赖中调用。
+    """
+    memo = _request_memo.get()
+    if memo is None:
+        memo = {}
+        _request_memo.set(memo)
+    return memo
+
+
+def profile_key(user_id: str) -> str:
+    return f"profile:{user_id}"
+
+
+def roles_key(user_id: str) -> str:
+    return f"roles:{user_id}"
+
+
+def scope_key(user_id: str, roles: Iterable[str]) -> str:
+    return f"scope:{user_id}:{','.join(sorted({str(r) for r in roles}))}"
+
+
+def lookup(key: str) -> Any:
+    """
+    依次查 L1 / L2，未命中返回哨兵值（用 is_missing 判断）。
+    """
+    memo = _request_memo.get()
+    if memo is not None and key in memo:
+        return memo[key]
+    if profile_cache_ttl_sec() > 0:
+        value = _process_cache.get(key)
+        if value is not None:
+            if memo is not None:
+                memo[key] = value
+            return value
+    return _MISSING
+
+
+def store(key: str, value: Any) -> None:
+    if value is None:
+        return
+    memo = _request_memo.get()
+    if memo is not None:
+        memo[key] = value
+    ttl = profile_cache_ttl_sec()
+    if ttl > 0:
+        _process_cache.set(key, value, ttl_sec=ttl)
+
+
+def is_missing(value: Any) -> bool:
+    return value is _MISSING
+
+
+def invalidate_user(user_id: str) -> None:
+    """
+    失效某用户的 profile / roles / journal scope 缓存（L1 + L2）。
+    """
+    uid = str(user_id or "").strip()
+    if not uid:
+        return
+    _process_cache.delete(profile_key(uid))
+    _process_cache.delete(roles_key(uid))
+    _process_cache.delete_prefix(f"scope:{uid}:")
+    memo = _request_memo.get()
+    if memo is not None:
+        for key in [k for k in memo if k in {profile_key(uid), roles_key(uid)} or k.startswith(f"scope:{uid}:")]:
+            memo.pop(key, None)
+
+
+def clear() -> None:
+    _process_cache.clear()
+    memo = _request_memo.get()
+    if memo is not None:
+        memo.clear()
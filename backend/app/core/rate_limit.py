@@ -1,182 +1,137 @@
 from __future__ import annotations
 
 import logging
-import os
-import time
-from dataclasses import dataclass
-from threading import Lock
+from typing import Optional
 
-from fastapi import Request
 from fastapi.responses import JSONResponse
-from starlette.middleware.base import BaseHTTPMiddleware
-
-logger = logging.getLogger("scholarflow.rate_limit")
-
-
-def _env_bool(name: str, default: bool) -> bool:
-    raw = os.environ.get(name)
-    if raw is None:
-        return default
-    value = str(raw).strip().lower()
-    return value in {"1", "true", "yes", "on"}
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
+from app.core.config import env_bool, env_int, is_test_env
+from app.core.jwks import verified_token_subject
+from app.core.rate_limit_backends import RateLimitPolicy, RateLimiter, build_rate_limiter
 
-def _env_int(name: str, default: int, *, minimum: int = 1) -> int:
-    raw = os.environ.get(name)
-    if raw is None:
-        return default
-    try:
-        value = int(str(raw).strip())
-    except Exception:
-        return default
-    return max(value, minimum)
-
-
-def _is_test_env() -> bool:
-    if os.environ.get("PYTEST_CURRENT_TEST"):
-        return True
-    mode = (
-        os.environ.get("GO_ENV")
-        or os.environ.get("ENVIRONMENT")
-        or os.environ.get("APP_ENV")
-        or ""
-    ).strip().lower()
-    return mode in {"test", "testing"}
+logger = logging.getLogger("scholarflow.rate_limit")
 
 
 def is_rate_limit_enabled() -> bool:
-    if _is_test_env():
+    if is_test_env():
         return False
-    return _env_bool("RATE_LIMIT_ENABLED", True)
-
+    return env_bool("RATE_LIMIT_ENABLED", True)
 
-@dataclass(frozen=True)
-class RateLimitPolicy:
-    key: str
-    max_requests: int
-    window_sec: int
 
-
-class _InMemoryRateLimiter:
-    def __init__(self) -> None:
-        self._entries: dict[str, tuple[int, float]] = {}
-        self._lock = Lock()
-        self._last_gc_at = time.monotonic()
-
-    def _gc_if_needed(self, now: float) -> None:
-        # 避免高并发下字典无限增长；每 60 秒清理一次过期 bucket。
-        if now - self._last_gc_at < 60:
-            return
-        self._last_gc_at = now
-        expired = [k for k, (_count, reset_at) in self._entries.items() if reset_at <= now]
-        for k in expired:
-            self._entries.pop(k, None)
-
-    def hit(self, *, bucket: str, policy: RateLimitPolicy) -> tuple[bool, int, int]:
-        now = time.monotonic()
-        with self._lock:
-            self._gc_if_needed(now)
-            count, reset_at = self._entries.get(bucket, (0, now + policy.window_sec))
-            if reset_at <= now:
-                count = 0
-                reset_at = now + policy.window_sec
-
-            count += 1
-            self._entries[bucket] = (count, reset_at)
-
-            allowed = count <= policy.max_requests
-            remaining = max(policy.max_requests - count, 0)
-            retry_after = max(int(reset_at - now), 0)
-            return allowed, remaining, retry_after
-
-
-class RateLimitMiddleware(BaseHTTPMiddleware):
+class RateLimitMiddleware:
     """
-    轻量内存限流中间件（按 IP + endpoint bucket）。
+    限流中间件（按 IP + endpoint bucket；带 Bearer token 时再叠加按用户 sub 的 bucket）。
 
     中文注释:
     - 目标是给 Auth/MagicLink/Token 端点提供基础防刷保护；
     - 默认在非测试环境开启，可用环境变量关闭；
-    - 多实例部署时为“实例内限流”，不等价于全局分布式限流。
+    - 后端由 RATE_LIMIT_BACKEND 选择：memory 为实例内 GCRA；postgres 为多实例共享（后台批量同步，热路径不访问数据库）。
+    - 用户 bucket 只认本地已验签的 token（HS256 密钥校验 / JWKS 验签缓存），否则只按 IP 计数：
+      伪造他人 sub 既不能消耗对方额度，也绕不过 IP 限额；同一账号换 IP 共享一份用户额度（RATE_LIMIT_USER_BUCKETS=0 可关闭）。
+    - 先判用户 bucket 再判 IP bucket：被用户额度拒绝的请求不再占用所在 IP（共享出口 NAT）的额度。
+    - 纯 ASGI 实现：限流头在 http.response.start 时写入，响应体原样透传，不缓冲流式响应。
     """
 
-    def __init__(self, app) -> None:  # type: ignore[override]
-        super().__init__(app)
-        self._limiter = _InMemoryRateLimiter()
+    def __init__(self, app: ASGIApp, *, limiter: RateLimiter | None = None) -> None:
+        self.app = app
+        self._limiter = limiter or build_rate_limiter()
+        self._user_buckets = env_bool("RATE_LIMIT_USER_BUCKETS", True)
         self._global_policy = RateLimitPolicy(
             key="global",
-            max_requests=_env_int("RATE_LIMIT_MAX_REQUESTS", 600),
-            window_sec=_env_int("RATE_LIMIT_WINDOW_SEC", 60),
+            max_requests=env_int("RATE_LIMIT_MAX_REQUESTS", 600),
+            window_sec=env_int("RATE_LIMIT_WINDOW_SEC", 60),
         )
         self._path_policies: list[tuple[str, RateLimitPolicy]] = [
             (
                 "/api/v1/auth/dev-login",
                 RateLimitPolicy(
                     key="auth_dev_login",
-                    max_requests=_env_int("RATE_LIMIT_DEV_LOGIN_MAX", 12),
-                    window_sec=_env_int("RATE_LIMIT_DEV_LOGIN_WINDOW_SEC", 60),
+                    max_requests=env_int("RATE_LIMIT_DEV_LOGIN_MAX", 12),
+                    window_sec=env_int("RATE_LIMIT_DEV_LOGIN_WINDOW_SEC", 60),
                 ),
             ),
             (
                 "/api/v1/auth/magic-link/verify",
                 RateLimitPolicy(
                     key="auth_magic_verify",
-                    max_requests=_env_int("RATE_LIMIT_MAGIC_VERIFY_MAX", 60),
-                    window_sec=_env_int("RATE_LIMIT_MAGIC_VERIFY_WINDOW_SEC", 60),
+                    max_requests=env_int("RATE_LIMIT_MAGIC_VERIFY_MAX", 60),
+                    window_sec=env_int("RATE_LIMIT_MAGIC_VERIFY_WINDOW_SEC", 60),
                 ),
             ),
             (
                 "/api/v1/reviews/token/",
                 RateLimitPolicy(
                     key="reviews_token",
-                    max_requests=_env_int("RATE_LIMIT_REVIEWS_TOKEN_MAX", 120),
-                    window_sec=_env_int("RATE_LIMIT_REVIEWS_TOKEN_WINDOW_SEC", 60),
+                    max_requests=env_int("RATE_LIMIT_REVIEWS_TOKEN_MAX", 120),
+                    window_sec=env_int("RATE_LIMIT_REVIEWS_TOKEN_WINDOW_SEC", 60),
                 ),
             ),
             (
                 "/api/v1/reviews/magic/assignments/",
                 RateLimitPolicy(
                     key="reviews_magic",
-                    max_requests=_env_int("RATE_LIMIT_REVIEWS_MAGIC_MAX", 180),
-                    window_sec=_env_int("RATE_LIMIT_REVIEWS_MAGIC_WINDOW_SEC", 60),
+                    max_requests=env_int("RATE_LIMIT_REVIEWS_MAGIC_MAX", 180),
+                    window_sec=env_int("RATE_LIMIT_REVIEWS_MAGIC_WINDOW_SEC", 60),
                 ),
             ),
         ]
 
     @staticmethod
-    def _client_ip(request: Request) -> str:
-        forwarded = (request.headers.get("x-forwarded-for") or "").strip()
+    def _client_ip(scope: Scope) -> str:
+        forwarded = (Headers(scope=scope).get("x-forwarded-for") or "").strip()
         if forwarded:
             return forwarded.split(",")[0].strip() or "unknown"
-        if request.client and request.client.host:
-            return str(request.client.host)
+        client = scope.get("client")
+        if client and client[0]:
+            return str(client[0])
         return "unknown"
 
+    @staticmethod
+    def _token_subject(scope: Scope) -> Optional[str]:
+        auth = Headers(scope=scope).get("authorization") or ""
+        if not auth.startswith("Bearer "):
+            return None
+        token = auth[7:].strip()
+        if token.count(".") != 2:
+            return None
+        return verified_token_subject(token)
+
     def _policy_for_path(self, path: str) -> RateLimitPolicy:
         for prefix, policy in self._path_policies:
             if path.startswith(prefix):
                 return policy
         return self._global_policy
 
-    async def dispatch(self, request: Request, call_next):  # type: ignore[override]
-        if request.method.upper() == "OPTIONS":
-            return await call_next(request)
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or str(scope.get("method") or "").upper() == "OPTIONS":
+            await self.app(scope, receive, send)
+            return
 
-        path = request.url.path
+        path = scope["path"]
         policy = self._policy_for_path(path)
-        client_ip = self._client_ip(request)
-        bucket = f"{policy.key}:{client_ip}"
-
-        allowed, remaining, retry_after = self._limiter.hit(bucket=bucket, policy=policy)
+        client_ip = self._client_ip(scope)
+        subject = self._token_subject(scope) if self._user_buckets else None
+
+        allowed, remaining = True, policy.max_requests
+        retry_after = 0
+        if subject:
+            bucket = f"{policy.key}:user:{subject}"
+            allowed, remaining, retry_after = self._limiter.hit(bucket=bucket, policy=policy)
+        if allowed:
+            bucket = f"{policy.key}:{client_ip}"
+            allowed, ip_remaining, retry_after = self._limiter.hit(bucket=bucket, policy=policy)
+            remaining = min(remaining, ip_remaining)
         if not allowed:
             logger.warning(
                 "Rate limit exceeded: path=%s ip=%s bucket=%s retry_after=%ss",
                 path,
                 client_ip,
-                policy.key,
+                bucket,
                 retry_after,
             )
-            return JSONResponse(
+            response = JSONResponse(
                 status_code=429,
                 content={
                     "detail": "Too many requests",
@@ -190,10 +145,15 @@ class RateLimitMiddleware(BaseHTTPMiddleware):
                     "X-RateLimit-Window": str(policy.window_sec),
                 },
             )
+            await response(scope, receive, send)
+            return
 
-        response = await call_next(request)
-        response.headers["X-RateLimit-Limit"] = str(policy.max_requests)
-        response.headers["X-RateLimit-Remaining"] = str(remaining)
-        response.headers["X-RateLimit-Window"] = str(policy.window_sec)
-        return response
+        async def send_with_headers(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                headers["X-RateLimit-Limit"] = str(policy.max_requests)
+                headers["X-RateLimit-Remaining"] = str(remaining)
+                headers["X-RateLimit-Window"] = str(policy.window_sec)
+            await send(message)
 
+        await self.app(scope, receive, send_with_headers)
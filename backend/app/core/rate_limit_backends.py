@@ -0,0 +1,257 @@
+from __future__ import annotations
+
+import logging
+import math
+import os
+import socket
+import threading
+import time
+from dataclasses import dataclass
+from threading import Lock
+from typing import Any, Optional, Protocol
+from uuid import uuid4
+
+logger = logging.getLogger("scholarflow.rate_limit")
+
+_SYNC_RPC = "rate_limit_sync"
+
+_shared_limiters: list["SharedStoreRateLimiter"] = []
+_shared_limiters_lock = Lock()
+
+
+@dataclass(frozen=True)
+class RateLimitPolicy:
+    key: str
+    max_requests: int
+    window_sec: int
+
+    @property
+    def emission_interval(self) -> float:
+        # 中文注释: GCRA 的“每个请求占用的时间”；窗口内最多 max_requests 个请求，允许一次性突发用满。
+        return self.window_sec / max(self.max_requests, 1)
+
+
+class RateLimiter(Protocol):
+    """
+    限流后端接口：hit 返回 (allowed, remaining, retry_after_sec)。
+
+    中文注释: 实现必须是线程安全、非阻塞的（中间件在事件循环内同步调用），不允许在 hit 内访问网络。
+    """
+
+    def hit(self, *, bucket: str, policy: RateLimitPolicy) -> tuple[bool, int, int]: ...
+
+    def close(self) -> None: ...
+
+
+class GCRARateLimiter:
+    """
+    进程内 GCRA（等价于 token bucket）限流。
+
+    中文注释:
+    - 每个 bucket 只存一个 TAT（theoretical arrival time，monotonic 秒）：请求到达时 TAT 推进一个 emission_interval，
+      TAT 超过 now + window 即拒绝。相比旧的固定窗口计数，不会在窗口边界出现 2 倍突发。
+    - 被拒绝的请求不推进 TAT，持续刷接口也不会把自己锁得更久。
+    """
+
+    def __init__(self, *, gc_interval_sec: float = 60.0) -> None:
+        self._tats: dict[str, float] = {}
+        self._lock = Lock()
+        self._gc_interval_sec = gc_interval_sec
+        self._last_gc_at = time.monotonic()
+
+    def _gc_if_needed(self, now: float) -> None:
+        # 避免高并发下字典无限增长；TAT 已落后于当前时间的 bucket 与“从未访问”等价，直接清理。
+        if now - self._last_gc_at < self._gc_interval_sec:
+            return
+        self._last_gc_at = now
+        expired = [k for k, tat in self._tats.items() if tat <= now]
+        for k in expired:
+            self._tats.pop(k, None)
+
+    def _advance(self, bucket: str, policy: RateLimitPolicy, now: float, *, share: int = 1) -> tuple[bool, int, int]:
+        # 中文注释: share>1 表示有 share 个实例同时在消耗该 bucket，本实例按 1/share 的速率放行。
+        interval = policy.emission_interval
+        tat = max(self._tats.get(bucket, now), now)
+        new_tat = tat + interval * share
+        allow_at = new_tat - policy.window_sec
+        if allow_at > now:
+            return False, 0, max(math.ceil(allow_at - now), 1)
+        self._tats[bucket] = new_tat
+        remaining = int((policy.window_sec - (new_tat - now)) / interval + 1e-9)
+        return True, max(remaining, 0), 0
+
+    def hit(self, *, bucket: str, policy: RateLimitPolicy) -> tuple[bool, int, int]:
+        now = time.monotonic()
+        with self._lock:
+            self._gc_if_needed(now)
+            return self._advance(bucket, policy, now)
+
+    def close(self) -> None:
+        return None
+
+
+class SharedStoreRateLimiter(GCRARateLimiter):
+    """
+    多实例共享限流：本地 GCRA 判定 + 后台批量同步到 Postgres（UNLOGGED 表 rate_limit_buckets）。
+
+    中文注释:
+    - 热路径只做本地判定并累加 pending 计数，不发任何数据库请求。
+    - 后台线程每 sync_interval_sec 把各 bucket 的新增请求数一次性提交给 rate_limit_sync RPC，
+      数据库推进全局 TAT 后返回“全局 TAT 领先当前时间多少秒”以及窗口内活跃的实例数，本地据此把自己的 TAT 抬到全局水位。
+    - 有 k 个实例同时消耗同一 bucket 时，各实例按 1/k 的速率本地放行：否则额度恢复的瞬间所有实例会基于同一份
+      过期水位一起放行，饱和时合计速率接近 k 倍。
+    - 超发上限约为首次同步前各实例各自放行的突发量，稳态速率与单实例一致。
+    - RPC 缺失/失败时只记录日志并退化为实例内限流，不影响请求处理。
+    """
+
+    def __init__(
+        self,
+        client: Any,
+        *,
+        sync_interval_sec: float = 1.0,
+        max_batch: int = 500,
+        start_thread: bool = True,
+    ) -> None:
+        super().__init__()
+        self._client = client
+        self._sync_interval_sec = sync_interval_sec
+        self._max_batch = max_batch
+        self._pending: dict[str, tuple[int, RateLimitPolicy]] = {}
+        self._shares: dict[str, int] = {}
+        self.instance_id = f"{socket.gethostname()}-{os.getpid()}-{uuid4().hex[:6]}"
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._rpc_disabled = False
+        self.syncs_total = 0
+        if start_thread:
+            self._thread = threading.Thread(target=self._run, name="rate-limit-sync", daemon=True)
+            self._thread.start()
+
+    def _gc_if_needed(self, now: float) -> None:
+        super()._gc_if_needed(now)
+        if len(self._shares) > len(self._tats):
+            for bucket in [k for k in self._shares if k not in self._tats]:
+                self._shares.pop(bucket, None)
+
+    def hit(self, *, bucket: str, policy: RateLimitPolicy) -> tuple[bool, int, int]:
+        now = time.monotonic()
+        with self._lock:
+            self._gc_if_needed(now)
+            allowed, remaining, retry_after = self._advance(bucket, policy, now, share=self._shares.get(bucket, 1))
+            if allowed:
+                count, _ = self._pending.get(bucket, (0, policy))
+                self._pending[bucket] = (count + 1, policy)
+            return allowed, remaining, retry_after
+
+    def flush(self) -> int:
+        """把 pending 计数提交到共享存储并合并全局水位；返回同步的 bucket 数。"""
+        if self._rpc_disabled:
+            with self._lock:
+                self._pending.clear()
+            return 0
+        with self._lock:
+            if not self._pending:
+                return 0
+            items = list(self._pending.items())[: self._max_batch]
+            for bucket, _ in items:
+                self._pending.pop(bucket, None)
+
+        payload = [
+            {
+                "bucket": bucket,
+                "hits": count,
+                "interval_sec": policy.emission_interval,
+                "window_sec": policy.window_sec,
+            }
+            for bucket, (count, policy) in items
+        ]
+        try:
+            resp = self._client.rpc(_SYNC_RPC, {"p_instance": self.instance_id, "p_hits": payload}).execute()
+        except Exception as e:
+            if _looks_like_missing_rpc(str(e)):
+                self._rpc_disabled = True
+                logger.warning("[RateLimit] %s rpc unavailable, falling back to per-instance limits: %s", _SYNC_RPC, e)
+            else:
+                logger.warning("[RateLimit] shared store sync failed (kept local state): %s", e)
+            return 0
+
+        now = time.monotonic()
+        with self._lock:
+            for row in getattr(resp, "data", None) or []:
+                bucket = str(row.get("bucket") or "")
+                try:
+                    ahead = float(row.get("ahead_sec") or 0.0)
+                    instances = int(row.get("instances") or 1)
+                except (TypeError, ValueError):
+                    continue
+                if not bucket:
+                    continue
+                self._shares[bucket] = max(instances, 1)
+                # 中文注释: 全局 TAT 已包含本批次提交的请求；同步期间新放行的请求还在 pending 里，需要叠加上去。
+                pending, policy = self._pending.get(bucket, (0, None))
+                extra = pending * policy.emission_interval if policy else 0.0
+                self._tats[bucket] = max(self._tats.get(bucket, now), now + ahead + extra)
+        self.syncs_total += 1
+        return len(items)
+
+    def _run(self) -> None:
+        while not self._stop.wait(self._sync_interval_sec):
+            try:
+                while self.flush() >= self._max_batch:
+                    pass
+            except Exception as e:  # pragma: no cover - 防御：后台线程不能因意外异常退出
+                logger.warning("[RateLimit] sync loop error: %s", e)
+
+    def close(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self._sync_interval_sec + 1.0)
+            self._thread = None
+        try:
+            self.flush()
+        except Exception:
+            pass
+
+
+def _looks_like_missing_rpc(error_text: str) -> bool:
+    lowered = (error_text or "").lower()
+    return _SYNC_RPC in lowered and (
+        "pgrst202" in lowered
+        or "could not find the function" in lowered
+        or "does not exist" in lowered
+        or "schema cache" in lowered
+    )
+
+
+def build_rate_limiter() -> RateLimiter:
+    """
+    按 RATE_LIMIT_BACKEND 构造限流后端：memory（默认，实例内 GCRA）/ postgres（共享存储，后台同步）。
+    """
+    backend = (os.environ.get("RATE_LIMIT_BACKEND") or "memory").strip().lower()
+    if backend == "postgres":
+        try:
+            from app.lib.api_client import supabase_admin
+
+            raw = os.environ.get("RATE_LIMIT_SYNC_INTERVAL_SEC") or "1"
+            try:
+                interval = max(float(raw), 0.05)
+            except ValueError:
+                interval = 1.0
+            limiter = SharedStoreRateLimiter(supabase_admin, sync_interval_sec=interval)
+            with _shared_limiters_lock:
+                _shared_limiters.append(limiter)
+            return limiter
+        except Exception as e:
+            logger.warning("[RateLimit] shared backend init failed, using in-memory limiter: %s", e)
+    elif backend != "memory":
+        logger.warning("[RateLimit] unknown RATE_LIMIT_BACKEND=%s, using in-memory limiter", backend)
+    return GCRARateLimiter()
+
+
+def shutdown_rate_limiters() -> None:
+    """应用关闭时停止后台同步线程，并把最后一批计数提交到共享存储。"""
+    with _shared_limiters_lock:
+        limiters = list(_shared_limiters)
+        _shared_limiters.clear()
+    for limiter in limiters:
+        limiter.close()
@@ -1,9 +1,16 @@
 from __future__ import annotations
 
+import heapq
 import math
 import re
+import threading
 from collections import Counter
-from typing import Dict, List
+from typing import Any, Dict, Iterable, List, Optional
+
+try:
+    import numpy as np  # type: ignore
+except Exception:  # pragma: no cover - 取决于部署环境
+    np = None
 
 _TOKEN_RE = re.compile(r"[a-zA-Z0-9]{2,}")
 
@@ -12,6 +19,13 @@ def _tokenize(text: str) -> List[str]:
     return _TOKEN_RE.findall((text or "").lower())
 
 
+def _reviewer_text(reviewer: Dict) -> str:
+    domains = reviewer.get("domains")
+    if isinstance(domains, list):
+        return " ".join(str(d or "") for d in domains)
+    return str(domains or "")
+
+
 def _tfidf_vector(tokens: List[str], *, idf: Dict[str, float]) -> Dict[str, float]:
     """
     将 tokens 转为稀疏 TF-IDF 向量（dict）。
@@ -62,6 +76,7 @@ def recommend_reviewers(manuscript_abstract: str, reviewer_pool: List[Dict]) ->
     2. 将稿件摘要与所有审稿人的领域标签汇总，进行向量化处理。
     3. 计算稿件向量与各审稿人向量之间的余弦相似度。
     4. 优雅降级: 如果最大得分低于 0.1，前端应提示“未找到高度匹配的结果”。
+    5. 每次调用都会对整个审稿人池重算 df 与向量；审稿人池固定、稿件反复查询时请使用 ReviewerTfidfIndex。
     """
     if not manuscript_abstract or not reviewer_pool:
         return []
@@ -72,11 +87,7 @@ def recommend_reviewers(manuscript_abstract: str, reviewer_pool: List[Dict]) ->
     reviewer_tokens: List[List[str]] = []
 
     for r in reviewer_pool:
-        domains = r.get("domains")
-        if isinstance(domains, list):
-            text = " ".join(str(d or "") for d in domains)
-        else:
-            text = str(domains or "")
+        text = _reviewer_text(r)
         reviewer_texts.append(text)
         reviewer_tokens.append(_tokenize(text))
 
@@ -104,3 +115,277 @@ def recommend_reviewers(manuscript_abstract: str, reviewer_pool: List[Dict]) ->
         })
     
     return sorted(results, key=lambda x: x['score'], reverse=True)
+
+
+class ReviewerTfidfIndex:
+    """
+    常驻内存的审稿人 TF-IDF 索引。
+
+    中文注释:
+    - 词表与 df 只在审稿人语料上维护（不含稿件），IDF 公式与 recommend_reviewers 相同：log((1+N)/(1+df)) + 1。
+    - 审稿人按行存成 CSR（indptr / indices / data 为 tf），行范数随 IDF 一起预计算；
+      N 或 df 变化时只标记 dirty，下次查询前一次性向量化重算（O(nnz)），不重建结构。
+    - 查询 = 一次稀疏矩阵-向量乘 + argpartition 取 TopK；numpy 缺失时退化为倒排表累加 + heapq（结果一致）。
+    - add/remove 为增量操作：新增行追加到 CSR 尾部；删除打墓碑（tf 置 0、df 回退），墓碑过多时才压缩。
+    """
+
+    # 中文注释: 墓碑行数超过该比例（且不少于 _COMPACT_MIN_DEAD 行）时压缩 CSR。
+    _COMPACT_RATIO = 0.25
+    _COMPACT_MIN_DEAD = 64
+
+    def __init__(self, reviewers: Optional[Iterable[Dict]] = None) -> None:
+        self._lock = threading.RLock()
+        self._vocab: Dict[str, int] = {}
+        self._df: List[int] = []
+        self._ids: List[Optional[str]] = []
+        self._emails: List[Any] = []
+        self._row_of: Dict[str, int] = {}
+        self._row_terms: List[Optional[Dict[int, float]]] = []
+        self._dead = 0
+        # 中文注释: CSR 主存储（numpy 模式，按容量倍增）；纯 Python 模式改用倒排表 col -> {row: tf}。
+        self._indptr: List[int] = [0]
+        self._nnz = 0
+        if np is not None:
+            self._indices = np.zeros(0, dtype=np.int32)
+            self._data = np.zeros(0, dtype=np.float64)
+            self._row_idx = np.zeros(0, dtype=np.int32)
+        self._postings: List[Dict[int, float]] = []
+        self._dirty = True
+        self._idf: Any = None
+        self._weighted: Any = None
+        self._norms: Any = None
+        self._alive: Any = None
+        if reviewers:
+            self.add_many(reviewers)
+
+    @property
+    def size(self) -> int:
+        with self._lock:
+            return len(self._row_of)
+
+    def __contains__(self, reviewer_id: object) -> bool:
+        with self._lock:
+            return str(reviewer_id) in self._row_of
+
+    # ---------------- 写入 ----------------
+
+    def _ensure_capacity(self, needed: int) -> None:
+        capacity = self._indices.shape[0]
+        if needed <= capacity:
+            return
+        new_capacity = max(needed, capacity * 2, 1024)
+        for name, dtype in (("_indices", np.int32), ("_data", np.float64), ("_row_idx", np.int32)):
+            grown = np.zeros(new_capacity, dtype=dtype)
+            grown[: self._nnz] = getattr(self, name)[: self._nnz]
+            setattr(self, name, grown)
+
+    def _append_row(self, reviewer_id: str, email: Any, terms: Dict[int, float]) -> None:
+        row = len(self._ids)
+        self._ids.append(reviewer_id)
+        self._emails.append(email)
+        self._row_of[reviewer_id] = row
+        self._row_terms.append(terms)
+        start = self._nnz
+        end = start + len(terms)
+        if np is not None:
+            self._ensure_capacity(end)
+            if terms:
+                self._indices[start:end] = np.fromiter(terms.keys(), dtype=np.int32, count=len(terms))
+                self._data[start:end] = np.fromiter(terms.values(), dtype=np.float64, count=len(terms))
+                self._row_idx[start:end] = row
+        else:
+            for col, tf in terms.items():
+                self._postings[col][row] = tf
+        self._nnz = end
+        self._indptr.append(end)
+
+    def _term_frequencies(self, tokens: List[str]) -> Dict[int, float]:
+        if not tokens:
+            return {}
+        denom = float(len(tokens))
+        terms: Dict[int, float] = {}
+        for term, c in Counter(tokens).items():
+            col = self._vocab.get(term)
+            if col is None:
+                col = len(self._df)
+                self._vocab[term] = col
+                self._df.append(0)
+                self._postings.append({})
+            self._df[col] += 1
+            terms[col] = c / denom
+        return terms
+
+    def add(self, reviewer: Dict) -> None:
+        """
+        新增或覆盖单个审稿人（dict 结构与 recommend_reviewers 的 reviewer_pool 元素一致）。
+        """
+        self.add_many([reviewer])
+
+    def add_many(self, reviewers: Iterable[Dict]) -> None:
+        with self._lock:
+            for r in reviewers:
+                reviewer_id = str(r.get("id") or "")
+                if not reviewer_id:
+                    continue
+                if reviewer_id in self._row_of:
+                    self._remove_row(reviewer_id)
+                terms = self._term_frequencies(_tokenize(_reviewer_text(r)))
+                self._append_row(reviewer_id, r.get("email"), terms)
+            self._dirty = True
+            self._maybe_compact()
+
+    def _remove_row(self, reviewer_id: str) -> bool:
+        row = self._row_of.pop(reviewer_id, None)
+        if row is None:
+            return False
+        terms = self._row_terms[row] or {}
+        for col in terms:
+            self._df[col] -= 1
+            if np is None:
+                self._postings[col].pop(row, None)
+        if np is not None:
+            self._data[self._indptr[row] : self._indptr[row + 1]] = 0.0
+        self._ids[row] = None
+        self._emails[row] = None
+        self._row_terms[row] = None
+        self._dead += 1
+        return True
+
+    def remove(self, reviewer_id: str) -> bool:
+        with self._lock:
+            removed = self._remove_row(str(reviewer_id))
+            if removed:
+                self._dirty = True
+                self._maybe_compact()
+            return removed
+
+    def _maybe_compact(self) -> None:
+        if self._dead < self._COMPACT_MIN_DEAD or self._dead < len(self._ids) * self._COMPACT_RATIO:
+            return
+        live = [
+            (rid, self._emails[row], self._row_terms[row])
+            for row, rid in enumerate(self._ids)
+            if rid is not None
+        ]
+        self._ids, self._emails, self._row_terms = [], [], []
+        self._row_of = {}
+        self._indptr = [0]
+        self._nnz = 0
+        self._dead = 0
+        if np is None:
+            self._postings = [{} for _ in self._df]
+        for rid, email, terms in live:
+            self._append_row(rid, email, terms or {})
+        self._dirty = True
+
+    # ---------------- 查询 ----------------
+
+    def _refresh_weights(self) -> None:
+        """
+        N / df 变化后重算 IDF 与行范数（向量化，O(nnz)）。
+        """
+        if not self._dirty:
+            return
+        n_docs = len(self._row_of)
+        n_rows = len(self._ids)
+        if np is not None:
+            df = np.asarray(self._df, dtype=np.float64)
+            self._idf = np.log((1.0 + n_docs) / (1.0 + df)) + 1.0
+            nnz = self._nnz
+            self._weighted = self._data[:nnz] * self._idf[self._indices[:nnz]]
+            self._norms = np.sqrt(
+                np.bincount(self._row_idx[:nnz], weights=self._weighted**2, minlength=n_rows)
+            )
+            self._alive = np.fromiter((rid is not None for rid in self._ids), dtype=bool, count=n_rows)
+        else:
+            self._idf = [math.log((1.0 + n_docs) / (1.0 + c)) + 1.0 for c in self._df]
+            norms = [0.0] * n_rows
+            for row, terms in enumerate(self._row_terms):
+                if terms:
+                    norms[row] = math.sqrt(
+                        sum((tf * self._idf[col]) ** 2 for col, tf in terms.items())
+                    )
+            self._norms = norms
+        self._dirty = False
+
+    def _query_weights(self, manuscript_abstract: str) -> tuple[Dict[int, float], float]:
+        tokens = _tokenize(manuscript_abstract)
+        if not tokens:
+            return {}, 0.0
+        n_docs = len(self._row_of)
+        unseen_idf = math.log(1.0 + n_docs) + 1.0
+        denom = float(len(tokens))
+        weights: Dict[int, float] = {}
+        sq = 0.0
+        for term, c in Counter(tokens).items():
+            col = self._vocab.get(term)
+            idf = float(self._idf[col]) if col is not None else unseen_idf
+            w = c / denom * idf
+            sq += w * w
+            if col is not None and self._df[col] > 0:
+                weights[col] = w
+        return weights, math.sqrt(sq)
+
+    def _raw_scores(self, weights: Dict[int, float], qnorm: float) -> Any:
+        n_rows = len(self._ids)
+        if np is not None:
+            if not weights or qnorm <= 0.0:
+                return np.zeros(n_rows, dtype=np.float64)
+            q = np.zeros(len(self._df), dtype=np.float64)
+            q[np.fromiter(weights.keys(), dtype=np.int64, count=len(weights))] = list(weights.values())
+            nnz = self._nnz
+            # 中文注释: CSR 矩阵-向量乘：按行累加 w_ij * q_j。
+            dots = np.bincount(
+                self._row_idx[:nnz],
+                weights=self._weighted * q[self._indices[:nnz]],
+                minlength=n_rows,
+            )
+            denom = self._norms * qnorm
+            return np.divide(dots, denom, out=np.zeros(n_rows, dtype=np.float64), where=denom > 0)
+        out: Dict[int, float] = {}
+        if not weights or qnorm <= 0.0:
+            return out
+        for col, qw in weights.items():
+            idf = self._idf[col]
+            for row, tf in self._postings[col].items():
+                out[row] = out.get(row, 0.0) + tf * idf * qw
+        for row in list(out):
+            norm = self._norms[row]
+            out[row] = out[row] / (norm * qnorm) if norm > 0 else 0.0
+        return out
+
+    def recommend(self, manuscript_abstract: str, *, top_k: Optional[int] = None) -> List[Dict]:
+        """
+        与 recommend_reviewers 返回结构一致：[{reviewer_id, email, score}]，按得分降序（同分保持加入顺序）。
+        top_k 为空时返回全部审稿人。
+        """
+        if not manuscript_abstract:
+            return []
+        with self._lock:
+            n_live = len(self._row_of)
+            k = n_live if top_k is None else max(0, min(int(top_k), n_live))
+            if k == 0:
+                return []
+            self._refresh_weights()
+            weights, qnorm = self._query_weights(manuscript_abstract)
+            raw = self._raw_scores(weights, qnorm)
+            if np is not None:
+                # 中文注释: 墓碑行排到最后，k 不超过存活行数，因此不会被选中。
+                ranked_scores = np.where(self._alive, raw, -1.0)
+                if k < ranked_scores.shape[0]:
+                    candidates = np.sort(np.argpartition(-ranked_scores, k - 1)[:k])
+                else:
+                    candidates = np.arange(ranked_scores.shape[0])
+                ordered = candidates[np.argsort(-ranked_scores[candidates], kind="stable")][:k]
+                picked = [(int(row), float(raw[int(row)])) for row in ordered]
+            else:
+                live = ((row, raw.get(row, 0.0)) for row, rid in enumerate(self._ids) if rid is not None)
+                picked = heapq.nsmallest(k, live, key=lambda item: (-item[1], item[0]))
+            return [
+                {
+                    "reviewer_id": self._ids[row],
+                    "email": self._emails[row],
+                    "score": round(score, 4),
+                }
+                for row, score in picked
+            ]
@@ -3,6 +3,7 @@ from typing import Callable, Iterable, Optional, Set
 
 from fastapi import Depends, HTTPException
 
+from app.core import profile_cache
 from app.core.auth_utils import get_current_user
 from app.core.email_normalization import normalize_email
 from app.lib.api_client import supabase
@@ -27,6 +28,7 @@ async def get_current_profile(current_user: dict = Depends(get_current_user)) ->
     1) 由于后端当前使用 Supabase anon key，因此这里做“应用层”角色管理。
     2) 首次访问时自动创建 user_profiles 记录，默认 roles=['author']。
     3) 若 email 在 ADMIN_EMAILS 中，则自动补齐 admin/managing_editor/reviewer 权限，便于本地/演示测试。
+    4) 结果走两级缓存（请求级 memo + 进程级短 TTL），角色/scope 变更时由 profile_cache.invalidate_user 失效。
     """
     user_id = current_user["id"]
     email = normalize_email(current_user.get("email"))
@@ -35,6 +37,12 @@ async def get_current_profile(current_user: dict = Depends(get_current_user)) ->
     if _is_admin_email(email):
         roles = ["admin", "managing_editor", "reviewer", "author"]
 
+    profile_cache.begin_request_scope()
+    cache_key = profile_cache.profile_key(str(user_id))
+    cached = profile_cache.lookup(cache_key)
+    if not profile_cache.is_missing(cached) and (not email or normalize_email(cached.get("email")) == email):
+        return dict(cached)
+
     try:
         resp = supabase.table("user_profiles").select("*").eq("id", user_id).execute()
         existing = (resp.data or [None])[0]
@@ -53,6 +61,7 @@ async def get_current_profile(current_user: dict = Depends(get_current_user)) ->
                 existing["email"] = email
             if update_payload:
                 supabase.table("user_profiles").update(update_payload).eq("id", user_id).execute()
+            profile_cache.store(cache_key, dict(existing))
             return existing
 
         inserted = (
@@ -60,7 +69,9 @@ async def get_current_profile(current_user: dict = Depends(get_current_user)) ->
             .insert({"id": user_id, "email": email, "roles": roles})
             .execute()
         )
-        return (inserted.data or [{"id": user_id, "email": email, "roles": roles}])[0]
+        created = (inserted.data or [{"id": user_id, "email": email, "roles": roles}])[0]
+        profile_cache.store(cache_key, dict(created))
+        return created
     except Exception as e:
         print(f"Failed to fetch/create user profile: {e}")
         # 最小化降级：至少把用户身份返回给上层，避免 UI 完全不可用
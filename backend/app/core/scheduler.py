@@ -1,11 +1,18 @@
 from __future__ import annotations
 
+import logging
 from datetime import datetime, timedelta, timezone
 from typing import Any, Dict, Optional
 
+from app.core.config import env_int
 from app.core.mail import EmailService
+from app.core.mail_dispatcher import TemplateEmail
 from app.lib.api_client import supabase_admin
 
+logger = logging.getLogger(__name__)
+
+_REMINDER_SUBJECT = "Friendly Reminder: Review Deadline Approaching"
+
 
 class ChaseScheduler:
     """
@@ -15,90 +22,193 @@ class ChaseScheduler:
     1) 触发方式：通过内部接口 /api/v1/internal/cron/chase-reviews 手动/定时触发。
     2) 幂等性：仅处理 last_reminded_at 为空且 due_at <= now + 24h 的 pending 任务。
     3) 失败处理：SMTP 失败只记录日志，不抛异常；last_reminded_at 仅在发送成功后写入。
+    4) 流水线：按 id keyset 分页（CHASE_BATCH_SIZE），每页一次 in_ 批量取 reviewer 邮箱，
+       整页交给 EmailService.send_template_batch（SMTP 连接池 + 有界并发 / Resend 批量接口），
+       发送成功的 assignment 用一条 update ... in_(id) 批量写 last_reminded_at。
+    5) 可续跑：max_assignments 限定单次处理量，未处理完时返回 next_cursor，下次以 cursor 继续。
+    6) dry_run：只查询与组装邮件，不发送、不写库，返回逐条 report 便于核对。
     """
 
-    def __init__(self, email_service: Optional[EmailService] = None):
+    def __init__(self, email_service: Optional[EmailService] = None, *, batch_size: int | None = None):
         self._email = email_service or EmailService()
-
-    def run(self) -> Dict[str, int]:
+        self.batch_size = batch_size or env_int("CHASE_BATCH_SIZE", 200)
+
+    def run(
+        self,
+        *,
+        dry_run: bool = False,
+        cursor: str | None = None,
+        max_assignments: int | None = None,
+    ) -> Dict[str, Any]:
         now = datetime.now(timezone.utc)
         threshold = now + timedelta(hours=24)
 
-        processed_count = 0
-        emails_sent = 0
+        summary: Dict[str, Any] = {
+            "processed_count": 0,
+            "emails_sent": 0,
+            "emails_failed": 0,
+            "skipped_no_email": 0,
+            "batches": 0,
+            "dry_run": bool(dry_run),
+            "next_cursor": None,
+        }
+        report: list[Dict[str, Any]] = []
+        last_id = str(cursor or "").strip() or None
+
+        while True:
+            page_size = self.batch_size
+            if max_assignments is not None:
+                remaining = max(int(max_assignments), 0) - summary["processed_count"]
+                if remaining <= 0:
+                    # 中文注释: 达到单次上限，把游标交还给调用方续跑。
+                    summary["next_cursor"] = last_id
+                    break
+                page_size = min(page_size, remaining)
 
+            try:
+                assignments = self._fetch_due_assignments(threshold, after_id=last_id, limit=page_size)
+            except Exception as e:
+                logger.warning("[ChaseScheduler] 查询失败（可能缺表/缺列）: %s", e)
+                summary["next_cursor"] = last_id
+                break
+            if not assignments:
+                break
+
+            summary["batches"] += 1
+            summary["processed_count"] += len(assignments)
+            last_id = str(assignments[-1].get("id") or "") or last_id
+            self._process_page(assignments, now=now, dry_run=dry_run, summary=summary, report=report)
+
+            if len(assignments) < page_size:
+                break
+
+        if dry_run:
+            summary["report"] = report
+        return summary
+
+    def _fetch_due_assignments(
+        self, threshold: datetime, *, after_id: str | None, limit: int
+    ) -> list[Dict[str, Any]]:
+        # 中文注释:
+        # - 依赖 review_assignments.due_at 与 last_reminded_at 字段。
+        # - select manuscripts(title) 让邮件内容更专业（可读性更强）。
+        # - 按 id 升序 keyset 翻页：发送失败的行仍满足过滤条件，用 gt(id) 保证同一次运行不会重复处理。
+        query = (
+            supabase_admin.table("review_assignments")
+            .select("id, reviewer_id, manuscript_id, due_at, last_reminded_at, manuscripts(title)")
+            .eq("status", "pending")
+            .is_("last_reminded_at", "null")
+            .lte("due_at", threshold.isoformat())
+        )
+        if after_id:
+            query = query.gt("id", after_id)
+        res = query.order("id").limit(limit).execute()
+        return list(getattr(res, "data", None) or [])
+
+    def _process_page(
+        self,
+        assignments: list[Dict[str, Any]],
+        *,
+        now: datetime,
+        dry_run: bool,
+        summary: Dict[str, Any],
+        report: list[Dict[str, Any]],
+    ) -> None:
+        emails = self._get_reviewer_emails([row.get("reviewer_id") for row in assignments])
+
+        pending: list[Dict[str, Any]] = []
+        messages: list[TemplateEmail] = []
+        for row in assignments:
+            reviewer_email = emails.get(str(row.get("reviewer_id") or ""))
+            if not reviewer_email:
+                summary["skipped_no_email"] += 1
+                logger.info("[ChaseScheduler] 缺少 reviewer email，跳过: reviewer_id=%s", row.get("reviewer_id"))
+                if dry_run:
+                    report.append(self._report_item(row, "skipped_no_email"))
+                continue
+            pending.append(row)
+            messages.append(self._build_message(row, reviewer_email))
+
+        if dry_run:
+            report.extend(self._report_item(row, "would_send") for row in pending)
+            return
+
+        results = self._email.send_template_batch(messages) if messages else []
+        sent_ids: list[str] = []
+        for row, result in zip(pending, results):
+            if result.ok:
+                sent_ids.append(str(row.get("id")))
+            else:
+                summary["emails_failed"] += 1
+        summary["emails_sent"] += len(sent_ids)
+        self._mark_reminded(sent_ids, now)
+
+    def _build_message(self, row: Dict[str, Any], reviewer_email: str) -> TemplateEmail:
+        assignment_id = row.get("id")
+        manuscript_id = row.get("manuscript_id")
+        manuscript = row.get("manuscripts") or {}
+        return TemplateEmail(
+            to_email=reviewer_email,
+            subject=_REMINDER_SUBJECT,
+            template_name="review_reminder.html",
+            context={
+                "subject": _REMINDER_SUBJECT,
+                "recipient_name": reviewer_email.split("@")[0].replace(".", " ").title(),
+                "manuscript_title": manuscript.get("title") or "Manuscript",
+                "manuscript_id": manuscript_id,
+                "due_at": row.get("due_at"),
+                "review_url": None,
+            },
+            idempotency_key=f"review-reminder/{assignment_id}" if assignment_id else None,
+            audit_context={
+                "assignment_id": assignment_id,
+                "manuscript_id": manuscript_id,
+                "scene": "reviewer_assignment",
+                "event_type": "review_reminder",
+                "delivery_mode": "auto",
+                "communication_status": "system_sent",
+            },
+        )
+
+    @staticmethod
+    def _report_item(row: Dict[str, Any], action: str) -> Dict[str, Any]:
+        return {
+            "assignment_id": row.get("id"),
+            "reviewer_id": row.get("reviewer_id"),
+            "manuscript_id": row.get("manuscript_id"),
+            "due_at": row.get("due_at"),
+            "action": action,
+        }
+
+    def _mark_reminded(self, assignment_ids: list[str], now: datetime) -> None:
+        if not assignment_ids:
+            return
         try:
-            # 中文注释:
-            # - 依赖 review_assignments.due_at 与 last_reminded_at 字段。
-            # - select manuscripts(title) 让邮件内容更专业（可读性更强）。
-            res = (
+            # 中文注释: 整页一条 UPDATE；再次限定 last_reminded_at is null，并发运行时不覆盖对方写入的时间。
+            (
                 supabase_admin.table("review_assignments")
-                .select("id, reviewer_id, manuscript_id, due_at, last_reminded_at, manuscripts(title)")
-                .eq("status", "pending")
+                .update({"last_reminded_at": now.isoformat()})
+                .in_("id", assignment_ids)
                 .is_("last_reminded_at", "null")
-                .lte("due_at", threshold.isoformat())
                 .execute()
             )
-            assignments = getattr(res, "data", None) or []
         except Exception as e:
-            print(f"[ChaseScheduler] 查询失败（可能缺表/缺列）: {e}")
-            return {"processed_count": 0, "emails_sent": 0}
-
-        for row in assignments:
-            processed_count += 1
-            assignment_id = row.get("id")
-            reviewer_id = row.get("reviewer_id")
-            manuscript_id = row.get("manuscript_id")
-            due_at = row.get("due_at")
-            manuscript = row.get("manuscripts") or {}
-            manuscript_title = manuscript.get("title") or "Manuscript"
-
-            reviewer_email = self._get_reviewer_email(reviewer_id)
-            if not reviewer_email:
-                print(f"[ChaseScheduler] 缺少 reviewer email，跳过: reviewer_id={reviewer_id}")
-                continue
+            # 中文注释: 仅影响幂等标记，不影响本次 Cron 调用结果
+            logger.warning("[ChaseScheduler] 写入 last_reminded_at 失败: %s", e)
 
-            ok = self._email.send_template_email(
-                to_email=reviewer_email,
-                subject="Friendly Reminder: Review Deadline Approaching",
-                template_name="review_reminder.html",
-                context={
-                    "subject": "Friendly Reminder: Review Deadline Approaching",
-                    "recipient_name": reviewer_email.split("@")[0].replace(".", " ").title(),
-                    "manuscript_title": manuscript_title,
-                    "manuscript_id": manuscript_id,
-                    "due_at": due_at,
-                    "review_url": None,
-                },
-            )
-            if not ok:
-                continue
-
-            emails_sent += 1
-            try:
-                supabase_admin.table("review_assignments").update(
-                    {"last_reminded_at": now.isoformat()}
-                ).eq("id", assignment_id).execute()
-            except Exception as e:
-                # 中文注释: 仅影响幂等标记，不影响本次 Cron 调用结果
-                print(f"[ChaseScheduler] 写入 last_reminded_at 失败: {e}")
-
-        return {"processed_count": processed_count, "emails_sent": emails_sent}
-
-    def _get_reviewer_email(self, reviewer_id: Any) -> Optional[str]:
-        if not reviewer_id:
-            return None
+    def _get_reviewer_emails(self, reviewer_ids: list[Any]) -> Dict[str, str]:
+        ids = sorted({str(rid) for rid in reviewer_ids if rid})
+        if not ids:
+            return {}
         try:
-            res = (
-                supabase_admin.table("user_profiles")
-                .select("email")
-                .eq("id", str(reviewer_id))
-                .single()
-                .execute()
-            )
-            profile = getattr(res, "data", None) or {}
-            email = (profile.get("email") or "").strip()
-            return email or None
-        except Exception:
-            return None
-
+            res = supabase_admin.table("user_profiles").select("id, email").in_("id", ids).execute()
+            rows = getattr(res, "data", None) or []
+        except Exception as e:
+            logger.warning("[ChaseScheduler] 批量读取 reviewer email 失败: %s", e)
+            return {}
+        emails: Dict[str, str] = {}
+        for profile in rows:
+            email = str(profile.get("email") or "").strip()
+            if email:
+                emails[str(profile.get("id"))] = email
+        return emails
@@ -12,7 +12,7 @@ class ShortTTLCache(Generic[T]):
     轻量进程内短缓存（用于高频只读接口降压）。
 
     设计目标：
-    - 简单可控：只支持 get/set/clear；
+    - 简单可控：只支持 get/set/delete/clear；
     - 线程安全：多请求并发下不会破坏字典状态；
     - 不跨进程：仅当前 worker 内生效，适用于秒级去抖。
     """
@@ -54,6 +54,17 @@ class ShortTTLCache(Generic[T]):
                     self._store.pop(oldest_key, None)
             self._store[key] = (expires_at, value)
 
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._store.pop(key, None)
+
+    def delete_prefix(self, prefix: str) -> int:
+        with self._lock:
+            keys = [k for k in self._store if k.startswith(prefix)]
+            for k in keys:
+                self._store.pop(k, None)
+            return len(keys)
+
     def clear(self) -> None:
         with self._lock:
             self._store.clear()
@@ -1,6 +1,7 @@
 import os
 from supabase import create_client, Client
 from app.core.config import app_config
+from app.lib.supabase_pool import create_user_scoped_client, pooled_client_options
 from typing import Any, Optional, Callable
 
 # Use configuration from AppConfig (Feature 019 support for staging)
@@ -55,14 +56,14 @@ def _require_anon_key() -> str:
 
 
 def _create_supabase() -> Client:
-    return create_client(_require_supabase_url(), _require_anon_key())
+    return create_client(_require_supabase_url(), _require_anon_key(), options=pooled_client_options())
 
 
 def _create_supabase_admin() -> Client:
     admin_key = service_role_key or key
     if not admin_key:
         raise RuntimeError("SUPABASE_SERVICE_ROLE_KEY (or SUPABASE_KEY) is required")
-    return create_client(_require_supabase_url(), admin_key)
+    return create_client(_require_supabase_url(), admin_key, options=pooled_client_options())
 
 
 # === 统一 Supabase 客户端（延迟初始化） ===
@@ -78,9 +79,12 @@ def create_user_supabase_client(access_token: str) -> Client:
 
     中文注释:
     - 不能在全局 supabase 实例上调用 postgrest.auth(token)，会造成并发请求串号。
-    - 因此为每个请求创建一个轻量 client，并注入当前用户 JWT。
+    - 因此为每个请求创建一个轻量 user-scoped 视图：只替换 Authorization 头，
+      底层复用进程级连接池（keep-alive / HTTP/2），不再每次新建完整 Client。
     """
 
-    client = create_client(_require_supabase_url(), _require_anon_key())
-    client.postgrest.auth(access_token)
-    return client
+    return create_user_scoped_client(  # type: ignore[return-value]
+        url=_require_supabase_url(),
+        anon_key=_require_anon_key(),
+        access_token=access_token,
+    )
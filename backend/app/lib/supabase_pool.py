@@ -0,0 +1,280 @@
+"""
+进程级共享的 Supabase/PostgREST HTTP 连接池。
+
+中文注释:
+- supabase-py 的 `create_client()` 默认每次都会新建 httpx.Client（无 keep-alive 复用，每次重新 TLS 握手）。
+- 这里维护一个进程级 httpx.Client（连接池 + keep-alive + HTTP/2），所有 Supabase client 共享它。
+- 同一 (url, key) 的 Client 只构建一次（get_pooled_client）。
+- RLS 场景使用 `create_user_scoped_client()`：只替换 Authorization 头，复用同一连接池，不再新建完整 Client。
+- 连接池指标（in_use/idle/waits）通过 `get_pool_metrics()` 暴露给内部接口。
+"""
+
+from __future__ import annotations
+
+import logging
+from dataclasses import dataclass
+from threading import Lock
+from typing import Any, Callable, Optional
+
+import httpx
+from postgrest import SyncPostgrestClient, SyncRequestBuilder
+from supabase import Client, create_client
+from supabase.lib.client_options import SyncClientOptions
+
+from app.core.config import env_bool, env_float, env_int
+
+logger = logging.getLogger("scholarflow.supabase_pool")
+
+
+def _h2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+    except Exception:
+        return False
+    return True
+
+
+@dataclass(frozen=True)
+class SupabasePoolConfig:
+    max_connections: int
+    max_keepalive_connections: int
+    keepalive_expiry_sec: float
+    http2: bool
+    timeout_sec: float
+    pool_timeout_sec: float
+
+    @staticmethod
+    def from_env() -> "SupabasePoolConfig":
+        max_connections = env_int("SUPABASE_POOL_MAX_CONNECTIONS", 50)
+        return SupabasePoolConfig(
+            max_connections=max_connections,
+            max_keepalive_connections=min(
+                env_int("SUPABASE_POOL_MAX_KEEPALIVE", 20, minimum=0),
+                max_connections,
+            ),
+            keepalive_expiry_sec=max(1.0, env_float("SUPABASE_POOL_KEEPALIVE_EXPIRY_SEC", 30.0)),
+            http2=env_bool("SUPABASE_POOL_HTTP2", True) and _h2_available(),
+            timeout_sec=max(1.0, env_float("SUPABASE_POOL_TIMEOUT_SEC", 120.0)),
+            pool_timeout_sec=max(0.1, env_float("SUPABASE_POOL_ACQUIRE_TIMEOUT_SEC", 10.0)),
+        )
+
+
+class _InstrumentedTransport(httpx.BaseTransport):
+    """
+    包装 httpx.HTTPTransport，统计请求数 / 排队等待 / 获取连接超时。
+
+    中文注释: "waits" 为近似值——请求进入时池内没有可用连接且已达上限，即视为需要等待。
+    """
+
+    def __init__(self, inner: httpx.HTTPTransport, *, max_connections: int) -> None:
+        self._inner = inner
+        self._max_connections = max_connections
+        self._lock = Lock()
+        self.in_flight = 0
+        self.requests_total = 0
+        self.waits_total = 0
+        self.pool_timeouts_total = 0
+        self.errors_total = 0
+
+    def _connections(self) -> list[Any]:
+        pool = getattr(self._inner, "_pool", None)
+        try:
+            return list(getattr(pool, "connections", None) or [])
+        except Exception:
+            return []
+
+    def _must_wait(self) -> bool:
+        connections = self._connections()
+        if len(connections) < self._max_connections:
+            return False
+        for conn in connections:
+            try:
+                if conn.is_available():
+                    return False
+            except Exception:
+                continue
+        return True
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        with self._lock:
+            self.requests_total += 1
+            if self._must_wait():
+                self.waits_total += 1
+            self.in_flight += 1
+        try:
+            return self._inner.handle_request(request)
+        except httpx.PoolTimeout:
+            with self._lock:
+                self.pool_timeouts_total += 1
+            raise
+        except Exception:
+            with self._lock:
+                self.errors_total += 1
+            raise
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+    def close(self) -> None:
+        self._inner.close()
+
+    def snapshot(self) -> dict[str, Any]:
+        connections = self._connections()
+        idle = 0
+        for conn in connections:
+            try:
+                if conn.is_idle():
+                    idle += 1
+            except Exception:
+                continue
+        with self._lock:
+            return {
+                "connections": len(connections),
+                "in_use": len(connections) - idle,
+                "idle": idle,
+                "in_flight_requests": self.in_flight,
+                "requests_total": self.requests_total,
+                "waits_total": self.waits_total,
+                "pool_timeouts_total": self.pool_timeouts_total,
+                "errors_total": self.errors_total,
+            }
+
+
+_lock = Lock()
+_http_client: Optional[httpx.Client] = None
+_transport: Optional[_InstrumentedTransport] = None
+_config: Optional[SupabasePoolConfig] = None
+_clients: dict[tuple[str, str], Client] = {}
+
+
+def get_shared_http_client() -> httpx.Client:
+    """
+    返回进程级共享 httpx.Client（懒初始化、线程安全）。
+    """
+    global _http_client, _transport, _config
+    if _http_client is not None:
+        return _http_client
+    with _lock:
+        if _http_client is None:
+            cfg = SupabasePoolConfig.from_env()
+            limits = httpx.Limits(
+                max_connections=cfg.max_connections,
+                max_keepalive_connections=cfg.max_keepalive_connections,
+                keepalive_expiry=cfg.keepalive_expiry_sec,
+            )
+            transport = _InstrumentedTransport(
+                httpx.HTTPTransport(http2=cfg.http2, limits=limits),
+                max_connections=cfg.max_connections,
+            )
+            _http_client = httpx.Client(
+                transport=transport,
+                timeout=httpx.Timeout(cfg.timeout_sec, pool=cfg.pool_timeout_sec),
+                follow_redirects=True,
+            )
+            _transport = transport
+            _config = cfg
+            logger.info(
+                "[SupabasePool] init max_connections=%s keepalive=%s http2=%s",
+                cfg.max_connections,
+                cfg.max_keepalive_connections,
+                cfg.http2,
+            )
+        return _http_client
+
+
+def pooled_client_options(**overrides: Any) -> SyncClientOptions:
+    """
+    构建共享连接池的 ClientOptions（供 create_client(url, key, options=...) 使用）。
+    """
+    return SyncClientOptions(httpx_client=get_shared_http_client(), **overrides)
+
+
+def get_pooled_client(
+    url: str,
+    key: str,
+    *,
+    factory: Callable[..., Client] = create_client,
+) -> Client:
+    """
+    返回同一 (url, key) 的进程级 Client（首次调用时构建，之后复用）。
+
+    中文注释: factory 参数便于调用方保留自己的 create_client 引用（测试可 patch）。
+    """
+    cache_key = (str(url), str(key))
+    cached = _clients.get(cache_key)
+    if cached is not None:
+        return cached
+    with _lock:
+        cached = _clients.get(cache_key)
+        if cached is not None:
+            return cached
+    client = factory(url, key, options=pooled_client_options())
+    with _lock:
+        return _clients.setdefault(cache_key, client)
+
+
+class UserScopedClient:
+    """
+    以“当前用户”身份调用 PostgREST 的轻量视图（用于触发/验证 RLS）。
+
+    中文注释:
+    - 只携带 apikey + 用户 Authorization 头，底层复用共享连接池；
+    - 每个请求一个实例，不共享 headers，避免并发请求串号。
+    """
+
+    def __init__(self, *, url: str, anon_key: str, access_token: str) -> None:
+        self.postgrest = SyncPostgrestClient(
+            f"{str(url).rstrip('/')}/rest/v1",
+            headers={"apiKey": anon_key, "Authorization": f"Bearer {access_token}"},
+            http_client=get_shared_http_client(),
+        )
+
+    def table(self, table_name: str) -> SyncRequestBuilder:
+        return self.postgrest.from_(table_name)
+
+    def from_(self, table_name: str) -> SyncRequestBuilder:
+        return self.postgrest.from_(table_name)
+
+    def rpc(self, fn: str, params: Optional[dict[str, Any]] = None, **kwargs: Any):
+        return self.postgrest.rpc(fn, params or {}, **kwargs)
+
+
+def create_user_scoped_client(*, url: str, anon_key: str, access_token: str) -> UserScopedClient:
+    return UserScopedClient(url=url, anon_key=anon_key, access_token=access_token)
+
+
+def get_pool_metrics() -> dict[str, Any]:
+    """
+    连接池指标快照（内部接口使用）。
+    """
+    transport = _transport
+    cfg = _config
+    if transport is None or cfg is None:
+        return {"initialized": False, "cached_clients": len(_clients)}
+    return {
+        "initialized": True,
+        "http2": cfg.http2,
+        "max_connections": cfg.max_connections,
+        "max_keepalive_connections": cfg.max_keepalive_connections,
+        "keepalive_expiry_sec": cfg.keepalive_expiry_sec,
+        "cached_clients": len(_clients),
+        **transport.snapshot(),
+    }
+
+
+def close_shared_http_client() -> None:
+    """
+    关闭并清空共享连接池（进程退出 / 测试隔离使用）。
+    """
+    global _http_client, _transport, _config
+    with _lock:
+        client = _http_client
+        _http_client = None
+        _transport = None
+        _config = None
+        _clients.clear()
+    if client is not None:
+        try:
+            client.close()
+        except Exception:
+            pass
@@ -0,0 +1,363 @@
+"""
+Analytics 月度事实汇总（analytics_monthly_facts）读取、实时重算与一致性校验。
+
+中文注释:
+- 汇总粒度：(journal_id, 投稿月份, 当前状态, 作者国家) → 稿件数 / 首次决定耗时累计 / 样本数。
+  scoped 仪表盘的 KPI、趋势、流水线、决定分布、地理分布都可以由这些单元格推出。
+- 增量维护在数据库触发器里完成（稿件状态流转即更新），这里只负责读取。
+- 表尚未迁移时，由 compute_live_facts 从 manuscripts 一次性扫描得到同样的单元格（兜底 + 一致性校验的基准）。
+"""
+
+from __future__ import annotations
+
+import logging
+from datetime import date, datetime, timezone
+from typing import Any, Iterable, Optional
+
+from app.models.analytics import DecisionData, GeoData, PipelineData, TrendData
+
+logger = logging.getLogger("scholarflow.analytics_rollups")
+
+FACTS_TABLE = "analytics_monthly_facts"
+FACT_COLUMNS = "journal_id,month,status,country,manuscript_count,decision_days_sum,decision_samples"
+REBUILD_RPC = "rebuild_analytics_monthly_facts"
+
+# 中文注释: created_at 为空的历史数据归入该月份（与迁移中的 SQL 口径一致）。
+UNKNOWN_MONTH = date(1900, 1, 1)
+
+_PAGE_SIZE = 1000
+_PROFILE_CHUNK = 200
+
+PENDING_STATUSES = frozenset(
+    {
+        "submitted",
+        "pre_check",
+        "under_review",
+        "revision",
+        "revision_requested",
+        "major_revision",
+        "minor_revision",
+        "resubmitted",
+        "decision",
+    }
+)
+ACCEPT_STATUSES = frozenset({"accepted", "approved", "published"})
+FIRST_DECISION_STATUSES = ACCEPT_STATUSES | {"rejected", "major_revision", "minor_revision"}
+_PIPELINE_STAGES = (
+    ("submitted", frozenset({"submitted", "pre_check"})),
+    ("under_review", frozenset({"under_review"})),
+    (
+        "revision",
+        frozenset({"revision", "revision_requested", "major_revision", "minor_revision", "resubmitted", "decision"}),
+    ),
+    ("in_production", frozenset({"in_production", "approved", "layout", "english_editing", "proofreading"})),
+)
+_DECISION_BUCKETS = (
+    ("accepted", ACCEPT_STATUSES),
+    ("rejected", frozenset({"rejected"})),
+    ("revision", frozenset({"revision", "revision_requested", "major_revision", "minor_revision", "resubmitted"})),
+    ("desk_reject", frozenset({"desk_reject"})),
+)
+
+FactKey = tuple[str, date, str, str]
+
+
+def _parse_dt(value: object) -> Optional[datetime]:
+    raw = str(value or "").strip()
+    if not raw:
+        return None
+    try:
+        return datetime.fromisoformat(raw.replace("Z", "+00:00")).astimezone(timezone.utc)
+    except Exception:
+        return None
+
+
+def _parse_month(value: object) -> date:
+    if isinstance(value, date):
+        return date(value.year, value.month, 1)
+    raw = str(value or "").strip()
+    try:
+        parsed = date.fromisoformat(raw[:10])
+    except Exception:
+        return UNKNOWN_MONTH
+    return date(parsed.year, parsed.month, 1)
+
+
+def _month_index(d: date) -> int:
+    return d.year * 12 + d.month - 1
+
+
+class AnalyticsRollup:
+    """
+    一组事实单元格（通常为一个 journal scope 的全部汇总行）及其派生指标。
+    """
+
+    def __init__(self, cells: Optional[dict[FactKey, list[float]]] = None) -> None:
+        # 中文注释: value = [manuscript_count, decision_days_sum, decision_samples]
+        self.cells: dict[FactKey, list[float]] = cells or {}
+
+    def add(self, key: FactKey, count: float, days_sum: float = 0.0, samples: float = 0.0) -> None:
+        cell = self.cells.get(key)
+        if cell is None:
+            cell = self.cells[key] = [0.0, 0.0, 0.0]
+        cell[0] += count
+        cell[1] += days_sum
+        cell[2] += samples
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[dict[str, Any]]) -> "AnalyticsRollup":
+        rollup = cls()
+        for row in rows:
+            key = (
+                str(row.get("journal_id") or ""),
+                _parse_month(row.get("month")),
+                str(row.get("status") or "").strip().lower(),
+                str(row.get("country") or "").strip(),
+            )
+            rollup.add(
+                key,
+                float(row.get("manuscript_count") or 0),
+                float(row.get("decision_days_sum") or 0),
+                float(row.get("decision_samples") or 0),
+            )
+        return rollup
+
+    def nonzero(self) -> dict[FactKey, list[float]]:
+        return {k: v for k, v in self.cells.items() if v[0] or v[2]}
+
+    # ---------------- 派生指标 ----------------
+
+    def kpi_counts(self, *, now: Optional[datetime] = None) -> dict[str, float]:
+        """
+        KPI 中与稿件相关的部分（APC 收入来自 invoices，由调用方补齐）。
+        """
+        now = now or datetime.now(timezone.utc)
+        month_start = date(now.year, now.month, 1)
+        year_start = date(now.year, 1, 1)
+        new_month = pending = accepted_year = rejected_year = 0
+        days_sum = samples = 0.0
+        for (_, month, status, _), (count, d_sum, d_samples) in self.cells.items():
+            count = int(count)
+            if month != UNKNOWN_MONTH and month >= month_start:
+                new_month += count
+            if status in PENDING_STATUSES:
+                pending += count
+            days_sum += d_sum
+            samples += d_samples
+            if month != UNKNOWN_MONTH and month >= year_start:
+                if status in ACCEPT_STATUSES:
+                    accepted_year += count
+                elif status == "rejected":
+                    rejected_year += count
+        decided = accepted_year + rejected_year
+        return {
+            "new_submissions_month": new_month,
+            "total_pending": pending,
+            "avg_first_decision_days": round(days_sum / samples, 1) if samples > 0 else 0.0,
+            "yearly_acceptance_rate": round(float(accepted_year) / float(decided), 4) if decided > 0 else 0.0,
+        }
+
+    def trends(self, *, now: Optional[datetime] = None, months: int = 12) -> list[TrendData]:
+        now = now or datetime.now(timezone.utc)
+        current_idx = now.year * 12 + now.month - 1
+        start_idx = current_idx - (months - 1)
+        buckets = {idx: [0, 0] for idx in range(start_idx, current_idx + 1)}
+        for (_, month, status, _), (count, _, _) in self.cells.items():
+            if month == UNKNOWN_MONTH:
+                continue
+            idx = _month_index(month)
+            if idx not in buckets:
+                continue
+            buckets[idx][0] += int(count)
+            if status in ACCEPT_STATUSES:
+                buckets[idx][1] += int(count)
+        return [
+            TrendData(
+                month=date(idx // 12, idx % 12 + 1, 1),
+                submission_count=buckets[idx][0],
+                acceptance_count=buckets[idx][1],
+            )
+            for idx in range(start_idx, current_idx + 1)
+        ]
+
+    def pipeline(self) -> list[PipelineData]:
+        totals = {stage: 0 for stage, _ in _PIPELINE_STAGES}
+        for (_, _, status, _), (count, _, _) in self.cells.items():
+            for stage, statuses in _PIPELINE_STAGES:
+                if status in statuses:
+                    totals[stage] += int(count)
+                    break
+        return [PipelineData(stage=stage, count=count) for stage, count in totals.items() if count > 0]
+
+    def decisions(self, *, now: Optional[datetime] = None) -> list[DecisionData]:
+        now = now or datetime.now(timezone.utc)
+        year_start = date(now.year, 1, 1)
+        totals = {bucket: 0 for bucket, _ in _DECISION_BUCKETS}
+        for (_, month, status, _), (count, _, _) in self.cells.items():
+            if month == UNKNOWN_MONTH or month < year_start:
+                continue
+            for bucket, statuses in _DECISION_BUCKETS:
+                if status in statuses:
+                    totals[bucket] += int(count)
+                    break
+        return [DecisionData(decision=bucket, count=count) for bucket, count in totals.items() if count > 0]
+
+    def geography(self, *, limit: int = 10) -> list[GeoData]:
+        totals: dict[str, int] = {}
+        for (_, _, _, country), (count, _, _) in self.cells.items():
+            if country and count:
+                totals[country] = totals.get(country, 0) + int(count)
+        ranked = sorted(
+            ((country, count) for country, count in totals.items() if count > 0),
+            key=lambda item: (-item[1], item[0]),
+        )[:limit]
+        return [GeoData(country=country, submission_count=count) for country, count in ranked]
+
+
+def compute_live_facts(
+    manuscript_rows: Iterable[dict[str, Any]],
+    country_by_author: dict[str, str],
+) -> AnalyticsRollup:
+    """
+    由 manuscripts 行（journal_id,author_id,status,created_at,updated_at）实时计算事实单元格。
+    """
+    rollup = AnalyticsRollup()
+    for row in manuscript_rows:
+        journal_id = str(row.get("journal_id") or "").strip()
+        if not journal_id:
+            continue
+        status = str(row.get("status") or "").strip().lower()
+        created_at = _parse_dt(row.get("created_at"))
+        updated_at = _parse_dt(row.get("updated_at"))
+        month = date(created_at.year, created_at.month, 1) if created_at else UNKNOWN_MONTH
+        country = country_by_author.get(str(row.get("author_id") or "").strip(), "")
+        days_sum = samples = 0.0
+        if created_at and updated_at and updated_at > created_at and status in FIRST_DECISION_STATUSES:
+            days_sum = (updated_at - created_at).total_seconds() / 86400.0
+            samples = 1.0
+        rollup.add((journal_id, month, status, country), 1.0, days_sum, samples)
+    return rollup
+
+
+def is_missing_facts_table_error(error: Exception | str) -> bool:
+    text = str(error or "").lower()
+    return FACTS_TABLE in text and (
+        "does not exist" in text or "schema cache" in text or "could not find" in text
+    )
+
+
+def fetch_rollup(client: Any, journal_ids: list[str]) -> AnalyticsRollup:
+    """
+    一次（分页）读取 scope 内全部汇总行。
+    """
+    rows: list[dict[str, Any]] = []
+    offset = 0
+    while True:
+        resp = (
+            client.table(FACTS_TABLE)
+            .select(FACT_COLUMNS)
+            .in_("journal_id", journal_ids)
+            .order("journal_id")
+            .order("month")
+            .order("status")
+            .order("country")
+            .range(offset, offset + _PAGE_SIZE - 1)
+            .execute()
+        )
+        page = list(getattr(resp, "data", None) or [])
+        rows.extend(page)
+        if len(page) < _PAGE_SIZE:
+            return AnalyticsRollup.from_rows(rows)
+        offset += _PAGE_SIZE
+
+
+def _iter_manuscripts(client: Any, journal_ids: Optional[list[str]]):
+    last_id: Optional[str] = None
+    while True:
+        query = client.table("manuscripts").select("id,journal_id,author_id,status,created_at,updated_at")
+        if journal_ids is not None:
+            query = query.in_("journal_id", journal_ids)
+        if last_id is not None:
+            query = query.gt("id", last_id)
+        resp = query.order("id").limit(_PAGE_SIZE).execute()
+        page = list(getattr(resp, "data", None) or [])
+        yield from page
+        if len(page) < _PAGE_SIZE:
+            return
+        last_id = str(page[-1].get("id") or "")
+
+
+def _fetch_countries(client: Any, author_ids: list[str]) -> dict[str, str]:
+    out: dict[str, str] = {}
+    for i in range(0, len(author_ids), _PROFILE_CHUNK):
+        chunk = author_ids[i : i + _PROFILE_CHUNK]
+        resp = client.table("user_profiles").select("id,country").in_("id", chunk).execute()
+        for row in getattr(resp, "data", None) or []:
+            uid = str(row.get("id") or "").strip()
+            if uid:
+                out[uid] = str(row.get("country") or "").strip()
+    return out
+
+
+def fetch_live_rollup(client: Any, journal_ids: Optional[list[str]]) -> AnalyticsRollup:
+    """
+    实时聚合：manuscripts 扫描一次 + 作者国家批量查询一次（汇总表缺失时的兜底 / 一致性校验基准）。
+    """
+    rows = [r for r in _iter_manuscripts(client, journal_ids) if str(r.get("journal_id") or "").strip()]
+    author_ids = sorted({str(r.get("author_id") or "").strip() for r in rows} - {""})
+    return compute_live_facts(rows, _fetch_countries(client, author_ids))
+
+
+def rebuild_rollups(client: Any, journal_ids: Optional[list[str]] = None) -> int:
+    resp = client.rpc(REBUILD_RPC, {"p_journal_ids": journal_ids or None}).execute()
+    try:
+        return int(getattr(resp, "data", None) or 0)
+    except Exception:
+        return 0
+
+
+def diff_rollups(
+    expected: AnalyticsRollup,
+    actual: AnalyticsRollup,
+    *,
+    tolerance_days: float = 0.01,
+) -> list[dict[str, Any]]:
+    """
+    比较两组单元格；返回不一致项（忽略计数为 0 的空单元格）。
+    """
+    want = expected.nonzero()
+    got = actual.nonzero()
+    out: list[dict[str, Any]] = []
+    for key in sorted(set(want) | set(got), key=lambda k: (k[0], k[1], k[2], k[3])):
+        w = want.get(key, [0.0, 0.0, 0.0])
+        g = got.get(key, [0.0, 0.0, 0.0])
+        if int(w[0]) != int(g[0]) or int(w[2]) != int(g[2]) or abs(w[1] - g[1]) > tolerance_days:
+            out.append(
+                {
+                    "journal_id": key[0],
+                    "month": key[1].isoformat(),
+                    "status": key[2],
+                    "country": key[3],
+                    "expected": {"count": int(w[0]), "decision_days_sum": w[1], "decision_samples": int(w[2])},
+                    "actual": {"count": int(g[0]), "decision_days_sum": g[1], "decision_samples": int(g[2])},
+                }
+            )
+    return out
+
+
+def check_consistency(client: Any, journal_ids: Optional[list[str]] = None) -> list[dict[str, Any]]:
+    """
+    汇总表 vs 实时聚合；journal_ids 为空时校验全部期刊。
+    """
+    live = fetch_live_rollup(client, journal_ids)
+    scope = journal_ids if journal_ids is not None else sorted({key[0] for key in live.cells})
+    stored = fetch_rollup(client, scope) if scope else AnalyticsRollup()
+    if journal_ids is None:
+        # 中文注释: 全量校验时还要发现“汇总表里有、但已无稿件”的期刊。
+        resp = client.table(FACTS_TABLE).select("journal_id").gt("manuscript_count", 0).execute()
+        orphan = sorted({str(r.get("journal_id") or "") for r in getattr(resp, "data", None) or []} - set(scope))
+        if orphan:
+            extra = fetch_rollup(client, orphan)
+            for key, cell in extra.cells.items():
+                stored.add(key, *cell)
+    return diff_rollups(live, stored)
@@ -6,14 +6,21 @@ Analytics Service - 分析服务层
 - 使用 Supabase-py v2 客户端执行 RPC 和 View 查询
 - 所有数据库聚合逻辑在 PostgreSQL 中执行，Python 层仅做数据转发
 - 遵循章程: 核心计算逻辑放在 SQL 层，服务层保持简单
+- journal scope 下的 KPI/趋势/流水线/决定分布/地理分布统一读取 analytics_monthly_facts 月度汇总（一次读取、短缓存共享），
+  汇总表未迁移时退回一次 manuscripts 实时扫描
 """
 
+import logging
 import os
-from datetime import date, datetime, timezone
+from datetime import datetime, timezone
+from threading import Lock
+from time import monotonic
 from typing import Literal, Optional, cast
 
 from supabase import Client, create_client
 
+from app.core.short_ttl_cache import ShortTTLCache
+from app.lib.supabase_pool import get_pooled_client
 from app.models.analytics import (
     DecisionData,
     EditorEfficiencyItem,
@@ -24,20 +31,44 @@ from app.models.analytics import (
     StageDurationItem,
     TrendData,
 )
+from app.services.analytics_rollups import (
+    AnalyticsRollup,
+    fetch_live_rollup,
+    fetch_rollup,
+    is_missing_facts_table_error,
+)
+
+logger = logging.getLogger("scholarflow.analytics")
 
 StageName = Literal["pre_check", "under_review", "decision", "production"]
 
 
+# 中文注释: 同一 scope 的 /summary、/trends、/geo、/export 共享一次汇总读取。
+_rollup_cache = ShortTTLCache[AnalyticsRollup](max_entries=128)
+# 中文注释: 汇总表缺失（未迁移）后在该时间窗内直接走实时扫描，避免每次先失败一次。
+_FACTS_RETRY_AFTER_SEC = 300.0
+_facts_lock = Lock()
+_facts_unavailable_until = 0.0
+
+
+def _rollup_cache_ttl_sec() -> float:
+    raw = str(os.getenv("ANALYTICS_ROLLUP_CACHE_TTL_SEC", "30") or "30").strip()
+    try:
+        return max(float(raw), 0.0)
+    except Exception:
+        return 30.0
+
+
 def get_supabase_client() -> Client:
     """
     获取 Supabase 客户端实例
-    中文注释: 使用环境变量配置，确保安全
+    中文注释: 使用环境变量配置，确保安全；同一 (url, key) 进程内复用并共享连接池
     """
     url = os.environ.get("SUPABASE_URL", "")
     key = os.environ.get("SUPABASE_SERVICE_ROLE_KEY", "")
     if not url or not key:
         raise ValueError("SUPABASE_URL 和 SUPABASE_SERVICE_ROLE_KEY 环境变量必须设置")
-    return create_client(url, key)
+    return get_pooled_client(url, key, factory=create_client)
 
 
 class AnalyticsService:
@@ -101,9 +132,32 @@ class AnalyticsService:
         except Exception:
             return None
 
-    @staticmethod
-    def _month_bucket(dt: datetime) -> date:
-        return date(dt.year, dt.month, 1)
+    def _scoped_rollup(self, scope_ids: list[str]) -> AnalyticsRollup:
+        """
+        读取 scope 内的月度事实汇总（短缓存）；汇总表不可用时退回一次实时扫描。
+        """
+        global _facts_unavailable_until
+        cache_key = ",".join(sorted(scope_ids))
+        cached = _rollup_cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+        with _facts_lock:
+            use_facts = monotonic() >= _facts_unavailable_until
+        rollup: AnalyticsRollup | None = None
+        if use_facts:
+            try:
+                rollup = fetch_rollup(self.client, scope_ids)
+            except Exception as e:
+                if not is_missing_facts_table_error(e):
+                    raise
+                with _facts_lock:
+                    _facts_unavailable_until = monotonic() + _FACTS_RETRY_AFTER_SEC
+                logger.warning("[Analytics] analytics_monthly_facts unavailable, using live aggregation: %s", e)
+        if rollup is None:
+            rollup = fetch_live_rollup(self.client, scope_ids)
+        _rollup_cache.set(cache_key, rollup, ttl_sec=_rollup_cache_ttl_sec())
+        return rollup
 
     async def get_kpi_summary(self, *, journal_ids: list[str] | None = None) -> KPISummary:
         """
@@ -150,65 +204,26 @@ class AnalyticsService:
         month_start = datetime(now.year, now.month, 1, tzinfo=timezone.utc)
         year_start = datetime(now.year, 1, 1, tzinfo=timezone.utc)
 
-        ms_resp = (
-            self.client.table("manuscripts")
-            .select("status,created_at,updated_at,journal_id")
-            .in_("journal_id", scope_ids)
-            .execute()
+        counts = self._scoped_rollup(scope_ids).kpi_counts(now=now)
+        apc_revenue_month, apc_revenue_year = self._scoped_apc_revenue(
+            scope_ids, month_start=month_start, year_start=year_start
         )
-        rows = ms_resp.data or []
-
-        new_submissions_month = 0
-        total_pending = 0
-        first_decision_deltas: list[float] = []
-        accepted_year = 0
-        rejected_year = 0
-
-        pending_statuses = {
-            "submitted",
-            "pre_check",
-            "under_review",
-            "revision",
-            "revision_requested",
-            "major_revision",
-            "minor_revision",
-            "resubmitted",
-            "decision",
-        }
-        accept_statuses = {"accepted", "approved", "published"}
-
-        for row in rows:
-            status = str(row.get("status") or "").strip().lower()
-            created_at = self._parse_dt(row.get("created_at"))
-            updated_at = self._parse_dt(row.get("updated_at"))
-
-            if created_at and created_at >= month_start:
-                new_submissions_month += 1
-            if status in pending_statuses:
-                total_pending += 1
-
-            if created_at and updated_at and updated_at > created_at:
-                delta_days = (updated_at - created_at).total_seconds() / 86400.0
-                if delta_days >= 0 and status in (accept_statuses | {"rejected", "major_revision", "minor_revision"}):
-                    first_decision_deltas.append(delta_days)
-
-            if created_at and created_at >= year_start:
-                if status in accept_statuses:
-                    accepted_year += 1
-                elif status == "rejected":
-                    rejected_year += 1
-
-        avg_first_decision_days = (
-            round(sum(first_decision_deltas) / len(first_decision_deltas), 1)
-            if first_decision_deltas
-            else 0.0
-        )
-        yearly_acceptance_rate = (
-            float(accepted_year) / float(accepted_year + rejected_year)
-            if (accepted_year + rejected_year) > 0
-            else 0.0
+        return KPISummary(
+            new_submissions_month=int(counts["new_submissions_month"]),
+            total_pending=int(counts["total_pending"]),
+            avg_first_decision_days=float(counts["avg_first_decision_days"]),
+            yearly_acceptance_rate=float(counts["yearly_acceptance_rate"]),
+            apc_revenue_month=float(round(apc_revenue_month, 2)),
+            apc_revenue_year=float(round(apc_revenue_year, 2)),
         )
 
+    def _scoped_apc_revenue(
+        self,
+        scope_ids: list[str],
+        *,
+        month_start: datetime,
+        year_start: datetime,
+    ) -> tuple[float, float]:
         apc_revenue_month = 0.0
         apc_revenue_year = 0.0
         try:
@@ -249,15 +264,7 @@ class AnalyticsService:
             # 中文注释: 发票统计失败时不阻断 KPI 主体，收入字段降级为 0。
             apc_revenue_month = 0.0
             apc_revenue_year = 0.0
-
-        return KPISummary(
-            new_submissions_month=new_submissions_month,
-            total_pending=total_pending,
-            avg_first_decision_days=float(avg_first_decision_days),
-            yearly_acceptance_rate=float(round(yearly_acceptance_rate, 4)),
-            apc_revenue_month=float(round(apc_revenue_month, 2)),
-            apc_revenue_year=float(round(apc_revenue_year, 2)),
-        )
+        return apc_revenue_month, apc_revenue_year
 
     async def get_submission_trends(self, *, journal_ids: list[str] | None = None) -> list[TrendData]:
         """
@@ -283,51 +290,7 @@ class AnalyticsService:
         if not scope_ids:
             return []
 
-        now = datetime.now(timezone.utc)
-        current_idx = now.year * 12 + now.month - 1
-        start_idx = current_idx - 11
-        start_year = start_idx // 12
-        start_month = start_idx % 12 + 1
-        start_dt = datetime(start_year, start_month, 1, tzinfo=timezone.utc)
-
-        response = (
-            self.client.table("manuscripts")
-            .select("created_at,status")
-            .in_("journal_id", scope_ids)
-            .gte("created_at", start_dt.isoformat())
-            .execute()
-        )
-        rows = response.data or []
-        acceptance_statuses = {"accepted", "approved", "published"}
-        buckets: dict[int, dict[str, int]] = {
-            idx: {"submission_count": 0, "acceptance_count": 0}
-            for idx in range(start_idx, current_idx + 1)
-        }
-
-        for row in rows:
-            created_at = self._parse_dt(row.get("created_at"))
-            if not created_at:
-                continue
-            idx = created_at.year * 12 + created_at.month - 1
-            if idx < start_idx or idx > current_idx:
-                continue
-            buckets[idx]["submission_count"] += 1
-            status = str(row.get("status") or "").strip().lower()
-            if status in acceptance_statuses:
-                buckets[idx]["acceptance_count"] += 1
-
-        out: list[TrendData] = []
-        for idx in range(start_idx, current_idx + 1):
-            year = idx // 12
-            month = idx % 12 + 1
-            out.append(
-                TrendData(
-                    month=date(year, month, 1),
-                    submission_count=int(buckets[idx]["submission_count"]),
-                    acceptance_count=int(buckets[idx]["acceptance_count"]),
-                )
-            )
-        return out
+        return self._scoped_rollup(scope_ids).trends()
 
     async def get_status_pipeline(self, *, journal_ids: list[str] | None = None) -> list[PipelineData]:
         """
@@ -352,40 +315,7 @@ class AnalyticsService:
         if not scope_ids:
             return []
 
-        response = (
-            self.client.table("manuscripts")
-            .select("status")
-            .in_("journal_id", scope_ids)
-            .execute()
-        )
-        rows = response.data or []
-        counters = {
-            "submitted": 0,
-            "under_review": 0,
-            "revision": 0,
-            "in_production": 0,
-        }
-        for row in rows:
-            status = str(row.get("status") or "").strip().lower()
-            if status in {"submitted", "pre_check"}:
-                counters["submitted"] += 1
-            elif status == "under_review":
-                counters["under_review"] += 1
-            elif status in {"revision", "revision_requested", "major_revision", "minor_revision", "resubmitted", "decision"}:
-                counters["revision"] += 1
-            elif status in {"in_production", "approved", "layout", "english_editing", "proofreading"}:
-                counters["in_production"] += 1
-
-        return [
-            PipelineData(stage=stage, count=count)
-            for stage, count in (
-                ("submitted", counters["submitted"]),
-                ("under_review", counters["under_review"]),
-                ("revision", counters["revision"]),
-                ("in_production", counters["in_production"]),
-            )
-            if count > 0
-        ]
+        return self._scoped_rollup(scope_ids).pipeline()
 
     async def get_decision_distribution(self, *, journal_ids: list[str] | None = None) -> list[DecisionData]:
         """
@@ -410,33 +340,7 @@ class AnalyticsService:
         if not scope_ids:
             return []
 
-        now = datetime.now(timezone.utc)
-        year_start = datetime(now.year, 1, 1, tzinfo=timezone.utc)
-        response = (
-            self.client.table("manuscripts")
-            .select("status,created_at")
-            .in_("journal_id", scope_ids)
-            .gte("created_at", year_start.isoformat())
-            .execute()
-        )
-        rows = response.data or []
-        counters = {"accepted": 0, "rejected": 0, "revision": 0, "desk_reject": 0}
-        for row in rows:
-            status = str(row.get("status") or "").strip().lower()
-            if status in {"accepted", "approved", "published"}:
-                counters["accepted"] += 1
-            elif status == "rejected":
-                counters["rejected"] += 1
-            elif status in {"revision", "revision_requested", "major_revision", "minor_revision", "resubmitted"}:
-                counters["revision"] += 1
-            elif status == "desk_reject":
-                counters["desk_reject"] += 1
-
-        return [
-            DecisionData(decision=decision, count=count)
-            for decision, count in counters.items()
-            if count > 0
-        ]
+        return self._scoped_rollup(scope_ids).decisions()
 
     async def get_author_geography(self, *, journal_ids: list[str] | None = None) -> list[GeoData]:
         """
@@ -461,54 +365,7 @@ class AnalyticsService:
         if not scope_ids:
             return []
 
-        ms_resp = (
-            self.client.table("manuscripts")
-            .select("author_id")
-            .in_("journal_id", scope_ids)
-            .execute()
-        )
-        ms_rows = ms_resp.data or []
-        if not ms_rows:
-            return []
-
-        author_ids = sorted(
-            {
-                str(row.get("author_id") or "").strip()
-                for row in ms_rows
-                if str(row.get("author_id") or "").strip()
-            }
-        )
-        if not author_ids:
-            return []
-
-        profile_resp = (
-            self.client.table("user_profiles")
-            .select("id,country")
-            .in_("id", author_ids)
-            .execute()
-        )
-        profile_rows = profile_resp.data or []
-        country_by_author = {
-            str(row.get("id") or ""): str(row.get("country") or "").strip()
-            for row in profile_rows
-            if str(row.get("id") or "").strip()
-        }
-
-        counts: dict[str, int] = {}
-        for row in ms_rows:
-            aid = str(row.get("author_id") or "").strip()
-            if not aid:
-                continue
-            country = country_by_author.get(aid, "")
-            if not country:
-                continue
-            counts[country] = counts.get(country, 0) + 1
-
-        ranked = sorted(counts.items(), key=lambda item: (-item[1], item[0]))[:10]
-        return [
-            GeoData(country=country, submission_count=count)
-            for country, count in ranked
-        ]
+        return self._scoped_rollup(scope_ids).geography()
 
     async def get_editor_efficiency_ranking(
         self,
@@ -628,6 +485,13 @@ class AnalyticsService:
         return out
 
 
+def reset_analytics_rollup_cache() -> None:
+    global _facts_unavailable_until
+    _rollup_cache.clear()
+    with _facts_lock:
+        _facts_unavailable_until = 0.0
+
+
 # 单例服务实例（可选，用于依赖注入）
 _analytics_service: Optional[AnalyticsService] = None
 
@@ -1,9 +1,31 @@
 import httpx
 import os
-from typing import Dict, Any, Optional
+import re
+import tempfile
+from dataclasses import dataclass
+from html import unescape
+from typing import Dict, Any, BinaryIO, Iterator, Optional, Sequence
 from lxml import etree
 from app.core.config import CrossrefConfig
 
+_RECORD_DIAGNOSTIC_RE = re.compile(
+    r"<record_diagnostic[^>]*\bstatus=[\"']([^\"']+)[\"'][^>]*>(.*?)</record_diagnostic>",
+    flags=re.IGNORECASE | re.DOTALL,
+)
+_DIAGNOSTIC_DOI_RE = re.compile(r"<doi[^>]*>(.*?)</doi>", flags=re.IGNORECASE | re.DOTALL)
+_DIAGNOSTIC_MSG_RE = re.compile(r"<msg[^>]*>(.*?)</msg>", flags=re.IGNORECASE | re.DOTALL)
+
+
+@dataclass
+class CrossrefDepositBatch:
+    batch_id: str
+    dois: list[str]
+    body: BinaryIO
+    size_bytes: int
+
+    def close(self) -> None:
+        self.body.close()
+
 
 class CrossrefClient:
     """
@@ -57,7 +79,107 @@ class CrossrefClient:
         root = etree.Element(f"{{{self.ns['default']}}}doi_batch", nsmap=self.ns)
 
         # 1. Head
-        head = etree.SubElement(root, "head")
+        root.append(self._build_head(batch_id))
+
+        # 2. Body
+        body = etree.SubElement(root, "body")
+        journal = etree.SubElement(body, "journal")
+        journal.append(self._build_journal_metadata())
+        journal.append(self._build_journal_article(article_data))
+
+        return etree.tostring(
+            root, pretty_print=True, xml_declaration=True, encoding="UTF-8"
+        )
+
+    def write_batch_xml(
+        self, fp: BinaryIO, articles: Sequence[Dict[str, Any] | etree._Element], batch_id: str
+    ) -> None:
+        """
+        把多篇文章写成一个 doi_batch（同一 journal 下多个 journal_article）。
+
+        中文注释:
+        - 用 lxml.etree.xmlfile 增量写入 fp，不在内存里拼整份文档；传入 dict 时逐篇构建、写完即丢。
+        - 结构与 generate_xml 单篇输出一致，Crossref 逐条处理 journal_article 并在结果里按 DOI 给出 record_diagnostic。
+        """
+        with etree.xmlfile(fp, encoding="UTF-8") as xf:
+            xf.write_declaration()
+            with xf.element(f"{{{self.ns['default']}}}doi_batch", nsmap=self.ns):
+                xf.write(self._build_head(batch_id), pretty_print=True)
+                with xf.element("body"):
+                    with xf.element("journal"):
+                        xf.write(self._build_journal_metadata(), pretty_print=True)
+                        for article in articles:
+                            element = article if isinstance(article, etree._Element) else self._build_journal_article(article)
+                            xf.write(element, pretty_print=True)
+
+    def iter_batch_deposits(
+        self,
+        articles: Sequence[Dict[str, Any]],
+        *,
+        batch_id_prefix: str,
+        max_records: int = 50,
+        max_bytes: int = 5 * 1024 * 1024,
+    ) -> Iterator["CrossrefDepositBatch"]:
+        """
+        按记录数/体积上限把待注册文章切成若干 doi_batch，逐个产出（body 为已写好的临时文件）。
+
+        中文注释:
+        - 单篇超过 max_bytes 时仍单独成批，避免死循环。
+        - 调用方用完 batch 后需 close()（临时文件超过 1MiB 才落盘）。
+        """
+        pending: list[tuple[str, etree._Element]] = []
+        pending_bytes = 0
+        index = 0
+
+        def _flush() -> CrossrefDepositBatch:
+            nonlocal index
+            index += 1
+            batch_id = f"{batch_id_prefix}-{index:03d}"
+            body = tempfile.SpooledTemporaryFile(max_size=1024 * 1024)
+            self.write_batch_xml(body, [element for _, element in pending], batch_id)
+            size = body.tell()
+            body.seek(0)
+            return CrossrefDepositBatch(
+                batch_id=batch_id,
+                dois=[doi for doi, _ in pending],
+                body=body,
+                size_bytes=size,
+            )
+
+        for article in articles:
+            element = self._build_journal_article(article)
+            element_bytes = len(etree.tostring(element))
+            if pending and (len(pending) >= max_records or pending_bytes + element_bytes > max_bytes):
+                yield _flush()
+                pending, pending_bytes = [], 0
+            pending.append((str(article.get("doi") or ""), element))
+            pending_bytes += element_bytes
+        if pending:
+            yield _flush()
+
+    @staticmethod
+    def parse_deposit_results(response_body: str) -> Dict[str, tuple[bool, str]]:
+        """
+        解析 Crossref 处理结果里的 record_diagnostic，返回 {doi: (成功与否, 消息)}。
+
+        中文注释:
+        - 同步返回只有“已接收”回执、没有逐条诊断时返回空 dict，调用方按整批成功处理（与单篇投递语义一致）。
+        - Warning 视为成功（DOI 已注册，只是元数据有提示）。
+        """
+        results: Dict[str, tuple[bool, str]] = {}
+        for matched in _RECORD_DIAGNOSTIC_RE.finditer(str(response_body or "")):
+            status = matched.group(1).strip().lower()
+            inner = matched.group(2)
+            doi_match = _DIAGNOSTIC_DOI_RE.search(inner)
+            if not doi_match:
+                continue
+            msg_match = _DIAGNOSTIC_MSG_RE.search(inner)
+            message = unescape(msg_match.group(1).strip()) if msg_match else ""
+            results[unescape(doi_match.group(1).strip())] = (status != "failure", message)
+        return results
+
+    def _build_head(self, batch_id: str) -> etree._Element:
+        head = etree.Element("head")
         etree.SubElement(head, "doi_batch_id").text = batch_id
         etree.SubElement(head, "timestamp").text = str(
             int(os.times()[4] * 100)
@@ -70,24 +192,22 @@ class CrossrefClient:
         )
 
         etree.SubElement(head, "registrant").text = "ScholarFlow"
+        return head
 
-        # 2. Body
-        body = etree.SubElement(root, "body")
-        journal = etree.SubElement(body, "journal")
-
+    def _build_journal_metadata(self) -> etree._Element:
         # Journal Metadata
-        j_meta = etree.SubElement(journal, "journal_metadata")
+        j_meta = etree.Element("journal_metadata")
         etree.SubElement(j_meta, "full_title").text = (
             self.deposit_config.journal_title if self.deposit_config else ""
         )
         if self.deposit_config and self.deposit_config.journal_issn:
             issn = etree.SubElement(j_meta, "issn")
             issn.text = self.deposit_config.journal_issn
+        return j_meta
 
+    def _build_journal_article(self, article_data: Dict[str, Any]) -> etree._Element:
         # Journal Article
-        j_article = etree.SubElement(
-            journal, "journal_article", publication_type="full_text"
-        )
+        j_article = etree.Element("journal_article", publication_type="full_text")
 
         # Titles
         titles = etree.SubElement(j_article, "titles")
@@ -144,16 +264,15 @@ class CrossrefClient:
         doi_data = etree.SubElement(j_article, "doi_data")
         etree.SubElement(doi_data, "doi").text = article_data.get("doi", "")
         etree.SubElement(doi_data, "resource").text = article_data.get("url", "")
-
-        return etree.tostring(
-            root, pretty_print=True, xml_declaration=True, encoding="UTF-8"
-        )
+        return j_article
 
     async def submit_deposit(
-        self, xml_content: bytes, file_name: str = "crossref_submission.xml"
+        self, xml_content: bytes | BinaryIO, file_name: str = "crossref_submission.xml"
     ) -> str:
         """
         Submit XML to Crossref API
+
+        中文注释: xml_content 可以是 bytes，也可以是已定位到开头的文件对象（批量投递的临时文件，按块流式上传）。
         """
         if not self.deposit_config:
             raise ValueError("Crossref deposit configuration missing")
@@ -0,0 +1,198 @@
+"""
+Dashboard 计数服务（/stats/editor、/stats/author）。
+
+中文注释:
+- 旧实现把 pre_check / under_review / decision 的全部 id（作者侧为全部 status 行）拉回来再 len()，
+  payload 随稿件总量线性增长。
+- 这里优先调用分组聚合 RPC `manuscript_status_counts`（一次往返）；RPC 未迁移时退回 count="exact" + head 查询
+  （只返回 Content-Range，不返回行）。
+- 结果按“期刊 scope / 作者”做短 TTL 缓存（STATS_COUNTER_TTL_SEC，默认 30s）；
+  EditorialService.update_status 与投稿创建会主动失效，其他直接写 status 的旧路径由 TTL 兜底。
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+from threading import Lock
+from time import monotonic
+from typing import Any, Iterable, Optional
+
+from app.core.short_ttl_cache import ShortTTLCache
+
+logger = logging.getLogger("scholarflow.dashboard_counters")
+
+EDITOR_COUNTER_STATUSES = {
+    "pending_assignment": ("pre_check",),
+    "active_review_cycles": ("under_review",),
+    "overdue_reviews": ("decision",),
+}
+AUTHOR_REVISION_STATUSES = (
+    "revision_before_review",
+    "major_revision",
+    "minor_revision",
+    "revision_requested",
+)
+AUTHOR_COUNTER_STATUSES = {
+    "published": ("published",),
+    "under_review": ("under_review",),
+    "revision_requested": AUTHOR_REVISION_STATUSES,
+    "rejected": ("rejected",),
+}
+
+# 中文注释: RPC 调用失败（未迁移/权限）后在该时间窗内直接走 head 查询，避免每次请求都先失败一次。
+_RPC_RETRY_AFTER_SEC = 300.0
+
+_counter_cache = ShortTTLCache[dict[str, int]](max_entries=512)
+_rpc_lock = Lock()
+_rpc_unavailable_until = 0.0
+
+
+def _ttl_sec() -> float:
+    raw = str(os.getenv("STATS_COUNTER_TTL_SEC", "30") or "30").strip()
+    try:
+        return max(float(raw), 0.0)
+    except Exception:
+        return 30.0
+
+
+def _rpc_available() -> bool:
+    with _rpc_lock:
+        return monotonic() >= _rpc_unavailable_until
+
+
+def _mark_rpc_unavailable(error: Exception) -> None:
+    global _rpc_unavailable_until
+    with _rpc_lock:
+        _rpc_unavailable_until = monotonic() + _RPC_RETRY_AFTER_SEC
+    logger.warning("[DashboardCounters] manuscript_status_counts rpc unavailable, using head counts: %s", error)
+
+
+def scope_cache_key(journal_ids: Optional[Iterable[str]]) -> str:
+    if journal_ids is None:
+        return "editor:*"
+    return "editor:" + ",".join(sorted(str(j) for j in journal_ids))
+
+
+def invalidate_dashboard_counters(*, author_id: Optional[str] = None) -> None:
+    """
+    稿件状态变化/新投稿后调用：编辑侧所有 scope 失效（条目很少），作者侧仅失效对应作者。
+    """
+    _counter_cache.delete_prefix("editor:")
+    if author_id:
+        _counter_cache.delete(f"author:{author_id}")
+    else:
+        _counter_cache.delete_prefix("author:")
+
+
+def reset_dashboard_counters() -> None:
+    global _rpc_unavailable_until
+    _counter_cache.clear()
+    with _rpc_lock:
+        _rpc_unavailable_until = 0.0
+
+
+class DashboardCounterService:
+    def __init__(self, client: Any) -> None:
+        self.client = client
+
+    def _rpc_status_counts(
+        self,
+        *,
+        author_id: Optional[str],
+        journal_ids: Optional[list[str]],
+        statuses: Optional[list[str]],
+    ) -> Optional[dict[str, int]]:
+        if not _rpc_available():
+            return None
+        try:
+            resp = self.client.rpc(
+                "manuscript_status_counts",
+                {
+                    "p_author_id": author_id,
+                    "p_journal_ids": journal_ids,
+                    "p_statuses": statuses,
+                },
+            ).execute()
+        except Exception as e:
+            _mark_rpc_unavailable(e)
+            return None
+        out: dict[str, int] = {}
+        for row in getattr(resp, "data", None) or []:
+            status = str(row.get("status") or "")
+            try:
+                out[status] = out.get(status, 0) + int(row.get("total") or 0)
+            except Exception:
+                continue
+        return out
+
+    def _head_count(
+        self,
+        *,
+        author_id: Optional[str],
+        journal_ids: Optional[list[str]],
+        statuses: Optional[tuple[str, ...]],
+    ) -> int:
+        query = self.client.table("manuscripts").select("id", count="exact", head=True)
+        if author_id:
+            query = query.eq("author_id", author_id)
+        if journal_ids is not None:
+            query = query.in_("journal_id", journal_ids)
+        if statuses:
+            query = query.eq("status", statuses[0]) if len(statuses) == 1 else query.in_("status", list(statuses))
+        resp = query.execute()
+        return int(getattr(resp, "count", None) or 0)
+
+    def _grouped_counts(
+        self,
+        groups: dict[str, tuple[str, ...]],
+        *,
+        author_id: Optional[str] = None,
+        journal_ids: Optional[list[str]] = None,
+        include_total: bool = False,
+    ) -> dict[str, int]:
+        wanted = sorted({s for statuses in groups.values() for s in statuses})
+        by_status = self._rpc_status_counts(
+            author_id=author_id,
+            journal_ids=journal_ids,
+            # 中文注释: 需要总数时不按状态过滤，由 RPC 一次返回全部状态分组。
+            statuses=None if include_total else wanted,
+        )
+        if by_status is not None:
+            out = {key: sum(by_status.get(s, 0) for s in statuses) for key, statuses in groups.items()}
+            if include_total:
+                out["total"] = sum(by_status.values())
+            return out
+        out = {
+            key: self._head_count(author_id=author_id, journal_ids=journal_ids, statuses=statuses)
+            for key, statuses in groups.items()
+        }
+        if include_total:
+            out["total"] = self._head_count(author_id=author_id, journal_ids=journal_ids, statuses=None)
+        return out
+
+    def editor_counts(self, *, journal_ids: Optional[Iterable[str]] = None) -> dict[str, int]:
+        """
+        journal_ids=None 表示不限期刊（admin / 未开启 scope）；空集合表示无可见期刊，直接返回 0。
+        """
+        scope = None if journal_ids is None else sorted({str(j) for j in journal_ids})
+        if scope is not None and not scope:
+            return {key: 0 for key in EDITOR_COUNTER_STATUSES}
+        cache_key = scope_cache_key(scope)
+        cached = _counter_cache.get(cache_key)
+        if cached is not None:
+            return dict(cached)
+        counts = self._grouped_counts(EDITOR_COUNTER_STATUSES, journal_ids=scope)
+        _counter_cache.set(cache_key, counts, ttl_sec=_ttl_sec())
+        return dict(counts)
+
+    def author_counts(self, author_id: str) -> dict[str, int]:
+        cache_key = f"author:{author_id}"
+        cached = _counter_cache.get(cache_key)
+        if cached is not None:
+            return dict(cached)
+        counts = self._grouped_counts(
+            AUTHOR_COUNTER_STATUSES, author_id=str(author_id), include_total=True
+        )
+        _counter_cache.set(cache_key, counts, ttl_sec=_ttl_sec())
+        return dict(counts)
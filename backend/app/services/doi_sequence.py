@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+from threading import Lock
+from time import monotonic
+from typing import Any, Optional
+
+from app.core.config import env_int
+from app.services.doi_service_common import logger, looks_like_missing_rpc
+
+_RESERVE_RPC = "reserve_doi_sequence_block"
+# 中文注释: RPC 缺失（未迁移）后在该时间窗内直接返回 None 走降级路径，避免每次分配都先失败一次。
+_RPC_RETRY_AFTER_SEC = 300.0
+# 中文注释: 与 reserve_doi_sequence_block 内 LEAST(p_count, 10000) 保持一致；超过上限时数据库只预留 10000 个号，
+# 若 Python 仍按原 block_size 推算区间起点，会占用未预留的序号，导致多实例发出重复 DOI。
+_MAX_BLOCK_SIZE = 10000
+
+
+class DOISequenceAllocator:
+    """
+    DOI 序号分配器（进程内单例）。
+
+    中文注释:
+    - 每年的序号由数据库 doi_sequences 计数行发放：reserve_doi_sequence_block 一次原子预留 block_size 个号，
+      行锁保证多个 worker/进程拿到的区间互不重叠。
+    - 进程内缓存当前区间，区间用完才再访问数据库；一次 RPC 可支撑 block_size 次注册。
+    - 进程退出时未用完的号直接作废，序号允许有空洞，但不会重复。
+    - RPC 缺失时 next() 返回 None，由调用方走旧的计数降级；其余数据库错误直接抛出，不再兜底时间戳。
+    """
+
+    def __init__(self, *, block_size: int | None = None):
+        self.block_size = min(
+            max(block_size or env_int("DOI_SEQUENCE_BLOCK_SIZE", 50, maximum=_MAX_BLOCK_SIZE), 1), _MAX_BLOCK_SIZE
+        )
+        self._blocks: dict[int, tuple[int, int]] = {}
+        self._lock = Lock()
+        self._rpc_unavailable_until = 0.0
+        self.reservations_total = 0
+
+    def next(self, client: Any, year: int) -> Optional[int]:
+        with self._lock:
+            current, last = self._blocks.get(year, (1, 0))
+            if current > last:
+                if monotonic() < self._rpc_unavailable_until:
+                    return None
+                reserved = self._reserve(client, year)
+                if reserved is None:
+                    return None
+                current, last = reserved
+            self._blocks[year] = (current + 1, last)
+            return current
+
+    def _reserve(self, client: Any, year: int) -> Optional[tuple[int, int]]:
+        try:
+            resp = client.rpc(_RESERVE_RPC, {"p_year": int(year), "p_count": self.block_size}).execute()
+        except Exception as e:
+            if looks_like_missing_rpc(str(e), _RESERVE_RPC):
+                self._rpc_unavailable_until = monotonic() + _RPC_RETRY_AFTER_SEC
+                logger.warning("[DOISequence] %s rpc unavailable, falling back to row count: %s", _RESERVE_RPC, e)
+                return None
+            raise
+        last = _coerce_block_end(getattr(resp, "data", None))
+        if last is None or last < self.block_size:
+            raise RuntimeError(f"{_RESERVE_RPC} returned an invalid block end: {getattr(resp, 'data', None)!r}")
+        self.reservations_total += 1
+        return last - self.block_size + 1, last
+
+    def clear(self) -> None:
+        with self._lock:
+            self._blocks.clear()
+            self._rpc_unavailable_until = 0.0
+            self.reservations_total = 0
+
+
+def _coerce_block_end(data: Any) -> Optional[int]:
+    # 中文注释: PostgREST 对标量函数返回裸值；部分客户端版本会包成 [{"reserve_doi_sequence_block": n}]。
+    if isinstance(data, list):
+        data = data[0] if data else None
+    if isinstance(data, dict):
+        data = data.get(_RESERVE_RPC)
+    try:
+        return int(data) if data is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+_allocator: Optional[DOISequenceAllocator] = None
+_allocator_lock = Lock()
+
+
+def get_doi_sequence_allocator() -> DOISequenceAllocator:
+    global _allocator
+    with _allocator_lock:
+        if _allocator is None:
+            _allocator = DOISequenceAllocator()
+        return _allocator
+
+
+def reset_doi_sequence_allocator() -> None:
+    global _allocator
+    with _allocator_lock:
+        _allocator = None
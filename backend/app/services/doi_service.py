@@ -1,9 +1,11 @@
 from __future__ import annotations
 
-from datetime import datetime, timezone
+import os
+import socket
 from typing import Any, Optional
+from uuid import uuid4
 
-from app.core.config import CrossrefConfig
+from app.core.config import CrossrefConfig, env_int
 from app.lib.api_client import supabase_admin
 from app.services.crossref_client import CrossrefClient
 from app.services.doi_service_data import DOIServiceDataMixin
@@ -17,6 +19,7 @@ class DOIService(DOIServiceDataMixin, DOIServiceWorkflowMixin):
     中文注释:
     - 使用数据库队列（doi_tasks）实现“异步可重试”。
     - 落库 `doi_registrations` + `doi_audit_log`，保证可追踪。
+    - 领取任务走 claim_doi_tasks RPC（SKIP LOCKED 批量领取），worker_id 带主机名/进程号，多 worker 的 locked_by 互不相同。
     """
 
     def __init__(
@@ -29,7 +32,14 @@ class DOIService(DOIServiceDataMixin, DOIServiceWorkflowMixin):
         self.config = config
         self.client = client or supabase_admin
         self.crossref = crossref_client or CrossrefClient(config)
-        self.worker_id = f"doi-service-{int(datetime.now(timezone.utc).timestamp())}"
+        self.worker_id = f"doi-{socket.gethostname()}-{os.getpid()}-{uuid4().hex[:6]}"
+        # 中文注释: 单批任务的并发注册数；processing 超过 lock_timeout_sec 未完成视为 worker 崩溃，由下一次领取回收。
+        self.concurrency = env_int("DOI_TASK_CONCURRENCY", 4)
+        self.lock_timeout_sec = env_int("DOI_TASK_LOCK_TIMEOUT_SEC", 600, minimum=30)
+        # 中文注释: batch 模式下一批任务合并成 doi_batch 投递（单批记录数/字节数上限），single 为逐条投递。
+        self.deposit_mode = (os.environ.get("DOI_DEPOSIT_MODE") or "single").strip().lower()
+        self.deposit_batch_max_records = env_int("DOI_DEPOSIT_BATCH_MAX_RECORDS", 50)
+        self.deposit_batch_max_bytes = env_int("DOI_DEPOSIT_BATCH_MAX_BYTES", 5 * 1024 * 1024, minimum=64 * 1024)
 
     def generate_doi(self, year: int, sequence: int) -> str:
         """
@@ -35,3 +35,13 @@ def looks_like_missing_schema(error_text: str) -> bool:
         or "relation" in lowered
         or "undefinedtable" in lowered
     )
+
+
+def looks_like_missing_rpc(error_text: str, function_name: str) -> bool:
+    lowered = (error_text or "").lower()
+    return function_name.lower() in lowered and (
+        "pgrst202" in lowered
+        or "could not find the function" in lowered
+        or "does not exist" in lowered
+        or "schema cache" in lowered
+    )
@@ -20,6 +20,7 @@ from app.services.doi_service_common import (
     looks_like_single_no_rows,
     now_iso,
 )
+from app.services.doi_sequence import get_doi_sequence_allocator
 
 
 class DOIServiceDataMixin:
@@ -214,25 +215,29 @@ class DOIServiceDataMixin:
         return None
 
     def _next_sequence_for_year(self, year: int) -> int:
+        # 中文注释: 正常走 doi_sequences 批量预留（进程内缓存区间，O(1) 且多 worker 不重号）。
+        sequence = get_doi_sequence_allocator().next(self.client, year)
+        if sequence is not None:
+            return sequence
+        return self._count_sequence_for_year(year)
+
+    def _count_sequence_for_year(self, year: int) -> int:
+        # 中文注释: 仅在 reserve_doi_sequence_block 未迁移时使用；并发下可能撞 doi 唯一约束，由插入处的幂等回读兜底。
         start = f"{year}-01-01T00:00:00+00:00"
         end = f"{year + 1}-01-01T00:00:00+00:00"
-        try:
-            resp = (
-                self.client.table("doi_registrations")
-                .select("id", count="exact")
-                .gte("created_at", start)
-                .lt("created_at", end)
-                .limit(1)
-                .execute()
-            )
-            count = getattr(resp, "count", None)
-            if isinstance(count, int):
-                return count + 1
-            data = getattr(resp, "data", None) or []
-            return len(data) + 1
-        except Exception:
-            # 中文注释: 计数失败时兜底时间戳，保证不会阻塞注册流程。
-            return int(datetime.now(timezone.utc).timestamp()) % 100000
+        resp = (
+            self.client.table("doi_registrations")
+            .select("id", count="exact")
+            .gte("created_at", start)
+            .lt("created_at", end)
+            .limit(1)
+            .execute()
+        )
+        count = getattr(resp, "count", None)
+        if isinstance(count, int):
+            return count + 1
+        data = getattr(resp, "data", None) or []
+        return len(data) + 1
 
     def _log_audit(
         self,
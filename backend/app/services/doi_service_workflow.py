@@ -1,7 +1,8 @@
 from __future__ import annotations
 
+import asyncio
 from datetime import datetime, timedelta, timezone
-from typing import Any, Optional
+from typing import Any, Optional, Sequence
 from uuid import UUID
 
 from fastapi import HTTPException
@@ -16,11 +17,14 @@ from app.models.doi import (
 )
 from app.services.doi_service_common import (
     logger,
+    looks_like_missing_rpc,
     looks_like_missing_schema,
     now_iso,
     truncate,
 )
 
+_CLAIM_RPC = "claim_doi_tasks"
+
 
 class DOIServiceWorkflowMixin:
     async def create_registration(self, article_id: UUID) -> DOIRegistration:
@@ -153,6 +157,73 @@ class DOIServiceWorkflowMixin:
 
         return DOITaskList(items=items, total=total, limit=limit, offset=offset)
 
+    def claim_tasks(self, limit: int) -> list[dict[str, Any]]:
+        """
+        领取最多 limit 个到期任务（状态置为 processing，attempts + 1）。
+
+        中文注释:
+        - 优先走 claim_doi_tasks RPC：一次往返、FOR UPDATE SKIP LOCKED，多 worker 并发领取互不重叠，并顺带回收过期锁。
+        - RPC 未迁移时降级为旧的逐条 select + 条件 update（同样先回收过期锁），结果语义一致。
+        """
+        limit = max(1, int(limit))
+        if getattr(self, "_claim_rpc_available", True):
+            try:
+                resp = self.client.rpc(
+                    _CLAIM_RPC,
+                    {
+                        "p_worker": self.worker_id,
+                        "p_limit": limit,
+                        "p_stale_after_sec": self.lock_timeout_sec,
+                    },
+                ).execute()
+                return list(getattr(resp, "data", None) or [])
+            except Exception as e:
+                if not looks_like_missing_rpc(str(e), _CLAIM_RPC):
+                    raise
+                logger.warning("[DOI] %s RPC missing, falling back to per-row claim: %s", _CLAIM_RPC, e)
+                self._claim_rpc_available = False
+
+        self._reap_stale_tasks()
+        claimed: list[dict[str, Any]] = []
+        for _ in range(limit):
+            task = self._claim_next_task()
+            if not task:
+                break
+            claimed.append(task)
+        return claimed
+
+    def _reap_stale_tasks(self) -> None:
+        # 中文注释: 与 reap_stale_doi_tasks 一致：attempts 用尽的过期任务标记 failed，其余放回 pending。
+        # PostgREST 不能比较两列，先取出过期任务再按 attempts 分组更新；更新仍带状态/锁时间条件，避免覆盖刚被续上的任务。
+        cutoff = (datetime.now(timezone.utc) - timedelta(seconds=self.lock_timeout_sec)).isoformat()
+        try:
+            resp = (
+                self.client.table("doi_tasks")
+                .select("id,attempts,max_attempts")
+                .eq("status", DOITaskStatus.PROCESSING.value)
+                .lt("locked_at", cutoff)
+                .execute()
+            )
+            exhausted: list[str] = []
+            retry: list[str] = []
+            for task in getattr(resp, "data", None) or []:
+                attempts = int(task.get("attempts") or 0)
+                max_attempts = int(task.get("max_attempts") or 4)
+                (exhausted if attempts >= max_attempts else retry).append(str(task["id"]))
+            for status, ids in ((DOITaskStatus.FAILED, exhausted), (DOITaskStatus.PENDING, retry)):
+                if not ids:
+                    continue
+                self.client.table("doi_tasks").update(
+                    {
+                        "status": status.value,
+                        "locked_at": None,
+                        "locked_by": None,
+                        "last_error": "stale lock reaped",
+                    }
+                ).in_("id", ids).eq("status", DOITaskStatus.PROCESSING.value).lt("locked_at", cutoff).execute()
+        except Exception as e:
+            logger.warning("[DOI] stale task reaping failed (ignored): %s", e)
+
     def _claim_next_task(self) -> Optional[dict[str, Any]]:
         now = now_iso()
         try:
@@ -225,63 +296,235 @@ class DOIServiceWorkflowMixin:
             }
         ).eq("id", task["id"]).execute()
 
-    async def process_due_tasks(self, *, limit: int = 5) -> dict[str, Any]:
-        processed: list[dict[str, Any]] = []
+    async def process_due_tasks(self, *, limit: int = 5, concurrency: int | None = None) -> dict[str, Any]:
+        """
+        领取一批到期任务并执行（internal cron 入口；常驻 worker 见 app/core/doi_worker.py）。
+        """
+        tasks = self.claim_tasks(max(1, min(limit, 50)))
+        if not tasks:
+            return {"processed_count": 0, "items": []}
 
-        for _ in range(max(1, min(limit, 50))):
-            task = self._claim_next_task()
-            if not task:
-                break
+        processed = await self.run_tasks(tasks, concurrency=concurrency)
+        return {
+            "processed_count": len(processed),
+            "items": processed,
+        }
 
-            task_id = str(task.get("id") or "")
-            try:
-                task_type = str(task.get("task_type") or "")
-                if task_type != DOITaskType.REGISTER.value:
-                    raise RuntimeError(f"Unsupported DOI task_type: {task_type}")
+    async def run_tasks(self, tasks: Sequence[dict[str, Any]], *, concurrency: int | None = None) -> list[dict[str, Any]]:
+        """
+        执行一批已领取的任务。
 
-                registration_id = str(task.get("registration_id") or "").strip()
-                if not registration_id:
-                    raise RuntimeError("Missing registration_id")
+        中文注释:
+        - deposit_mode=batch：整批打包成尽量少的 Crossref doi_batch 投递（见 register_dois_batch），
+          按 DOI 逐条结算，只有失败的任务按退避重新入队。
+        - deposit_mode=single：每个任务单独投递，有界并发（concurrency，缺省 DOI_TASK_CONCURRENCY）。
+        """
+        if self.deposit_mode == "batch":
+            return await self._run_tasks_batched(tasks)
 
-                await self.register_doi(UUID(registration_id))
+        semaphore = asyncio.Semaphore(max(1, int(concurrency or self.concurrency)))
 
-                self.client.table("doi_tasks").update(
-                    {
-                        "status": DOITaskStatus.COMPLETED.value,
-                        "completed_at": now_iso(),
-                        "locked_at": None,
-                        "locked_by": None,
-                        "last_error": None,
-                    }
-                ).eq("id", task_id).execute()
+        async def _bounded(task: dict[str, Any]) -> dict[str, Any]:
+            async with semaphore:
+                return await self.run_task(task)
+
+        return list(await asyncio.gather(*(_bounded(task) for task in tasks)))
+
+    async def run_task(self, task: dict[str, Any]) -> dict[str, Any]:
+        """
+        执行一个已领取的任务；成功标记 completed，失败按退避策略放回队列或标记 failed。
+        """
+        task_id = str(task.get("id") or "")
+        try:
+            registration_id = self._task_registration_id(task)
+            await self.register_doi(UUID(registration_id))
+            self._mark_task_completed(task_id)
+            return {"task_id": task_id, "status": "completed"}
+        except Exception as e:
+            await self._handle_task_failure(task, str(e))
+            return {
+                "task_id": task_id,
+                "status": "failed",
+                "error": truncate(str(e), 300),
+            }
 
-                processed.append({"task_id": task_id, "status": "completed"})
+    async def _run_tasks_batched(self, tasks: Sequence[dict[str, Any]]) -> list[dict[str, Any]]:
+        items: dict[str, dict[str, Any]] = {}
+        runnable: list[tuple[dict[str, Any], str]] = []
+        for task in tasks:
+            try:
+                runnable.append((task, self._task_registration_id(task)))
             except Exception as e:
                 await self._handle_task_failure(task, str(e))
-                processed.append(
-                    {
-                        "task_id": task_id,
-                        "status": "failed",
-                        "error": truncate(str(e), 300),
-                    }
-                )
+                items[str(task.get("id") or "")] = {
+                    "task_id": str(task.get("id") or ""),
+                    "status": "failed",
+                    "error": truncate(str(e), 300),
+                }
 
-        return {
-            "processed_count": len(processed),
-            "items": processed,
-        }
+        errors = await self.register_dois_batch([registration_id for _, registration_id in runnable]) if runnable else {}
+        for task, registration_id in runnable:
+            task_id = str(task.get("id") or "")
+            error = errors.get(registration_id, "DOI registration was not attempted")
+            if error is None:
+                self._mark_task_completed(task_id)
+                items[task_id] = {"task_id": task_id, "status": "completed"}
+            else:
+                await self._handle_task_failure(task, error)
+                items[task_id] = {"task_id": task_id, "status": "failed", "error": truncate(error, 300)}
+        return [items[str(task.get("id") or "")] for task in tasks]
+
+    def _task_registration_id(self, task: dict[str, Any]) -> str:
+        task_type = str(task.get("task_type") or "")
+        if task_type != DOITaskType.REGISTER.value:
+            raise RuntimeError(f"Unsupported DOI task_type: {task_type}")
+
+        registration_id = str(task.get("registration_id") or "").strip()
+        if not registration_id:
+            raise RuntimeError("Missing registration_id")
+        return registration_id
+
+    def _mark_task_completed(self, task_id: str) -> None:
+        self.client.table("doi_tasks").update(
+            {
+                "status": DOITaskStatus.COMPLETED.value,
+                "completed_at": now_iso(),
+                "locked_at": None,
+                "locked_by": None,
+                "last_error": None,
+            }
+        ).eq("id", task_id).execute()
 
     async def register_doi(self, registration_id: UUID):
         """
         执行单条 DOI 注册任务（由 Worker/cron 调用）。
         """
         reg_id = str(registration_id)
+        registration, manuscript, doi = self._prepare_deposit(reg_id)
+        if manuscript is None:
+            return self._to_registration_model(registration)
+
+        manuscript_id = str(registration.get("article_id") or "").strip()
+        article_data = self._build_crossref_article_data(manuscript, doi)
+        batch_id = self._create_batch_id(manuscript_id)
+        xml_content = self.crossref.generate_xml(article_data, batch_id)
+
+        try:
+            response_body = await self.crossref.submit_deposit(
+                xml_content,
+                file_name=f"doi-{batch_id}.xml",
+            )
+        except Exception as e:
+            self._fail_registration(
+                reg_id,
+                truncate(str(e)),
+                response_status=500,
+                request_payload={
+                    "article_id": manuscript_id,
+                    "doi": doi,
+                    "batch_id": batch_id,
+                },
+            )
+            raise
+
+        registered = self._complete_registration(
+            reg_id,
+            manuscript_id=manuscript_id,
+            doi=doi,
+            batch_id=batch_id,
+            crossref_batch_id=self._extract_crossref_batch_id(response_body) or batch_id,
+            response_body=response_body,
+        )
+        return self._to_registration_model(registered)
+
+    async def register_dois_batch(self, registration_ids: Sequence[str]) -> dict[str, str | None]:
+        """
+        把多条注册打包成尽量少的 Crossref doi_batch 投递，返回 {registration_id: 错误信息 | None}。
+
+        中文注释:
+        - 单个 doi_batch 受 DOI_DEPOSIT_BATCH_MAX_RECORDS / DOI_DEPOSIT_BATCH_MAX_BYTES 限制，整期上线通常 1 次投递即可。
+        - 回执带 record_diagnostic 时按 DOI 逐条结算：失败的只标记该条 failed，成功的照常 registered；
+          没有逐条诊断时视为整批受理（与单篇投递的语义一致）。
+        - 整批 HTTP 失败时该批所有注册都记失败，由任务队列按退避重试。
+        """
+        results: dict[str, str | None] = {}
+        prepared: list[tuple[str, str, str, dict[str, Any]]] = []
+        for reg_id in registration_ids:
+            try:
+                registration, manuscript, doi = self._prepare_deposit(str(reg_id))
+            except Exception as e:
+                results[str(reg_id)] = truncate(str(e))
+                continue
+            if manuscript is None:
+                results[str(reg_id)] = None
+                continue
+            manuscript_id = str(registration.get("article_id") or "").strip()
+            prepared.append((str(reg_id), manuscript_id, doi, self._build_crossref_article_data(manuscript, doi)))
+        if not prepared:
+            return results
+
+        by_doi = {doi: (reg_id, manuscript_id) for reg_id, manuscript_id, doi, _ in prepared}
+        batches = self.crossref.iter_batch_deposits(
+            [article_data for *_, article_data in prepared],
+            batch_id_prefix=self._create_batch_id("batch"),
+            max_records=self.deposit_batch_max_records,
+            max_bytes=self.deposit_batch_max_bytes,
+        )
+        for batch in batches:
+            members = [(by_doi[doi][0], by_doi[doi][1], doi) for doi in batch.dois]
+            try:
+                response_body = await self.crossref.submit_deposit(batch.body, file_name=f"doi-{batch.batch_id}.xml")
+            except Exception as e:
+                err = truncate(str(e))
+                for reg_id, manuscript_id, doi in members:
+                    self._fail_registration(
+                        reg_id,
+                        err,
+                        response_status=500,
+                        request_payload={"article_id": manuscript_id, "doi": doi, "batch_id": batch.batch_id},
+                    )
+                    results[reg_id] = err
+                continue
+            finally:
+                batch.close()
+
+            record_results = self.crossref.parse_deposit_results(response_body)
+            crossref_batch_id = self._extract_crossref_batch_id(response_body) or batch.batch_id
+            for reg_id, manuscript_id, doi in members:
+                ok, message = record_results.get(doi, (True, ""))
+                if ok:
+                    self._complete_registration(
+                        reg_id,
+                        manuscript_id=manuscript_id,
+                        doi=doi,
+                        batch_id=batch.batch_id,
+                        crossref_batch_id=crossref_batch_id,
+                        response_body=response_body,
+                    )
+                    results[reg_id] = None
+                else:
+                    err = truncate(message or "Crossref rejected the record")
+                    self._fail_registration(
+                        reg_id,
+                        err,
+                        response_status=422,
+                        request_payload={"article_id": manuscript_id, "doi": doi, "batch_id": batch.batch_id},
+                    )
+                    results[reg_id] = err
+        return results
+
+    def _prepare_deposit(self, reg_id: str) -> tuple[dict[str, Any], Optional[dict[str, Any]], str]:
+        """
+        校验并把注册置为 submitting，返回 (registration, manuscript, doi)。
+
+        中文注释: 已注册时 manuscript 为 None，调用方直接返回；校验失败会记录 failed + 审计后抛出。
+        """
         registration = self._load_registration_by_id(registration_id=reg_id)
         if not registration:
             raise HTTPException(status_code=404, detail="DOI registration not found")
 
         if str(registration.get("status") or "") == DOIRegistrationStatus.REGISTERED.value:
-            return self._to_registration_model(registration)
+            return registration, None, str(registration.get("doi") or "")
 
         attempts = int(registration.get("attempts") or 0) + 1
         registration = self._update_registration(
@@ -297,56 +540,17 @@ class DOIServiceWorkflowMixin:
         manuscript = self._load_manuscript(manuscript_id)
         if not manuscript:
             err = "Manuscript not found for DOI registration"
-            self._update_registration(
-                reg_id,
-                {
-                    "status": DOIRegistrationStatus.FAILED.value,
-                    "error_message": err,
-                },
-            )
-            self._log_audit(
-                registration_id=reg_id,
-                action="register_failed",
-                request_payload={"article_id": manuscript_id},
-                response_status=404,
-                error_details=err,
-            )
+            self._fail_registration(reg_id, err, response_status=404, request_payload={"article_id": manuscript_id})
             raise RuntimeError(err)
 
         if str(manuscript.get("status") or "").strip().lower() != "published":
             err = "Manuscript is not published"
-            self._update_registration(
-                reg_id,
-                {
-                    "status": DOIRegistrationStatus.FAILED.value,
-                    "error_message": err,
-                },
-            )
-            self._log_audit(
-                registration_id=reg_id,
-                action="register_failed",
-                request_payload={"article_id": manuscript_id},
-                response_status=400,
-                error_details=err,
-            )
+            self._fail_registration(reg_id, err, response_status=400, request_payload={"article_id": manuscript_id})
             raise RuntimeError(err)
 
         if not self.config:
             err = "Crossref deposit configuration missing"
-            self._update_registration(
-                reg_id,
-                {
-                    "status": DOIRegistrationStatus.FAILED.value,
-                    "error_message": err,
-                },
-            )
-            self._log_audit(
-                registration_id=reg_id,
-                action="register_failed",
-                request_payload={"article_id": manuscript_id},
-                response_status=503,
-                error_details=err,
-            )
+            self._fail_registration(reg_id, err, response_status=503, request_payload={"article_id": manuscript_id})
             raise RuntimeError(err)
 
         doi = str(registration.get("doi") or "").strip()
@@ -355,39 +559,41 @@ class DOIServiceWorkflowMixin:
             sequence = self._next_sequence_for_year(year)
             doi = self.generate_doi(year, sequence)
             registration = self._update_registration(reg_id, {"doi": doi})
+        return registration, manuscript, doi
 
-        article_data = self._build_crossref_article_data(manuscript, doi)
-        batch_id = self._create_batch_id(manuscript_id)
-        xml_content = self.crossref.generate_xml(article_data, batch_id)
-
-        try:
-            response_body = await self.crossref.submit_deposit(
-                xml_content,
-                file_name=f"doi-{batch_id}.xml",
-            )
-        except Exception as e:
-            err = truncate(str(e))
-            self._update_registration(
-                reg_id,
-                {
-                    "status": DOIRegistrationStatus.FAILED.value,
-                    "error_message": err,
-                },
-            )
-            self._log_audit(
-                registration_id=reg_id,
-                action="register_failed",
-                request_payload={
-                    "article_id": manuscript_id,
-                    "doi": doi,
-                    "batch_id": batch_id,
-                },
-                response_status=500,
-                error_details=err,
-            )
-            raise
+    def _fail_registration(
+        self,
+        reg_id: str,
+        err: str,
+        *,
+        response_status: int,
+        request_payload: dict[str, Any],
+    ) -> None:
+        self._update_registration(
+            reg_id,
+            {
+                "status": DOIRegistrationStatus.FAILED.value,
+                "error_message": err,
+            },
+        )
+        self._log_audit(
+            registration_id=reg_id,
+            action="register_failed",
+            request_payload=request_payload,
+            response_status=response_status,
+            error_details=err,
+        )
 
-        crossref_batch_id = self._extract_crossref_batch_id(response_body) or batch_id
+    def _complete_registration(
+        self,
+        reg_id: str,
+        *,
+        manuscript_id: str,
+        doi: str,
+        batch_id: str,
+        crossref_batch_id: str,
+        response_body: str,
+    ) -> dict[str, Any]:
         now = now_iso()
         registered = self._update_registration(
             reg_id,
@@ -421,4 +627,4 @@ class DOIServiceWorkflowMixin:
             response_status=200,
             response_body=truncate(response_body, 4000),
         )
-        return self._to_registration_model(registered)
+        return registered
@@ -51,6 +51,8 @@ class FinanceListFilters:
     page_size: int = 20
     sort_by: Literal["updated_at", "amount", "status"] = "updated_at"
     sort_order: Literal["asc", "desc"] = "desc"
+    # 中文注释: 上一页 meta.next_cursor；给出时按 keyset 翻页（忽略 page，不返回 total）。
+    cursor: str | None = None
 
 
 def _is_uuid(value: str) -> bool:
@@ -1,13 +1,16 @@
 from __future__ import annotations
 
+import base64
 import csv
-from dataclasses import replace
+import json
 from datetime import datetime, timezone
 from io import StringIO
-from typing import TYPE_CHECKING, Any, Literal
+from typing import TYPE_CHECKING, Any, Iterator, Literal
 
 from fastapi import HTTPException
 
+from app.core.postgrest_filters import postgrest_literal
+
 if TYPE_CHECKING:
     from app.services.editor_service import FinanceListFilters
 
@@ -29,16 +32,6 @@ class EditorServiceFinanceMixin:
             return raw
         return fallback or datetime.now(timezone.utc).isoformat()
 
-    @staticmethod
-    def _parse_iso(value: str | None) -> datetime:
-        raw = str(value or "").strip()
-        if not raw:
-            return datetime.fromtimestamp(0, tz=timezone.utc)
-        try:
-            return datetime.fromisoformat(raw.replace("Z", "+00:00")).astimezone(timezone.utc)
-        except Exception:
-            return datetime.fromtimestamp(0, tz=timezone.utc)
-
     @staticmethod
     def _effective_status(*, raw_status: str | None, amount: float) -> Literal["unpaid", "paid", "waived"]:
         status = str(raw_status or "").strip().lower()
@@ -48,51 +41,159 @@ class EditorServiceFinanceMixin:
             return "paid"
         return "unpaid"
 
-    def _load_finance_source_rows(
+    @staticmethod
+    def _finance_sort_spec(filters: FinanceListFilters) -> tuple[str, bool]:
+        sort_by = str(filters.sort_by or "updated_at").strip().lower()
+        sort_order = str(filters.sort_order or "desc").strip().lower()
+        if sort_by not in {"updated_at", "amount", "status"}:
+            raise HTTPException(status_code=422, detail="Invalid sort_by")
+        if sort_order not in {"asc", "desc"}:
+            raise HTTPException(status_code=422, detail="Invalid sort_order")
+        return sort_by, sort_order == "desc"
+
+    @staticmethod
+    def _finance_status_filter(filters: FinanceListFilters) -> str:
+        status = str(filters.status or "all").strip().lower()
+        if status not in {"all", "unpaid", "paid", "waived"}:
+            raise HTTPException(status_code=422, detail="Invalid status filter")
+        return status
+
+    @staticmethod
+    def _finance_keyword(filters: FinanceListFilters) -> str:
+        q = str(filters.q or "").strip().lower()
+        if len(q) > 100:
+            raise HTTPException(status_code=422, detail="q too long (max 100)")
+        return q
+
+    @staticmethod
+    def _finance_sort_column(sort_by: str) -> str:
+        # 中文注释: 与页面展示保持一致：updated_at 即 COALESCE(confirmed_at, 稿件 updated_at, created_at)，
+        # status 即 effective_status；两者均由 20260315090000 迁移落成可索引的列。
+        return {"updated_at": "activity_at", "amount": "amount", "status": "effective_status"}[sort_by]
+
+    @classmethod
+    def _finance_cursor_key(cls, row: dict[str, Any], *, sort_by: str) -> dict[str, Any]:
+        return {"k": row.get(cls._finance_sort_column(sort_by)), "c": row.get("created_at"), "i": row.get("id")}
+
+    @classmethod
+    def encode_finance_cursor(cls, row: dict[str, Any], *, sort_by: str) -> str:
+        raw = json.dumps(
+            {"s": sort_by, **cls._finance_cursor_key(row, sort_by=sort_by)},
+            separators=(",", ":"),
+            default=str,
+        ).encode("utf-8")
+        return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+    @staticmethod
+    def decode_finance_cursor(cursor: str, *, sort_by: str) -> dict[str, Any]:
+        try:
+            padded = cursor + "=" * (-len(cursor) % 4)
+            payload = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+            if payload.get("s") != sort_by or not payload.get("c") or not payload.get("i"):
+                raise ValueError("cursor does not match sort")
+            return payload
+        except Exception:
+            raise HTTPException(status_code=422, detail="Invalid cursor")
+
+    def _finance_keyset_condition(self, cursor: dict[str, Any], *, sort_by: str, desc: bool) -> str:
+        lit = postgrest_literal
+        created_at, invoice_id = lit(cursor["c"]), lit(cursor["i"])
+        op = "lt" if desc else "gt"
+        column = self._finance_sort_column(sort_by)
+        tie = f"or(created_at.lt.{created_at},and(created_at.eq.{created_at},id.lt.{invoice_id}))"
+        # 中文注释: Postgres 默认 DESC 时 NULL 在最前、ASC 时在最后；NULL 排序键不能拿去做 eq/lt 比较，
+        # 需按 is.null 单独分支，否则 "None" 会被当成字面量比较，翻页丢行或重复。
+        if cursor.get("k") is None:
+            null_tail = f"and({column}.is.null,{tie})"
+            return f"or({column}.not.is.null,{null_tail})" if desc else null_tail
+        key = lit(cursor["k"])
+        branches = f"{column}.{op}.{key},and({column}.eq.{key},{tie})"
+        return f"or({branches})" if desc else f"or({branches},{column}.is.null)"
+
+    def _query_finance_invoices(
         self,
         *,
         filters: FinanceListFilters,
-        export_mode: bool,
-    ) -> tuple[list[dict[str, Any]], int]:
+        keyword: str,
+        cursor: dict[str, Any] | None,
+        limit: int | None,
+        offset: int = 0,
+        with_count: bool = False,
+    ) -> tuple[list[dict[str, Any]], int | None]:
+        """
+        中文注释:
+        - 状态/关键词/排序/翻页全部下推到数据库：关键词走 invoices.search_text（pg_trgm GIN），
+          排序键 + (created_at, id) 作为 keyset，翻到第 N 页的代价与第 1 页相同。
+        - 排序与旧实现一致：activity_at（展示的 updated_at）/amount/effective_status 为主键，created_at DESC, id DESC 兜底。
+        """
         select_clause = (
-            "id,manuscript_id,amount,status,confirmed_at,invoice_number,created_at,"
+            "id,manuscript_id,amount,status,effective_status,activity_at,confirmed_at,invoice_number,created_at,"
             "manuscripts(id,title,author_id,updated_at,invoice_metadata)"
         )
-        page = max(int(filters.page or 1), 1)
-        page_size = max(min(int(filters.page_size or 20), 100), 1)
-        offset = (page - 1) * page_size
-
-        query = self.client.table("invoices").select(select_clause, count="exact")
+        query = (
+            self.client.table("invoices").select(select_clause, count="exact")
+            if with_count
+            else self.client.table("invoices").select(select_clause)
+        )
 
-        status = str(filters.status or "all").strip().lower()
-        if status not in {"all", "unpaid", "paid", "waived"}:
-            raise HTTPException(status_code=422, detail="Invalid status filter")
+        logic_terms: list[str] = []
+        status = self._finance_status_filter(filters)
         if status == "paid":
             query = query.eq("status", "paid").gt("amount", 0)
         elif status == "waived":
-            query = query.or_("status.eq.waived,amount.lte.0")
+            logic_terms.append("or(status.eq.waived,amount.lte.0)")
         elif status == "unpaid":
-            query = query.gt("amount", 0).neq("status", "paid").neq("status", "waived")
+            # 中文注释: status 为空的历史账单按 unpaid 展示；neq 会把 NULL 一并过滤掉，这里显式保留。
+            query = query.gt("amount", 0)
+            logic_terms.append("or(status.is.null,status.not.in.(paid,waived))")
 
-        sort_by = str(filters.sort_by or "updated_at").strip().lower()
-        sort_order = str(filters.sort_order or "desc").strip().lower()
-        if sort_by not in {"updated_at", "amount", "status"}:
-            raise HTTPException(status_code=422, detail="Invalid sort_by")
-        if sort_order not in {"asc", "desc"}:
-            raise HTTPException(status_code=422, detail="Invalid sort_order")
-        desc = sort_order == "desc"
-        if sort_by == "amount":
-            query = query.order("amount", desc=desc).order("created_at", desc=True)
-        elif sort_by == "status":
-            query = query.order("status", desc=desc).order("created_at", desc=True)
-        else:
-            # 中文注释: updated_at 对 invoices 不稳定，统一退化为 created_at 排序以便走索引。
-            query = query.order("created_at", desc=desc)
+        if keyword:
+            escaped = keyword.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+            query = query.ilike("search_text", f"%{escaped}%")
+
+        sort_by, desc = self._finance_sort_spec(filters)
+        if cursor is not None:
+            logic_terms.append(self._finance_keyset_condition(cursor, sort_by=sort_by, desc=desc))
+        if logic_terms:
+            # 中文注释: 合并为一个 or=(and(...)) 参数，避免同名 or 参数重复出现。
+            query = query.or_(f"and({','.join(logic_terms)})")
+
+        query = (
+            query.order(self._finance_sort_column(sort_by), desc=desc)
+            .order("created_at", desc=True)
+            .order("id", desc=True)
+        )
 
-        if not export_mode:
-            query = query.range(offset, offset + page_size - 1)
+        if limit is not None:
+            query = query.range(offset, offset + limit - 1)
         resp = query.execute()
-        return (getattr(resp, "data", None) or [], int(getattr(resp, "count", None) or 0))
+        total = getattr(resp, "count", None) if with_count else None
+        return getattr(resp, "data", None) or [], (int(total or 0) if with_count else None)
+
+    @staticmethod
+    def _looks_like_missing_search_column(error: Exception) -> bool:
+        lowered = str(error).lower()
+        return "search_text" in lowered and (
+            "does not exist" in lowered or "42703" in lowered or "pgrst204" in lowered or "schema cache" in lowered
+        )
+
+    def _load_finance_source_rows(
+        self,
+        *,
+        filters: FinanceListFilters,
+        export_mode: bool,
+    ) -> tuple[list[dict[str, Any]], int]:
+        page = max(int(filters.page or 1), 1)
+        page_size = max(min(int(filters.page_size or 20), 100), 1)
+        rows, total = self._query_finance_invoices(
+            filters=filters,
+            keyword=self._finance_keyword(filters),
+            cursor=None,
+            limit=None if export_mode else page_size,
+            offset=(page - 1) * page_size,
+            with_count=True,
+        )
+        return rows, int(total or 0)
 
     def _build_finance_rows(self, source_rows: list[dict[str, Any]]) -> list[dict[str, Any]]:
         author_ids: set[str] = set()
@@ -169,46 +270,6 @@ class EditorServiceFinanceMixin:
             )
         return out
 
-    def _filter_and_sort_finance_rows(
-        self,
-        rows: list[dict[str, Any]],
-        *,
-        filters: FinanceListFilters,
-    ) -> list[dict[str, Any]]:
-        out = list(rows)
-
-        status = str(filters.status or "all").strip().lower()
-        if status not in {"all", "unpaid", "paid", "waived"}:
-            raise HTTPException(status_code=422, detail="Invalid status filter")
-        if status != "all":
-            out = [r for r in out if str(r.get("effective_status") or "") == status]
-
-        q = str(filters.q or "").strip().lower()
-        if len(q) > 100:
-            raise HTTPException(status_code=422, detail="q too long (max 100)")
-        if q:
-            out = [
-                r
-                for r in out
-                if q in str(r.get("invoice_number") or "").lower() or q in str(r.get("manuscript_title") or "").lower()
-            ]
-
-        sort_by = str(filters.sort_by or "updated_at").strip().lower()
-        sort_order = str(filters.sort_order or "desc").strip().lower()
-        if sort_by not in {"updated_at", "amount", "status"}:
-            raise HTTPException(status_code=422, detail="Invalid sort_by")
-        if sort_order not in {"asc", "desc"}:
-            raise HTTPException(status_code=422, detail="Invalid sort_order")
-        reverse = sort_order == "desc"
-
-        if sort_by == "amount":
-            out.sort(key=lambda r: self._to_float(r.get("amount")), reverse=reverse)
-        elif sort_by == "status":
-            out.sort(key=lambda r: str(r.get("effective_status") or ""), reverse=reverse)
-        else:
-            out.sort(key=lambda r: self._parse_iso(str(r.get("updated_at") or "")).timestamp(), reverse=reverse)
-        return out
-
     def _apply_finance_keyword_filter(
         self,
         rows: list[dict[str, Any]],
@@ -227,25 +288,54 @@ class EditorServiceFinanceMixin:
             or q in str(row.get("manuscript_title") or "").lower()
         ]
 
+    def _list_finance_invoices_legacy(self, *, filters: FinanceListFilters, keyword: str) -> tuple[list[dict[str, Any]], int]:
+        # 中文注释: 仅在 invoices.search_text 尚未迁移时使用：全量加载后在内存中过滤关键词。
+        page = max(int(filters.page or 1), 1)
+        page_size = max(min(int(filters.page_size or 20), 100), 1)
+        source_rows, _ = self._query_finance_invoices(
+            filters=filters, keyword="", cursor=None, limit=None, with_count=False
+        )
+        filtered = self._apply_finance_keyword_filter(self._build_finance_rows(source_rows), keyword=keyword)
+        start = (page - 1) * page_size
+        return filtered[start : start + page_size], len(filtered)
+
     def list_finance_invoices(self, *, filters: FinanceListFilters) -> dict[str, Any]:
         page = max(int(filters.page or 1), 1)
         page_size = max(min(int(filters.page_size or 20), 100), 1)
         snapshot_at = self._now()
-        keyword = str(filters.q or "").strip()
-        if keyword:
-            source_rows, _ = self._load_finance_source_rows(
-                filters=replace(filters, q=None),
-                export_mode=True,
-            )
-            rows = self._build_finance_rows(source_rows)
-            filtered = self._apply_finance_keyword_filter(rows, keyword=keyword)
-            total = len(filtered)
-            start = (page - 1) * page_size
-            end = start + page_size
-            paged = filtered[start:end]
-        else:
-            source_rows, total = self._load_finance_source_rows(filters=filters, export_mode=False)
+        keyword = self._finance_keyword(filters)
+        sort_by, desc = self._finance_sort_spec(filters)
+
+        next_cursor: str | None = None
+        total: int | None
+        if filters.cursor:
+            # 中文注释: keyset 翻页：多取 1 行判断是否还有下一页；不做 count，耗时与翻到第几页无关。
+            cursor = self.decode_finance_cursor(filters.cursor, sort_by=sort_by)
+            try:
+                source_rows, _ = self._query_finance_invoices(
+                    filters=filters, keyword=keyword, cursor=cursor, limit=page_size + 1
+                )
+            except Exception as e:
+                if keyword and self._looks_like_missing_search_column(e):
+                    raise HTTPException(status_code=422, detail="Keyword search requires page-based listing")
+                raise
+            has_more = len(source_rows) > page_size
+            source_rows = source_rows[:page_size]
+            if has_more and source_rows:
+                next_cursor = self.encode_finance_cursor(source_rows[-1], sort_by=sort_by)
             paged = self._build_finance_rows(source_rows)
+            total = None
+        else:
+            try:
+                source_rows, total = self._load_finance_source_rows(filters=filters, export_mode=False)
+            except Exception as e:
+                if not (keyword and self._looks_like_missing_search_column(e)):
+                    raise
+                paged, total = self._list_finance_invoices_legacy(filters=filters, keyword=keyword)
+            else:
+                paged = self._build_finance_rows(source_rows)
+                if page * page_size < int(total or 0) and source_rows:
+                    next_cursor = self.encode_finance_cursor(source_rows[-1], sort_by=sort_by)
 
         return {
             "rows": paged,
@@ -255,23 +345,42 @@ class EditorServiceFinanceMixin:
                 "total": total,
                 "status_filter": filters.status,
                 "snapshot_at": snapshot_at,
-                "empty": total == 0,
+                "empty": (total == 0) if total is not None else not paged,
+                "next_cursor": next_cursor,
             },
         }
 
-    def export_finance_invoices_csv(self, *, filters: FinanceListFilters) -> dict[str, Any]:
+    def _iter_finance_export_rows(self, *, filters: FinanceListFilters, batch_size: int) -> Iterator[list[dict[str, Any]]]:
+        keyword = self._finance_keyword(filters)
+        sort_by, _desc = self._finance_sort_spec(filters)
+        cursor: dict[str, Any] | None = None
+        while True:
+            try:
+                source_rows, _ = self._query_finance_invoices(
+                    filters=filters, keyword=keyword, cursor=cursor, limit=batch_size
+                )
+            except Exception as e:
+                if not (cursor is None and keyword and self._looks_like_missing_search_column(e)):
+                    raise
+                source_rows, _ = self._query_finance_invoices(filters=filters, keyword="", cursor=None, limit=None)
+                yield self._apply_finance_keyword_filter(self._build_finance_rows(source_rows), keyword=keyword)
+                return
+            if source_rows:
+                # 中文注释: 每批只对本批稿件作者做一次 in_ 查询。
+                yield self._build_finance_rows(source_rows)
+            if len(source_rows) < batch_size:
+                return
+            cursor = self._finance_cursor_key(source_rows[-1], sort_by=sort_by)
+
+    def export_finance_invoices_csv(self, *, filters: FinanceListFilters, batch_size: int = 500) -> dict[str, Any]:
+        """
+        中文注释:
+        - 以 keyset 分批读取（batch_size 行/批），chunks 为逐批产出的 CSV 文本，内存占用与账单总数无关。
+        - 首批在返回前预取，用于决定 X-Export-Empty 响应头；其余批次在响应流式输出时按需读取。
+        """
         snapshot_at = self._now()
-        keyword = str(filters.q or "").strip()
-        source_rows, _total = self._load_finance_source_rows(
-            filters=replace(filters, q=None) if keyword else filters,
-            export_mode=True,
-        )
-        filtered = self._apply_finance_keyword_filter(
-            self._build_finance_rows(source_rows),
-            keyword=keyword,
-        )
-
-        buf = StringIO()
+        batches = self._iter_finance_export_rows(filters=filters, batch_size=max(int(batch_size), 1))
+        first = next(batches, [])
         fieldnames = [
             "invoice_id",
             "manuscript_id",
@@ -285,14 +394,23 @@ class EditorServiceFinanceMixin:
             "confirmed_at",
             "updated_at",
         ]
-        writer = csv.DictWriter(buf, fieldnames=fieldnames)
-        writer.writeheader()
-        for row in filtered:
-            writer.writerow({k: row.get(k) for k in fieldnames})
+
+        def _render(rows: list[dict[str, Any]], *, header: bool) -> str:
+            buf = StringIO()
+            writer = csv.DictWriter(buf, fieldnames=fieldnames)
+            if header:
+                writer.writeheader()
+            for row in rows:
+                writer.writerow({k: row.get(k) for k in fieldnames})
+            return buf.getvalue()
+
+        def _chunks() -> Iterator[str]:
+            yield _render(first, header=True)
+            for rows in batches:
+                yield _render(rows, header=False)
 
         return {
-            "csv_text": buf.getvalue(),
+            "chunks": _chunks(),
             "snapshot_at": snapshot_at,
-            "row_count": len(filtered),
-            "empty": len(filtered) == 0,
+            "empty": not first,
         }
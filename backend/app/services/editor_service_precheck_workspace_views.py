@@ -1,18 +1,24 @@
 from __future__ import annotations
 
+import base64
+import json
 import logging
 from types import SimpleNamespace
-from typing import Any
+from typing import Any, Callable
 from uuid import UUID
 
 from fastapi import HTTPException
 
 from app.core.journal_scope import ensure_manuscript_scope_access
+from app.core.postgrest_filters import postgrest_literal
 from app.core.role_matrix import normalize_roles
 from app.models.manuscript import ManuscriptStatus, PreCheckStatus, normalize_status
 
 logger = logging.getLogger("scholarflow.editor_precheck_workspace")
 
+# 中文注释: keyset 扫描单批上限；可见范围/关键词过滤掉的行较多时逐批放大到该值。
+_WORKSPACE_SCAN_MAX_BATCH = 200
+
 
 class EditorServicePrecheckWorkspaceViewMixin:
     def list_academic_editor_candidates(
@@ -167,67 +173,177 @@ class EditorServicePrecheckWorkspaceViewMixin:
             return "production"
         return "other"
 
-    def get_managing_workspace(
+    @staticmethod
+    def _workspace_sort_key(row: dict[str, Any]) -> tuple[bool, str, bool, str, str]:
+        # 中文注释: 与数据库 DESC 默认 NULLS FIRST 保持一致：倒序排序时 NULL 时间排在最前。
+        updated_at, created_at = row.get("updated_at"), row.get("created_at")
+        return (
+            updated_at is None,
+            str(updated_at or ""),
+            created_at is None,
+            str(created_at or ""),
+            str(row.get("id") or ""),
+        )
+
+    @staticmethod
+    def encode_workspace_cursor(row: dict[str, Any]) -> str:
+        raw = json.dumps(
+            {"u": row.get("updated_at"), "c": row.get("created_at"), "i": row.get("id")},
+            separators=(",", ":"),
+            default=str,
+        ).encode("utf-8")
+        return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+    @staticmethod
+    def decode_workspace_cursor(cursor: str) -> dict[str, Any]:
+        try:
+            padded = cursor + "=" * (-len(cursor) % 4)
+            payload = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+            # 中文注释: updated_at/created_at 列可为 NULL，游标里允许显式 null，但键必须存在。
+            if "u" not in payload or "c" not in payload or not payload.get("i"):
+                raise ValueError("incomplete cursor")
+            return payload
+        except Exception:
+            raise HTTPException(status_code=422, detail="Invalid cursor")
+
+    @staticmethod
+    def _apply_workspace_keyset(query: Any, after: dict[str, Any] | None) -> Any:
+        """
+        (updated_at, created_at, id) 倒序 keyset：只取排在游标行之后的稿件。
+
+        中文注释: 两个时间列可为 NULL，DESC 时 NULL 排最前；游标键为 NULL 时不能做 lt/eq 比较，
+        改为 not.is.null / is.null 分支，否则会把 "None" 当时间戳发给 PostgREST。
+        """
+        if not after:
+            return query
+        rest = f"id.lt.{postgrest_literal(after.get('i'))}"
+        for column, key in (("created_at", "c"), ("updated_at", "u")):
+            value = after.get(key)
+            if value is None:
+                branches = f"{column}.not.is.null,and({column}.is.null,{rest})"
+            else:
+                lit = postgrest_literal(value)
+                branches = f"{column}.lt.{lit},and({column}.eq.{lit},{rest})"
+            rest = f"or({branches})"
+        return query.or_(branches)
+
+    def _scan_workspace_rows(
         self,
         *,
-        viewer_user_id: str,
-        viewer_roles: list[str] | None,
-        page: int = 1,
-        page_size: int = 20,
-        q: str | None = None,
-    ) -> list[dict[str, Any]]:
+        fetch_batch: Callable[[dict[str, Any] | None, int], list[dict[str, Any]]],
+        accept_batch: Callable[[list[dict[str, Any]]], list[dict[str, Any]]],
+        page_size: int,
+        cursor: dict[str, Any] | None,
+        skip: int = 0,
+    ) -> tuple[list[dict[str, Any]], bool, str | None]:
         """
-        Managing Editor Workspace：
-        - 聚合 ME 需要跟进的全流程稿件，并按状态输出 workspace_bucket。
-        - 仅包含非终态工作流（排除 published/rejected）。
+        Workspace 列表按 keyset 顺序扫描：每批从上一批末尾继续，过滤后凑够 page_size + 1 行即停止。
+
+        中文注释:
+        - 带 cursor 时从游标行之后开始，翻到第几页代价都与第 1 页相同；
+        - 不带 cursor 的 page 翻页兼容旧前端：跳过前 skip 个可见行（只传输基础列，不做富化）；
+        - next_cursor 指向本页最后一行，而不是最后一批的末尾：被多读的行下一页会重新扫描到。
         """
-        status_scope = [
-            ManuscriptStatus.PRE_CHECK.value,
-            ManuscriptStatus.REVISION_BEFORE_REVIEW.value,
-            ManuscriptStatus.UNDER_REVIEW.value,
-            ManuscriptStatus.MINOR_REVISION.value,
-            ManuscriptStatus.MAJOR_REVISION.value,
-            ManuscriptStatus.RESUBMITTED.value,
-            ManuscriptStatus.DECISION.value,
-            ManuscriptStatus.DECISION_DONE.value,
-            ManuscriptStatus.APPROVED.value,
-            ManuscriptStatus.LAYOUT.value,
-            ManuscriptStatus.ENGLISH_EDITING.value,
-            ManuscriptStatus.PROOFREADING.value,
-        ]
-        selects = [
-            "id,title,created_at,updated_at,status,pre_check_status,assistant_editor_id,owner_id,journal_id,journals(title,slug)",
-            "id,title,created_at,updated_at,status,pre_check_status,assistant_editor_id,owner_id,journal_id",
-            "id,title,created_at,updated_at,status,pre_check_status,assistant_editor_id,owner_id",
-        ]
-        fetch_end = max(page * page_size - 1, page_size - 1)
+        collected: list[dict[str, Any]] = []
+        after = cursor
+        limit = page_size + 1
+        while len(collected) <= page_size:
+            batch = fetch_batch(after, limit)
+            if not batch:
+                break
+            for row in accept_batch(batch):
+                if skip > 0:
+                    skip -= 1
+                    continue
+                collected.append(row)
+            if len(batch) < limit:
+                break
+            tail = batch[-1]
+            after = {"u": tail.get("updated_at"), "c": tail.get("created_at"), "i": tail.get("id")}
+            # 中文注释: 过滤掉的行多时逐批放大，减少往返次数。
+            limit = min(limit * 2, _WORKSPACE_SCAN_MAX_BATCH)
 
-        rows: list[dict[str, Any]] = []
+        has_more = len(collected) > page_size
+        page_rows = collected[:page_size]
+        next_cursor = self.encode_workspace_cursor(page_rows[-1]) if has_more and page_rows else None
+        return page_rows, has_more, next_cursor
+
+    def _fetch_workspace_batch(
+        self,
+        *,
+        selects: list[str],
+        state: dict[str, Any],
+        build_query: Callable[[str], Any],
+        after: dict[str, Any] | None,
+        limit: int,
+    ) -> list[dict[str, Any]]:
+        # 中文注释: 首批按 selects 顺序探测可用列（journals 关联/journal_id 可能未迁移），之后沿用同一个 select。
+        candidates = [state["select"]] if state.get("select") else selects
         last_error: Exception | None = None
-        for select_clause in selects:
+        for select_clause in candidates:
             try:
+                query = self._apply_workspace_keyset(build_query(select_clause), after)
                 resp = (
-                    self.client.table("manuscripts")
-                    .select(select_clause)
-                    .in_("status", status_scope)
-                    .order("updated_at", desc=True)
+                    query.order("updated_at", desc=True)
                     .order("created_at", desc=True)
-                    .range(0, fetch_end)
+                    .order("id", desc=True)
+                    .range(0, limit - 1)
                     .execute()
                 )
-                rows = getattr(resp, "data", None) or []
-                break
+                state["select"] = select_clause
+                return getattr(resp, "data", None) or []
             except Exception as e:
                 last_error = e
                 lowered = str(e).lower()
                 if "journals" in lowered or "schema cache" in lowered or "pgrst" in lowered:
                     continue
                 raise
-        if not rows and last_error:
+        if last_error:
             lowered = str(last_error).lower()
             if "schema cache" in lowered or "could not find" in lowered:
                 raise last_error
+        return []
+
+    def _load_workspace_profiles(self, ids: set[str], cache: dict[str, dict[str, Any]], *, log_prefix: str) -> None:
+        missing = sorted(pid for pid in ids if pid and pid not in cache)
+        if not missing:
+            return
+        try:
+            prof = (
+                self.client.table("user_profiles")
+                .select("id,full_name,email")
+                .in_("id", missing)
+                .execute()
+            )
+            for p in (getattr(prof, "data", None) or []):
+                pid = str(p.get("id") or "")
+                if pid:
+                    cache[pid] = p
+        except Exception as e:
+            logger.warning("[%s] load profiles failed (ignored): %s", log_prefix, e)
+        for pid in missing:
+            cache.setdefault(pid, {})
+
+    @staticmethod
+    def _workspace_profile_ref(pid: str, profile_map: dict[str, dict[str, Any]]) -> dict[str, Any] | None:
+        if not pid:
+            return None
+        return {
+            "id": pid,
+            "full_name": (profile_map.get(pid) or {}).get("full_name"),
+            "email": (profile_map.get(pid) or {}).get("email"),
+        }
+
+    @staticmethod
+    def _workspace_journal(row: dict[str, Any]) -> dict[str, Any] | None:
+        journal = row.get("journals")
+        if isinstance(journal, list):
+            return journal[0] if journal else None
+        if isinstance(journal, dict):
+            return journal
+        return None
 
+    def _precheck_overrides(self, rows: list[dict[str, Any]]) -> dict[str, dict[str, Any]]:
         precheck_rows = [
             row
             for row in rows
@@ -242,15 +358,149 @@ class EditorServicePrecheckWorkspaceViewMixin:
             if precheck_rows
             else []
         )
-        precheck_by_id = {
+        return {
             str(item.get("id") or ""): item
             for item in precheck_enriched
             if str(item.get("id") or "").strip()
         }
+
+    @staticmethod
+    def _apply_precheck_override(row: dict[str, Any], precheck_override: dict[str, Any] | None) -> None:
+        if not precheck_override:
+            return
+        row["pre_check_status"] = precheck_override.get("pre_check_status")
+        row["current_role"] = precheck_override.get("current_role")
+        row["current_assignee"] = precheck_override.get("current_assignee")
+        row["assigned_at"] = precheck_override.get("assigned_at")
+        row["technical_completed_at"] = precheck_override.get("technical_completed_at")
+        row["academic_completed_at"] = precheck_override.get("academic_completed_at")
+        row["academic_recommendation"] = precheck_override.get("academic_recommendation")
+        row["academic_recommendation_comment"] = precheck_override.get("academic_recommendation_comment")
+
+    def get_managing_workspace(
+        self,
+        *,
+        viewer_user_id: str,
+        viewer_roles: list[str] | None,
+        page: int = 1,
+        page_size: int = 20,
+        q: str | None = None,
+    ) -> list[dict[str, Any]]:
+        """
+        Managing Editor Workspace：
+        - 聚合 ME 需要跟进的全流程稿件，并按状态输出 workspace_bucket。
+        - 仅包含非终态工作流（排除 published/rejected）。
+        """
+        return self.get_managing_workspace_page(
+            viewer_user_id=viewer_user_id,
+            viewer_roles=viewer_roles,
+            page=page,
+            page_size=page_size,
+            q=q,
+        )["rows"]
+
+    def get_managing_workspace_page(
+        self,
+        *,
+        viewer_user_id: str,
+        viewer_roles: list[str] | None,
+        page: int = 1,
+        page_size: int = 20,
+        q: str | None = None,
+        cursor: str | None = None,
+    ) -> dict[str, Any]:
+        """
+        Managing Editor Workspace（分页版）：返回 {"rows", "has_more", "next_cursor"}。
+
+        中文注释:
+        - 按 (updated_at, created_at, id) 倒序 keyset 扫描；可见范围与关键词过滤在扫描时逐批进行，
+          预审富化 / intake 退回日志只对最终返回的这一页执行。
+        - 关键词命中负责人/AE 姓名时需要 profile：带 q 时每批补齐本批缺失的 profile（结果跨批复用）。
+        """
+        status_scope = [
+            ManuscriptStatus.PRE_CHECK.value,
+            ManuscriptStatus.REVISION_BEFORE_REVIEW.value,
+            ManuscriptStatus.UNDER_REVIEW.value,
+            ManuscriptStatus.MINOR_REVISION.value,
+            ManuscriptStatus.MAJOR_REVISION.value,
+            ManuscriptStatus.RESUBMITTED.value,
+            ManuscriptStatus.DECISION.value,
+            ManuscriptStatus.DECISION_DONE.value,
+            ManuscriptStatus.APPROVED.value,
+            ManuscriptStatus.LAYOUT.value,
+            ManuscriptStatus.ENGLISH_EDITING.value,
+            ManuscriptStatus.PROOFREADING.value,
+        ]
+        selects = [
+            "id,title,created_at,updated_at,status,pre_check_status,assistant_editor_id,owner_id,journal_id,journals(title,slug)",
+            "id,title,created_at,updated_at,status,pre_check_status,assistant_editor_id,owner_id,journal_id",
+            "id,title,created_at,updated_at,status,pre_check_status,assistant_editor_id,owner_id",
+        ]
+        page = max(int(page or 1), 1)
+        page_size = max(int(page_size or 20), 1)
+        after = self.decode_workspace_cursor(cursor) if cursor else None
+        keyword = str(q or "").strip().lower()
+        select_state: dict[str, Any] = {}
+        profile_map: dict[str, dict[str, Any]] = {}
+
+        def _fetch(after_row: dict[str, Any] | None, limit: int) -> list[dict[str, Any]]:
+            return self._fetch_workspace_batch(
+                selects=selects,
+                state=select_state,
+                build_query=lambda select_clause: (
+                    self.client.table("manuscripts").select(select_clause).in_("status", status_scope)
+                ),
+                after=after_row,
+                limit=limit,
+            )
+
+        def _accept(batch: list[dict[str, Any]]) -> list[dict[str, Any]]:
+            rows = [
+                {**row, "status": normalize_status(str(row.get("status") or ""))}
+                for row in batch
+                if normalize_status(str(row.get("status") or ""))
+            ]
+            rows = self._apply_process_visibility_scope(
+                rows=rows,
+                viewer_user_id=viewer_user_id,
+                viewer_roles=viewer_roles,
+            )
+            if not keyword or not rows:
+                return rows
+            self._load_workspace_profiles(
+                {
+                    str(pid)
+                    for row in rows
+                    for pid in (row.get("owner_id"), row.get("assistant_editor_id"))
+                    if str(pid or "").strip()
+                },
+                profile_map,
+                log_prefix="MEWorkspace",
+            )
+            return [
+                row
+                for row in rows
+                if keyword in str(row.get("title") or "").lower()
+                or keyword in str(row.get("id") or "").lower()
+                or keyword in str((profile_map.get(str(row.get("owner_id") or "")) or {}).get("full_name") or "").lower()
+                or keyword
+                in str((profile_map.get(str(row.get("assistant_editor_id") or "")) or {}).get("full_name") or "").lower()
+                or keyword in str(((self._workspace_journal(row) or {}).get("title") or "")).lower()
+            ]
+
+        rows, has_more, next_cursor = self._scan_workspace_rows(
+            fetch_batch=_fetch,
+            accept_batch=_accept,
+            page_size=page_size,
+            cursor=after,
+            skip=0 if after else (page - 1) * page_size,
+        )
+
+        precheck_by_id = self._precheck_overrides(rows)
         waiting_author_ids = [
             str(row.get("id") or "").strip()
             for row in rows
-            if normalize_status(str(row.get("status") or "")) == ManuscriptStatus.REVISION_BEFORE_REVIEW.value
+            if row.get("status") == ManuscriptStatus.REVISION_BEFORE_REVIEW.value
             and str(row.get("id") or "").strip()
         ]
         waiting_author_logs = (
@@ -258,28 +508,27 @@ class EditorServicePrecheckWorkspaceViewMixin:
             if waiting_author_ids
             else {}
         )
+        self._load_workspace_profiles(
+            {
+                str(pid)
+                for row in rows
+                for pid in (row.get("owner_id"), row.get("assistant_editor_id"))
+                if str(pid or "").strip()
+            },
+            profile_map,
+            log_prefix="MEWorkspace",
+        )
+
         out: list[dict[str, Any]] = []
         for base_row in rows:
             row = dict(base_row)
             row_id = str(row.get("id") or "").strip()
-            precheck_override = precheck_by_id.get(row_id)
-            if precheck_override:
-                row["pre_check_status"] = precheck_override.get("pre_check_status")
-                row["current_role"] = precheck_override.get("current_role")
-                row["current_assignee"] = precheck_override.get("current_assignee")
-                row["assigned_at"] = precheck_override.get("assigned_at")
-                row["technical_completed_at"] = precheck_override.get("technical_completed_at")
-                row["academic_completed_at"] = precheck_override.get("academic_completed_at")
-                row["academic_recommendation"] = precheck_override.get("academic_recommendation")
-                row["academic_recommendation_comment"] = precheck_override.get("academic_recommendation_comment")
-
-            normalized_status = normalize_status(str(row.get("status") or ""))
-            if not normalized_status:
-                continue
+            self._apply_precheck_override(row, precheck_by_id.get(row_id))
+
+            normalized_status = row["status"]
             normalized_precheck = self._normalize_precheck_status(row.get("pre_check_status"))
             if normalized_status == ManuscriptStatus.PRE_CHECK.value and normalized_precheck is None:
                 normalized_precheck = PreCheckStatus.INTAKE.value
-            row["status"] = normalized_status
             row["pre_check_status"] = normalized_precheck
             if normalized_status == ManuscriptStatus.REVISION_BEFORE_REVIEW.value:
                 waiting_log = waiting_author_logs.get(row_id) or {}
@@ -292,95 +541,17 @@ class EditorServicePrecheckWorkspaceViewMixin:
                 status=normalized_status,
                 pre_check_status=normalized_precheck,
             )
-            out.append(row)
 
-        out = self._apply_process_visibility_scope(
-            rows=out,
-            viewer_user_id=viewer_user_id,
-            viewer_roles=viewer_roles,
-        )
-
-        profile_ids = sorted(
-            {
-                str(pid)
-                for row in out
-                for pid in (row.get("owner_id"), row.get("assistant_editor_id"))
-                if str(pid or "").strip()
-            }
-        )
-        profile_map: dict[str, dict[str, Any]] = {}
-        if profile_ids:
-            try:
-                prof = (
-                    self.client.table("user_profiles")
-                    .select("id,full_name,email")
-                    .in_("id", profile_ids)
-                    .execute()
-                )
-                for p in (getattr(prof, "data", None) or []):
-                    pid = str(p.get("id") or "")
-                    if pid:
-                        profile_map[pid] = p
-            except Exception as e:
-                logger.warning("[MEWorkspace] load profiles failed (ignored): %s", e)
-
-        for row in out:
             oid = str(row.get("owner_id") or "")
             ae_id = str(row.get("assistant_editor_id") or "")
-            row["owner"] = (
-                {
-                    "id": oid,
-                    "full_name": (profile_map.get(oid) or {}).get("full_name"),
-                    "email": (profile_map.get(oid) or {}).get("email"),
-                }
-                if oid
-                else None
-            )
-            row["assistant_editor"] = (
-                {
-                    "id": ae_id,
-                    "full_name": (profile_map.get(ae_id) or {}).get("full_name"),
-                    "email": (profile_map.get(ae_id) or {}).get("email"),
-                }
-                if ae_id
-                else None
-            )
+            row["owner"] = self._workspace_profile_ref(oid, profile_map)
+            row["assistant_editor"] = self._workspace_profile_ref(ae_id, profile_map)
             if isinstance(row.get("current_assignee"), dict) and ae_id:
-                row["current_assignee"] = {
-                    "id": ae_id,
-                    "full_name": (profile_map.get(ae_id) or {}).get("full_name"),
-                    "email": (profile_map.get(ae_id) or {}).get("email"),
-                }
-            journal = row.get("journals")
-            if isinstance(journal, list):
-                row["journal"] = journal[0] if journal else None
-            elif isinstance(journal, dict):
-                row["journal"] = journal
-            else:
-                row["journal"] = None
-
-        keyword = str(q or "").strip().lower()
-        if keyword:
-            out = [
-                row
-                for row in out
-                if keyword in str(row.get("title") or "").lower()
-                or keyword in str(row.get("id") or "").lower()
-                or keyword in str(((row.get("owner") or {}).get("full_name") or "")).lower()
-                or keyword in str(((row.get("assistant_editor") or {}).get("full_name") or "")).lower()
-                or keyword in str(((row.get("journal") or {}).get("title") or "")).lower()
-            ]
+                row["current_assignee"] = self._workspace_profile_ref(ae_id, profile_map)
+            row["journal"] = self._workspace_journal(row)
+            out.append(row)
 
-        out.sort(
-            key=lambda r: (
-                str(r.get("updated_at") or ""),
-                str(r.get("created_at") or ""),
-            ),
-            reverse=True,
-        )
-        start = max((page - 1) * page_size, 0)
-        end = start + page_size
-        return out[start:end]
+        return {"rows": out, "has_more": has_more, "next_cursor": next_cursor}
 
     def get_ae_workspace(self, ae_id: UUID, page: int = 1, page_size: int = 20) -> list[dict[str, Any]]:
         """
@@ -391,6 +562,22 @@ class EditorServicePrecheckWorkspaceViewMixin:
         - under_review / major_revision / minor_revision / resubmitted / decision 也纳入 AE 待办；
         - 默认按 updated_at 倒序，确保最近更新稿件置顶。
         """
+        return self.get_ae_workspace_page(ae_id, page=page, page_size=page_size)["rows"]
+
+    def get_ae_workspace_page(
+        self,
+        ae_id: UUID | str,
+        *,
+        page: int = 1,
+        page_size: int = 20,
+        cursor: str | None = None,
+    ) -> dict[str, Any]:
+        """
+        AE Workspace（分页版）：返回 {"rows", "has_more", "next_cursor"}。
+
+        中文注释: 与 ME Workspace 相同的 keyset 扫描；历史 pending_decision 状态用同一游标单独查询后归并，
+        富化（预审时间线、作者 profile）只针对返回的这一页。
+        """
         status_scope = [
             ManuscriptStatus.PRE_CHECK.value,
             ManuscriptStatus.UNDER_REVIEW.value,
@@ -405,47 +592,41 @@ class EditorServicePrecheckWorkspaceViewMixin:
             "id,title,created_at,updated_at,status,pre_check_status,assistant_editor_id,owner_id",
             "id,title,created_at,updated_at,status,pre_check_status,assistant_editor_id",
         ]
-
-        rows: list[dict[str, Any]] = []
-        select_used: str | None = None
-        last_error: Exception | None = None
-        for select_clause in selects:
-            try:
-                q = (
+        page = max(int(page or 1), 1)
+        page_size = max(int(page_size or 20), 1)
+        after = self.decode_workspace_cursor(cursor) if cursor else None
+        ae_id_str = str(ae_id)
+        select_state: dict[str, Any] = {}
+        legacy_state = {"enabled": True}
+
+        def _fetch(after_row: dict[str, Any] | None, limit: int) -> list[dict[str, Any]]:
+            rows = self._fetch_workspace_batch(
+                selects=selects,
+                state=select_state,
+                build_query=lambda select_clause: (
                     self.client.table("manuscripts")
                     .select(select_clause)
                     .in_("status", status_scope)
-                    .eq("assistant_editor_id", str(ae_id))
-                    .order("updated_at", desc=True)
-                    .order("created_at", desc=True)
-                    .range((page - 1) * page_size, page * page_size - 1)
-                )
-                resp = q.execute()
-                rows = getattr(resp, "data", None) or []
-                select_used = select_clause
-                break
-            except Exception as e:
-                last_error = e
-                lowered = str(e).lower()
-                if "journals" in lowered or "schema cache" in lowered or "pgrst" in lowered:
-                    continue
-                raise
-        if not rows and last_error:
-            lowered = str(last_error).lower()
-            if "schema cache" in lowered or "could not find" in lowered:
-                raise last_error
-
-        legacy_rows: list[dict[str, Any]] = []
-        if select_used:
+                    .eq("assistant_editor_id", ae_id_str)
+                ),
+                after=after_row,
+                limit=limit,
+            )
+            if not select_state.get("select") or not legacy_state["enabled"]:
+                return rows
             try:
-                legacy_resp = (
+                legacy_query = (
                     self.client.table("manuscripts")
-                    .select(select_used)
-                    .eq("assistant_editor_id", str(ae_id))
+                    .select(select_state["select"])
+                    .eq("assistant_editor_id", ae_id_str)
                     .eq("status", "pending_decision")
+                )
+                legacy_resp = (
+                    self._apply_workspace_keyset(legacy_query, after_row)
                     .order("updated_at", desc=True)
                     .order("created_at", desc=True)
-                    .range((page - 1) * page_size, page * page_size - 1)
+                    .order("id", desc=True)
+                    .range(0, limit - 1)
                     .execute()
                 )
                 legacy_rows = getattr(legacy_resp, "data", None) or []
@@ -453,108 +634,60 @@ class EditorServicePrecheckWorkspaceViewMixin:
                 msg = str(e).lower()
                 if "invalid input value" not in msg and "enum" not in msg and "pending_decision" not in msg:
                     logger.warning("[AEWorkspace] legacy pending_decision query failed (ignored): %s", e)
+                # 中文注释: 枚举里没有 pending_decision 时后续批次不再重复查询。
+                legacy_state["enabled"] = False
                 legacy_rows = []
-
-        if legacy_rows:
+            if not legacy_rows:
+                return rows
             merged: dict[str, dict[str, Any]] = {}
             for r in rows + legacy_rows:
                 mid = str(r.get("id") or "").strip()
-                if not mid:
+                if mid:
+                    merged[mid] = r
+            return sorted(merged.values(), key=self._workspace_sort_key, reverse=True)[:limit]
+
+        def _accept(batch: list[dict[str, Any]]) -> list[dict[str, Any]]:
+            out: list[dict[str, Any]] = []
+            for base_row in batch:
+                normalized_status = normalize_status(str(base_row.get("status") or ""))
+                normalized_precheck = self._normalize_precheck_status(base_row.get("pre_check_status"))
+                if normalized_status == ManuscriptStatus.PRE_CHECK.value and normalized_precheck not in {
+                    PreCheckStatus.TECHNICAL.value,
+                    PreCheckStatus.ACADEMIC.value,
+                }:
                     continue
-                merged[mid] = r
-            rows = list(merged.values())
-            rows.sort(
-                key=lambda r: (
-                    str(r.get("updated_at") or ""),
-                    str(r.get("created_at") or ""),
-                ),
-                reverse=True,
-            )
-            rows = rows[:page_size]
+                row = dict(base_row)
+                if normalized_status:
+                    row["status"] = normalized_status
+                out.append(row)
+            return out
+
+        rows, has_more, next_cursor = self._scan_workspace_rows(
+            fetch_batch=_fetch,
+            accept_batch=_accept,
+            page_size=page_size,
+            cursor=after,
+            skip=0 if after else (page - 1) * page_size,
+        )
 
-        precheck_rows = [
-            row
-            for row in rows
-            if normalize_status(str(row.get("status") or "")) == ManuscriptStatus.PRE_CHECK.value
-        ]
-        precheck_enriched = (
-            self._enrich_precheck_rows(
-                precheck_rows,
-                include_timeline=False,
-                include_assignee_profiles=False,
-            )
-            if precheck_rows
-            else []
+        precheck_by_id = self._precheck_overrides(rows)
+        owner_map: dict[str, dict[str, Any]] = {}
+        self._load_workspace_profiles(
+            {str(r.get("owner_id") or "") for r in rows if str(r.get("owner_id") or "")},
+            owner_map,
+            log_prefix="AEWorkspace",
         )
-        precheck_by_id = {
-            str(item.get("id") or ""): item
-            for item in precheck_enriched
-            if str(item.get("id") or "").strip()
-        }
+
         out: list[dict[str, Any]] = []
         for base_row in rows:
             row = dict(base_row)
-            row_id = str(row.get("id") or "").strip()
-            precheck_override = precheck_by_id.get(row_id)
-            if precheck_override:
-                row["pre_check_status"] = precheck_override.get("pre_check_status")
-                row["current_role"] = precheck_override.get("current_role")
-                row["current_assignee"] = precheck_override.get("current_assignee")
-                row["assigned_at"] = precheck_override.get("assigned_at")
-                row["technical_completed_at"] = precheck_override.get("technical_completed_at")
-                row["academic_completed_at"] = precheck_override.get("academic_completed_at")
-                row["academic_recommendation"] = precheck_override.get("academic_recommendation")
-                row["academic_recommendation_comment"] = precheck_override.get("academic_recommendation_comment")
-
-            normalized_status = normalize_status(str(row.get("status") or ""))
-            normalized_precheck = self._normalize_precheck_status(row.get("pre_check_status"))
-            if normalized_status:
-                row["status"] = normalized_status
-            if normalized_status == ManuscriptStatus.PRE_CHECK.value and normalized_precheck not in {
-                PreCheckStatus.TECHNICAL.value,
-                PreCheckStatus.ACADEMIC.value,
-            }:
-                continue
+            self._apply_precheck_override(row, precheck_by_id.get(str(row.get("id") or "").strip()))
             row["workspace_bucket"] = self._derive_ae_workspace_bucket(
-                status=normalized_status,
-                pre_check_status=normalized_precheck,
+                status=normalize_status(str(row.get("status") or "")),
+                pre_check_status=self._normalize_precheck_status(row.get("pre_check_status")),
             )
+            row["owner"] = self._workspace_profile_ref(str(row.get("owner_id") or ""), owner_map)
+            row["journal"] = self._workspace_journal(row)
             out.append(row)
 
-        owner_ids = sorted({str(r.get("owner_id") or "") for r in out if str(r.get("owner_id") or "")})
-        owner_map: dict[str, dict[str, Any]] = {}
-        if owner_ids:
-            try:
-                prof = (
-                    self.client.table("user_profiles")
-                    .select("id,full_name,email")
-                    .in_("id", owner_ids)
-                    .execute()
-                )
-                for p in (getattr(prof, "data", None) or []):
-                    pid = str(p.get("id") or "")
-                    if pid:
-                        owner_map[pid] = p
-            except Exception as e:
-                logger.warning("[AEWorkspace] load owner profiles failed (ignored): %s", e)
-
-        for row in out:
-            oid = str(row.get("owner_id") or "")
-            row["owner"] = (
-                {
-                    "id": oid,
-                    "full_name": (owner_map.get(oid) or {}).get("full_name"),
-                    "email": (owner_map.get(oid) or {}).get("email"),
-                }
-                if oid
-                else None
-            )
-            journal = row.get("journals")
-            if isinstance(journal, list):
-                row["journal"] = journal[0] if journal else None
-            elif isinstance(journal, dict):
-                row["journal"] = journal
-            else:
-                row["journal"] = None
-
-        return out
+        return {"rows": out, "has_more": has_more, "next_cursor": next_cursor}
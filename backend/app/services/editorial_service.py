@@ -9,6 +9,7 @@ from fastapi import HTTPException
 
 from app.lib.api_client import supabase_admin
 from app.models.manuscript import ManuscriptStatus, PreCheckStatus, normalize_status
+from app.services.dashboard_counter_service import invalidate_dashboard_counters
 
 
 @dataclass(frozen=True)
@@ -219,6 +220,7 @@ class EditorialService:
             ),
             manuscript_id=manuscript_id,
         )
+        invalidate_dashboard_counters(author_id=str(updated.get("author_id") or "") or None)
         return updated
 
     def update_invoice_info(
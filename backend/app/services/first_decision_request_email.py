@@ -6,6 +6,7 @@ from typing import Any
 from postgrest.exceptions import APIError
 
 from app.core.email_normalization import normalize_email
+from app.core.email_templates import get_email_template_registry
 from app.core.mail import email_service
 from app.lib.api_client import supabase_admin
 from app.models.email_log import EmailStatus
@@ -86,7 +87,7 @@ def _load_first_decision_template() -> dict[str, Any]:
         resp = (
             supabase_admin.table(_EMAIL_TEMPLATE_TABLE)
             .select(
-                "template_key,display_name,description,scene,event_type,subject_template,body_html_template,body_text_template,is_active"
+                "template_key,display_name,description,scene,event_type,subject_template,body_html_template,body_text_template,is_active,id,updated_at"
             )
             .eq("template_key", _FIRST_DECISION_TEMPLATE_KEY)
             .eq("is_active", True)
@@ -97,6 +98,7 @@ def _load_first_decision_template() -> dict[str, Any]:
         if row:
             scene = str(row.get("scene") or "").strip().lower()
             if scene == _DECISION_SCENE:
+                get_email_template_registry().register(row)
                 return row
     except APIError as exc:
         text = str(exc)
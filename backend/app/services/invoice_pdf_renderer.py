@@ -0,0 +1,188 @@
+"""
+Invoice PDF 渲染进程池。
+
+中文注释:
+- WeasyPrint 渲染是纯 CPU 操作，旧实现在请求线程内 `HTML(string=html).write_pdf()`，每次都重新解析样式、
+  重新初始化 fontconfig/pango 字体缓存；月底批量重生成时会长时间占住 API worker。
+- 这里改为固定数量的子进程（INVOICE_RENDER_POOL_WORKERS）：子进程启动时预热 WeasyPrint（字体配置、
+  解析好的 invoice_pdf.css、一次空白渲染），之后每个任务只做 HTML -> PDF。
+- 单个子进程执行 INVOICE_RENDER_MAX_JOBS_PER_WORKER 次后回收，防止渲染库内存碎片累积。
+- INVOICE_RENDER_POOL_WORKERS=0 时在调用线程内渲染（同样复用进程内缓存的样式与字体配置），便于本地调试。
+"""
+
+from __future__ import annotations
+
+import logging
+import multiprocessing
+import os
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from threading import Lock
+from typing import Any, Optional
+
+from app.core.config import env_int
+
+logger = logging.getLogger("scholarflow.invoice_pdf")
+
+_STYLESHEET_NAME = "invoice_pdf.css"
+
+# 中文注释: 每个进程各自持有一份（父进程内联渲染 / 子进程预热后复用）。
+_font_config: Any = None
+_stylesheet: Any = None
+_cache_lock = Lock()
+
+
+def _stylesheet_path() -> Path:
+    return Path(__file__).resolve().parents[1] / "core" / "templates" / _STYLESHEET_NAME
+
+
+def _weasyprint_state() -> tuple[Any, Any]:
+    global _font_config, _stylesheet
+    if _stylesheet is not None:
+        return _font_config, _stylesheet
+    with _cache_lock:
+        if _stylesheet is None:
+            from weasyprint import CSS  # type: ignore
+            from weasyprint.text.fonts import FontConfiguration  # type: ignore
+
+            font_config = FontConfiguration()
+            _stylesheet = CSS(string=_stylesheet_path().read_text(encoding="utf-8"), font_config=font_config)
+            _font_config = font_config
+    return _font_config, _stylesheet
+
+
+def render_invoice_pdf(html: str) -> bytes:
+    """HTML（不含内联样式）-> PDF bytes；样式表与字体配置按进程缓存。"""
+    from weasyprint import HTML  # type: ignore
+
+    font_config, stylesheet = _weasyprint_state()
+    return HTML(string=html).write_pdf(stylesheets=[stylesheet], font_config=font_config)
+
+
+def _warm_worker() -> None:
+    # 中文注释: 首次渲染会触发 fontconfig 扫描与 pango 字体缓存构建，放在子进程启动时完成，避免落到第一张发票上。
+    try:
+        render_invoice_pdf("<html><body><p>warmup 预热</p></body></html>")
+    except Exception as e:  # pragma: no cover - WeasyPrint 缺系统依赖时由真实任务报错
+        logger.warning("[InvoiceRender] worker warmup failed: %s", e)
+
+
+class InvoiceRenderPool:
+    """
+    Invoice PDF 渲染进程池（线程安全）。
+
+    - workers：子进程数量，0 表示在调用线程内渲染；
+    - max_jobs_per_worker：单个子进程最多渲染多少张发票后回收。
+    """
+
+    def __init__(
+        self,
+        *,
+        workers: Optional[int] = None,
+        max_jobs_per_worker: Optional[int] = None,
+        start_method: Optional[str] = None,
+    ) -> None:
+        self.workers = (
+            workers
+            if workers is not None
+            else env_int("INVOICE_RENDER_POOL_WORKERS", min(4, os.cpu_count() or 1), minimum=0)
+        )
+        self.max_jobs_per_worker = max_jobs_per_worker or env_int("INVOICE_RENDER_MAX_JOBS_PER_WORKER", 500)
+        # 中文注释: 父进程有多线程，默认 spawn，避免 fork 继承锁状态；max_tasks_per_child 也要求非 fork。
+        self._ctx = multiprocessing.get_context(
+            start_method or (os.environ.get("INVOICE_RENDER_START_METHOD") or "spawn").strip()
+        )
+        self._lock = Lock()
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self.submitted_total = 0
+        self.restarts_total = 0
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=self._ctx,
+                    initializer=_warm_worker,
+                    max_tasks_per_child=self.max_jobs_per_worker,
+                )
+            return self._executor
+
+    def _restart(self, broken: ProcessPoolExecutor) -> None:
+        with self._lock:
+            if self._executor is not broken:
+                return
+            self._executor = None
+            self.restarts_total += 1
+        broken.shutdown(wait=False, cancel_futures=True)
+
+    def submit(self, html: str) -> "Future[bytes]":
+        """提交一次渲染，返回 Future[bytes]；子进程崩溃导致池失效时重建一次。"""
+        with self._lock:
+            self.submitted_total += 1
+        if self.workers <= 0:
+            future: "Future[bytes]" = Future()
+            try:
+                future.set_result(render_invoice_pdf(html))
+            except Exception as e:
+                future.set_exception(e)
+            return future
+        executor = self._get_executor()
+        try:
+            return executor.submit(render_invoice_pdf, html)
+        except BrokenProcessPool:
+            logger.warning("[InvoiceRender] process pool broken, restarting")
+            self._restart(executor)
+            return self._get_executor().submit(render_invoice_pdf, html)
+
+    def render(self, html: str, *, timeout_sec: Optional[float] = None) -> bytes:
+        try:
+            return self.submit(html).result(timeout=timeout_sec)
+        except BrokenProcessPool:
+            # 中文注释: 渲染期间子进程被 OOM/信号杀掉：重建池后重试一次。
+            broken = self._executor
+            if broken is not None:
+                self._restart(broken)
+            return self.submit(html).result(timeout=timeout_sec)
+
+    def metrics(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "max_jobs_per_worker": self.max_jobs_per_worker,
+                "started": self._executor is not None,
+                "submitted_total": self.submitted_total,
+                "restarts_total": self.restarts_total,
+            }
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor = self._executor
+            self._executor = None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+_pool_lock = Lock()
+_pool: Optional[InvoiceRenderPool] = None
+
+
+def get_invoice_render_pool() -> InvoiceRenderPool:
+    global _pool
+    if _pool is not None:
+        return _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = InvoiceRenderPool()
+            logger.info("[InvoiceRender] init workers=%s", _pool.workers)
+        return _pool
+
+
+def shutdown_invoice_render_pool() -> None:
+    global _pool
+    with _pool_lock:
+        pool = _pool
+        _pool = None
+    if pool is not None:
+        pool.shutdown()
@@ -1,16 +1,19 @@
 from __future__ import annotations
 
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
 from dataclasses import dataclass
 from datetime import datetime, timezone
 from pathlib import Path
 import time
+from typing import Any, Iterable
 from uuid import UUID
 
 from jinja2 import Environment, FileSystemLoader, select_autoescape
 
-from app.core.config import InvoiceConfig
+from app.core.config import InvoiceConfig, env_int
 from app.lib.api_client import supabase_admin
-from app.services.storage_service import create_signed_url, upload_bytes
+from app.services.invoice_pdf_renderer import InvoiceRenderPool, get_invoice_render_pool
+from app.services.storage_service import create_signed_url, ensure_bucket_exists, upload_bytes
 
 try:
     from weasyprint import HTML  # type: ignore
@@ -20,10 +23,16 @@ except Exception as e:  # pragma: no cover
 else:
     _WEASYPRINT_IMPORT_ERROR = ""
 
+_INVOICE_BASE_SELECT = "id,manuscript_id,amount,status,confirmed_at"
+_INVOICE_EXTENDED_SELECT = f"{_INVOICE_BASE_SELECT},invoice_number,pdf_path,pdf_generated_at,pdf_error"
+# 中文注释: 批量预取时 in_ 过滤拼在 URL 里，按块查询避免超出网关 URL 长度限制。
+_PREFETCH_CHUNK = 200
+
 
 @dataclass(frozen=True)
 class InvoicePdfResult:
-    invoice_id: UUID
+    # 中文注释: 批量重生成时格式非法的 id 无法转成 UUID，原样回传字符串。
+    invoice_id: UUID | str
     invoice_number: str | None
     pdf_path: str | None
     pdf_generated_at: str | None
@@ -87,7 +96,11 @@ def _render_invoice_html(
     manuscript_title: str,
     amount_display: str,
     bank_details: str,
+    inline_styles: bool = True,
 ) -> str:
+    """
+    中文注释: inline_styles=False 时不内联 invoice_pdf.css，由渲染进程使用预先解析好的样式表。
+    """
     return _jinja.get_template("invoice_pdf.html").render(
         invoice_number=invoice_number,
         issue_date=issue_date,
@@ -96,18 +109,19 @@ def _render_invoice_html(
         manuscript_title=manuscript_title,
         amount_display=amount_display,
         bank_details=bank_details,
+        inline_styles=inline_styles,
     )
 
 
 def _html_to_pdf_bytes(html: str) -> bytes:
     if HTML is None:  # pragma: no cover
         raise RuntimeError(f"WeasyPrint is not available: {_WEASYPRINT_IMPORT_ERROR}")
-    return HTML(string=html).write_pdf()
+    return get_invoice_render_pool().render(html)
 
 
 def _load_invoice_row(invoice_id: UUID) -> dict:
-    base = "id,manuscript_id,amount,status,confirmed_at"
-    extended = f"{base},invoice_number,pdf_path,pdf_generated_at,pdf_error"
+    base = _INVOICE_BASE_SELECT
+    extended = _INVOICE_EXTENDED_SELECT
 
     try:
         resp = (
@@ -163,12 +177,141 @@ def _load_author_profile(author_id: str) -> dict:
     return rows[0] if rows else {}
 
 
+def _chunks(values: list[str], size: int = _PREFETCH_CHUNK) -> Iterable[list[str]]:
+    for start in range(0, len(values), size):
+        yield values[start : start + size]
+
+
+def _load_rows_by_ids(table: str, select: str, ids: list[str]) -> dict[str, dict]:
+    out: dict[str, dict] = {}
+    for chunk in _chunks(ids):
+        resp = supabase_admin.table(table).select(select).in_("id", chunk).execute()
+        for row in getattr(resp, "data", None) or []:
+            rid = str(row.get("id") or "")
+            if rid:
+                out[rid] = row
+    return out
+
+
+def _load_invoice_rows(invoice_ids: list[str]) -> dict[str, dict]:
+    try:
+        return _load_rows_by_ids("invoices", _INVOICE_EXTENDED_SELECT, invoice_ids)
+    except Exception as e:
+        print(f"[InvoicePDF] bulk invoice select fallback: error={e}")
+        return _load_rows_by_ids("invoices", _INVOICE_BASE_SELECT, invoice_ids)
+
+
+def _load_author_profiles(author_ids: list[str]) -> dict[str, dict]:
+    # 中文注释：与单张生成一致，profile 缺失/查询失败时回退为 "Author"，不影响发票生成。
+    try:
+        return _load_rows_by_ids("user_profiles", "id,full_name,email", author_ids)
+    except Exception as e:
+        print(f"[InvoicePDF] bulk profile select failed (ignored): error={e}")
+        return {}
+
+
+def _author_display_name(prof: dict | None) -> str:
+    prof = prof or {}
+    return (
+        (prof.get("full_name") or "").strip()
+        or (prof.get("email") or "").strip()
+        or "Author"
+    )
+
+
+def _invoice_render_context(
+    *,
+    invoice_id: UUID,
+    inv: dict,
+    ms: dict | None,
+    author_name: str,
+    now: datetime,
+    cfg: InvoiceConfig,
+) -> dict[str, Any]:
+    try:
+        amount = float(inv.get("amount") or 0)
+    except Exception:
+        amount = 0.0
+    manuscript_id = str(inv.get("manuscript_id") or "").strip()
+    return {
+        "invoice_number": (inv.get("invoice_number") or "").strip()
+        or _invoice_number(invoice_id=invoice_id, when=now),
+        "issue_date": now.strftime("%Y-%m-%d"),
+        "author_name": author_name,
+        "manuscript_id": manuscript_id,
+        "manuscript_title": (ms.get("title") or "Manuscript").strip() if ms else "Manuscript",
+        "amount_display": _format_amount(amount),
+        "bank_details": cfg.payment_instructions,
+    }
+
+
+def _store_invoice_pdf(
+    *,
+    invoice_id: UUID,
+    manuscript_id: str,
+    inv_no: str,
+    pdf_bytes: bytes,
+    now: datetime,
+    ensure_bucket: bool = True,
+) -> InvoicePdfResult:
+    pdf_path = f"{manuscript_id}/{invoice_id}.pdf"
+    upload_bytes(
+        bucket="invoices",
+        path=pdf_path,
+        content=pdf_bytes,
+        content_type="application/pdf",
+        upsert=True,
+        ensure_bucket=ensure_bucket,
+    )
+    _safe_update_invoice(
+        invoice_id=invoice_id,
+        patch={
+            "invoice_number": inv_no,
+            "pdf_path": pdf_path,
+            "pdf_generated_at": now.isoformat(),
+            "pdf_error": None,
+        },
+    )
+    print(f"[InvoicePDF] stored: invoice_id={invoice_id} pdf_path={pdf_path}")
+    return InvoicePdfResult(
+        invoice_id=invoice_id,
+        invoice_number=inv_no,
+        pdf_path=pdf_path,
+        pdf_generated_at=now.isoformat(),
+        pdf_error=None,
+    )
+
+
+def _record_invoice_pdf_failure(
+    *,
+    invoice_id: UUID,
+    inv_no: str | None,
+    err: str,
+    now: datetime,
+    update_row: bool = True,
+) -> InvoicePdfResult:
+    print(f"[InvoicePDF] failed: invoice_id={invoice_id} error={err}")
+    if update_row:
+        _safe_update_invoice(
+            invoice_id=invoice_id,
+            patch={"pdf_error": err, "pdf_generated_at": now.isoformat()},
+        )
+    return InvoicePdfResult(
+        invoice_id=invoice_id,
+        invoice_number=inv_no,
+        pdf_path=None,
+        pdf_generated_at=now.isoformat(),
+        pdf_error=err,
+    )
+
+
 def generate_and_store_invoice_pdf(*, invoice_id: UUID) -> InvoicePdfResult:
     """
     生成并上传 Invoice PDF，然后回填 invoices 表（不改变 payment status）。
+
+    中文注释: PDF 渲染交给 invoice 渲染进程池，当前线程只等待结果并负责上传/回填。
     """
     now = datetime.now(timezone.utc)
-    issue_date = now.strftime("%Y-%m-%d")
     cfg = InvoiceConfig.from_env()
 
     inv = _load_invoice_row(invoice_id)
@@ -180,80 +323,155 @@ def generate_and_store_invoice_pdf(*, invoice_id: UUID) -> InvoicePdfResult:
         raise RuntimeError("Invoice missing manuscript_id")
 
     ms = _load_manuscript_row(manuscript_id)
-    title = (ms.get("title") or "Manuscript").strip() if ms else "Manuscript"
     author_id = str((ms or {}).get("author_id") or "").strip()
 
     author_name = "Author"
     if author_id:
-        prof = _load_author_profile(author_id)
-        author_name = (
-            (prof.get("full_name") or "").strip()
-            or (prof.get("email") or "").strip()
-            or "Author"
-        )
-
-    try:
-        amount = float(inv.get("amount") or 0)
-    except Exception:
-        amount = 0.0
+        author_name = _author_display_name(_load_author_profile(author_id))
 
-    inv_no = (inv.get("invoice_number") or "").strip() or _invoice_number(
-        invoice_id=invoice_id, when=now
-    )
-    pdf_path = f"{manuscript_id}/{invoice_id}.pdf"
+    ctx = _invoice_render_context(invoice_id=invoice_id, inv=inv, ms=ms, author_name=author_name, now=now, cfg=cfg)
+    inv_no = ctx["invoice_number"]
 
     try:
-        html = _render_invoice_html(
-            invoice_number=inv_no,
-            issue_date=issue_date,
-            author_name=author_name,
-            manuscript_id=manuscript_id,
-            manuscript_title=title,
-            amount_display=_format_amount(amount),
-            bank_details=cfg.payment_instructions,
-        )
+        html = _render_invoice_html(**ctx, inline_styles=False)
         pdf_bytes = _html_to_pdf_bytes(html)
         print(
             f"[InvoicePDF] generating: invoice_id={invoice_id} manuscript_id={manuscript_id} bytes={len(pdf_bytes)}"
         )
-        upload_bytes(
-            bucket="invoices",
-            path=pdf_path,
-            content=pdf_bytes,
-            content_type="application/pdf",
-            upsert=True,
-        )
-        _safe_update_invoice(
-            invoice_id=invoice_id,
-            patch={
-                "invoice_number": inv_no,
-                "pdf_path": pdf_path,
-                "pdf_generated_at": now.isoformat(),
-                "pdf_error": None,
-            },
-        )
-        print(f"[InvoicePDF] stored: invoice_id={invoice_id} pdf_path={pdf_path}")
-        return InvoicePdfResult(
+        return _store_invoice_pdf(
             invoice_id=invoice_id,
-            invoice_number=inv_no,
-            pdf_path=pdf_path,
-            pdf_generated_at=now.isoformat(),
-            pdf_error=None,
+            manuscript_id=manuscript_id,
+            inv_no=inv_no,
+            pdf_bytes=pdf_bytes,
+            now=now,
         )
     except Exception as e:
-        err = str(e)
-        print(f"[InvoicePDF] failed: invoice_id={invoice_id} error={err}")
-        _safe_update_invoice(
-            invoice_id=invoice_id,
-            patch={"pdf_error": err, "pdf_generated_at": now.isoformat()},
-        )
-        return InvoicePdfResult(
-            invoice_id=invoice_id,
-            invoice_number=inv_no,
-            pdf_path=None,
-            pdf_generated_at=now.isoformat(),
-            pdf_error=err,
-        )
+        return _record_invoice_pdf_failure(invoice_id=invoice_id, inv_no=inv_no, err=str(e), now=now)
+
+
+def regenerate_invoice_pdfs(
+    invoice_ids: Iterable[UUID | str],
+    *,
+    render_pool: InvoiceRenderPool | None = None,
+    upload_concurrency: int | None = None,
+) -> list[InvoicePdfResult]:
+    """
+    批量重新生成 Invoice PDF（月底批量重出账单等场景），按输入顺序返回每张发票的结果。
+
+    中文注释:
+    - invoices / manuscripts / user_profiles 各一轮 in_ 批量预取（超过 200 个 id 时分块），不再逐张 3 次查询；
+    - HTML 在当前线程渲染后整体提交到渲染进程池，哪张先渲染完就先交给上传线程池
+      （INVOICE_PDF_UPLOAD_CONCURRENCY 路并发上传 + 回填），渲染与上传重叠进行；
+    - 单张失败只记录到该发票的 pdf_error，不影响其余发票；同样不触碰支付状态。
+    """
+    # 中文注释: 先校验 id 格式并规范成小写 UUID 字符串；非法 id 只记为该条失败，
+    # 且不能进入 in_ 查询（否则整批查询会被 Postgres 拒绝）。
+    ids: list[str] = []
+    valid_ids: dict[str, UUID] = {}
+    for raw in invoice_ids:
+        iid = str(raw).strip()
+        try:
+            invoice_id = UUID(iid)
+        except ValueError:
+            pass
+        else:
+            iid = str(invoice_id)
+            valid_ids[iid] = invoice_id
+        if iid and iid not in ids:
+            ids.append(iid)
+    if not ids:
+        return []
+
+    now = datetime.now(timezone.utc)
+    cfg = InvoiceConfig.from_env()
+    pool = render_pool or get_invoice_render_pool()
+    workers = upload_concurrency or env_int("INVOICE_PDF_UPLOAD_CONCURRENCY", 8)
+
+    results: dict[str, InvoicePdfResult] = {}
+    for iid in ids:
+        if iid not in valid_ids:
+            print(f"[InvoicePDF] failed: invoice_id={iid} error=Invalid invoice id")
+            results[iid] = InvoicePdfResult(
+                invoice_id=iid,
+                invoice_number=None,
+                pdf_path=None,
+                pdf_generated_at=now.isoformat(),
+                pdf_error="Invalid invoice id",
+            )
+
+    invoices = _load_invoice_rows(list(valid_ids)) if valid_ids else {}
+    manuscript_ids = sorted(
+        {str(inv.get("manuscript_id") or "").strip() for inv in invoices.values()} - {""}
+    )
+    manuscripts = _load_rows_by_ids("manuscripts", "id,title,author_id", manuscript_ids) if manuscript_ids else {}
+    author_ids = sorted({str(ms.get("author_id") or "").strip() for ms in manuscripts.values()} - {""})
+    profiles = _load_author_profiles(author_ids) if author_ids else {}
+
+    renders: dict[Future, tuple[UUID, str, str]] = {}
+    for iid, invoice_id in valid_ids.items():
+        inv = invoices.get(iid)
+        if not inv:
+            results[iid] = _record_invoice_pdf_failure(
+                invoice_id=invoice_id, inv_no=None, err="Invoice not found", now=now, update_row=False
+            )
+            continue
+        manuscript_id = str(inv.get("manuscript_id") or "").strip()
+        if not manuscript_id:
+            results[iid] = _record_invoice_pdf_failure(
+                invoice_id=invoice_id, inv_no=None, err="Invoice missing manuscript_id", now=now
+            )
+            continue
+        ms = manuscripts.get(manuscript_id)
+        author_id = str((ms or {}).get("author_id") or "").strip()
+        author_name = _author_display_name(profiles.get(author_id)) if author_id else "Author"
+        ctx = _invoice_render_context(invoice_id=invoice_id, inv=inv, ms=ms, author_name=author_name, now=now, cfg=cfg)
+        try:
+            future = pool.submit(_render_invoice_html(**ctx, inline_styles=False))
+        except Exception as e:
+            results[iid] = _record_invoice_pdf_failure(
+                invoice_id=invoice_id, inv_no=ctx["invoice_number"], err=str(e), now=now
+            )
+            continue
+        renders[future] = (invoice_id, manuscript_id, ctx["invoice_number"])
+
+    if renders:
+        try:
+            ensure_bucket_exists(bucket="invoices", public=False)
+        except Exception as e:
+            # 中文注释: bucket 不可用时本批全部无法上传：逐张记录失败并丢弃尚未开始的渲染，而不是整批抛错。
+            for future, (invoice_id, _manuscript_id, inv_no) in renders.items():
+                future.cancel()
+                results[str(invoice_id)] = _record_invoice_pdf_failure(
+                    invoice_id=invoice_id, inv_no=inv_no, err=f"Invoice bucket unavailable: {e}", now=now
+                )
+            renders = {}
+
+    def _finish(future: Future, invoice_id: UUID, manuscript_id: str, inv_no: str) -> InvoicePdfResult:
+        try:
+            return _store_invoice_pdf(
+                invoice_id=invoice_id,
+                manuscript_id=manuscript_id,
+                inv_no=inv_no,
+                pdf_bytes=future.result(),
+                now=now,
+                ensure_bucket=False,
+            )
+        except Exception as e:
+            return _record_invoice_pdf_failure(invoice_id=invoice_id, inv_no=inv_no, err=str(e), now=now)
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="sf-invoice-upload") as uploader:
+        uploads = {
+            uploader.submit(_finish, future, *renders[future]): str(renders[future][0])
+            for future in as_completed(renders)
+        }
+        for upload in as_completed(uploads):
+            results[uploads[upload]] = upload.result()
+
+    print(
+        f"[InvoicePDF] bulk regenerate: total={len(ids)} "
+        f"failed={sum(1 for r in results.values() if r.pdf_error)}"
+    )
+    return [results[iid] for iid in ids]
 
 
 def get_invoice_pdf_signed_url(*, invoice_id: UUID) -> tuple[str, int]:
@@ -1,14 +1,16 @@
 from __future__ import annotations
 
 from datetime import datetime, timezone
-from typing import Any, Dict, List, Optional
+from collections import defaultdict
+from typing import Any, Callable, Dict, List, Optional, Sequence
 from uuid import UUID
 
 from fastapi import HTTPException
 
 from app.core.config import MatchmakingConfig
-from app.core.ml import embed_text, hash_source_text
+from app.core.ml import embed_text, embed_texts, hash_source_text
 from app.lib.api_client import supabase_admin
+from app.services.reviewer_vector_index import ReviewerVectorIndex, get_reviewer_index
 
 
 def _to_pgvector_literal(vector: List[float]) -> str:
@@ -23,6 +25,19 @@ def _to_pgvector_literal(vector: List[float]) -> str:
     return "[" + ",".join(f"{x:.6f}" for x in vector) + "]"
 
 
+# 中文注释: PostgREST in_ 过滤拼在 URL 上，id 过多会超出网关 URL 长度限制，按块拆分。
+_IN_FILTER_CHUNK = 200
+# 与 index_reviewer 保持一致：每位审稿人最多取 20 条历史审稿稿件标题。
+_HISTORY_PER_REVIEWER = 20
+# 中文注释: PostgREST 默认 max-rows=1000，超出部分会被静默截断；review_reports 按该页长分页读取。
+_HISTORY_PAGE_SIZE = 1000
+
+
+def _chunks(items: Sequence[Any], size: int):
+    for i in range(0, len(items), size):
+        yield items[i : i + size]
+
+
 class MatchmakingService:
     """
     本地审稿人匹配服务（Feature 012）
@@ -34,10 +49,16 @@ class MatchmakingService:
         *,
         db_client=None,
         embedder=None,
+        batch_embedder=None,
     ) -> None:
         self._config = config or MatchmakingConfig.from_env()
         self._db = db_client or supabase_admin
         self._embedder = embedder or (lambda text: embed_text(text, self._config.model_name))
+        self._batch_embedder: Callable[[List[str]], List[List[float]]] = batch_embedder or (
+            (lambda texts: [embedder(t) for t in texts])
+            if embedder is not None
+            else (lambda texts: embed_texts(texts, self._config.model_name))
+        )
 
     def analyze(
         self,
@@ -51,21 +72,25 @@ class MatchmakingService:
         """
 
         config = self._config
+        index = self._ready_index()
 
         # 冷启动门槛：reviewer_embeddings 少于 min_reviewers 时，返回友好提示
-        try:
-            corpus_preview = (
-                self._db.table("reviewer_embeddings")
-                .select("user_id")
-                .limit(config.min_reviewers)
-                .execute()
-            )
-            corpus_rows = getattr(corpus_preview, "data", None) or []
-        except Exception as e:
-            print(f"[matchmaking] failed to read reviewer_embeddings: {e}")
-            raise HTTPException(status_code=503, detail="Matchmaking unavailable (database not configured)")
+        if index is not None:
+            corpus_size = index.size
+        else:
+            try:
+                corpus_preview = (
+                    self._db.table("reviewer_embeddings")
+                    .select("user_id")
+                    .limit(config.min_reviewers)
+                    .execute()
+                )
+                corpus_size = len(getattr(corpus_preview, "data", None) or [])
+            except Exception as e:
+                print(f"[matchmaking] failed to read reviewer_embeddings: {e}")
+                raise HTTPException(status_code=503, detail="Matchmaking unavailable (database not configured)")
 
-        if len(corpus_rows) < config.min_reviewers:
+        if corpus_size < config.min_reviewers:
             return {
                 "recommendations": [],
                 "insufficient_data": True,
@@ -79,24 +104,37 @@ class MatchmakingService:
         if not isinstance(vector, list) or len(vector) != 384:
             raise HTTPException(status_code=500, detail="Embedding generation failed (unexpected dimension)")
 
-        query_embedding = _to_pgvector_literal(vector)
-
-        try:
-            match_resp = self._db.rpc(
-                "match_reviewers",
-                {
-                    "query_embedding": query_embedding,
-                    "match_threshold": float(config.threshold),
-                    "match_count": int(config.top_k),
-                },
-            ).execute()
-        except Exception as e:
-            print(f"[matchmaking] rpc match_reviewers failed: {e}")
-            raise HTTPException(status_code=503, detail="Matchmaking unavailable (rpc missing)")
+        if index is not None:
+            # 中文注释: 进程内索引直接给出 TopK + 展示字段；仅缺失 profile 时才回查数据库。
+            matches = [
+                {"user_id": uid, "score": score}
+                for uid, score in index.search(vector, threshold=float(config.threshold), top_k=int(config.top_k))
+            ]
+            user_ids = [m["user_id"] for m in matches]
+            profiles = index.profiles_for(user_ids)
+            missing = [uid for uid in user_ids if uid not in profiles]
+            if missing:
+                profiles.update(self._fetch_profiles_map(missing))
+            index.maybe_refresh_in_background(self._db)
+        else:
+            query_embedding = _to_pgvector_literal(vector)
 
-        matches = getattr(match_resp, "data", None) or []
-        user_ids = [m.get("user_id") for m in matches if m.get("user_id")]
-        profiles = self._fetch_profiles_map(user_ids)
+            try:
+                match_resp = self._db.rpc(
+                    "match_reviewers",
+                    {
+                        "query_embedding": query_embedding,
+                        "match_threshold": float(config.threshold),
+                        "match_count": int(config.top_k),
+                    },
+                ).execute()
+            except Exception as e:
+                print(f"[matchmaking] rpc match_reviewers failed: {e}")
+                raise HTTPException(status_code=503, detail="Matchmaking unavailable (rpc missing)")
+
+            matches = getattr(match_resp, "data", None) or []
+            user_ids = [m.get("user_id") for m in matches if m.get("user_id")]
+            profiles = self._fetch_profiles_map(user_ids)
 
         recommendations = []
         for m in matches:
@@ -120,6 +158,26 @@ class MatchmakingService:
             "message": None,
         }
 
+    def _ready_index(self) -> Optional[ReviewerVectorIndex]:
+        """
+        memory 模式且索引已加载时返回索引；否则返回 None（走 match_reviewers RPC）。
+        """
+        if self._config.index_mode != "memory":
+            return None
+        index = get_reviewer_index()
+        if not index.ready:
+            # 中文注释: 启动预热尚未完成时本次仍走 RPC，同时触发后台加载。
+            index.maybe_refresh_in_background(self._db)
+            return None
+        return index
+
+    def _push_to_index(self, user_id: str, vector: List[float]) -> None:
+        if self._config.index_mode != "memory":
+            return
+        index = get_reviewer_index()
+        if index.ready:
+            index.upsert(user_id, vector)
+
     def index_reviewer(self, user_id: str) -> None:
         """
         计算并写入 reviewer embedding（BackgroundTasks 调用）。
@@ -147,26 +205,8 @@ class MatchmakingService:
         else:
             interests = str(interests_data or "").strip()
 
-        history_titles: List[str] = []
         try:
-            rr = (
-                self._db.table("review_reports")
-                .select("manuscript_id")
-                .eq("reviewer_id", user_id)
-                .limit(20)
-                .execute()
-            )
-            rr_rows = getattr(rr, "data", None) or []
-            ms_ids = [r.get("manuscript_id") for r in rr_rows if r.get("manuscript_id")]
-            if ms_ids:
-                ms = (
-                    self._db.table("manuscripts")
-                    .select("id, title")
-                    .in_("id", ms_ids)
-                    .execute()
-                )
-                ms_rows = getattr(ms, "data", None) or []
-                history_titles = [m.get("title") for m in ms_rows if m.get("title")]
+            history_titles = self._fetch_history_titles([str(user_id)]).get(str(user_id), [])
         except Exception:
             history_titles = []
 
@@ -208,6 +248,207 @@ class MatchmakingService:
             self._db.table("reviewer_embeddings").upsert(payload).execute()
         except Exception as e:
             print(f"[matchmaking] failed to upsert reviewer_embeddings: {e}")
+            return
+        self._push_to_index(user_id, vector)
+
+    def reindex_reviewers(
+        self,
+        *,
+        batch_size: int = 256,
+        user_ids: Optional[List[str]] = None,
+        force: bool = False,
+    ) -> Dict[str, int]:
+        """
+        批量重建 reviewer embedding（内部 cron / 运维脚本调用）。
+
+        中文注释:
+        - 按 id keyset 分批读取审稿人；每批的画像、历史稿件标题、现有 source_text_hash 各一次批量查询；
+        - hash 未变的审稿人跳过（force=True 时全部重算）；
+        - 需要重算的文本一次 embed_texts 批量推理，再一次 upsert 批量写回。
+        """
+        batch_size = max(1, int(batch_size or 1))
+        stats = {"scanned": 0, "skipped": 0, "embedded": 0, "failed": 0}
+
+        if user_ids is not None:
+            ids = [str(u) for u in user_ids if u]
+            for chunk in _chunks(ids, batch_size):
+                self._reindex_batch(self._fetch_reviewer_profiles_by_ids(chunk), force=force, stats=stats)
+        else:
+            last_id: Optional[str] = None
+            while True:
+                profiles = self._fetch_reviewer_profiles_page(after_id=last_id, limit=batch_size)
+                if not profiles:
+                    break
+                self._reindex_batch(profiles, force=force, stats=stats)
+                last_id = str(profiles[-1].get("id"))
+                if len(profiles) < batch_size:
+                    break
+        print(
+            "[matchmaking] reindex done: "
+            + " ".join(f"{k}={v}" for k, v in stats.items())
+        )
+        return stats
+
+    def _fetch_reviewer_profiles_page(self, *, after_id: Optional[str], limit: int) -> List[Dict[str, Any]]:
+        query = (
+            self._db.table("user_profiles")
+            .select("id, research_interests")
+            .contains("roles", ["reviewer"])
+        )
+        if after_id:
+            query = query.gt("id", after_id)
+        resp = query.order("id").limit(limit).execute()
+        return list(getattr(resp, "data", None) or [])
+
+    def _fetch_reviewer_profiles_by_ids(self, ids: List[str]) -> List[Dict[str, Any]]:
+        if not ids:
+            return []
+        resp = (
+            self._db.table("user_profiles")
+            .select("id, research_interests")
+            .in_("id", ids)
+            .execute()
+        )
+        return list(getattr(resp, "data", None) or [])
+
+    def _fetch_history_titles(self, reviewer_ids: List[str]) -> Dict[str, List[str]]:
+        """
+        reviewer 历史审稿标题（单个索引与批量重建共用）。
+
+        中文注释: 每个 reviewer 取去重后按 manuscript_id 升序的前 _HISTORY_PER_REVIEWER 篇，标题也按该顺序排列；
+        顺序与数据库返回顺序无关，保证同一份数据算出的 source_text_hash 恒定，未变化的 reviewer 不会被重复向量化。
+        """
+        reported: Dict[str, set] = defaultdict(set)
+        for chunk in _chunks(reviewer_ids, _IN_FILTER_CHUNK):
+            # 中文注释: 一块 reviewer 的报告数可能超过 max-rows，按稳定顺序 range 分页直到返回短页，
+            # 否则排在后面的 reviewer 会丢失历史标题，批量结果与 index_reviewer 不一致。
+            offset = 0
+            while True:
+                resp = (
+                    self._db.table("review_reports")
+                    .select("reviewer_id, manuscript_id")
+                    .in_("reviewer_id", chunk)
+                    .order("reviewer_id")
+                    .order("manuscript_id")
+                    .order("id")
+                    .range(offset, offset + _HISTORY_PAGE_SIZE - 1)
+                    .execute()
+                )
+                rows = getattr(resp, "data", None) or []
+                for row in rows:
+                    rid = str(row.get("reviewer_id") or "")
+                    mid = row.get("manuscript_id")
+                    if rid and mid:
+                        reported[rid].add(str(mid))
+                if len(rows) < _HISTORY_PAGE_SIZE:
+                    break
+                offset += _HISTORY_PAGE_SIZE
+        manuscript_ids_by_reviewer = {
+            rid: sorted(mids)[:_HISTORY_PER_REVIEWER] for rid, mids in reported.items()
+        }
+
+        all_ms_ids = sorted({mid for mids in manuscript_ids_by_reviewer.values() for mid in mids})
+        titles: Dict[str, str] = {}
+        for chunk in _chunks(all_ms_ids, _IN_FILTER_CHUNK):
+            resp = (
+                self._db.table("manuscripts")
+                .select("id, title")
+                .in_("id", chunk)
+                .execute()
+            )
+            for row in getattr(resp, "data", None) or []:
+                if row.get("id") and row.get("title"):
+                    titles[str(row["id"])] = row["title"]
+
+        return {
+            rid: [titles[mid] for mid in mids if mid in titles]
+            for rid, mids in manuscript_ids_by_reviewer.items()
+        }
+
+    def _fetch_existing_hashes(self, reviewer_ids: List[str]) -> Dict[str, str]:
+        hashes: Dict[str, str] = {}
+        for chunk in _chunks(reviewer_ids, _IN_FILTER_CHUNK):
+            resp = (
+                self._db.table("reviewer_embeddings")
+                .select("user_id, source_text_hash")
+                .in_("user_id", chunk)
+                .execute()
+            )
+            for row in getattr(resp, "data", None) or []:
+                if row.get("user_id"):
+                    hashes[str(row["user_id"])] = str(row.get("source_text_hash") or "")
+        return hashes
+
+    def _reindex_batch(self, profiles: List[Dict[str, Any]], *, force: bool, stats: Dict[str, int]) -> None:
+        reviewer_ids = [str(p.get("id")) for p in profiles if p.get("id")]
+        if not reviewer_ids:
+            return
+        stats["scanned"] += len(reviewer_ids)
+
+        try:
+            history = self._fetch_history_titles(reviewer_ids)
+            existing = {} if force else self._fetch_existing_hashes(reviewer_ids)
+        except Exception as e:
+            print(f"[matchmaking] reindex batch prefetch failed: {e}")
+            stats["failed"] += len(reviewer_ids)
+            return
+
+        pending: List[tuple[str, str, str]] = []
+        for profile in profiles:
+            user_id = str(profile.get("id") or "")
+            if not user_id:
+                continue
+            interests_data = profile.get("research_interests")
+            if isinstance(interests_data, list):
+                interests = ", ".join(interests_data)
+            else:
+                interests = str(interests_data or "").strip()
+            source_text = self._build_reviewer_source_text(
+                interests=interests, history_titles=history.get(user_id, [])
+            )
+            source_hash = hash_source_text(source_text)
+            if existing.get(user_id) == source_hash:
+                stats["skipped"] += 1
+                continue
+            pending.append((user_id, source_text, source_hash))
+
+        if not pending:
+            return
+
+        try:
+            vectors = self._batch_embedder([text for _, text, _ in pending])
+        except Exception as e:
+            print(f"[matchmaking] reindex batch embedding failed: {e}")
+            stats["failed"] += len(pending)
+            return
+
+        now = datetime.now(timezone.utc).isoformat()
+        payload = []
+        for (user_id, _, source_hash), vector in zip(pending, vectors):
+            if not isinstance(vector, list) or len(vector) != 384:
+                stats["failed"] += 1
+                continue
+            payload.append(
+                {
+                    "user_id": user_id,
+                    "embedding": _to_pgvector_literal(vector),
+                    "source_text_hash": source_hash,
+                    "updated_at": now,
+                }
+            )
+        if not payload:
+            return
+
+        try:
+            self._db.table("reviewer_embeddings").upsert(payload).execute()
+            stats["embedded"] += len(payload)
+        except Exception as e:
+            print(f"[matchmaking] reindex batch upsert failed: {e}")
+            stats["failed"] += len(payload)
+            return
+        for (user_id, _, _), vector in zip(pending, vectors):
+            if isinstance(vector, list) and len(vector) == 384:
+                self._push_to_index(user_id, vector)
 
     def _resolve_manuscript_text(
         self,
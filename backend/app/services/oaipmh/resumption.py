@@ -0,0 +1,91 @@
+"""
+OAI-PMH resumptionToken 编解码。
+
+中文注释:
+- token 为 itsdangerous 签名串，对外不透明；篡改/过期统一视为 badResumptionToken。
+- 载荷携带首个请求的全部参数（verb/metadataPrefix/from/until/set），后续请求只需带 token。
+- 游标为 keyset `(updated_at, id)`，不使用 offset，翻到深页也不会越来越慢。
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+from dataclasses import asdict, dataclass
+from typing import Optional
+
+from itsdangerous import BadSignature, URLSafeTimedSerializer
+
+from app.core.config import env_int, is_test_env
+
+logger = logging.getLogger("scholarflow.oaipmh")
+
+_SALT = "scholarflow.oaipmh.resumption"
+_TEST_SECRET = "scholarflow-oaipmh-test-secret"
+_missing_secret_logged = False
+
+
+def resumption_token_ttl_sec() -> int:
+    return env_int("OAIPMH_RESUMPTION_TTL_SEC", 86400, minimum=60)
+
+
+def _token_secret() -> str:
+    """
+    中文注释:
+    - 优先 OAIPMH_RESUMPTION_SECRET，其次复用已有的共享密钥 SECRET_KEY / MAGIC_LINK_JWT_SECRET
+      （itsdangerous 的 salt 做用途隔离），严禁复用 Supabase service role key 做签名；
+    - 多个 uvicorn worker 必须使用同一密钥，否则 A 进程签发的 token 在 B 进程校验失败，harvest 随机中断。
+      因此不再退化为进程内随机密钥：都未配置时（测试环境除外）记录错误并拒绝签发/校验。
+    """
+    global _missing_secret_logged
+    for name in ("OAIPMH_RESUMPTION_SECRET", "SECRET_KEY", "MAGIC_LINK_JWT_SECRET"):
+        secret = (os.environ.get(name) or "").strip()
+        if secret:
+            return secret
+    if is_test_env():
+        return _TEST_SECRET
+    if not _missing_secret_logged:
+        _missing_secret_logged = True
+        logger.error("[OAI-PMH] OAIPMH_RESUMPTION_SECRET/SECRET_KEY not configured; resumption tokens are disabled")
+    # 中文注释: 异常信息可能经由 OAI-PMH 错误响应返回给 harvester，不在其中暴露环境变量名。
+    raise RuntimeError("resumption tokens are unavailable")
+
+
+class InvalidResumptionToken(ValueError):
+    pass
+
+
+@dataclass(frozen=True)
+class ResumptionState:
+    verb: str
+    metadata_prefix: str
+    from_: Optional[str]
+    until: Optional[str]
+    set_spec: Optional[str]
+    journal_id: Optional[str]
+    last_updated_at: str
+    last_id: str
+    cursor: int
+    complete_list_size: Optional[int]
+
+
+def _serializer() -> URLSafeTimedSerializer:
+    return URLSafeTimedSerializer(_token_secret(), salt=_SALT)
+
+
+def encode_token(state: ResumptionState) -> str:
+    return _serializer().dumps(asdict(state))
+
+
+def decode_token(token: str) -> ResumptionState:
+    try:
+        serializer = _serializer()
+    except RuntimeError as e:
+        # 中文注释: 密钥缺失是服务端配置问题，只记录在服务端日志；对外统一返回 badResumptionToken。
+        logger.error("[OAI-PMH] cannot verify resumptionToken: %s", e)
+        raise InvalidResumptionToken("Invalid resumptionToken") from e
+    try:
+        payload = serializer.loads(str(token or ""), max_age=resumption_token_ttl_sec())
+        return ResumptionState(**payload)
+    except (BadSignature, TypeError) as e:
+        raise InvalidResumptionToken(str(e)) from e
@@ -0,0 +1,521 @@
+"""
+已发表文章的进程内全文检索索引（/manuscripts/search 与 /public/topics 共用）。
+
+中文注释:
+- 旧实现每次检索都是 `title.ilike.%q% OR abstract.ilike.%q%` 全量扫描 + 返回全部列，无排序、无分页；
+  /public/topics 每次请求都拉 1200 行再逐行做关键词子串匹配。
+- 这里在进程内维护倒排表（term -> {doc: tf}），BM25 排序（标题词频加权），keyset 分页（score desc, id asc），
+  字段投影与摘要片段（snippet）。学科计数在文档写入/删除时增量维护，topics 直接读取。
+- 启动时全量加载；之后按 manuscripts.updated_at 水位增量刷新（包含非 published 行，用于撤稿/下线时从索引删除），
+  并定期全量重载以清理被物理删除的行。
+- 索引未就绪（首次加载中/加载失败）时由调用方退回数据库查询，不影响可用性。
+"""
+
+from __future__ import annotations
+
+import base64
+import json
+import logging
+import math
+import os
+import re
+import threading
+from bisect import bisect_left
+from collections import Counter
+from time import monotonic
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from app.core.config import env_int, is_test_env
+
+logger = logging.getLogger("scholarflow.public_search")
+
+# 中文注释: 索引内保留的列（也是检索结果可投影的全部字段）。
+INDEX_COLUMNS = (
+    "id,title,abstract,authors,doi,published_at,updated_at,status,journal_id,journals(title,slug)"
+)
+PROJECTABLE_FIELDS = (
+    "id",
+    "title",
+    "abstract",
+    "authors",
+    "doi",
+    "published_at",
+    "journal_id",
+    "journals",
+)
+DEFAULT_FIELDS = PROJECTABLE_FIELDS
+
+_PAGE_SIZE = 1000
+_TOKEN_RE = re.compile(r"[0-9a-z]+")
+_MIN_PREFIX_LEN = 3
+_MAX_PREFIX_EXPANSION = 50
+_SNIPPET_RADIUS = 80
+
+# BM25 参数（常用默认值）；标题词频按 _TITLE_WEIGHT 倍计入。
+_BM25_K1 = 1.2
+_BM25_B = 0.75
+_TITLE_WEIGHT = 2
+
+# 中文注释:
+# - 由于当前 schema 里没有稳定的“学科分类表”，MVP 先用标题/摘要关键词做轻量归类。
+# - 后续若新增 journals.subject/category 字段，可直接切到数据库聚合而不是关键词匹配。
+SUBJECT_COLLECTION_RULES = [
+    {
+        "id": "medicine",
+        "name": "Medicine",
+        "icon": "Stethoscope",
+        "query": "medicine",
+        "keywords": (
+            "medicine",
+            "medical",
+            "clinical",
+            "health",
+            "patient",
+            "disease",
+            "therapy",
+            "hospital",
+            "biomedical",
+            "oncology",
+        ),
+    },
+    {
+        "id": "technology",
+        "name": "Technology",
+        "icon": "Cpu",
+        "query": "technology",
+        "keywords": (
+            "technology",
+            "artificial intelligence",
+            "machine learning",
+            "deep learning",
+            "ai ",
+            "algorithm",
+            "software",
+            "computer",
+            "engineering",
+            "data science",
+            "robot",
+            "network",
+        ),
+    },
+    {
+        "id": "physics",
+        "name": "Physics",
+        "icon": "Atom",
+        "query": "physics",
+        "keywords": (
+            "physics",
+            "quantum",
+            "particle",
+            "optics",
+            "photon",
+            "thermodynamics",
+            "astrophysics",
+            "materials",
+            "nanostructure",
+        ),
+    },
+    {
+        "id": "social",
+        "name": "Social Sciences",
+        "icon": "Landmark",
+        "query": "social",
+        "keywords": (
+            "social",
+            "sociology",
+            "economics",
+            "policy",
+            "education",
+            "psychology",
+            "humanities",
+            "law",
+            "governance",
+            "ethics",
+            "management",
+        ),
+    },
+    {
+        "id": "general",
+        "name": "General Science",
+        "icon": "FlaskConical",
+        "query": "science",
+        "keywords": (),
+    },
+]
+
+
+def is_public_search_index_enabled() -> bool:
+    raw = os.environ.get("PUBLIC_SEARCH_INDEX_ENABLED")
+    if raw is None:
+        # 中文注释: 测试默认关闭，接口走数据库路径，避免单例索引在用例之间串数据。
+        return not is_test_env()
+    return str(raw).strip().lower() in {"1", "true", "yes", "on"}
+
+
+def normalize_text(value: Any) -> str:
+    return " ".join(str(value or "").strip().lower().split())
+
+
+def classify_subjects(text: str) -> List[str]:
+    """
+    按关键词把一段（已 normalize 的）文本归入学科；空文本返回 []，无命中归入 general。
+    """
+    if not text:
+        return []
+    matched = [
+        str(rule["id"])
+        for rule in SUBJECT_COLLECTION_RULES
+        if rule.get("keywords") and any(keyword in text for keyword in rule["keywords"])
+    ]
+    return matched or ["general"]
+
+
+def tokenize(text: Any) -> List[str]:
+    return [t for t in _TOKEN_RE.findall(str(text or "").lower()) if len(t) >= 2 or t.isdigit()]
+
+
+def encode_cursor(score: float, doc_id: str) -> str:
+    raw = json.dumps({"s": score, "i": doc_id}, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: Optional[str]) -> Optional[Tuple[float, str]]:
+    """
+    解析 next_cursor；格式不对返回 None（调用方按第一页处理或报 422）。
+    """
+    if not cursor:
+        return None
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        return float(payload["s"]), str(payload["i"])
+    except Exception:
+        return None
+
+
+def project_fields(raw: Optional[str]) -> Tuple[str, ...]:
+    """
+    fields=title,doi → 只返回白名单内的列（id 始终返回）；为空返回默认列。
+    """
+    if not raw:
+        return DEFAULT_FIELDS
+    wanted = {part.strip() for part in str(raw).split(",") if part.strip()}
+    picked = tuple(f for f in PROJECTABLE_FIELDS if f in wanted)
+    return picked if "id" in picked else ("id",) + picked
+
+
+def build_snippet(text: Any, terms: Sequence[str], *, radius: int = _SNIPPET_RADIUS) -> str:
+    """
+    截取首个命中词附近的摘要片段；无命中时返回开头部分。
+    """
+    source = " ".join(str(text or "").split())
+    if not source:
+        return ""
+    lowered = source.lower()
+    hit = -1
+    for term in terms:
+        match = re.search(r"\b" + re.escape(term), lowered)
+        if match and (hit < 0 or match.start() < hit):
+            hit = match.start()
+    start = 0 if hit < 0 else max(0, hit - radius)
+    end = min(len(source), (radius * 2 if hit < 0 else hit + radius))
+    if start > 0:
+        space = source.find(" ", start)
+        start = space + 1 if 0 <= space < hit else start
+    if end < len(source):
+        space = source.rfind(" ", start, end)
+        end = space if space > max(hit, start) else end
+    snippet = source[start:end].strip()
+    return ("…" if start > 0 else "") + snippet + ("…" if end < len(source) else "")
+
+
+class PublicSearchIndex:
+    """
+    线程安全的已发表文章倒排索引。
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.RLock()
+        self._docs: Dict[str, Dict[str, Any]] = {}
+        self._doc_terms: Dict[str, Dict[str, int]] = {}
+        self._doc_len: Dict[str, int] = {}
+        self._doc_subjects: Dict[str, List[str]] = {}
+        self._postings: Dict[str, Dict[str, int]] = {}
+        self._total_len = 0
+        self._subject_counts: Counter = Counter()
+        self._sorted_terms: Optional[List[str]] = None
+        self._watermark: Optional[str] = None
+        self._loaded = False
+        self._last_refresh = 0.0
+        self._last_full_load = 0.0
+        self._refreshing = False
+        self.refresh_interval_sec = env_int("PUBLIC_SEARCH_INDEX_REFRESH_SEC", 60)
+        self.full_reload_interval_sec = env_int("PUBLIC_SEARCH_INDEX_FULL_RELOAD_SEC", 3600)
+
+    @property
+    def ready(self) -> bool:
+        return self._loaded
+
+    @property
+    def size(self) -> int:
+        with self._lock:
+            return len(self._docs)
+
+    # ---------------- 写入 ----------------
+
+    def upsert(self, row: Dict[str, Any]) -> None:
+        """
+        写入一行 manuscripts；非 published 状态视为删除（撤稿/下线）。
+        """
+        doc_id = str(row.get("id") or "")
+        if not doc_id:
+            return
+        if str(row.get("status") or "published") != "published":
+            self.remove(doc_id)
+            return
+        title = row.get("title") or ""
+        abstract = row.get("abstract") or ""
+        counts: Counter = Counter()
+        for token in tokenize(title):
+            counts[token] += _TITLE_WEIGHT
+        counts.update(tokenize(abstract))
+        doc = {field: row.get(field) for field in PROJECTABLE_FIELDS}
+        subjects = classify_subjects(normalize_text(f"{title} {abstract}"))
+        with self._lock:
+            self._remove_locked(doc_id)
+            self._docs[doc_id] = doc
+            self._doc_terms[doc_id] = dict(counts)
+            length = sum(counts.values())
+            self._doc_len[doc_id] = length
+            self._total_len += length
+            for term, tf in counts.items():
+                postings = self._postings.get(term)
+                if postings is None:
+                    postings = self._postings[term] = {}
+                    self._sorted_terms = None
+                postings[doc_id] = tf
+            self._doc_subjects[doc_id] = subjects
+            self._subject_counts.update(subjects)
+
+    def _remove_locked(self, doc_id: str) -> None:
+        terms = self._doc_terms.pop(doc_id, None)
+        if terms is None:
+            return
+        for term in terms:
+            postings = self._postings.get(term)
+            if postings is None:
+                continue
+            postings.pop(doc_id, None)
+            if not postings:
+                del self._postings[term]
+                self._sorted_terms = None
+        self._total_len -= self._doc_len.pop(doc_id, 0)
+        self._docs.pop(doc_id, None)
+        self._subject_counts.subtract(self._doc_subjects.pop(doc_id, []))
+
+    def remove(self, doc_id: str) -> None:
+        with self._lock:
+            self._remove_locked(str(doc_id))
+
+    # ---------------- 查询 ----------------
+
+    def _expand_terms(self, query: str) -> List[str]:
+        """
+        查询词：精确命中优先；否则按前缀扩展（与旧 ilike 子串检索的“输入一半也能搜到”体验接近）。
+        """
+        out: List[str] = []
+        for token in dict.fromkeys(tokenize(query)):
+            if token in self._postings:
+                out.append(token)
+                continue
+            if len(token) < _MIN_PREFIX_LEN:
+                continue
+            if self._sorted_terms is None:
+                self._sorted_terms = sorted(self._postings)
+            terms = self._sorted_terms
+            i = bisect_left(terms, token)
+            expanded = 0
+            while i < len(terms) and terms[i].startswith(token) and expanded < _MAX_PREFIX_EXPANSION:
+                out.append(terms[i])
+                i += 1
+                expanded += 1
+        return out
+
+    def search(
+        self,
+        query: str,
+        *,
+        limit: int,
+        cursor: Optional[Tuple[float, str]] = None,
+        fields: Sequence[str] = DEFAULT_FIELDS,
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """
+        BM25 检索。返回 (results, next_cursor)；results 每项包含投影字段 + score + snippet。
+        """
+        limit = max(1, int(limit))
+        with self._lock:
+            terms = self._expand_terms(query)
+            n_docs = len(self._docs)
+            if not terms or n_docs == 0:
+                return [], None
+            avgdl = (self._total_len / n_docs) or 1.0
+            scores: Dict[str, float] = {}
+            for term in terms:
+                postings = self._postings[term]
+                df = len(postings)
+                idf = math.log(1.0 + (n_docs - df + 0.5) / (df + 0.5))
+                for doc_id, tf in postings.items():
+                    norm = _BM25_K1 * (1.0 - _BM25_B + _BM25_B * self._doc_len[doc_id] / avgdl)
+                    scores[doc_id] = scores.get(doc_id, 0.0) + idf * tf * (_BM25_K1 + 1.0) / (tf + norm)
+            # 中文注释: 分数保留 6 位小数，保证 cursor 往返后比较稳定。
+            ranked = sorted(((round(s, 6), doc_id) for doc_id, s in scores.items()), key=lambda x: (-x[0], x[1]))
+            if cursor is not None:
+                last_score, last_id = cursor
+                ranked = [
+                    item
+                    for item in ranked
+                    if item[0] < last_score or (item[0] == last_score and item[1] > last_id)
+                ]
+            page = ranked[: limit + 1]
+            results: List[Dict[str, Any]] = []
+            for score, doc_id in page[:limit]:
+                doc = self._docs[doc_id]
+                item = {field: doc.get(field) for field in fields}
+                item["score"] = score
+                item["snippet"] = build_snippet(doc.get("abstract"), terms)
+                results.append(item)
+        next_cursor = None
+        if len(page) > limit:
+            tail_score, tail_id = page[limit - 1]
+            next_cursor = encode_cursor(tail_score, tail_id)
+        return results, next_cursor
+
+    def subject_counts(self) -> Dict[str, int]:
+        with self._lock:
+            counts = {str(rule["id"]): 0 for rule in SUBJECT_COLLECTION_RULES}
+            for subject, count in self._subject_counts.items():
+                if count > 0:
+                    counts[subject] = int(count)
+            return counts
+
+    # ---------------- 加载 / 刷新 ----------------
+
+    @staticmethod
+    def _iter_rows(db, since: Optional[str]) -> Iterator[Dict[str, Any]]:
+        last: Optional[Tuple[str, str]] = None
+        while True:
+            query = db.table("manuscripts").select(INDEX_COLUMNS)
+            if since:
+                # 中文注释: 增量刷新不过滤 status，才能发现“已发表 → 撤稿”的变化。
+                query = query.gte("updated_at", since)
+            else:
+                query = query.eq("status", "published")
+            if last is not None:
+                ts, doc_id = last
+                query = query.or_(
+                    f'updated_at.gt."{ts}",and(updated_at.eq."{ts}",id.gt."{doc_id}")'
+                )
+            resp = query.order("updated_at").order("id").limit(_PAGE_SIZE).execute()
+            rows = list(getattr(resp, "data", None) or [])
+            for row in rows:
+                yield row
+            if len(rows) < _PAGE_SIZE:
+                return
+            tail = rows[-1]
+            last = (str(tail.get("updated_at") or ""), str(tail.get("id") or ""))
+
+    def _apply_rows(self, rows: Iterator[Dict[str, Any]]) -> int:
+        count = 0
+        watermark = self._watermark
+        for row in rows:
+            self.upsert(row)
+            count += 1
+            ts = str(row.get("updated_at") or "")
+            if ts and (watermark is None or ts > watermark):
+                watermark = ts
+        with self._lock:
+            self._watermark = watermark
+        return count
+
+    def load(self, db) -> int:
+        """
+        全量（重新）加载：在新索引上构建后整体替换，查询期间不会看到半成品。
+        """
+        fresh = PublicSearchIndex()
+        count = fresh._apply_rows(self._iter_rows(db, None))
+        now = monotonic()
+        with self._lock:
+            self._docs = fresh._docs
+            self._doc_terms = fresh._doc_terms
+            self._doc_len = fresh._doc_len
+            self._doc_subjects = fresh._doc_subjects
+            self._postings = fresh._postings
+            self._total_len = fresh._total_len
+            self._subject_counts = fresh._subject_counts
+            self._sorted_terms = None
+            self._watermark = fresh._watermark
+            self._loaded = True
+            self._last_refresh = now
+            self._last_full_load = now
+        logger.info("[PublicSearch] loaded %s published articles", count)
+        return count
+
+    def refresh(self, db) -> int:
+        """
+        增量刷新：只拉取 updated_at >= 水位 的行（同一时间戳可能有多行，取 >= 后幂等覆盖）。
+        """
+        with self._lock:
+            since = self._watermark
+        if since is None:
+            return self.load(db)
+        count = self._apply_rows(self._iter_rows(db, since))
+        with self._lock:
+            self._last_refresh = monotonic()
+        return count
+
+    def maybe_refresh_in_background(self, db) -> None:
+        now = monotonic()
+        with self._lock:
+            if self._refreshing:
+                return
+            # 中文注释: 首次加载失败后同样按刷新间隔退避，避免每个请求都触发一次全量加载。
+            if self._last_refresh and now - self._last_refresh < self.refresh_interval_sec:
+                return
+            full = not self._loaded or now - self._last_full_load >= self.full_reload_interval_sec
+            self._refreshing = True
+
+        def _run() -> None:
+            try:
+                if full:
+                    self.load(db)
+                else:
+                    self.refresh(db)
+            except Exception as e:
+                logger.warning("[PublicSearch] refresh failed: %s", e)
+                with self._lock:
+                    self._last_refresh = monotonic()
+            finally:
+                with self._lock:
+                    self._refreshing = False
+
+        threading.Thread(target=_run, name="sf-public-search-refresh", daemon=True).start()
+
+
+_index_lock = threading.Lock()
+_index: Optional[PublicSearchIndex] = None
+
+
+def get_public_search_index() -> PublicSearchIndex:
+    global _index
+    if _index is not None:
+        return _index
+    with _index_lock:
+        if _index is None:
+            _index = PublicSearchIndex()
+        return _index
+
+
+def reset_public_search_index() -> None:
+    global _index
+    with _index_lock:
+        _index = None
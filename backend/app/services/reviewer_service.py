@@ -5,6 +5,7 @@ from datetime import datetime, timedelta, timezone
 from typing import Any, Dict, List, Optional
 from uuid import UUID
 
+from app.core import profile_cache
 from app.core.email_normalization import normalize_email
 from app.core.default_password import get_default_bootstrap_password
 from app.lib.api_client import supabase_admin
@@ -320,6 +321,7 @@ class ReviewerService:
                 "updated_at": now,
             }
             supabase_admin.table("user_profiles").update(update_data).eq("id", str(existing["id"])).execute()
+            profile_cache.invalidate_user(str(existing["id"]))
             merged = {**existing, **update_data}
             merged["id"] = existing["id"]
             return merged
@@ -365,6 +367,7 @@ class ReviewerService:
             "updated_at": now,
         }
         supabase_admin.table("user_profiles").upsert(profile_data).execute()
+        profile_cache.invalidate_user(str(user_id))
         return profile_data
 
     def deactivate(self, reviewer_id: UUID) -> Dict[str, Any]:
@@ -375,6 +378,7 @@ class ReviewerService:
             .eq("id", str(reviewer_id))
             .execute()
         )
+        profile_cache.invalidate_user(str(reviewer_id))
         rows = getattr(resp, "data", None) or []
         if not rows:
             raise ValueError("Reviewer not found")
@@ -402,6 +406,7 @@ class ReviewerService:
             else:
                 update_data[k] = v
         resp = supabase_admin.table("user_profiles").update(update_data).eq("id", str(reviewer_id)).execute()
+        profile_cache.invalidate_user(str(reviewer_id))
         rows = getattr(resp, "data", None) or []
         if not rows:
             raise ValueError("Reviewer not found")
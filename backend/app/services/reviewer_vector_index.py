@@ -0,0 +1,312 @@
+"""
+进程内审稿人向量索引（MATCHMAKING_INDEX_MODE=memory）。
+
+中文注释:
+- 默认模式下每次“Assign Reviewer”都要把 384 维向量拼成 pgvector 字面量发给 match_reviewers RPC，再查一次 profiles。
+- memory 模式在进程内持有全部 reviewer embedding（float32 连续矩阵）+ 展示用 profile 字段，
+  TopK 为一次矩阵-向量乘 + argpartition，查询路径不访问数据库。
+- 启动时全量加载；之后按 reviewer_embeddings.updated_at 水位增量刷新（后台线程，不阻塞查询），
+  并定期全量重载以清理已删除的审稿人；本进程内 index_reviewer / reindex_reviewers 写入后也会直接更新索引。
+- 向量已 L2 归一化，点积即 cosine similarity（与 RPC 的 1 - cosine distance 一致）。
+- numpy 为可选依赖：缺失时退化为纯 Python 点积（小规模审稿人池仍可用）。
+- 未引入 HNSW：暴力矩阵乘在十万级 × 384 float32 仍为毫秒级，足够当前规模。
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import threading
+from time import monotonic
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from app.core.config import env_int
+
+try:
+    import numpy as np  # type: ignore
+except Exception:  # pragma: no cover - 取决于部署环境
+    np = None
+
+logger = logging.getLogger("scholarflow.reviewer_index")
+
+EMBEDDING_DIM = 384
+_PAGE_SIZE = 1000
+_PROFILE_CHUNK = 200
+
+
+def _parse_vector(raw: Any) -> Optional[List[float]]:
+    """
+    PostgREST 返回的 vector 列是字符串 "[0.1,0.2,...]"；兼容已是 list 的情况。
+    """
+    if isinstance(raw, str):
+        try:
+            raw = json.loads(raw)
+        except Exception:
+            return None
+    if not isinstance(raw, (list, tuple)) or len(raw) != EMBEDDING_DIM:
+        return None
+    try:
+        return [float(x) for x in raw]
+    except Exception:
+        return None
+
+
+class ReviewerVectorIndex:
+    """
+    线程安全的审稿人向量索引。
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.RLock()
+        self._ids: List[str] = []
+        self._row_of: Dict[str, int] = {}
+        self._matrix: Any = (
+            np.zeros((0, EMBEDDING_DIM), dtype=np.float32) if np is not None else []
+        )
+        self._profiles: Dict[str, Dict[str, Any]] = {}
+        self._watermark: Optional[str] = None
+        self._loaded = False
+        self._last_refresh = 0.0
+        self._last_full_load = 0.0
+        self._refreshing = False
+        self.refresh_interval_sec = env_int("MATCHMAKING_INDEX_REFRESH_SEC", 30)
+        self.full_reload_interval_sec = env_int("MATCHMAKING_INDEX_FULL_RELOAD_SEC", 3600)
+
+    @property
+    def ready(self) -> bool:
+        return self._loaded
+
+    @property
+    def size(self) -> int:
+        with self._lock:
+            return len(self._ids)
+
+    # ---------------- 写入 ----------------
+
+    def _ensure_capacity(self, needed: int) -> None:
+        if np is None:
+            return
+        capacity = self._matrix.shape[0]
+        if needed <= capacity:
+            return
+        # 中文注释: 容量按倍数增长，避免逐行 append 导致频繁整块拷贝。
+        new_capacity = max(needed, capacity * 2, 64)
+        grown = np.zeros((new_capacity, EMBEDDING_DIM), dtype=np.float32)
+        grown[: len(self._ids)] = self._matrix[: len(self._ids)]
+        self._matrix = grown
+
+    def upsert(self, user_id: str, vector: Sequence[float], profile: Optional[Dict[str, Any]] = None) -> None:
+        uid = str(user_id)
+        if len(vector) != EMBEDDING_DIM:
+            return
+        with self._lock:
+            row = self._row_of.get(uid)
+            if row is None:
+                row = len(self._ids)
+                self._ensure_capacity(row + 1)
+                self._ids.append(uid)
+                self._row_of[uid] = row
+                if np is None:
+                    self._matrix.append([float(x) for x in vector])
+            if np is not None:
+                self._matrix[row] = np.asarray(vector, dtype=np.float32)
+            elif row < len(self._matrix):
+                self._matrix[row] = [float(x) for x in vector]
+            if profile:
+                self._profiles[uid] = {
+                    "email": profile.get("email"),
+                    "full_name": profile.get("full_name"),
+                }
+
+    def remove(self, user_id: str) -> None:
+        uid = str(user_id)
+        with self._lock:
+            row = self._row_of.pop(uid, None)
+            if row is None:
+                return
+            last = len(self._ids) - 1
+            if row != last:
+                # 中文注释: 与最后一行交换后截断，O(1) 删除。
+                moved = self._ids[last]
+                self._ids[row] = moved
+                self._row_of[moved] = row
+                self._matrix[row] = self._matrix[last]
+            self._ids.pop()
+            if np is None:
+                self._matrix.pop()
+            self._profiles.pop(uid, None)
+
+    # ---------------- 查询 ----------------
+
+    def search(self, vector: Sequence[float], *, threshold: float, top_k: int) -> List[Tuple[str, float]]:
+        """
+        返回 [(user_id, score)]，score 降序，仅包含 score >= threshold 的前 top_k 个。
+        """
+        k = max(0, int(top_k))
+        with self._lock:
+            n = len(self._ids)
+            if n == 0 or k == 0:
+                return []
+            if np is not None:
+                q = np.asarray(vector, dtype=np.float32)
+                scores = self._matrix[:n] @ q
+                if k < n:
+                    candidates = np.argpartition(-scores, k - 1)[:k]
+                else:
+                    candidates = np.arange(n)
+                ordered = candidates[np.argsort(-scores[candidates], kind="stable")]
+                return [
+                    (self._ids[int(i)], float(scores[int(i)]))
+                    for i in ordered
+                    if float(scores[int(i)]) >= threshold
+                ]
+            q_list = [float(x) for x in vector]
+            scored = [
+                (self._ids[i], sum(a * b for a, b in zip(self._matrix[i], q_list)))
+                for i in range(n)
+            ]
+        scored.sort(key=lambda item: item[1], reverse=True)
+        return [(uid, score) for uid, score in scored[:k] if score >= threshold]
+
+    def profiles_for(self, user_ids: Sequence[str]) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            return {uid: dict(self._profiles[uid]) for uid in user_ids if uid in self._profiles}
+
+    # ---------------- 加载 / 刷新 ----------------
+
+    @staticmethod
+    def _iter_embedding_rows(db, since: Optional[str]) -> Iterator[Dict[str, Any]]:
+        last: Optional[Tuple[str, str]] = None
+        while True:
+            query = db.table("reviewer_embeddings").select("user_id, embedding, updated_at")
+            if since:
+                query = query.gte("updated_at", since)
+            if last is not None:
+                ts, uid = last
+                query = query.or_(
+                    f'updated_at.gt."{ts}",and(updated_at.eq."{ts}",user_id.gt."{uid}")'
+                )
+            resp = query.order("updated_at").order("user_id").limit(_PAGE_SIZE).execute()
+            rows = list(getattr(resp, "data", None) or [])
+            for row in rows:
+                yield row
+            if len(rows) < _PAGE_SIZE:
+                return
+            tail = rows[-1]
+            last = (str(tail.get("updated_at") or ""), str(tail.get("user_id") or ""))
+
+    @staticmethod
+    def _fetch_profiles(db, user_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        out: Dict[str, Dict[str, Any]] = {}
+        for i in range(0, len(user_ids), _PROFILE_CHUNK):
+            chunk = user_ids[i : i + _PROFILE_CHUNK]
+            try:
+                resp = (
+                    db.table("user_profiles")
+                    .select("id, email, full_name")
+                    .in_("id", chunk)
+                    .execute()
+                )
+            except Exception as e:
+                logger.warning("[ReviewerIndex] profile fetch failed: %s", e)
+                continue
+            for row in getattr(resp, "data", None) or []:
+                if row.get("id"):
+                    out[str(row["id"])] = row
+        return out
+
+    def _apply_rows(self, db, rows: List[Dict[str, Any]]) -> int:
+        vectors: List[Tuple[str, List[float]]] = []
+        watermark = self._watermark
+        for row in rows:
+            uid = str(row.get("user_id") or "")
+            vec = _parse_vector(row.get("embedding"))
+            if not uid or vec is None:
+                continue
+            vectors.append((uid, vec))
+            ts = str(row.get("updated_at") or "")
+            if ts and (watermark is None or ts > watermark):
+                watermark = ts
+        profiles = self._fetch_profiles(db, [uid for uid, _ in vectors])
+        for uid, vec in vectors:
+            self.upsert(uid, vec, profiles.get(uid))
+        with self._lock:
+            self._watermark = watermark
+        return len(vectors)
+
+    def load(self, db) -> int:
+        """
+        全量（重新）加载：在新索引上构建后整体替换，查询期间不会看到半成品。
+        """
+        fresh = ReviewerVectorIndex()
+        rows = list(self._iter_embedding_rows(db, None))
+        count = fresh._apply_rows(db, rows)
+        now = monotonic()
+        with self._lock:
+            self._ids = fresh._ids
+            self._row_of = fresh._row_of
+            self._matrix = fresh._matrix
+            self._profiles = fresh._profiles
+            self._watermark = fresh._watermark
+            self._loaded = True
+            self._last_refresh = now
+            self._last_full_load = now
+        logger.info("[ReviewerIndex] loaded %s reviewers", count)
+        return count
+
+    def refresh(self, db) -> int:
+        """
+        增量刷新：只拉取 updated_at >= 水位 的行（同一时间戳可能有多行，取 >= 后幂等覆盖）。
+        """
+        with self._lock:
+            since = self._watermark
+        if since is None:
+            return self.load(db)
+        count = self._apply_rows(db, list(self._iter_embedding_rows(db, since)))
+        with self._lock:
+            self._last_refresh = monotonic()
+        return count
+
+    def maybe_refresh_in_background(self, db) -> None:
+        now = monotonic()
+        with self._lock:
+            if self._refreshing or now - self._last_refresh < self.refresh_interval_sec:
+                return
+            full = now - self._last_full_load >= self.full_reload_interval_sec
+            self._refreshing = True
+
+        def _run() -> None:
+            try:
+                if full:
+                    self.load(db)
+                else:
+                    self.refresh(db)
+            except Exception as e:
+                logger.warning("[ReviewerIndex] refresh failed: %s", e)
+                with self._lock:
+                    self._last_refresh = monotonic()
+            finally:
+                with self._lock:
+                    self._refreshing = False
+
+        threading.Thread(target=_run, name="sf-reviewer-index-refresh", daemon=True).start()
+
+
+_index_lock = threading.Lock()
+_index: Optional[ReviewerVectorIndex] = None
+
+
+def get_reviewer_index() -> ReviewerVectorIndex:
+    global _index
+    if _index is not None:
+        return _index
+    with _index_lock:
+        if _index is None:
+            _index = ReviewerVectorIndex()
+        return _index
+
+
+def reset_reviewer_index() -> None:
+    global _index
+    with _index_lock:
+        _index = None
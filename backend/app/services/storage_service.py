@@ -59,8 +59,28 @@ def upload_bytes(
     content: bytes,
     content_type: str,
     upsert: bool = True,
+    ensure_bucket: bool = True,
 ) -> None:
-    ensure_bucket_exists(bucket=bucket, public=False)
+    # 中文注释: 批量上传时调用方先确保一次 bucket 存在，再传 ensure_bucket=False，避免每个文件多一次 get_bucket。
+    if ensure_bucket:
+        ensure_bucket_exists(bucket=bucket, public=False)
     # storage3 期望 header value 为字符串；传 bool 会触发 httpx "Header value must be str or bytes"。
     opts = {"content-type": content_type, "upsert": "true" if upsert else "false"}
     supabase_admin.storage.from_(bucket).upload(path, content, opts)
+
+
+def upload_file(
+    *,
+    bucket: str,
+    path: str,
+    file_path: str,
+    content_type: str,
+    upsert: bool = True,
+) -> None:
+    """
+    上传磁盘文件（以文件句柄交给 storage3，由 httpx 流式发送，避免整文件读入内存）。
+    """
+    ensure_bucket_exists(bucket=bucket, public=False)
+    opts = {"content-type": content_type, "upsert": "true" if upsert else "false"}
+    with open(file_path, "rb") as fh:
+        supabase_admin.storage.from_(bucket).upload(path, fh, opts)
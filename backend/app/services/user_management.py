@@ -6,8 +6,10 @@ from uuid import UUID
 from typing import Optional, Dict, Any, List, Iterable
 from supabase import create_client, Client
 
+from app.core import profile_cache
 from app.core.default_password import get_default_bootstrap_password
 from app.core.email_normalization import normalize_email
+from app.core.email_templates import get_email_template_registry
 from app.core.mail import email_service
 
 ALLOWED_USER_ROLES = {
@@ -360,7 +362,7 @@ class UserManagementService:
             res = (
                 self.admin_client.table(_EMAIL_TEMPLATE_TABLE)
                 .select(
-                    "template_key,display_name,scene,subject_template,body_html_template,body_text_template,is_active"
+                    "template_key,display_name,scene,subject_template,body_html_template,body_text_template,is_active,id,updated_at"
                 )
                 .eq("template_key", configured_key)
                 .eq("is_active", True)
@@ -369,6 +371,7 @@ class UserManagementService:
             )
             row = getattr(res, "data", None)
             if row:
+                get_email_template_registry().register(row)
                 return row
         except Exception as e:
             # 中文注释：模板表缺失或查询失败时回退内置模板，避免主流程中断。
@@ -618,6 +621,8 @@ class UserManagementService:
                 raise Exception("Failed to update user profile")
             
             updated_profile = update_resp.data[0]
+            # 角色已变更：失效 profile/roles/scope 缓存，保证新权限立即生效
+            profile_cache.invalidate_user(target_id_str)
             
             # T058: Audit Log
             # We log the primary transition.
@@ -817,6 +822,7 @@ class UserManagementService:
             }
             
             self.admin_client.table("user_profiles").upsert(profile_data).execute()
+            profile_cache.invalidate_user(str(user_id))
             
             self.log_account_creation(
                 created_user_id=UUID(user_id),
@@ -924,6 +930,7 @@ class UserManagementService:
                 "updated_at": datetime.utcnow().isoformat(),
             }
             self.admin_client.table("user_profiles").upsert(profile_data).execute()
+            profile_cache.invalidate_user(str(user_id))
             self.log_account_creation(
                 created_user_id=UUID(user_id),
                 created_by=invited_by,
@@ -1,6 +1,7 @@
 from typing import Dict, Any, Optional
 from uuid import UUID
 from datetime import datetime, timezone
+from app.core import profile_cache
 from app.core.email_normalization import normalize_email
 from app.lib.api_client import supabase_admin, create_user_supabase_client
 from app.schemas.user import UserProfileUpdate
@@ -41,7 +42,9 @@ class UserService:
                 
                 resp = user_client.table("user_profiles").insert(insert_data).execute()
                 rows = getattr(resp, "data", None) or [insert_data]
-            
+
+            # 中文注释: 自助修改 profile 后立即失效缓存，避免 GET /user/profile 与角色判定读到旧值。
+            profile_cache.invalidate_user(str(user_id))
             return rows[0]
         except Exception as e:
             print(f"Error updating profile: {e}")
@@ -47,6 +47,11 @@ from app.core.middleware import ExceptionHandlerMiddleware
 from app.core.init_cms import ensure_cms_initialized
 from app.core.rate_limit import RateLimitMiddleware, is_rate_limit_enabled
 from app.lib.api_client import supabase_admin
+from app.core.mail_dispatcher import shutdown_smtp_pools
+from app.core.parse_pool import shutdown_parse_pool
+from app.core.rate_limit_backends import shutdown_rate_limiters
+from app.services.invoice_pdf_renderer import shutdown_invoice_render_pool
+from app.lib.supabase_pool import close_shared_http_client
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
@@ -72,7 +77,46 @@ async def lifespan(app: FastAPI):
                 logger.warning("[matchmaking] warmup failed: %s", e)
 
         asyncio.create_task(_warmup())
+
+    # 中文注释: MATCHMAKING_INDEX_MODE=memory 时后台加载进程内审稿人向量索引（加载完成前仍走 RPC）。
+    if (os.environ.get("MATCHMAKING_INDEX_MODE") or "").strip().lower() == "memory":
+
+        async def _load_reviewer_index():
+            try:
+                from app.services.reviewer_vector_index import get_reviewer_index
+
+                count = await asyncio.to_thread(get_reviewer_index().load, supabase_admin)
+                logger.info("[matchmaking] reviewer index loaded: %s", count)
+            except Exception as e:
+                logger.warning("[matchmaking] reviewer index load failed: %s", e)
+
+        asyncio.create_task(_load_reviewer_index())
+
+    # 中文注释: 邮件模板（文件 + email_templates 表）后台预编译，批量发信时每个模板只编译一次。
+    from app.core.email_templates import get_email_template_registry, is_email_template_warmup_enabled
+
+    if is_email_template_warmup_enabled():
+
+        async def _warm_email_templates():
+            try:
+                count = await asyncio.to_thread(get_email_template_registry().warm, supabase_admin)
+                logger.info("[email] templates warmed: %s", count)
+            except Exception as e:
+                logger.warning("[email] template warmup failed: %s", e)
+
+        asyncio.create_task(_warm_email_templates())
+
+    # 中文注释: 公开检索 / Subject Collections 的倒排索引后台加载（加载完成前接口走数据库查询）。
+    from app.services.public_search_index import get_public_search_index, is_public_search_index_enabled
+
+    if is_public_search_index_enabled():
+        get_public_search_index().maybe_refresh_in_background(supabase_admin)
     yield
+    shutdown_parse_pool()
+    shutdown_invoice_render_pool()
+    shutdown_smtp_pools()
+    shutdown_rate_limiters()
+    close_shared_http_client()
 
 
 app = FastAPI(
@@ -131,6 +175,8 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # 中文注释: workspace 列表的 keyset 翻页信息放在响应头，跨域时需显式暴露给前端。
+    expose_headers=["X-Has-More", "X-Next-Cursor"],
 )
 
 # 2. 基础限流（Auth / MagicLink / Token 端点重点防刷）
@@ -0,0 +1,61 @@
+"""
+analytics_monthly_facts 运维命令：回填与一致性校验。
+
+中文注释:
+- backfill: 调用 rebuild_analytics_monthly_facts RPC，按 manuscripts 现状重建（全部或指定期刊的）汇总行。
+- check: 用 manuscripts 实时聚合与汇总表逐单元格对比，输出不一致项；存在不一致时退出码为 1。
+- 用法:
+    python scripts/analytics_rollups.py backfill [--journal <id> ...]
+    python scripts/analytics_rollups.py check [--journal <id> ...] [--limit 20]
+"""
+
+import argparse
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app.services.analytics_rollups import check_consistency, rebuild_rollups  # noqa: E402
+from app.services.analytics_service import get_supabase_client  # noqa: E402
+
+
+def _backfill(client, journal_ids) -> int:
+    rows = rebuild_rollups(client, journal_ids)
+    scope = ",".join(journal_ids) if journal_ids else "all journals"
+    print(f"rebuilt {rows} fact rows for {scope}")
+    return 0
+
+
+def _check(client, journal_ids, limit: int) -> int:
+    diffs = check_consistency(client, journal_ids)
+    if not diffs:
+        print("analytics_monthly_facts is consistent with manuscripts")
+        return 0
+    print(f"{len(diffs)} mismatched cells")
+    for item in diffs[:limit]:
+        print(json.dumps(item, ensure_ascii=False))
+    if len(diffs) > limit:
+        print(f"... {len(diffs) - limit} more")
+    return 1
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    sub = parser.add_subparsers(dest="command", required=True)
+    for name in ("backfill", "check"):
+        cmd = sub.add_parser(name)
+        cmd.add_argument("--journal", action="append", dest="journal_ids", help="限定期刊 id（可重复）")
+        if name == "check":
+            cmd.add_argument("--limit", type=int, default=20, help="最多输出多少条不一致项")
+    args = parser.parse_args()
+
+    client = get_supabase_client()
+    journal_ids = [j.strip() for j in args.journal_ids or [] if j.strip()] or None
+    if args.command == "backfill":
+        return _backfill(client, journal_ids)
+    return _check(client, journal_ids, max(args.limit, 1))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,168 @@
+"""
+ASGI 中间件栈开销基准：裸 FastAPI 应用 vs 线上中间件栈（CORS + 限流 + 统一异常）。
+
+中文注释:
+- 直接以 ASGI 协议调用应用（不经过网络/uvicorn），只测中间件本身的每请求开销，路由为返回常量 JSON 的 /ping。
+- bare: 不挂任何中间件。
+- asgi: 与 main.py 相同的挂载顺序，使用当前的纯 ASGI ExceptionHandlerMiddleware / RateLimitMiddleware。
+- legacy: 同样的逻辑改用 BaseHTTPMiddleware 实现（旧版本写法），用于对比每层额外的 task + 内存流开销。
+- 限流阈值调到足够大保证不触发 429；scholarflow 访问日志降到 WARNING，避免把日志 I/O 计入中间件开销。
+- 用法: python scripts/benchmark_asgi_middleware.py [--requests 20000] [--concurrency 50] [--rounds 3]
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from fastapi import FastAPI, HTTPException, Request  # noqa: E402
+from fastapi.middleware.cors import CORSMiddleware  # noqa: E402
+from fastapi.responses import JSONResponse  # noqa: E402
+from starlette.middleware.base import BaseHTTPMiddleware  # noqa: E402
+
+from app.core.middleware import ExceptionHandlerMiddleware  # noqa: E402
+from app.core.rate_limit import RateLimitMiddleware  # noqa: E402
+
+
+class _LegacyRateLimitMiddleware(BaseHTTPMiddleware):
+    def __init__(self, app) -> None:
+        super().__init__(app)
+        self._inner = RateLimitMiddleware(app)
+
+    async def dispatch(self, request: Request, call_next):
+        if request.method.upper() == "OPTIONS":
+            return await call_next(request)
+        policy = self._inner._policy_for_path(request.url.path)
+        bucket = f"{policy.key}:{self._inner._client_ip(request.scope)}"
+        allowed, remaining, retry_after = self._inner._limiter.hit(bucket=bucket, policy=policy)
+        if not allowed:
+            return JSONResponse(status_code=429, content={"detail": "Too many requests", "retry_after": retry_after})
+        response = await call_next(request)
+        response.headers["X-RateLimit-Limit"] = str(policy.max_requests)
+        response.headers["X-RateLimit-Remaining"] = str(remaining)
+        response.headers["X-RateLimit-Window"] = str(policy.window_sec)
+        return response
+
+
+class _LegacyExceptionHandlerMiddleware(BaseHTTPMiddleware):
+    async def dispatch(self, request: Request, call_next):
+        start_time = time.time()
+        try:
+            response = await call_next(request)
+            logging.getLogger("scholarflow").info(
+                f"Method: {request.method} Path: {request.url.path} Status: {response.status_code} "
+                f"Time: {time.time() - start_time:.4f}s"
+            )
+            return response
+        except HTTPException as exc:
+            return JSONResponse(status_code=exc.status_code, content={"detail": exc.detail, "type": "http_exception"})
+        except Exception:
+            return JSONResponse(status_code=500, content={"detail": "server error", "type": "server_error"})
+
+
+def _build_app(variant: str) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/ping")
+    async def ping():
+        return {"ok": True}
+
+    if variant == "bare":
+        return app
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=["http://localhost:3000"],
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+    )
+    if variant == "legacy":
+        app.add_middleware(_LegacyRateLimitMiddleware)
+        app.add_middleware(_LegacyExceptionHandlerMiddleware)
+    else:
+        app.add_middleware(RateLimitMiddleware)
+        app.add_middleware(ExceptionHandlerMiddleware)
+    return app
+
+
+def _scope() -> dict:
+    return {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": "/ping",
+        "raw_path": b"/ping",
+        "root_path": "",
+        "query_string": b"",
+        "headers": [(b"host", b"bench"), (b"origin", b"http://localhost:3000")],
+        "client": ("127.0.0.1", 50000),
+        "server": ("bench", 80),
+    }
+
+
+async def _call(app: FastAPI) -> int:
+    status = 0
+    request_sent = False
+
+    async def receive():
+        nonlocal request_sent
+        if not request_sent:
+            request_sent = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        await asyncio.Event().wait()
+
+    async def send(message):
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+
+    await app(_scope(), receive, send)
+    return status
+
+
+async def _drive(app: FastAPI, total: int, concurrency: int) -> float:
+    await _call(app)  # 中文注释: 预热，触发 Starlette 懒构建中间件栈。
+    counter = iter(range(total))
+
+    async def _client():
+        for _ in counter:
+            status = await _call(app)
+            if status != 200:
+                raise RuntimeError(f"unexpected status {status}")
+
+    started = time.perf_counter()
+    await asyncio.gather(*(_client() for _ in range(concurrency)))
+    return total / (time.perf_counter() - started)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--rounds", type=int, default=3)
+    args = parser.parse_args()
+
+    os.environ["RATE_LIMIT_MAX_REQUESTS"] = str(args.requests * (args.rounds + 1) * 10)
+    logging.getLogger("scholarflow").setLevel(logging.WARNING)
+
+    results: dict[str, float] = {}
+    for variant in ("bare", "asgi", "legacy"):
+        app = _build_app(variant)
+        rates = [asyncio.run(_drive(app, args.requests, args.concurrency)) for _ in range(args.rounds)]
+        results[variant] = max(rates)
+        print(f"{variant:<7} best={results[variant]:9.0f} req/s  rounds={' '.join(f'{r:.0f}' for r in rates)}")
+
+    bare = results["bare"]
+    for variant in ("asgi", "legacy"):
+        overhead_us = (1.0 / results[variant] - 1.0 / bare) * 1e6
+        print(f"{variant:<7} overhead vs bare: {overhead_us:7.1f} us/request")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,214 @@
+"""
+DOI 任务队列吞吐基准：旧的逐条领取串行消费 vs claim_doi_tasks 批量领取 + 并发 DOIWorker。
+
+中文注释:
+- 用进程内的 PostgREST 替身（每次请求固定 --rtt-ms 往返延迟，rpc 领取在锁内原子完成，等价 SKIP LOCKED）承载 doi_tasks，
+  Crossref 投递用 --deposit-ms 的 asyncio.sleep 模拟，因此不需要真实数据库/网络。
+- legacy: 每个 worker 循环 process_due_tasks(limit=1)，领取走 select + 条件 update（RPC 不可用的降级路径，每次领取前多一次过期锁回收）。
+- batched: 每个 DOIWorker 按空位批量领取，最多 --concurrency 个注册同时在途。
+- 输出总耗时、吞吐、数据库往返次数，并校验没有任务被重复注册。
+- 用法: python scripts/benchmark_doi_queue.py [--tasks 100] [--workers 2] [--concurrency 16] [--rtt-ms 5] [--deposit-ms 100]
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app.core.doi_worker import DOIWorker  # noqa: E402
+from app.services.doi_service import DOIService  # noqa: E402
+
+
+class _StandInQuery:
+    def __init__(self, db: "_PostgRESTStandIn"):
+        self.db = db
+        self.filters = []
+        self.ordering = []
+        self.patch = None
+        self.limit_n = None
+
+    def select(self, *_args, **_kwargs):
+        return self
+
+    def eq(self, column, value):
+        self.filters.append(lambda r: str(r.get(column)) == str(value))
+        return self
+
+    def lte(self, column, value):
+        self.filters.append(lambda r: r.get(column) is not None and str(r.get(column)) <= str(value))
+        return self
+
+    def lt(self, column, value):
+        self.filters.append(lambda r: r.get(column) is not None and str(r.get(column)) < str(value))
+        return self
+
+    def order(self, column, desc=False):
+        self.ordering.append((column, desc))
+        return self
+
+    def limit(self, n):
+        self.limit_n = n
+        return self
+
+    def update(self, patch):
+        self.patch = patch
+        return self
+
+    def execute(self):
+        self.db.round_trip()
+        with self.db.lock:
+            rows = [r for r in self.db.tasks if all(f(r) for f in self.filters)]
+            if self.patch is not None:
+                for row in rows:
+                    row.update(self.patch)
+                return SimpleNamespace(data=[dict(r) for r in rows])
+            for column, desc in reversed(self.ordering):
+                rows.sort(key=lambda r: r.get(column) or 0, reverse=desc)
+            if self.limit_n is not None:
+                rows = rows[: self.limit_n]
+            return SimpleNamespace(data=[dict(r) for r in rows])
+
+
+class _PostgRESTStandIn:
+    def __init__(self, tasks: int, rtt_sec: float):
+        past = (datetime.now(timezone.utc) - timedelta(minutes=1)).isoformat()
+        self.tasks = [
+            {
+                "id": f"task-{i:05d}",
+                "registration_id": f"00000000-0000-0000-0000-{i:012d}",
+                "task_type": "register",
+                "status": "pending",
+                "priority": 0,
+                "run_at": past,
+                "locked_at": None,
+                "locked_by": None,
+                "attempts": 0,
+                "max_attempts": 4,
+            }
+            for i in range(tasks)
+        ]
+        self.rtt_sec = rtt_sec
+        self.lock = threading.Lock()
+        self.requests = 0
+
+    def round_trip(self) -> None:
+        with self.lock:
+            self.requests += 1
+        time.sleep(self.rtt_sec)
+
+    def table(self, name):
+        assert name == "doi_tasks", name
+        return _StandInQuery(self)
+
+    def rpc(self, name, params):
+        assert name == "claim_doi_tasks", name
+        db = self
+
+        class _Call:
+            def execute(self):
+                db.round_trip()
+                now = datetime.now(timezone.utc).isoformat()
+                with db.lock:
+                    due = [r for r in db.tasks if r["status"] == "pending" and r["run_at"] <= now]
+                    due.sort(key=lambda r: (-int(r["priority"]), r["run_at"]))
+                    picked = due[: int(params["p_limit"])]
+                    for row in picked:
+                        row.update(
+                            status="processing",
+                            locked_at=now,
+                            locked_by=params["p_worker"],
+                            attempts=int(row["attempts"]) + 1,
+                        )
+                    return SimpleNamespace(data=[dict(r) for r in picked])
+
+        return _Call()
+
+    def completed(self) -> int:
+        with self.lock:
+            return sum(1 for r in self.tasks if r["status"] == "completed")
+
+
+def _service(db: _PostgRESTStandIn, deposits: Counter, deposit_sec: float, *, legacy: bool) -> DOIService:
+    svc = DOIService(client=db)
+    if legacy:
+        svc._claim_rpc_available = False
+
+    async def _fake_register(registration_id):
+        deposits[str(registration_id)] += 1
+        await asyncio.sleep(deposit_sec)
+
+    svc.register_doi = _fake_register
+    return svc
+
+
+async def _run_legacy(args) -> tuple:
+    db = _PostgRESTStandIn(args.tasks, args.rtt_ms / 1000.0)
+    deposits: Counter = Counter()
+
+    async def _legacy_worker():
+        svc = _service(db, deposits, args.deposit_ms / 1000.0, legacy=True)
+        while True:
+            result = await svc.process_due_tasks(limit=1)
+            if int(result.get("processed_count") or 0) == 0:
+                return
+
+    started = time.perf_counter()
+    await asyncio.gather(*(_legacy_worker() for _ in range(args.workers)))
+    return time.perf_counter() - started, db, deposits
+
+
+async def _run_batched(args) -> tuple:
+    db = _PostgRESTStandIn(args.tasks, args.rtt_ms / 1000.0)
+    deposits: Counter = Counter()
+    workers = []
+    for _ in range(args.workers):
+        worker = DOIWorker(
+            doi_service=_service(db, deposits, args.deposit_ms / 1000.0, legacy=False),
+            concurrency=args.concurrency,
+        )
+        worker.idle_min_sec = 0.01
+        workers.append(worker)
+
+    async def _stop_when_drained():
+        while db.completed() < args.tasks:
+            await asyncio.sleep(0.01)
+        for worker in workers:
+            worker.stop()
+
+    started = time.perf_counter()
+    await asyncio.gather(_stop_when_drained(), *(worker.start() for worker in workers))
+    return time.perf_counter() - started, db, deposits
+
+
+def _report(name: str, elapsed: float, db: _PostgRESTStandIn, deposits: Counter) -> None:
+    duplicates = sum(1 for count in deposits.values() if count > 1)
+    print(
+        f"{name:<8} tasks={db.completed():>5}  elapsed={elapsed:7.2f}s  "
+        f"throughput={db.completed() / max(elapsed, 1e-9):8.1f}/s  db_requests={db.requests:>6}  duplicates={duplicates}"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tasks", type=int, default=100)
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--rtt-ms", type=float, default=5.0)
+    parser.add_argument("--deposit-ms", type=float, default=100.0)
+    parser.add_argument("--skip-legacy", action="store_true")
+    args = parser.parse_args()
+
+    if not args.skip_legacy:
+        _report("legacy", *asyncio.run(_run_legacy(args)))
+    _report("batched", *asyncio.run(_run_batched(args)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+批量重新生成 Invoice PDF（月底重出账单 / 模板调整后全量刷新）。
+
+中文注释:
+- 按月份（invoices.created_at）或显式 id 列表选取发票，每 --batch 张调用一次 regenerate_invoice_pdfs：
+  三轮 in_ 预取 + 渲染进程池 + 并发上传；不经过 API，不占用线上 API worker。
+- 渲染并发由 INVOICE_RENDER_POOL_WORKERS 控制，上传并发由 --upload-concurrency 控制。
+- 只更新 pdf_path / pdf_generated_at / pdf_error / invoice_number，不改变支付状态。
+- 用法: python scripts/regenerate_invoice_pdfs.py --month 2026-03 [--batch 500] [--upload-concurrency 8]
+        python scripts/regenerate_invoice_pdfs.py --ids <uuid> <uuid> ...
+"""
+
+import argparse
+import os
+import sys
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from dotenv import load_dotenv  # noqa: E402
+
+load_dotenv()
+
+from app.lib.api_client import supabase_admin  # noqa: E402
+from app.services.invoice_pdf_renderer import shutdown_invoice_render_pool  # noqa: E402
+from app.services.invoice_pdf_service import regenerate_invoice_pdfs  # noqa: E402
+
+
+def _month_bounds(month: str) -> tuple[str, str]:
+    start = datetime.strptime(month, "%Y-%m")
+    end = start.replace(year=start.year + 1, month=1) if start.month == 12 else start.replace(month=start.month + 1)
+    return start.strftime("%Y-%m-%dT00:00:00Z"), end.strftime("%Y-%m-%dT00:00:00Z")
+
+
+def _invoice_ids_for_month(month: str, page_size: int = 1000) -> list[str]:
+    start, end = _month_bounds(month)
+    ids: list[str] = []
+    last_id = ""
+    while True:
+        query = (
+            supabase_admin.table("invoices")
+            .select("id")
+            .gte("created_at", start)
+            .lt("created_at", end)
+        )
+        if last_id:
+            query = query.gt("id", last_id)
+        rows = getattr(query.order("id").limit(page_size).execute(), "data", None) or []
+        ids.extend(str(r["id"]) for r in rows if r.get("id"))
+        if len(rows) < page_size:
+            return ids
+        last_id = str(rows[-1]["id"])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument("--month", help="YYYY-MM，按 invoices.created_at 选取")
+    target.add_argument("--ids", nargs="+", help="显式指定 invoice id")
+    parser.add_argument("--batch", type=int, default=500)
+    parser.add_argument("--upload-concurrency", type=int, default=8)
+    args = parser.parse_args()
+
+    invoice_ids = list(args.ids) if args.ids else _invoice_ids_for_month(args.month)
+    print(f"invoices selected: {len(invoice_ids)}")
+
+    started = time.perf_counter()
+    failed: list[tuple[str, str]] = []
+    done = 0
+    try:
+        for offset in range(0, len(invoice_ids), max(args.batch, 1)):
+            chunk = invoice_ids[offset : offset + max(args.batch, 1)]
+            results = regenerate_invoice_pdfs(chunk, upload_concurrency=args.upload_concurrency)
+            failed.extend((str(r.invoice_id), r.pdf_error or "") for r in results if r.pdf_error)
+            done += len(results)
+            elapsed = time.perf_counter() - started
+            print(f"progress {done}/{len(invoice_ids)}  {done / max(elapsed, 1e-9):.1f} invoices/s")
+    finally:
+        shutdown_invoice_render_pool()
+
+    elapsed = time.perf_counter() - started
+    print(f"done: total={done} failed={len(failed)} elapsed={elapsed:.1f}s")
+    for invoice_id, err in failed[:50]:
+        print(f"  failed {invoice_id}: {err}")
+
+
+if __name__ == "__main__":
+    main()
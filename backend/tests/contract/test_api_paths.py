@@ -46,8 +46,12 @@ EXPECTED_ROUTES = {
     ("GET", "/api/v1/cms/menu"),
     ("PUT", "/api/v1/cms/menu"),
     ("POST", "/api/v1/internal/cron/chase-reviews"),
+    ("POST", "/api/v1/internal/cron/reindex-reviewers"),
     ("GET", "/api/v1/internal/platform-readiness"),
     ("GET", "/api/v1/internal/runtime-version"),
+    ("GET", "/api/v1/internal/metrics/supabase-pool"),
+    ("GET", "/api/v1/internal/metrics/parse-pool"),
+    ("GET", "/api/v1/internal/metrics/mail"),
     ("POST", "/api/v1/internal/release-validation/runs"),
     ("GET", "/api/v1/internal/release-validation/runs"),
     ("POST", "/api/v1/internal/release-validation/runs/{run_id}/readiness"),
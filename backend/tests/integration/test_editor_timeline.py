@@ -181,6 +181,10 @@ async def test_editor_detail_returns_reviewer_timeline(client, auth_token, monke
     assert invites[0]["latest_email_at"] == "2026-02-01T00:00:12Z"
     assert [event["status"] for event in invites[0]["email_events"]] == ["sent", "queued"]
     assert invites[0]["email_events"][0]["actor"]["full_name"] == "Inviter User"
+    server_timing = res.headers.get("server-timing") or ""
+    assert "invoice;dur=" in server_timing
+    assert "review_assignments;dur=" in server_timing
+    assert "total;dur=" in server_timing
 
 
 @pytest.mark.integration
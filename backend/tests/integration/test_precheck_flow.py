@@ -117,7 +117,10 @@ async def test_ae_check_flow(client, mocker):
         "updated_at": "2026-02-06T00:00:00Z"
     }
 
-    mocker.patch("app.services.editor_service.EditorService.get_ae_workspace", return_value=[mock_manuscript])
+    mocker.patch(
+        "app.services.editor_service.EditorService.get_ae_workspace_page",
+        return_value={"rows": [mock_manuscript], "has_more": False, "next_cursor": None},
+    )
     mocker.patch(
         "app.services.editor_service.EditorService.submit_technical_check",
         return_value={
@@ -420,10 +423,15 @@ async def test_me_workspace_flow(client, mocker):
             "owner_id": MOCK_ME_ID,
         }
     ]
-    mocker.patch("app.services.editor_service.EditorService.get_managing_workspace", return_value=mock_rows)
+    mocker.patch(
+        "app.services.editor_service.EditorService.get_managing_workspace_page",
+        return_value={"rows": mock_rows, "has_more": True, "next_cursor": "abc"},
+    )
 
     response = await client.get("/api/v1/editor/managing-workspace")
     assert response.status_code == 200
+    assert response.headers["x-has-more"] == "true"
+    assert response.headers["x-next-cursor"] == "abc"
     data = response.json()
     assert len(data) == 1
     assert data[0]["workspace_bucket"] == "intake"
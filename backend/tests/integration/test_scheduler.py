@@ -1,5 +1,6 @@
 from unittest.mock import MagicMock, patch
 
+from app.core.mail_dispatcher import DispatchResult
 from app.core.scheduler import ChaseScheduler
 
 
@@ -9,6 +10,10 @@ def _chainable_table(execute_data):
     table.eq.return_value = table
     table.is_.return_value = table
     table.lte.return_value = table
+    table.gt.return_value = table
+    table.in_.return_value = table
+    table.order.return_value = table
+    table.limit.return_value = table
     table.update.return_value = table
     table.execute.return_value = MagicMock(data=execute_data)
     table.single.return_value = table
@@ -29,10 +34,14 @@ def test_chase_scheduler_idempotency_marks_only_on_success():
             }
         ]
     )
-    user_profiles_table = _chainable_table(execute_data={"email": "rev@example.com"})
+    user_profiles_table = _chainable_table(
+        execute_data=[{"id": "bbbbbbbb-bbbb-bbbb-bbbb-bbbbbbbbbbbb", "email": "rev@example.com"}]
+    )
 
     email_service = MagicMock()
-    email_service.send_template_email.return_value = True
+    email_service.send_template_batch.side_effect = lambda messages: [
+        DispatchResult(ok=True, provider="smtp") for _ in messages
+    ]
 
     def table_side_effect(name: str):
         if name == "review_assignments":
@@ -66,10 +75,14 @@ def test_chase_scheduler_does_not_mark_when_email_fails():
             }
         ]
     )
-    user_profiles_table = _chainable_table(execute_data={"email": "rev@example.com"})
+    user_profiles_table = _chainable_table(
+        execute_data=[{"id": "bbbbbbbb-bbbb-bbbb-bbbb-bbbbbbbbbbbb", "email": "rev@example.com"}]
+    )
 
     email_service = MagicMock()
-    email_service.send_template_email.return_value = False
+    email_service.send_template_batch.side_effect = lambda messages: [
+        DispatchResult(ok=False, provider="smtp", error="send failed") for _ in messages
+    ]
 
     def table_side_effect(name: str):
         if name == "review_assignments":
@@ -88,3 +101,142 @@ def test_chase_scheduler_does_not_mark_when_email_fails():
         assert result["emails_sent"] == 0
         assert review_assignments_table.update.called is False
 
+
+
+class _FakeQuery:
+    def __init__(self, db, table):
+        self.db = db
+        self.table = table
+        self.filters = []
+        self.patch = None
+        self.limit_n = None
+
+    def select(self, *_args, **_kwargs):
+        return self
+
+    def eq(self, column, value):
+        self.filters.append(lambda r: r.get(column) == value)
+        return self
+
+    def is_(self, column, _value):
+        self.filters.append(lambda r: r.get(column) is None)
+        return self
+
+    def lte(self, column, value):
+        self.filters.append(lambda r: str(r.get(column)) <= value)
+        return self
+
+    def gt(self, column, value):
+        self.filters.append(lambda r: str(r.get(column)) > value)
+        return self
+
+    def in_(self, column, values):
+        self.filters.append(lambda r, v=set(values): str(r.get(column)) in v)
+        return self
+
+    def order(self, *_args, **_kwargs):
+        return self
+
+    def limit(self, n):
+        self.limit_n = n
+        return self
+
+    def update(self, patch):
+        self.patch = patch
+        return self
+
+    def execute(self):
+        self.db.calls.append((self.table, "update" if self.patch else "select"))
+        rows = sorted(
+            (r for r in self.db.rows[self.table] if all(f(r) for f in self.filters)),
+            key=lambda r: r["id"],
+        )
+        if self.patch:
+            for row in rows:
+                row.update(self.patch)
+            return MagicMock(data=rows)
+        return MagicMock(data=rows[: self.limit_n] if self.limit_n else rows)
+
+
+class _FakeDB:
+    def __init__(self, count):
+        self.calls = []
+        self.rows = {
+            "review_assignments": [
+                {
+                    "id": f"a{i:04d}",
+                    "reviewer_id": f"r{i % 7}",
+                    "manuscript_id": f"m{i}",
+                    "status": "pending",
+                    "due_at": "2026-01-31T00:00:00Z",
+                    "last_reminded_at": None,
+                    "manuscripts": {"title": f"Paper {i}"},
+                }
+                for i in range(count)
+            ],
+            # 中文注释: r6 没有邮箱，对应 assignment 应被跳过。
+            "user_profiles": [{"id": f"r{i}", "email": f"r{i}@example.com"} for i in range(6)],
+        }
+
+    def table(self, name):
+        return _FakeQuery(self, name)
+
+
+def _batch_email_service(fail_to=()):
+    email_service = MagicMock()
+    email_service.send_template_batch.side_effect = lambda messages: [
+        DispatchResult(ok=m.to_email not in fail_to, provider="smtp") for m in messages
+    ]
+    return email_service
+
+
+def test_chase_scheduler_pipeline_uses_bulk_queries_per_page():
+    db = _FakeDB(25)
+    email_service = _batch_email_service(fail_to={"r1@example.com"})
+
+    with patch("app.core.scheduler.supabase_admin", db):
+        result = ChaseScheduler(email_service=email_service, batch_size=10).run()
+
+    assert result["processed_count"] == 25
+    assert result["batches"] == 3
+    assert result["skipped_no_email"] == 3
+    assert result["emails_failed"] == 4
+    assert result["emails_sent"] == 18
+    assert result["next_cursor"] is None
+    # 中文注释: 每页 1 次 assignment 查询 + 1 次 profile 批量查询 + 1 次批量 UPDATE。
+    assert db.calls.count(("user_profiles", "select")) == 3
+    assert db.calls.count(("review_assignments", "update")) == 3
+    assert email_service.send_template_batch.call_count == 3
+    reminded = [r for r in db.rows["review_assignments"] if r["last_reminded_at"]]
+    assert len(reminded) == 18
+    assert all(r["reviewer_id"] not in {"r1", "r6"} for r in reminded)
+
+
+def test_chase_scheduler_resumes_from_cursor():
+    db = _FakeDB(25)
+    email_service = _batch_email_service()
+
+    with patch("app.core.scheduler.supabase_admin", db):
+        scheduler = ChaseScheduler(email_service=email_service, batch_size=10)
+        first = scheduler.run(max_assignments=12)
+        second = scheduler.run(cursor=first["next_cursor"])
+
+    assert first["processed_count"] == 12
+    assert first["next_cursor"] == "a0011"
+    assert second["processed_count"] == 13
+    assert second["next_cursor"] is None
+
+
+def test_chase_scheduler_dry_run_reports_without_side_effects():
+    db = _FakeDB(8)
+    email_service = _batch_email_service()
+
+    with patch("app.core.scheduler.supabase_admin", db):
+        result = ChaseScheduler(email_service=email_service).run(dry_run=True)
+
+    assert result["dry_run"] is True
+    assert result["emails_sent"] == 0
+    assert {item["action"] for item in result["report"]} == {"would_send", "skipped_no_email"}
+    assert [item["assignment_id"] for item in result["report"] if item["action"] == "skipped_no_email"] == ["a0006"]
+    email_service.send_template_batch.assert_not_called()
+    assert ("review_assignments", "update") not in db.calls
@@ -184,3 +184,160 @@ class TestExportService:
         assert isinstance(result, BytesIO)
         result.seek(0, 2)
         assert result.tell() > 0
+
+
+class _RowQuery:
+    def __init__(self, client, table):
+        self.client = client
+        self.table = table
+        self.filters = []
+        self.window = None
+
+    def select(self, *_args, **_kwargs):
+        return self
+
+    def in_(self, column, values):
+        self.filters.append(lambda r, c=column, v=set(values): str(r.get(c)) in v)
+        return self
+
+    def gt(self, column, value):
+        self.filters.append(lambda r, c=column, v=value: str(r.get(c)) > v)
+        return self
+
+    def order(self, column, **_kwargs):
+        self.sort_key = column
+        return self
+
+    def limit(self, n):
+        self.window = (0, n)
+        return self
+
+    def range(self, start, end):
+        self.window = (start, end - start + 1)
+        return self
+
+    def execute(self):
+        self.client.calls.append(self.table)
+        rows = [r for r in self.client.tables.get(self.table, []) if all(f(r) for f in self.filters)]
+        rows.sort(key=lambda r: str(r.get(self.sort_key) or ""))
+        if self.window:
+            start, size = self.window
+            rows = rows[start : start + size]
+        return MagicMock(data=rows)
+
+
+class _RowClient:
+    def __init__(self, n):
+        self.calls = []
+        manuscripts = [
+            {
+                "id": f"m{i:04d}",
+                "title": f"Paper {i}",
+                "journal_id": "j1" if i % 2 else "j2",
+                "author_id": "a1",
+                "status": "under_review",
+                "created_at": "2026-01-01T00:00:00+00:00",
+            }
+            for i in range(n)
+        ]
+        self.tables = {
+            "manuscripts": manuscripts,
+            "status_transition_logs": [
+                {
+                    "manuscript_id": "m0001",
+                    "from_status": "pre_check",
+                    "to_status": "under_review",
+                    "created_at": "2026-01-03T00:00:00+00:00",
+                }
+            ],
+            "review_assignments": [
+                {
+                    "manuscript_id": "m0001",
+                    "status": "completed",
+                    "invited_at": "2026-01-04T00:00:00+00:00",
+                    "submitted_at": "2026-01-14T00:00:00+00:00",
+                    "created_at": "2026-01-04T00:00:00+00:00",
+                },
+                {"manuscript_id": "m0001", "status": "pending", "created_at": "2026-01-04T00:00:00+00:00"},
+            ],
+            "invoices": [{"manuscript_id": "m0001", "invoice_number": "INV-1", "status": "paid", "amount": 1200}],
+            "user_profiles": [{"id": "a1", "full_name": "Ada", "country": "UK"}],
+        }
+
+    def table(self, name):
+        return _RowQuery(self, name)
+
+
+class TestManuscriptRowExporter:
+    def test_csv_streams_one_chunk_per_page(self):
+        import csv as _csv
+
+        from app.core.export_service import MANUSCRIPT_EXPORT_HEADERS, ManuscriptRowExporter
+
+        client = _RowClient(5)
+        chunks = list(ManuscriptRowExporter(client, ["j1", "j2"], page_size=2).iter_csv())
+
+        assert len(chunks) == 3
+        rows = list(_csv.reader(b"".join(chunks).decode("utf-8").splitlines()))
+        assert tuple(rows[0]) == MANUSCRIPT_EXPORT_HEADERS
+        assert [r[0] for r in rows[1:]] == [f"m{i:04d}" for i in range(5)]
+        detail = dict(zip(rows[0], rows[2]))
+        assert detail["status_transitions"] == "1"
+        assert detail["status_history"] == "2026-01-03 pre_check→under_review"
+        assert (detail["reviewers_invited"], detail["reviews_completed"]) == ("2", "1")
+        assert detail["avg_review_turnaround_days"] == "10.0"
+        assert (detail["invoice_number"], detail["invoice_status"]) == ("INV-1", "paid")
+        assert detail["author_country"] == "UK"
+        assert client.calls.count("manuscripts") == 3
+
+    def test_empty_scope_only_writes_header(self):
+        from app.core.export_service import ManuscriptRowExporter
+
+        client = _RowClient(3)
+        chunks = list(ManuscriptRowExporter(client, []).iter_csv())
+        assert b"".join(chunks).decode("utf-8").count("\n") == 1
+        assert client.calls == []
+
+    def test_xlsx_write_only_roundtrip(self):
+        from openpyxl import load_workbook
+
+        from app.core.export_service import ManuscriptRowExporter
+
+        data = b"".join(ManuscriptRowExporter(_RowClient(4), None, page_size=3).iter_xlsx())
+        assert data[:4] == b"PK\x03\x04"
+        ws = load_workbook(BytesIO(data), read_only=True)["Manuscripts"]
+        values = [row for row in ws.iter_rows(values_only=True)]
+        assert len(values) == 5
+        assert values[1][1] == "Paper 0"
+
+    def test_export_job_uploads_and_signs(self, monkeypatch):
+        import app.services.storage_service as storage
+        from app.core.export_service import (
+            ManuscriptRowExporter,
+            create_export_job,
+            get_export_job,
+            run_export_job,
+        )
+
+        uploads = []
+
+        def _upload(*, bucket, path, file_path, content_type):
+            with open(file_path, "rb") as fh:
+                uploads.append((bucket, path, content_type, fh.read()))
+
+        monkeypatch.setattr(storage, "upload_file", _upload)
+        monkeypatch.setattr(
+            storage,
+            "create_signed_url",
+            lambda *, bucket, path, expires_in: storage.SignedUrl(url=f"https://s/{path}", expires_in=expires_in),
+        )
+
+        job = create_export_job(owner_id="u1", format="csv")
+        run_export_job(job, ManuscriptRowExporter(_RowClient(2), None))
+
+        assert get_export_job(job.id, owner_id="u2") is None
+        done = get_export_job(job.id, owner_id="u1")
+        assert done.status == "completed"
+        assert done.url == f"https://s/u1/{job.id}.csv"
+        assert uploads[0][0] == "analytics-exports"
+        assert uploads[0][3].decode("utf-8").count("\n") == 3
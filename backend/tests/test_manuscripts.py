@@ -1062,6 +1062,57 @@ async def test_upload_metadata_timeout_returns_manual_fill_hint(client: AsyncCli
     assert "手动填写" in payload["message"]
 
 
+@pytest.mark.asyncio
+async def test_upload_duplicate_file_hits_parse_cache(client: AsyncClient, monkeypatch, tmp_path):
+    """验证同一文件重复上传直接复用缓存的解析结果（不再解析 PDF / 调用元数据提取）"""
+    monkeypatch.setenv("PARSE_CACHE_ENABLED", "1")
+    monkeypatch.setenv("PARSE_CACHE_DIR", str(tmp_path))
+    monkeypatch.delenv("GEMINI_API_KEY", raising=False)
+    monkeypatch.delenv("GOOGLE_API_KEY", raising=False)
+    monkeypatch.setattr("app.core.parse_cache._cache", None)
+    calls = {"pdf": 0, "meta": 0}
+
+    def fake_pdf(*args, **kwargs):
+        calls["pdf"] += 1
+        return ("cached text", [])
+
+    async def fake_parse(_text: str, *, parser_mode: str, layout_lines=None):
+        calls["meta"] += 1
+        return {"title": "Cached Paper", "abstract": "A", "authors": ["Alice"], "parser_source": "local"}
+
+    with patch("app.api.v1.manuscripts.extract_text_and_layout_from_pdf", side_effect=fake_pdf), patch(
+        "app.api.v1.manuscripts.extract_manuscript_metadata", fake_parse
+    ):
+        for _ in range(2):
+            files = {"file": ("paper.pdf", b"%PDF-1.4\n%same-bytes", "application/pdf")}
+            response = await client.post("/api/v1/manuscripts/upload", files=files)
+            assert response.status_code == 200
+            assert response.json()["data"]["title"] == "Cached Paper"
+
+    assert calls == {"pdf": 1, "meta": 1}
+
+
+@pytest.mark.asyncio
+async def test_upload_parse_queue_full_returns_parse_later_hint(client: AsyncClient):
+    """验证解析队列已满时直接提示稍后解析，而不是继续排队"""
+    from app.core.parse_pool import ParsePoolBusy
+
+    class _BusyPool:
+        async def run(self, *args, **kwargs):
+            raise ParsePoolBusy("parse queue is full")
+
+    with patch("app.api.v1.manuscripts_submission.get_parse_pool", return_value=_BusyPool()):
+        files = {"file": ("paper.pdf", b"%PDF-1.4\n%mocked", "application/pdf")}
+        response = await client.post("/api/v1/manuscripts/upload", files=files)
+
+    assert response.status_code == 200
+    payload = response.json()
+    assert payload["success"] is True
+    assert payload["parse_deferred"] is True
+    assert payload["data"]["title"] == ""
+    assert "稍后" in payload["message"]
+
+
 @pytest.mark.asyncio
 async def test_upload_doc_legacy_returns_manual_fill_hint(client: AsyncClient):
     """验证 .doc（旧格式）走手动填写降级提示，而不是 500"""
@@ -0,0 +1,195 @@
+from datetime import date, datetime, timezone
+from types import SimpleNamespace
+
+import pytest
+
+from app.services import analytics_service as analytics_module
+from app.services.analytics_rollups import (
+    AnalyticsRollup,
+    check_consistency,
+    compute_live_facts,
+    diff_rollups,
+)
+from app.services.analytics_service import AnalyticsService
+
+NOW = datetime(2026, 3, 15, tzinfo=timezone.utc)
+
+MANUSCRIPTS = [
+    {
+        "id": "m1",
+        "journal_id": "j1",
+        "author_id": "a1",
+        "status": "published",
+        "created_at": "2026-01-10T00:00:00+00:00",
+        "updated_at": "2026-01-20T00:00:00+00:00",
+    },
+    {
+        "id": "m2",
+        "journal_id": "j1",
+        "author_id": "a2",
+        "status": "rejected",
+        "created_at": "2026-03-02T00:00:00+00:00",
+        "updated_at": "2026-03-06T00:00:00+00:00",
+    },
+    {
+        "id": "m3",
+        "journal_id": "j1",
+        "author_id": "a1",
+        "status": "under_review",
+        "created_at": "2026-03-05T00:00:00+00:00",
+        "updated_at": "2026-03-07T00:00:00+00:00",
+    },
+    {
+        "id": "m4",
+        "journal_id": "j2",
+        "author_id": "a2",
+        "status": "pre_check",
+        "created_at": None,
+        "updated_at": None,
+    },
+]
+COUNTRIES = {"a1": "China", "a2": "Germany"}
+
+
+@pytest.fixture(autouse=True)
+def _reset_cache():
+    analytics_module.reset_analytics_rollup_cache()
+    yield
+    analytics_module.reset_analytics_rollup_cache()
+
+
+class _Query:
+    def __init__(self, client, table):
+        self.client = client
+        self.table = table
+        self.filters = []
+
+    def select(self, *_args, **_kwargs):
+        return self
+
+    def in_(self, column, values):
+        self.filters.append(lambda r, c=column, v=set(values): str(r.get(c)) in v)
+        return self
+
+    def gt(self, column, value):
+        self.filters.append(lambda r, c=column, v=value: (r.get(c) or 0) > v)
+        return self
+
+    def order(self, *_args, **_kwargs):
+        return self
+
+    def limit(self, *_args):
+        return self
+
+    def range(self, *_args):
+        return self
+
+    def execute(self):
+        self.client.calls.append(self.table)
+        if self.table == "analytics_monthly_facts" and self.client.facts is None:
+            raise RuntimeError('relation "public.analytics_monthly_facts" does not exist')
+        source = {
+            "analytics_monthly_facts": self.client.facts or [],
+            "manuscripts": MANUSCRIPTS,
+            "user_profiles": [{"id": k, "country": v} for k, v in COUNTRIES.items()],
+            "invoices": [],
+        }[self.table]
+        return SimpleNamespace(data=[r for r in source if all(f(r) for f in self.filters)])
+
+
+class _Client:
+    def __init__(self, facts):
+        self.facts = facts
+        self.calls = []
+
+    def table(self, name):
+        return _Query(self, name)
+
+
+def _facts_rows(rollup: AnalyticsRollup) -> list[dict]:
+    return [
+        {
+            "journal_id": j,
+            "month": m.isoformat(),
+            "status": s,
+            "country": c,
+            "manuscript_count": int(cell[0]),
+            "decision_days_sum": cell[1],
+            "decision_samples": int(cell[2]),
+        }
+        for (j, m, s, c), cell in rollup.cells.items()
+    ]
+
+
+def test_live_facts_derive_dashboard_metrics():
+    rollup = compute_live_facts(MANUSCRIPTS, COUNTRIES)
+
+    kpi = rollup.kpi_counts(now=NOW)
+    assert kpi["new_submissions_month"] == 2
+    assert kpi["total_pending"] == 2
+    assert kpi["avg_first_decision_days"] == 7.0
+    assert kpi["yearly_acceptance_rate"] == 0.5
+
+    trends = rollup.trends(now=NOW, months=3)
+    assert [(t.month, t.submission_count, t.acceptance_count) for t in trends] == [
+        (date(2026, 1, 1), 1, 1),
+        (date(2026, 2, 1), 0, 0),
+        (date(2026, 3, 1), 2, 0),
+    ]
+    assert {p.stage: p.count for p in rollup.pipeline()} == {"submitted": 1, "under_review": 1}
+    assert {d.decision: d.count for d in rollup.decisions(now=NOW)} == {"accepted": 1, "rejected": 1}
+    assert [(g.country, g.submission_count) for g in rollup.geography()] == [("China", 2), ("Germany", 2)]
+
+
+def test_diff_rollups_reports_drifted_cells():
+    live = compute_live_facts(MANUSCRIPTS, COUNTRIES)
+    stored = AnalyticsRollup.from_rows(_facts_rows(live))
+    assert diff_rollups(live, stored) == []
+
+    stored.add(("j1", date(2026, 3, 1), "under_review", "China"), -1)
+    stored.add(("j1", date(2026, 3, 1), "decision", "China"), 1)
+    diffs = diff_rollups(live, stored)
+    assert {(d["status"], d["expected"]["count"], d["actual"]["count"]) for d in diffs} == {
+        ("under_review", 1, 0),
+        ("decision", 0, 1),
+    }
+
+
+def test_check_consistency_compares_against_live_scan():
+    live = compute_live_facts(MANUSCRIPTS, COUNTRIES)
+    rows = _facts_rows(live) + [
+        {"journal_id": "j9", "month": "2026-01-01", "status": "submitted", "country": "", "manuscript_count": 1}
+    ]
+    diffs = check_consistency(_Client(rows))
+    assert [(d["journal_id"], d["expected"]["count"], d["actual"]["count"]) for d in diffs] == [("j9", 0, 1)]
+
+
+async def test_scoped_dashboard_reads_rollups_once():
+    rows = _facts_rows(compute_live_facts(MANUSCRIPTS, COUNTRIES))
+    client = _Client(rows)
+    service = AnalyticsService(supabase_client=client)
+
+    kpi = await service.get_kpi_summary(journal_ids=["j1"])
+    await service.get_submission_trends(journal_ids=["j1"])
+    await service.get_status_pipeline(journal_ids=["j1"])
+    await service.get_decision_distribution(journal_ids=["j1"])
+    geo = await service.get_author_geography(journal_ids=["j1"])
+
+    assert client.calls.count("analytics_monthly_facts") == 1
+    assert "manuscripts" not in client.calls
+    assert kpi.total_pending == 1
+    assert [(g.country, g.submission_count) for g in geo] == [("China", 2), ("Germany", 1)]
+
+
+async def test_scoped_dashboard_falls_back_to_live_scan_without_facts_table():
+    client = _Client(None)
+    service = AnalyticsService(supabase_client=client)
+
+    pipeline = await service.get_status_pipeline(journal_ids=["j1", "j2"])
+    analytics_module._rollup_cache.clear()
+    await service.get_status_pipeline(journal_ids=["j1", "j2"])
+
+    assert {p.stage: p.count for p in pipeline} == {"submitted": 1, "under_review": 1}
+    # 中文注释: 汇总表缺失只探测一次，之后直接实时扫描。
+    assert client.calls.count("analytics_monthly_facts") == 1
+    assert client.calls.count("manuscripts") == 2
@@ -0,0 +1,145 @@
+import asyncio
+
+import pytest
+from fastapi import BackgroundTasks, FastAPI, HTTPException
+from fastapi.responses import StreamingResponse
+from fastapi.testclient import TestClient
+
+from app.core.middleware import ExceptionHandlerMiddleware
+from app.core.rate_limit import RateLimitMiddleware
+
+
+def _app(events: list) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/ok")
+    async def ok(background: BackgroundTasks):
+        background.add_task(events.append, "background")
+        return {"ok": True}
+
+    @app.get("/boom")
+    async def boom():
+        raise RuntimeError("kaboom")
+
+    @app.get("/stream")
+    async def stream():
+        async def _chunks():
+            for i in range(3):
+                events.append(f"chunk-{i}")
+                yield f"{i}\n".encode()
+                await asyncio.sleep(0)
+
+        return StreamingResponse(_chunks(), media_type="text/plain")
+
+    app.add_middleware(RateLimitMiddleware)
+    app.add_middleware(ExceptionHandlerMiddleware)
+    return app
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setenv("RATE_LIMIT_MAX_REQUESTS", "3")
+    monkeypatch.setenv("RATE_LIMIT_WINDOW_SEC", "60")
+    events: list = []
+    with TestClient(_app(events), raise_server_exceptions=False) as test_client:
+        test_client.events = events
+        yield test_client
+
+
+def test_rate_limit_headers_and_background_tasks(client):
+    resp = client.get("/ok")
+
+    assert resp.status_code == 200
+    assert resp.headers["X-RateLimit-Limit"] == "3"
+    assert resp.headers["X-RateLimit-Remaining"] == "2"
+    assert resp.headers["X-RateLimit-Window"] == "60"
+    assert client.events == ["background"]
+
+
+def test_rate_limit_exceeded_returns_429_envelope(client):
+    for _ in range(3):
+        assert client.get("/ok").status_code == 200
+
+    resp = client.get("/ok")
+
+    assert resp.status_code == 429
+    assert resp.json()["type"] == "rate_limit_exceeded"
+    assert resp.headers["X-RateLimit-Remaining"] == "0"
+    assert int(resp.headers["Retry-After"]) == resp.json()["retry_after"]
+    # 中文注释: OPTIONS 预检不计入限流。
+    assert client.options("/ok").status_code != 429
+
+
+def test_rate_limit_buckets_by_forwarded_ip(client):
+    for _ in range(3):
+        client.get("/ok", headers={"X-Forwarded-For": "10.0.0.1"})
+
+    assert client.get("/ok", headers={"X-Forwarded-For": "10.0.0.1, 172.16.0.1"}).status_code == 429
+    assert client.get("/ok", headers={"X-Forwarded-For": "10.0.0.2"}).status_code == 200
+
+
+def test_unhandled_exception_becomes_json_envelope(client):
+    resp = client.get("/boom")
+
+    assert resp.status_code == 500
+    assert resp.json() == {"detail": "内部系统错误，请联系管理员", "type": "server_error"}
+
+
+async def test_http_exception_raised_below_handler_keeps_status():
+    async def _inner(scope, receive, send):
+        raise HTTPException(status_code=418, detail="teapot")
+
+    sent = []
+
+    async def _send(message):
+        sent.append(message)
+
+    async def _receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    await ExceptionHandlerMiddleware(_inner)({"type": "http", "method": "GET", "path": "/x", "headers": []}, _receive, _send)
+
+    assert sent[0]["status"] == 418
+    assert sent[1]["body"] == b'{"detail":"teapot","type":"http_exception"}'
+
+
+async def test_streaming_response_is_not_buffered(monkeypatch):
+    monkeypatch.setenv("RATE_LIMIT_MAX_REQUESTS", "3")
+    events: list = []
+    app = _app(events)
+
+    async def _receive():
+        await asyncio.sleep(3600)
+
+    async def _send(message):
+        if message["type"] == "http.response.start":
+            events.append(("start", dict(message["headers"]).get(b"x-ratelimit-limit")))
+        elif message.get("body"):
+            events.append(("body", message["body"]))
+
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": "/stream",
+        "raw_path": b"/stream",
+        "root_path": "",
+        "query_string": b"",
+        "headers": [],
+        "client": ("127.0.0.1", 1234),
+        "server": ("testserver", 80),
+    }
+    await app(scope, _receive, _send)
+
+    # 中文注释: 每个分片生成后立即下发，而不是整个响应体缓冲完才发送。
+    assert events == [
+        ("start", b"3"),
+        "chunk-0",
+        ("body", b"0\n"),
+        "chunk-1",
+        ("body", b"1\n"),
+        "chunk-2",
+        ("body", b"2\n"),
+    ]
@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+import time
+
+import pytest
+
+from app.core.concurrent_loader import BlockingBlock, format_server_timing, run_blocking_blocks
+
+
+@pytest.mark.asyncio
+async def test_run_blocking_blocks_runs_independent_blocks_concurrently() -> None:
+    def _slow(value: str):
+        def _load():
+            time.sleep(0.2)
+            return value
+
+        return _load
+
+    timings: dict[str, float] = {}
+    started = time.perf_counter()
+    result = await run_blocking_blocks(
+        [BlockingBlock("a", _slow("A")), BlockingBlock("b", _slow("B")), BlockingBlock("c", _slow("C"))],
+        timings=timings,
+    )
+    elapsed = time.perf_counter() - started
+
+    assert result.values == {"a": "A", "b": "B", "c": "C"}
+    assert result.degraded == []
+    assert set(timings) == {"a", "b", "c"}
+    assert elapsed < 0.5
+
+
+@pytest.mark.asyncio
+async def test_run_blocking_blocks_degrades_on_timeout_and_error() -> None:
+    def _hang():
+        time.sleep(0.5)
+        return "late"
+
+    def _boom():
+        raise RuntimeError("db down")
+
+    timings: dict[str, float] = {}
+    result = await run_blocking_blocks(
+        [
+            BlockingBlock("ok", lambda: [1]),
+            BlockingBlock("slow", _hang, []),
+            BlockingBlock("broken", _boom, {"empty": True}),
+        ],
+        timings=timings,
+        timeout_sec=0.1,
+    )
+
+    assert result.values["ok"] == [1]
+    assert result.values["slow"] == []
+    assert result.values["broken"] == {"empty": True}
+    assert sorted(result.degraded) == ["broken", "slow"]
+    assert "slow" in timings
+
+
+def test_format_server_timing_marks_degraded_blocks() -> None:
+    header = format_server_timing(
+        {"invoice": 12.34, "email logs": 3},
+        total_ms=20,
+        degraded=["invoice"],
+    )
+    assert header == 'invoice;dur=12.3;desc="degraded", email_logs;dur=3.0, total;dur=20.0'
@@ -100,3 +100,64 @@ async def test_submit_deposit_posts_to_httpx(monkeypatch, crossref_config):
 
     monkeypatch.setattr("app.services.crossref_client.httpx.AsyncClient", lambda: _HTTP())
     assert await client.submit_deposit(b"<xml/>", file_name="x.xml") == "OK"
+
+
+def _article(i: int) -> dict:
+    return {
+        "title": f"Article {i}",
+        "authors": [{"full_name": f"Author {i}"}],
+        "publication_date": "2026-03-01",
+        "doi": f"10.12345/sf.2026.{i:05d}",
+        "url": f"https://example.com/articles/{i}",
+    }
+
+
+def test_batch_deposit_packs_many_articles_into_one_doi_batch(crossref_client):
+    batches = list(crossref_client.iter_batch_deposits([_article(i) for i in range(3)], batch_id_prefix="issue-7"))
+
+    assert len(batches) == 1
+    batch = batches[0]
+    root = etree.fromstring(batch.body.read())
+    batch.close()
+
+    ns = crossref_client.ns["default"]
+    assert root.tag == f"{{{ns}}}doi_batch"
+    assert root.find("head/doi_batch_id").text == "issue-7-001"
+    journals = root.findall("body/journal")
+    assert len(journals) == 1
+    assert journals[0].find("journal_metadata/full_title").text == "Test Journal"
+    assert [a.find("doi_data/doi").text for a in journals[0].findall("journal_article")] == batch.dois
+    assert batch.dois == [f"10.12345/sf.2026.{i:05d}" for i in range(3)]
+
+
+def test_batch_deposit_respects_record_and_size_limits(crossref_client):
+    by_count = list(
+        crossref_client.iter_batch_deposits([_article(i) for i in range(5)], batch_id_prefix="b", max_records=2)
+    )
+    assert [len(b.dois) for b in by_count] == [2, 2, 1]
+
+    one_size = len(etree.tostring(crossref_client._build_journal_article(_article(0))))
+    by_size = list(
+        crossref_client.iter_batch_deposits(
+            [_article(i) for i in range(5)], batch_id_prefix="b", max_bytes=one_size * 2 + 10
+        )
+    )
+    assert [len(b.dois) for b in by_size] == [2, 2, 1]
+    for batch in by_count + by_size:
+        batch.close()
+
+
+def test_parse_deposit_results_maps_record_diagnostics():
+    body = """
+    <doi_batch_diagnostic status="completed">
+      <record_diagnostic status="Success"><doi>10.1/a</doi><msg>Successfully added</msg></record_diagnostic>
+      <record_diagnostic status="Failure"><doi>10.1/b</doi><msg>Invalid &amp; rejected</msg></record_diagnostic>
+      <record_diagnostic status="Warning"><doi>10.1/c</doi><msg>Added with conflict</msg></record_diagnostic>
+    </doi_batch_diagnostic>
+    """
+    assert CrossrefClient.parse_deposit_results(body) == {
+        "10.1/a": (True, "Successfully added"),
+        "10.1/b": (False, "Invalid & rejected"),
+        "10.1/c": (True, "Added with conflict"),
+    }
+    assert CrossrefClient.parse_deposit_results("SUCCESS: batch received") == {}
@@ -0,0 +1,123 @@
+from types import SimpleNamespace
+
+import pytest
+
+from app.services import dashboard_counter_service as dcs
+from app.services.dashboard_counter_service import (
+    DashboardCounterService,
+    invalidate_dashboard_counters,
+)
+
+
+@pytest.fixture(autouse=True)
+def _reset_counters():
+    dcs.reset_dashboard_counters()
+    yield
+    dcs.reset_dashboard_counters()
+
+
+class _Query:
+    def __init__(self, client):
+        self.client = client
+        self.filters = []
+
+    def select(self, *columns, count=None, head=None):
+        assert count == "exact" and head is True
+        return self
+
+    def eq(self, column, value):
+        self.filters.append(("eq", column, value))
+        return self
+
+    def in_(self, column, values):
+        self.filters.append(("in", column, tuple(values)))
+        return self
+
+    def execute(self):
+        self.client.head_calls.append(self.filters)
+        statuses = None
+        for op, column, value in self.filters:
+            if column == "status":
+                statuses = (value,) if op == "eq" else value
+        rows = self.client.rows
+        if statuses is not None:
+            rows = [r for r in rows if r in statuses]
+        return SimpleNamespace(data=None, count=len(rows))
+
+
+class _Client:
+    def __init__(self, rows, *, rpc_fails=False):
+        self.rows = rows
+        self.rpc_fails = rpc_fails
+        self.rpc_calls = []
+        self.head_calls = []
+
+    def rpc(self, name, params):
+        self.rpc_calls.append((name, params))
+        if self.rpc_fails:
+            raise RuntimeError("Could not find the function public.manuscript_status_counts")
+        counts = {}
+        for status in self.rows:
+            if params["p_statuses"] is None or status in params["p_statuses"]:
+                counts[status] = counts.get(status, 0) + 1
+        data = [{"status": s, "total": n} for s, n in counts.items()]
+        return SimpleNamespace(execute=lambda: SimpleNamespace(data=data))
+
+    def table(self, name):
+        assert name == "manuscripts"
+        return _Query(self)
+
+
+def test_author_counts_use_single_grouped_rpc():
+    client = _Client(["published", "published", "under_review", "minor_revision", "rejected", "pre_check"])
+
+    counts = DashboardCounterService(client).author_counts("u1")
+
+    assert counts == {
+        "published": 2,
+        "under_review": 1,
+        "revision_requested": 1,
+        "rejected": 1,
+        "total": 6,
+    }
+    assert len(client.rpc_calls) == 1
+    assert client.rpc_calls[0][1]["p_author_id"] == "u1"
+    assert client.head_calls == []
+
+
+def test_editor_counts_fall_back_to_head_queries_and_remember_missing_rpc():
+    client = _Client(["pre_check", "pre_check", "under_review", "decision", "published"], rpc_fails=True)
+
+    counts = DashboardCounterService(client).editor_counts(journal_ids={"j2", "j1"})
+
+    assert counts == {"pending_assignment": 2, "active_review_cycles": 1, "overdue_reviews": 1}
+    assert all(("in", "journal_id", ("j1", "j2")) in filters for filters in client.head_calls)
+
+    other = _Client(["decision"], rpc_fails=False)
+    DashboardCounterService(other).editor_counts(journal_ids=None)
+    assert other.rpc_calls == []
+
+
+def test_counts_are_cached_per_scope_until_invalidated():
+    client = _Client(["pre_check"])
+    svc = DashboardCounterService(client)
+
+    svc.editor_counts(journal_ids=None)
+    svc.editor_counts(journal_ids=None)
+    svc.editor_counts(journal_ids=["j1"])
+    assert len(client.rpc_calls) == 2
+
+    client.rows.append("pre_check")
+    invalidate_dashboard_counters(author_id="u1")
+
+    assert svc.editor_counts(journal_ids=None)["pending_assignment"] == 2
+    assert len(client.rpc_calls) == 3
+
+
+def test_editor_counts_empty_scope_skips_database():
+    client = _Client(["pre_check"])
+
+    counts = DashboardCounterService(client).editor_counts(journal_ids=set())
+
+    assert counts == {"pending_assignment": 0, "active_review_cycles": 0, "overdue_reviews": 0}
+    assert client.rpc_calls == [] and client.head_calls == []
@@ -0,0 +1,128 @@
+import pytest
+
+from app.core.config import CrossrefConfig
+from app.services.crossref_client import CrossrefClient
+from app.services.doi_service import DOIService
+
+
+def _config() -> CrossrefConfig:
+    return CrossrefConfig(
+        depositor_email="x@example.com",
+        depositor_password="pw",
+        doi_prefix="10.99999",
+        api_url="https://example.com",
+        journal_title="J",
+        journal_issn=None,
+    )
+
+
+class _RecordingCrossref(CrossrefClient):
+    def __init__(self, response_body: str = "SUCCESS", fail: bool = False):
+        super().__init__(_config())
+        self.response_body = response_body
+        self.fail = fail
+        self.deposits: list[bytes] = []
+
+    async def submit_deposit(self, xml_content, file_name="crossref_submission.xml"):
+        self.deposits.append(xml_content.read())
+        if self.fail:
+            raise RuntimeError("crossref 503")
+        return self.response_body
+
+
+@pytest.fixture
+def svc(monkeypatch):
+    service = DOIService(config=_config(), client=object(), crossref_client=_RecordingCrossref())
+    state = {
+        f"reg-{i}": {
+            "id": f"reg-{i}",
+            "article_id": f"m-{i}",
+            "doi": f"10.99999/sf.2026.{i:05d}",
+            "status": "pending",
+            "attempts": 0,
+        }
+        for i in range(4)
+    }
+    state["reg-3"]["status"] = "registered"
+    service.state = state
+    service.completed = []
+    service.failed = {}
+
+    monkeypatch.setattr(service, "_load_registration_by_id", lambda *, registration_id: dict(state[registration_id]))
+    monkeypatch.setattr(
+        service, "_update_registration", lambda reg_id, updates: {**state[reg_id], **updates}
+    )
+    monkeypatch.setattr(service, "_load_manuscript", lambda mid: {"id": mid, "status": "published", "title": mid})
+    monkeypatch.setattr(
+        service,
+        "_build_crossref_article_data",
+        lambda m, doi: {"doi": doi, "title": m["title"], "authors": [{"full_name": "A"}], "url": "u"},
+    )
+    monkeypatch.setattr(
+        service, "_complete_registration", lambda reg_id, **kwargs: service.completed.append((reg_id, kwargs))
+    )
+    monkeypatch.setattr(
+        service,
+        "_fail_registration",
+        lambda reg_id, err, **_kwargs: service.failed.__setitem__(reg_id, err),
+    )
+    return service
+
+
+async def test_batch_registers_many_dois_in_one_deposit(svc):
+    results = await svc.register_dois_batch(["reg-0", "reg-1", "reg-2", "reg-3"])
+
+    assert results == {"reg-0": None, "reg-1": None, "reg-2": None, "reg-3": None}
+    assert len(svc.crossref.deposits) == 1
+    assert svc.crossref.deposits[0].count(b"<journal_article") == 3
+    assert [reg_id for reg_id, _ in svc.completed] == ["reg-0", "reg-1", "reg-2"]
+    assert len({kwargs["batch_id"] for _, kwargs in svc.completed}) == 1
+
+
+async def test_batch_fails_only_rejected_records(svc):
+    svc.crossref.response_body = (
+        '<record_diagnostic status="Success"><doi>10.99999/sf.2026.00000</doi></record_diagnostic>'
+        '<record_diagnostic status="Failure"><doi>10.99999/sf.2026.00001</doi><msg>bad title</msg></record_diagnostic>'
+    )
+
+    results = await svc.register_dois_batch(["reg-0", "reg-1", "reg-2"])
+
+    assert results == {"reg-0": None, "reg-1": "bad title", "reg-2": None}
+    assert svc.failed == {"reg-1": "bad title"}
+    assert [reg_id for reg_id, _ in svc.completed] == ["reg-0", "reg-2"]
+
+
+async def test_batch_respects_record_limit_and_http_failure(svc):
+    svc.deposit_batch_max_records = 2
+    svc.crossref.fail = True
+
+    results = await svc.register_dois_batch(["reg-0", "reg-1", "reg-2"])
+
+    assert len(svc.crossref.deposits) == 2
+    assert set(results) == {"reg-0", "reg-1", "reg-2"}
+    assert all(err == "crossref 503" for err in results.values())
+    assert svc.completed == []
+
+
+async def test_batched_task_run_retries_only_failed_tasks(svc, monkeypatch):
+    svc.deposit_mode = "batch"
+    svc.crossref.response_body = (
+        '<record_diagnostic status="Failure"><doi>10.99999/sf.2026.00002</doi><msg>dup</msg></record_diagnostic>'
+    )
+    marked, retried = [], []
+    monkeypatch.setattr(svc, "_mark_task_completed", marked.append)
+
+    async def _fake_failure(task, error):
+        retried.append((task["id"], error))
+
+    monkeypatch.setattr(svc, "_handle_task_failure", _fake_failure)
+    tasks = [
+        {"id": f"t{i}", "task_type": "register", "registration_id": f"reg-{i}"} for i in range(3)
+    ] + [{"id": "t9", "task_type": "unknown", "registration_id": "reg-9"}]
+
+    items = await svc.run_tasks(tasks)
+
+    assert [item["status"] for item in items] == ["completed", "completed", "failed", "failed"]
+    assert marked == ["t0", "t1"]
+    assert retried == [("t9", "Unsupported DOI task_type: unknown"), ("t2", "dup")]
+    assert len(svc.crossref.deposits) == 1
@@ -0,0 +1,228 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from app.core.doi_worker import DOIWorker
+from app.services.doi_service import DOIService
+
+
+class _RpcClient:
+    def __init__(self, *, error: str | None = None, rows=None):
+        self.error = error
+        self.rows = rows or []
+        self.rpc_calls = []
+
+    def rpc(self, name, params):
+        self.rpc_calls.append((name, params))
+        client = self
+
+        class _Call:
+            def execute(self):
+                if client.error:
+                    raise RuntimeError(client.error)
+                return SimpleNamespace(data=client.rows)
+
+        return _Call()
+
+
+def _task(i: int) -> dict:
+    return {
+        "id": f"task-{i}",
+        "task_type": "register",
+        "registration_id": f"00000000-0000-0000-0000-{i:012d}",
+        "attempts": 1,
+        "max_attempts": 4,
+    }
+
+
+def test_claim_tasks_uses_skip_locked_rpc():
+    client = _RpcClient(rows=[_task(1), _task(2)])
+    svc = DOIService(client=client)
+
+    claimed = svc.claim_tasks(10)
+
+    assert [t["id"] for t in claimed] == ["task-1", "task-2"]
+    assert client.rpc_calls == [
+        (
+            "claim_doi_tasks",
+            {"p_worker": svc.worker_id, "p_limit": 10, "p_stale_after_sec": svc.lock_timeout_sec},
+        )
+    ]
+
+
+def test_claim_tasks_falls_back_when_rpc_missing(monkeypatch):
+    client = _RpcClient(error="PGRST202: Could not find the function public.claim_doi_tasks in the schema cache")
+    svc = DOIService(client=client)
+    reaped = []
+    queue = [_task(1), _task(2), _task(3)]
+    monkeypatch.setattr(svc, "_reap_stale_tasks", lambda: reaped.append(True))
+    monkeypatch.setattr(svc, "_claim_next_task", lambda: queue.pop(0) if queue else None)
+
+    assert [t["id"] for t in svc.claim_tasks(2)] == ["task-1", "task-2"]
+    assert [t["id"] for t in svc.claim_tasks(2)] == ["task-3"]
+    # 中文注释: RPC 缺失只探测一次，之后直接走逐条领取。
+    assert len(client.rpc_calls) == 1
+    assert len(reaped) == 2
+
+
+class _ReapTable:
+    def __init__(self, rows):
+        self.rows = rows
+        self.updates = []
+        self._payload = None
+        self._filters = []
+
+    def select(self, *_args, **_kwargs):
+        self._payload, self._filters = None, []
+        return self
+
+    def update(self, payload):
+        self._payload, self._filters = payload, []
+        return self
+
+    def in_(self, key, values):
+        self._filters.append(("in", key, list(values)))
+        return self
+
+    def eq(self, key, value):
+        self._filters.append(("eq", key, value))
+        return self
+
+    def lt(self, key, value):
+        self._filters.append(("lt", key, value))
+        return self
+
+    def execute(self):
+        if self._payload is not None:
+            self.updates.append((self._payload, self._filters))
+            return SimpleNamespace(data=[])
+        return SimpleNamespace(data=self.rows)
+
+
+def test_fallback_reap_fails_tasks_with_exhausted_attempts():
+    table = _ReapTable(
+        [
+            {"id": "t-retry", "attempts": 2, "max_attempts": 4},
+            {"id": "t-done", "attempts": 4, "max_attempts": 4},
+        ]
+    )
+    svc = DOIService(client=SimpleNamespace(table=lambda _name: table))
+
+    svc._reap_stale_tasks()
+
+    by_status = {payload["status"]: filters for payload, filters in table.updates}
+    assert set(by_status) == {"failed", "pending"}
+    assert ("in", "id", ["t-done"]) in by_status["failed"]
+    assert ("in", "id", ["t-retry"]) in by_status["pending"]
+    assert all(("eq", "status", "processing") in filters for filters in by_status.values())
+
+
+def test_claim_tasks_propagates_other_errors():
+    svc = DOIService(client=_RpcClient(error="connection reset"))
+    with pytest.raises(RuntimeError):
+        svc.claim_tasks(5)
+
+
+async def test_process_due_tasks_runs_batch_with_bounded_concurrency(monkeypatch):
+    svc = DOIService(client=_RpcClient())
+    monkeypatch.setattr(svc, "claim_tasks", lambda limit: [_task(i) for i in range(min(limit, 6))])
+    state = {"inflight": 0, "peak": 0}
+
+    async def _fake_run_task(task):
+        state["inflight"] += 1
+        state["peak"] = max(state["peak"], state["inflight"])
+        await asyncio.sleep(0.01)
+        state["inflight"] -= 1
+        return {"task_id": task["id"], "status": "completed"}
+
+    monkeypatch.setattr(svc, "run_task", _fake_run_task)
+
+    result = await svc.process_due_tasks(limit=10, concurrency=2)
+
+    assert result["processed_count"] == 6
+    assert state["peak"] == 2
+
+
+class _QueueService:
+    def __init__(self, queue: list, done: list, worker_id: str):
+        self.queue = queue
+        self.done = done
+        self.worker_id = worker_id
+        self.claims = []
+
+    def claim_tasks(self, limit):
+        self.claims.append(limit)
+        taken, self.queue[:] = self.queue[:limit], self.queue[limit:]
+        return taken
+
+    async def run_task(self, task):
+        await asyncio.sleep(0.005)
+        self.done.append(task["id"])
+        return {"task_id": task["id"], "status": "completed"}
+
+
+async def test_workers_drain_queue_concurrently_without_duplicates():
+    queue = [_task(i) for i in range(40)]
+    done: list = []
+    workers = [
+        DOIWorker(doi_service=_QueueService(queue, done, f"w{i}"), concurrency=8) for i in range(2)
+    ]
+    for worker in workers:
+        worker.idle_min_sec = 0.005
+
+    async def _stop_when_drained():
+        while len(done) < 40:
+            await asyncio.sleep(0.005)
+        for worker in workers:
+            worker.stop()
+
+    await asyncio.wait_for(asyncio.gather(_stop_when_drained(), *(w.start() for w in workers)), timeout=5)
+
+    assert sorted(done) == sorted(f"task-{i}" for i in range(40))
+    # 中文注释: 按空位数领取，单次领取不超过并发上限。
+    assert all(0 < limit <= 8 for w in workers for limit in w.doi_service.claims)
+
+
+async def test_worker_backs_off_when_idle():
+    service = _QueueService([], [], "idle")
+    worker = DOIWorker(doi_service=service, concurrency=4)
+    worker.idle_min_sec = 0.01
+    worker.idle_max_sec = 0.04
+
+    async def _stop_later():
+        await asyncio.sleep(0.2)
+        worker.stop()
+
+    await asyncio.gather(_stop_later(), worker.start())
+
+    # 中文注释: 0.01 → 0.02 → 0.04 封顶，0.2s 内的轮询次数远少于固定 10ms 间隔。
+    assert 3 <= len(service.claims) <= 8
+
+
+async def test_worker_batch_mode_hands_claimed_groups_to_run_tasks():
+    queue = [_task(i) for i in range(25)]
+    done: list = []
+    service = _QueueService(queue, done, "batch")
+    service.deposit_mode = "batch"
+    service.deposit_batch_max_records = 10
+    groups: list[int] = []
+
+    async def _run_tasks(tasks):
+        groups.append(len(tasks))
+        await asyncio.sleep(0.005)
+        done.extend(task["id"] for task in tasks)
+
+    service.run_tasks = _run_tasks
+    worker = DOIWorker(doi_service=service, concurrency=2)
+    worker.idle_min_sec = 0.005
+
+    async def _stop_when_drained():
+        while len(done) < 25:
+            await asyncio.sleep(0.005)
+        worker.stop()
+
+    await asyncio.wait_for(asyncio.gather(_stop_when_drained(), worker.start()), timeout=5)
+
+    assert sorted(groups, reverse=True) == [10, 10, 5]
+    assert all(limit == 10 for limit in service.claims)
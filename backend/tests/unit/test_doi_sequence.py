@@ -0,0 +1,113 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+import pytest
+
+from app.services import doi_sequence as sequence_module
+from app.services.doi_sequence import DOISequenceAllocator
+from app.services.doi_service import DOIService
+
+
+class _CounterClient:
+    """模拟 reserve_doi_sequence_block：每年一行计数，行锁内原子自增。"""
+
+    def __init__(self, *, seed: int = 0, error: str | None = None, wrap: bool = False):
+        self.rows: dict[int, int] = {}
+        self.seed = seed
+        self.error = error
+        self.wrap = wrap
+        self.calls = 0
+        self.lock = threading.Lock()
+
+    def rpc(self, name, params):
+        assert name == "reserve_doi_sequence_block"
+        client = self
+
+        class _Call:
+            def execute(self):
+                if client.error:
+                    raise RuntimeError(client.error)
+                with client.lock:
+                    client.calls += 1
+                    year = params["p_year"]
+                    # 中文注释: 与 SQL 一致：GREATEST(LEAST(p_count, 10000), 1)。
+                    count = max(min(params["p_count"], 10000), 1)
+                    client.rows[year] = client.rows.get(year, client.seed) + count
+                    value = client.rows[year]
+                data = [{"reserve_doi_sequence_block": value}] if client.wrap else value
+                return SimpleNamespace(data=data)
+
+        return _Call()
+
+
+@pytest.fixture(autouse=True)
+def _reset_allocator():
+    sequence_module.reset_doi_sequence_allocator()
+    yield
+    sequence_module.reset_doi_sequence_allocator()
+
+
+def test_allocator_reserves_blocks_per_year():
+    client = _CounterClient(seed=7)
+    allocator = DOISequenceAllocator(block_size=50)
+
+    numbers = [allocator.next(client, 2026) for _ in range(120)]
+
+    assert numbers == list(range(8, 128))
+    assert client.calls == 3
+    assert allocator.next(client, 2027) == 8
+
+
+def test_allocator_clamps_block_size_to_rpc_maximum(monkeypatch):
+    monkeypatch.setenv("DOI_SEQUENCE_BLOCK_SIZE", "50000")
+    client = _CounterClient()
+    first = DOISequenceAllocator()
+    second = DOISequenceAllocator(block_size=50000)
+
+    assert first.block_size == second.block_size == 10000
+    assert first.next(client, 2026) == 1
+    assert second.next(client, 2026) == 10001
+
+
+def test_parallel_allocators_never_share_a_number():
+    client = _CounterClient(wrap=True)
+    allocators = [DOISequenceAllocator(block_size=50) for _ in range(4)]
+
+    def _draw(i):
+        return allocators[i % 4].next(client, 2026)
+
+    with ThreadPoolExecutor(max_workers=16) as pool:
+        numbers = list(pool.map(_draw, range(1000)))
+
+    assert len(set(numbers)) == 1000
+    # 中文注释: 4 个进程各自预留区间，空洞最多 4 个未用完的尾巴。
+    assert max(numbers) <= 1000 + 4 * 50
+    assert client.calls <= 24
+
+
+def test_missing_rpc_falls_back_to_row_count(monkeypatch):
+    client = _CounterClient(error="PGRST202: Could not find the function public.reserve_doi_sequence_block")
+    svc = DOIService(client=client)
+    monkeypatch.setattr(svc, "_count_sequence_for_year", lambda year: 42)
+
+    assert svc._next_sequence_for_year(2026) == 42
+    assert svc._next_sequence_for_year(2026) == 42
+    # 中文注释: 标记不可用后的重试窗口内不再访问 RPC。
+    assert client.calls == 0
+
+
+def test_other_rpc_errors_propagate_instead_of_timestamp_fallback():
+    client = _CounterClient(error="connection reset by peer")
+    svc = DOIService(client=client)
+
+    with pytest.raises(RuntimeError, match="connection reset"):
+        svc._next_sequence_for_year(2026)
+
+
+def test_service_instances_share_process_block():
+    client = _CounterClient()
+    first, second = DOIService(client=client), DOIService(client=client)
+
+    assert [first._next_sequence_for_year(2026), second._next_sequence_for_year(2026)] == [1, 2]
+    assert client.calls == 1
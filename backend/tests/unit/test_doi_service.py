@@ -174,6 +174,9 @@ async def test_process_due_tasks_handles_failure(monkeypatch):
     async def _fake_handle_failure(_task, _error):
         calls["handled"] += 1
 
+    # 中文注释: 走 RPC 未迁移时的逐条领取降级路径。
+    svc._claim_rpc_available = False
+    monkeypatch.setattr(svc, "_reap_stale_tasks", lambda: None)
     monkeypatch.setattr(svc, "_claim_next_task", _fake_claim_next_task)
     monkeypatch.setattr(svc, "register_doi", _fake_register)
     monkeypatch.setattr(svc, "_handle_task_failure", _fake_handle_failure)
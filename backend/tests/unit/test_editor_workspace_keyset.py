@@ -0,0 +1,280 @@
+from __future__ import annotations
+
+import re
+from types import SimpleNamespace
+from unittest.mock import Mock
+
+import pytest
+from fastapi import HTTPException
+
+from app.services.editor_service import EditorService
+
+def _split_terms(expr: str) -> list[str]:
+    terms, depth, quoted, start, idx = [], 0, False, 0, 0
+    while idx < len(expr):
+        ch = expr[idx]
+        if quoted and ch == "\\":
+            idx += 2
+            continue
+        if ch == '"':
+            quoted = not quoted
+        elif not quoted and ch == "(":
+            depth += 1
+        elif not quoted and ch == ")":
+            depth -= 1
+        elif not quoted and depth == 0 and ch == ",":
+            terms.append(expr[start:idx])
+            start = idx + 1
+        idx += 1
+    terms.append(expr[start:])
+    return terms
+
+
+def _keyset_predicate(expr: str):
+    # 中文注释: 极简 PostgREST 逻辑树求值（or/and + lt/eq/is.null/not.is.null），按 DESC NULLS FIRST 语义比较。
+    m = re.fullmatch(r"(or|and)\((.*)\)", expr)
+    if m:
+        parts = [_keyset_predicate(t) for t in _split_terms(m[2])]
+        combine = any if m[1] == "or" else all
+        return lambda row: combine(p(row) for p in parts)
+    column, op = expr.split(".", 1)
+    if op == "is.null":
+        return lambda row: row.get(column) is None
+    if op == "not.is.null":
+        return lambda row: row.get(column) is not None
+    op, raw = op.split(".", 1)
+    value = re.sub(r'\\(.)', r"\1", raw[1:-1])
+    if op == "eq":
+        return lambda row: row.get(column) is not None and row[column] == value
+    return lambda row: row.get(column) is not None and row[column] < value
+
+
+def _desc_key(row: dict) -> tuple:
+    return tuple((row[k] is None, row[k] or "") for k in ("updated_at", "created_at")) + (row["id"],)
+
+
+class _FakeQuery:
+    def __init__(self, table: "_FakeTable"):
+        self._table = table
+        self._filters: list = []
+        self._range: tuple[int, int] | None = None
+
+    def select(self, *_args, **_kwargs):
+        return self
+
+    def in_(self, key, values):
+        allowed = {str(v) for v in values}
+        self._filters.append(lambda row: str(row.get(key)) in allowed)
+        self._table.in_calls.append((key, sorted(allowed)))
+        return self
+
+    def eq(self, key, value):
+        self._filters.append(lambda row: str(row.get(key)) == str(value))
+        return self
+
+    def or_(self, expr):
+        self._filters.append(_keyset_predicate(f"or({expr})"))
+        return self
+
+    def order(self, *_args, **_kwargs):
+        return self
+
+    def range(self, start, end):
+        self._range = (start, end)
+        return self
+
+    def execute(self):
+        rows = [dict(r) for r in self._table.rows if all(f(r) for f in self._filters)]
+        if self._table.name == "manuscripts":
+            rows.sort(key=_desc_key, reverse=True)
+            self._table.fetched += len(rows if self._range is None else rows[: self._range[1] + 1])
+        if self._range is not None:
+            rows = rows[self._range[0] : self._range[1] + 1]
+        return SimpleNamespace(data=rows)
+
+
+class _FakeTable:
+    def __init__(self, name: str, rows: list[dict]):
+        self.name = name
+        self.rows = rows
+        self.in_calls: list = []
+        self.fetched = 0
+
+
+class _FakeClient:
+    def __init__(self, manuscripts: list[dict], profiles: list[dict] | None = None):
+        self.tables = {
+            "manuscripts": _FakeTable("manuscripts", manuscripts),
+            "user_profiles": _FakeTable("user_profiles", profiles or []),
+        }
+
+    def table(self, name: str):
+        return _FakeQuery(self.tables[name])
+
+
+def _manuscripts(n: int, *, status: str = "under_review", ae_id: str = "ae-1") -> list[dict]:
+    # 中文注释: 两两共享 updated_at，覆盖 keyset 的并列比较分支。
+    return [
+        {
+            "id": f"m-{i:03d}",
+            "title": f"Manuscript {i}",
+            "status": status,
+            "pre_check_status": None,
+            "assistant_editor_id": ae_id,
+            "owner_id": f"owner-{i}",
+            "journal_id": "journal-1",
+            "created_at": f"2026-02-01T00:{i:02d}:00Z",
+            "updated_at": f"2026-02-10T00:{i // 2:02d}:00Z",
+        }
+        for i in range(n)
+    ]
+
+
+def _service(client: _FakeClient) -> EditorService:
+    svc = EditorService()
+    svc.client = client
+    svc._apply_process_visibility_scope = Mock(side_effect=lambda *, rows, **_kw: rows)
+    svc._enrich_precheck_rows = Mock(return_value=[])
+    svc._load_latest_precheck_intake_revision_logs = Mock(return_value={})
+    return svc
+
+
+def test_managing_workspace_cursor_walks_all_rows_in_order():
+    client = _FakeClient(_manuscripts(7))
+    svc = _service(client)
+
+    seen: list[str] = []
+    cursor = None
+    pages = 0
+    while True:
+        result = svc.get_managing_workspace_page(
+            viewer_user_id="me-1", viewer_roles=["managing_editor"], page_size=3, cursor=cursor
+        )
+        seen.extend(row["id"] for row in result["rows"])
+        pages += 1
+        if not result["has_more"]:
+            assert result["next_cursor"] is None
+            break
+        cursor = result["next_cursor"]
+
+    assert pages == 3
+    assert seen == [f"m-{i:03d}" for i in range(6, -1, -1)]
+
+
+def test_managing_workspace_enriches_only_returned_slice():
+    rows = _manuscripts(6, status="pre_check")
+    client = _FakeClient(rows, profiles=[{"id": "owner-5", "full_name": "Owner Five"}])
+    svc = _service(client)
+
+    result = svc.get_managing_workspace_page(viewer_user_id="me-1", viewer_roles=["managing_editor"], page_size=2)
+
+    assert [row["id"] for row in result["rows"]] == ["m-005", "m-004"]
+    assert result["has_more"] is True
+    enriched_ids = [row["id"] for row in svc._enrich_precheck_rows.call_args.args[0]]
+    assert enriched_ids == ["m-005", "m-004"]
+    assert client.tables["user_profiles"].in_calls == [("id", ["ae-1", "owner-4", "owner-5"])]
+    assert result["rows"][0]["owner"]["full_name"] == "Owner Five"
+    # 中文注释: 只多取 1 行用于判断 has_more。
+    assert client.tables["manuscripts"].fetched == 3
+
+
+def test_managing_workspace_deep_cursor_does_not_rescan_earlier_rows():
+    client = _FakeClient(_manuscripts(40))
+    svc = _service(client)
+
+    first = svc.get_managing_workspace_page(viewer_user_id="me-1", viewer_roles=["managing_editor"], page_size=5)
+    client.tables["manuscripts"].fetched = 0
+    deep_cursor = EditorService.encode_workspace_cursor(client.tables["manuscripts"].rows[10])
+    deep = svc.get_managing_workspace_page(
+        viewer_user_id="me-1", viewer_roles=["managing_editor"], page_size=5, cursor=deep_cursor
+    )
+
+    assert first["has_more"] is True
+    assert [row["id"] for row in deep["rows"]] == ["m-009", "m-008", "m-007", "m-006", "m-005"]
+    assert client.tables["manuscripts"].fetched == 6
+
+
+def test_managing_workspace_keeps_scanning_when_scope_filters_rows():
+    client = _FakeClient(_manuscripts(30))
+    svc = _service(client)
+    svc._apply_process_visibility_scope = Mock(
+        side_effect=lambda *, rows, **_kw: [r for r in rows if int(r["id"][2:]) % 5 == 0]
+    )
+
+    result = svc.get_managing_workspace_page(viewer_user_id="me-1", viewer_roles=["managing_editor"], page_size=3)
+    nxt = svc.get_managing_workspace_page(
+        viewer_user_id="me-1", viewer_roles=["managing_editor"], page_size=3, cursor=result["next_cursor"]
+    )
+
+    assert [row["id"] for row in result["rows"]] == ["m-025", "m-020", "m-015"]
+    assert result["has_more"] is True
+    assert [row["id"] for row in nxt["rows"]] == ["m-010", "m-005", "m-000"]
+    assert nxt["has_more"] is False
+
+
+def test_managing_workspace_page_number_still_supported_without_cursor():
+    client = _FakeClient(_manuscripts(7))
+    svc = _service(client)
+
+    rows = svc.get_managing_workspace(viewer_user_id="me-1", viewer_roles=["managing_editor"], page=2, page_size=3)
+
+    assert [row["id"] for row in rows] == ["m-003", "m-002", "m-001"]
+
+
+def test_managing_workspace_rejects_malformed_cursor():
+    svc = _service(_FakeClient(_manuscripts(3)))
+
+    with pytest.raises(HTTPException) as exc:
+        svc.get_managing_workspace_page(viewer_user_id="me-1", viewer_roles=["managing_editor"], cursor="not-a-cursor")
+
+    assert exc.value.status_code == 422
+
+
+def test_ae_workspace_cursor_merges_legacy_pending_decision_rows():
+    rows = _manuscripts(5)
+    rows[3]["status"] = "pending_decision"
+    rows.append({**rows[0], "id": "m-other", "assistant_editor_id": "ae-2"})
+    client = _FakeClient(rows)
+    svc = _service(client)
+
+    first = svc.get_ae_workspace_page("ae-1", page_size=2)
+    second = svc.get_ae_workspace_page("ae-1", page_size=2, cursor=first["next_cursor"])
+    third = svc.get_ae_workspace_page("ae-1", page_size=2, cursor=second["next_cursor"])
+
+    assert [row["id"] for row in first["rows"]] == ["m-004", "m-003"]
+    assert first["rows"][1]["status"] == "decision"
+    assert [row["id"] for row in second["rows"]] == ["m-002", "m-001"]
+    assert [row["id"] for row in third["rows"]] == ["m-000"]
+    assert third["has_more"] is False
+
+
+def test_workspace_keyset_escapes_quotes_instead_of_stripping():
+    query = Mock()
+    EditorService._apply_workspace_keyset(query, {"u": '2026-02-10"x', "c": "2026-02-01T00:00:00Z", "i": "m\\1"})
+
+    (expr,) = query.or_.call_args.args
+    assert expr.startswith('updated_at.lt."2026-02-10\\"x",')
+    assert 'id.lt."m\\\\1"' in expr
+
+
+def test_managing_workspace_cursor_pages_through_null_timestamps():
+    rows = _manuscripts(6)
+    for row in rows[:3]:
+        row["updated_at"] = None
+    rows[1]["created_at"] = None
+    client = _FakeClient(rows)
+    svc = _service(client)
+
+    seen: list[str] = []
+    cursor = None
+    while True:
+        # 中文注释: page_size=1 让游标与批次末尾都会落在 NULL 行上。
+        result = svc.get_managing_workspace_page(
+            viewer_user_id="me-1", viewer_roles=["managing_editor"], page_size=1, cursor=cursor
+        )
+        seen.extend(row["id"] for row in result["rows"])
+        if not result["has_more"]:
+            break
+        cursor = result["next_cursor"]
+
+    assert seen == ["m-001", "m-002", "m-000", "m-005", "m-004", "m-003"]
@@ -0,0 +1,104 @@
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from app.core import email_templates as registry_module
+from app.core.email_templates import EmailTemplateRegistry, get_email_template_registry
+from app.core.mail import EmailService
+
+
+@pytest.fixture(autouse=True)
+def _reset_registry():
+    registry_module.reset_email_template_registry()
+    yield
+    registry_module.reset_email_template_registry()
+
+
+def _row(updated_at: str, subject: str = "Invite: {{ title }}") -> dict:
+    return {
+        "id": "tpl-1",
+        "updated_at": updated_at,
+        "subject_template": subject,
+        "body_html_template": "<p>Dear {{ name }}</p>",
+        "body_text_template": None,
+    }
+
+
+def test_inline_template_is_compiled_once_across_services():
+    first = EmailService(smtp_config=None, resend_config=None, supabase_client=None)
+    second = EmailService(smtp_config=None, resend_config=None, supabase_client=None)
+    registry = get_email_template_registry()
+
+    with patch.object(registry.env, "from_string", wraps=registry.env.from_string) as compile_spy:
+        for i in range(50):
+            service = first if i % 2 else second
+            assert service.render_inline_template("Hi {{ name }}", {"name": f"r{i}"}) == f"Hi r{i}"
+
+    assert compile_spy.call_count == 1
+    assert first._jinja is second._jinja
+    assert registry.snapshot()["hits_total"] == 49
+
+
+def test_inline_template_escapes_html_like_file_templates():
+    service = EmailService(smtp_config=None, resend_config=None, supabase_client=None)
+    rendered = service.render_inline_template("<p>{{ name }}</p>", {"name": "<b>x</b>"})
+    assert rendered == "<p>&lt;b&gt;x&lt;/b&gt;</p>"
+
+
+def test_register_recompiles_only_when_updated_at_changes():
+    registry = EmailTemplateRegistry()
+
+    assert registry.register(_row("2026-01-01T00:00:00Z")) is True
+    assert registry.register(_row("2026-01-01T00:00:00Z")) is False
+    assert registry.snapshot()["compiles_total"] == 2
+
+    assert registry.register(_row("2026-02-01T00:00:00Z", subject="Reminder: {{ title }}")) is True
+    snapshot = registry.snapshot()
+    assert snapshot["registered_rows"] == 1
+    # 中文注释: 旧版本的 subject/html 被释放，只留下新版本的两个字段。
+    assert snapshot["inline_cached"] == 2
+
+
+def test_invalidate_drops_compiled_fields():
+    registry = EmailTemplateRegistry()
+    registry.register(_row("2026-01-01T00:00:00Z"))
+
+    registry.invalidate("tpl-1")
+
+    assert registry.snapshot() == {
+        "inline_cached": 0,
+        "registered_rows": 0,
+        "compiles_total": 2,
+        "hits_total": 0,
+    }
+    assert registry.register(_row("2026-01-01T00:00:00Z")) is True
+
+
+def test_register_tolerates_syntax_errors():
+    registry = EmailTemplateRegistry()
+    assert registry.register(_row("v1", subject="{% if %}")) is True
+    assert registry.snapshot()["inline_cached"] == 1
+
+
+def test_warm_compiles_file_and_active_db_templates():
+    registry = EmailTemplateRegistry()
+    client = MagicMock()
+    query = client.table.return_value.select.return_value.eq.return_value
+    query.execute.return_value = SimpleNamespace(data=[_row("v1")])
+
+    count = registry.warm(client)
+
+    client.table.assert_called_once_with("email_templates")
+    assert "review_reminder.html" in registry.env.list_templates()
+    assert count == len(registry.env.list_templates(filter_func=lambda n: n.endswith(".html"))) + 1
+    assert registry.snapshot()["registered_rows"] == 1
+
+
+def test_warm_survives_missing_template_table():
+    registry = EmailTemplateRegistry()
+    client = MagicMock()
+    client.table.side_effect = RuntimeError('relation "public.email_templates" does not exist')
+
+    assert registry.warm(client) > 0
+    assert registry.snapshot()["registered_rows"] == 0
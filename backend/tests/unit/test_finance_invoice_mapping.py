@@ -1,3 +1,6 @@
+import pytest
+from fastapi import HTTPException
+
 from app.services.editor_service import EditorService, FinanceListFilters
 
 
@@ -9,52 +12,6 @@ def test_effective_status_uses_amount_zero_as_waived():
     assert svc._effective_status(raw_status="unpaid", amount=1200) == "unpaid"
 
 
-def test_filter_and_sort_finance_rows_status_query_and_amount():
-    svc = EditorService()
-    rows = [
-        {
-            "invoice_id": "1",
-            "manuscript_id": "m1",
-            "invoice_number": "INV-001",
-            "manuscript_title": "Cancer Trial",
-            "authors": "A",
-            "amount": 200.0,
-            "raw_status": "paid",
-            "effective_status": "paid",
-            "updated_at": "2026-02-09T01:00:00Z",
-        },
-        {
-            "invoice_id": "2",
-            "manuscript_id": "m2",
-            "invoice_number": "INV-002",
-            "manuscript_title": "Brain Study",
-            "authors": "B",
-            "amount": 100.0,
-            "raw_status": "unpaid",
-            "effective_status": "unpaid",
-            "updated_at": "2026-02-09T02:00:00Z",
-        },
-        {
-            "invoice_id": "3",
-            "manuscript_id": "m3",
-            "invoice_number": "INV-003",
-            "manuscript_title": "Genome Maps",
-            "authors": "C",
-            "amount": 0.0,
-            "raw_status": "paid",
-            "effective_status": "waived",
-            "updated_at": "2026-02-09T03:00:00Z",
-        },
-    ]
-
-    filtered = svc._filter_and_sort_finance_rows(
-        rows,
-        filters=FinanceListFilters(status="unpaid", q="brain", sort_by="amount", sort_order="asc"),
-    )
-    assert len(filtered) == 1
-    assert filtered[0]["invoice_id"] == "2"
-
-
 def test_list_finance_invoices_applies_pagination_and_meta():
     svc = EditorService()
     fake_rows = [
@@ -101,3 +58,202 @@ def test_list_finance_invoices_applies_pagination_and_meta():
     assert result["meta"]["page"] == 2
     assert len(result["rows"]) == 1
     assert result["rows"][0]["invoice_id"] == "2"
+
+
+class _RecordingQuery:
+    def __init__(self, client, table):
+        self.client = client
+        self.table = table
+        self.calls = []
+
+    def __getattr__(self, name):
+        def _record(*args, **kwargs):
+            self.calls.append((name, args, kwargs))
+            return self
+
+        return _record
+
+    def execute(self):
+        self.client.queries.append(self)
+        return self.client.respond(self)
+
+
+class _FinanceClient:
+    def __init__(self, invoices, *, error=None):
+        self.invoices = invoices
+        self.error = error
+        self.queries = []
+        self.served = 0
+
+    def table(self, name):
+        return _RecordingQuery(self, name)
+
+    def respond(self, query):
+        from types import SimpleNamespace
+
+        if query.table == "user_profiles":
+            return SimpleNamespace(data=[{"id": "a1", "full_name": "Ada"}])
+        calls = {name: (args, kwargs) for name, args, kwargs in query.calls}
+        if self.error and "ilike" in calls:
+            raise RuntimeError(self.error)
+        rows = list(self.invoices)
+        if "range" in calls:
+            start, end = calls["range"][0]
+            # 中文注释: 带 or_（keyset 游标）的请求从上一批末尾继续；偏移翻页按 range 取。
+            if "or_" in calls:
+                start = self.served
+            rows = rows[start : start + (end - calls["range"][0][0] + 1)]
+            self.served = start + len(rows)
+        return SimpleNamespace(data=rows, count=len(self.invoices))
+
+
+def _invoice(i):
+    return {
+        "id": f"00000000-0000-0000-0000-{i:012d}",
+        "manuscript_id": f"m{i}",
+        "amount": 100 + i,
+        "status": "unpaid",
+        "invoice_number": f"INV-{i:03d}",
+        "created_at": f"2026-02-{i + 1:02d}T00:00:00+00:00",
+        "manuscripts": {"id": f"m{i}", "title": f"Paper {i}", "author_id": "a1"},
+    }
+
+
+def _calls(query, name):
+    return [args for n, args, _ in query.calls if n == name]
+
+
+def test_finance_keyword_search_is_pushed_to_database():
+    svc = EditorService()
+    svc.client = _FinanceClient([_invoice(i) for i in range(3)])
+
+    result = svc.list_finance_invoices(filters=FinanceListFilters(q="INV_0%", page=1, page_size=2))
+
+    invoice_query = svc.client.queries[0]
+    assert _calls(invoice_query, "ilike") == [("search_text", "%inv\\_0\\%%")]
+    assert _calls(invoice_query, "range") == [(0, 1)]
+    assert [q.table for q in svc.client.queries] == ["invoices", "user_profiles"]
+    assert result["meta"]["total"] == 3
+    assert result["meta"]["next_cursor"]
+    assert result["rows"][0]["authors"] == "Ada"
+
+
+def test_finance_unpaid_filter_keeps_null_status_and_sorts_by_effective_status():
+    svc = EditorService()
+    svc.client = _FinanceClient([{**_invoice(1), "status": None, "effective_status": "unpaid"}])
+
+    result = svc.list_finance_invoices(
+        filters=FinanceListFilters(status="unpaid", q="brain", sort_by="status", sort_order="asc")
+    )
+
+    invoice_query = svc.client.queries[0]
+    assert _calls(invoice_query, "gt") == [("amount", 0)]
+    assert _calls(invoice_query, "neq") == []
+    assert _calls(invoice_query, "or_") == [("and(or(status.is.null,status.not.in.(paid,waived)))",)]
+    assert _calls(invoice_query, "ilike") == [("search_text", "%brain%")]
+    orders = [(args[0], kwargs.get("desc")) for name, args, kwargs in invoice_query.calls if name == "order"]
+    assert orders == [("effective_status", False), ("created_at", True), ("id", True)]
+    assert result["rows"][0]["raw_status"] == "unpaid"
+    assert result["rows"][0]["effective_status"] == "unpaid"
+
+
+def test_finance_default_sort_uses_displayed_activity_time():
+    svc = EditorService()
+    row = {**_invoice(2), "activity_at": "2026-03-01T08:00:00+00:00"}
+    svc.client = _FinanceClient([row, _invoice(1)])
+
+    result = svc.list_finance_invoices(filters=FinanceListFilters(page_size=1))
+
+    invoice_query = svc.client.queries[0]
+    orders = [(args[0], kwargs.get("desc")) for name, args, kwargs in invoice_query.calls if name == "order"]
+    assert orders[0] == ("activity_at", True)
+    cursor = svc.decode_finance_cursor(result["meta"]["next_cursor"], sort_by="updated_at")
+    assert cursor["k"] == "2026-03-01T08:00:00+00:00"
+    condition = svc._finance_keyset_condition(cursor, sort_by="updated_at", desc=True)
+    assert condition.startswith('or(activity_at.lt."2026-03-01T08:00:00+00:00",and(activity_at.eq.')
+
+
+def test_finance_cursor_uses_keyset_and_skips_count():
+    svc = EditorService()
+    svc.client = _FinanceClient([_invoice(i) for i in range(5)])
+    cursor = svc.encode_finance_cursor(_invoice(7), sort_by="amount")
+
+    result = svc.list_finance_invoices(
+        filters=FinanceListFilters(status="waived", sort_by="amount", sort_order="asc", page_size=2, cursor=cursor)
+    )
+
+    invoice_query = svc.client.queries[0]
+    assert all("count" not in kwargs for name, _, kwargs in invoice_query.calls if name == "select")
+    (condition,) = _calls(invoice_query, "or_")
+    assert condition[0].startswith("and(or(status.eq.waived,amount.lte.0),or(amount.gt.\"107\",and(amount.eq.\"107\",")
+    assert _calls(invoice_query, "range") == [(0, 2)]
+    assert result["meta"]["total"] is None
+    assert len(result["rows"]) == 2
+    decoded = svc.decode_finance_cursor(result["meta"]["next_cursor"], sort_by="amount")
+    assert decoded["i"] == _invoice(1)["id"]
+
+
+def test_finance_cursor_must_match_sort():
+    svc = EditorService()
+    svc.client = _FinanceClient([])
+    cursor = svc.encode_finance_cursor(_invoice(1), sort_by="amount")
+
+    with pytest.raises(HTTPException) as exc:
+        svc.list_finance_invoices(filters=FinanceListFilters(sort_by="status", cursor=cursor))
+    assert exc.value.status_code == 422
+
+
+def test_finance_cursor_keeps_null_sort_key_distinct_from_literal():
+    svc = EditorService()
+    row = {**_invoice(3), "amount": None}
+    cursor = svc.decode_finance_cursor(svc.encode_finance_cursor(row, sort_by="amount"), sort_by="amount")
+    assert cursor["k"] is None
+
+    desc = svc._finance_keyset_condition(cursor, sort_by="amount", desc=True)
+    asc = svc._finance_keyset_condition(cursor, sort_by="amount", desc=False)
+
+    assert "None" not in desc and "None" not in asc
+    assert desc.startswith("or(amount.not.is.null,and(amount.is.null,or(created_at.lt.")
+    assert asc.startswith("and(amount.is.null,or(created_at.lt.")
+
+
+def test_finance_cursor_non_null_key_includes_trailing_nulls_only_when_ascending():
+    svc = EditorService()
+    cursor = svc.decode_finance_cursor(svc.encode_finance_cursor(_invoice(2), sort_by="amount"), sort_by="amount")
+
+    desc = svc._finance_keyset_condition(cursor, sort_by="amount", desc=True)
+    asc = svc._finance_keyset_condition(cursor, sort_by="amount", desc=False)
+
+    assert "is.null" not in desc
+    assert desc.startswith('or(amount.lt."102"')
+    assert asc.startswith('or(amount.gt."102"') and asc.endswith(",amount.is.null)")
+
+
+def test_finance_keyword_falls_back_when_search_column_missing():
+    svc = EditorService()
+    svc.client = _FinanceClient(
+        [_invoice(i) for i in range(12)], error='column invoices.search_text does not exist (42703)'
+    )
+
+    result = svc.list_finance_invoices(filters=FinanceListFilters(q="inv-01", page=1, page_size=5))
+
+    assert [r["invoice_number"] for r in result["rows"]] == ["INV-010", "INV-011"]
+    assert result["meta"]["total"] == 2
+
+
+def test_finance_export_streams_keyset_batches():
+    svc = EditorService()
+    svc.client = _FinanceClient([_invoice(i) for i in range(5)])
+
+    result = svc.export_finance_invoices_csv(filters=FinanceListFilters(), batch_size=2)
+    assert len(svc.client.queries) == 2  # 中文注释: 仅预取首批（invoices + 作者资料）。
+    chunks = list(result["chunks"])
+
+    assert result["empty"] is False
+    assert len(chunks) == 3
+    assert chunks[0].startswith("invoice_id,")
+    assert not any(c.startswith("invoice_id,") for c in chunks[1:])
+    body = "".join(chunks)
+    assert [line.split(",")[2] for line in body.strip().splitlines()[1:]] == [f"INV-{i:03d}" for i in range(5)]
+    invoice_queries = [q for q in svc.client.queries if q.table == "invoices"]
+    assert [len(_calls(q, "or_")) for q in invoice_queries] == [0, 1, 1]
@@ -148,3 +148,162 @@ def test_render_invoice_html_includes_cjk_font_fallback():
     )
     assert "PingFang SC" in html
     assert "Noto Sans CJK SC" in html
+
+
+class _BulkFakeQuery:
+    def __init__(self, parent: "_BulkFakeSupabaseAdmin", name: str):
+        self.parent = parent
+        self.name = name
+        self._ids: list[str] | None = None
+        self._update_payload: dict | None = None
+        self._eq_id: str | None = None
+
+    def select(self, *_args, **_kwargs):
+        return self
+
+    def in_(self, _key, values):
+        self._ids = [str(v) for v in values]
+        return self
+
+    def eq(self, _key, value):
+        self._eq_id = str(value)
+        return self
+
+    def update(self, payload: dict):
+        self._update_payload = payload
+        return self
+
+    def execute(self):
+        if self._update_payload is not None:
+            self.parent.update_calls.append((self._eq_id, self._update_payload))
+            return SimpleNamespace(data=[])
+        self.parent.select_calls.append((self.name, list(self._ids or [])))
+        rows = self.parent.rows[self.name]
+        return SimpleNamespace(data=[rows[i] for i in (self._ids or []) if i in rows])
+
+
+class _BulkFakeSupabaseAdmin:
+    def __init__(self, n: int):
+        self.rows: dict[str, dict[str, dict]] = {"invoices": {}, "manuscripts": {}, "user_profiles": {}}
+        self.invoice_ids: list[str] = []
+        for i in range(n):
+            iid = f"00000000-0000-0000-0000-{i:012d}"
+            mid = f"ms-{i}"
+            aid = f"author-{i % 3}"
+            self.invoice_ids.append(iid)
+            self.rows["invoices"][iid] = {"id": iid, "manuscript_id": mid, "amount": 100 + i, "invoice_number": ""}
+            self.rows["manuscripts"][mid] = {"id": mid, "title": f"Title {i}", "author_id": aid}
+            self.rows["user_profiles"][aid] = {"id": aid, "full_name": f"Author {i % 3}", "email": None}
+        self.select_calls: list[tuple[str, list[str]]] = []
+        self.update_calls: list[tuple[str | None, dict]] = []
+
+    def table(self, name: str):
+        return _BulkFakeQuery(self, name)
+
+
+class _FakeRenderPool:
+    def __init__(self, fail_marker: str | None = None):
+        self.fail_marker = fail_marker
+        self.htmls: list[str] = []
+
+    def submit(self, html: str):
+        from concurrent.futures import Future
+
+        self.htmls.append(html)
+        future = Future()
+        if self.fail_marker and self.fail_marker in html:
+            future.set_exception(RuntimeError("render boom"))
+        else:
+            future.set_result(b"%PDF-1.4\n%Fake\n")
+        return future
+
+
+def test_regenerate_invoice_pdfs_prefetches_in_three_queries(monkeypatch):
+    fake = _BulkFakeSupabaseAdmin(6)
+    uploads: list[dict] = []
+    monkeypatch.setattr(invoice_pdf_service, "supabase_admin", fake)
+    monkeypatch.setattr(invoice_pdf_service, "upload_bytes", lambda **kw: uploads.append(kw))
+    monkeypatch.setattr(invoice_pdf_service, "ensure_bucket_exists", lambda **_kw: None)
+    pool = _FakeRenderPool()
+
+    missing = "99999999-9999-9999-9999-999999999999"
+    results = invoice_pdf_service.regenerate_invoice_pdfs(
+        [*fake.invoice_ids, missing, fake.invoice_ids[0]], render_pool=pool, upload_concurrency=3
+    )
+
+    assert [str(r.invoice_id) for r in results] == [*fake.invoice_ids, missing]
+    assert [name for name, _ids in fake.select_calls] == ["invoices", "manuscripts", "user_profiles"]
+    assert len(pool.htmls) == 6
+    assert all("<style>" not in html for html in pool.htmls)
+    assert "Author 2" in pool.htmls[2]
+    assert len(uploads) == 6
+    assert all(kw["ensure_bucket"] is False for kw in uploads)
+    assert results[-1].pdf_error == "Invoice not found"
+    assert all(r.pdf_error is None and r.pdf_path for r in results[:-1])
+    for _iid, payload in fake.update_calls:
+        assert "status" not in payload
+        assert "confirmed_at" not in payload
+
+
+def test_regenerate_invoice_pdfs_isolates_render_failures(monkeypatch):
+    fake = _BulkFakeSupabaseAdmin(3)
+    monkeypatch.setattr(invoice_pdf_service, "supabase_admin", fake)
+    monkeypatch.setattr(invoice_pdf_service, "upload_bytes", lambda **_kw: None)
+    monkeypatch.setattr(invoice_pdf_service, "ensure_bucket_exists", lambda **_kw: None)
+
+    results = invoice_pdf_service.regenerate_invoice_pdfs(
+        fake.invoice_ids, render_pool=_FakeRenderPool(fail_marker="Title 1")
+    )
+
+    assert [r.pdf_error for r in results] == [None, "render boom", None]
+    failed_updates = [payload for iid, payload in fake.update_calls if iid == fake.invoice_ids[1]]
+    assert failed_updates == [{"pdf_error": "render boom", "pdf_generated_at": results[1].pdf_generated_at}]
+
+
+def test_regenerate_invoice_pdfs_records_malformed_ids_per_invoice(monkeypatch):
+    fake = _BulkFakeSupabaseAdmin(2)
+    monkeypatch.setattr(invoice_pdf_service, "supabase_admin", fake)
+    monkeypatch.setattr(invoice_pdf_service, "upload_bytes", lambda **_kw: None)
+    monkeypatch.setattr(invoice_pdf_service, "ensure_bucket_exists", lambda **_kw: None)
+
+    results = invoice_pdf_service.regenerate_invoice_pdfs(
+        [fake.invoice_ids[0], "not-a-uuid", fake.invoice_ids[1].upper()], render_pool=_FakeRenderPool()
+    )
+
+    assert [str(r.invoice_id) for r in results] == [fake.invoice_ids[0], "not-a-uuid", fake.invoice_ids[1]]
+    assert [r.pdf_error for r in results] == [None, "Invalid invoice id", None]
+    assert fake.select_calls[0] == ("invoices", fake.invoice_ids)
+
+
+def test_regenerate_invoice_pdfs_records_bucket_failure_per_invoice(monkeypatch):
+    fake = _BulkFakeSupabaseAdmin(2)
+    uploads: list[dict] = []
+    monkeypatch.setattr(invoice_pdf_service, "supabase_admin", fake)
+    monkeypatch.setattr(invoice_pdf_service, "upload_bytes", lambda **kw: uploads.append(kw))
+
+    def _no_bucket(**_kw):
+        raise RuntimeError("storage down")
+
+    monkeypatch.setattr(invoice_pdf_service, "ensure_bucket_exists", _no_bucket)
+
+    results = invoice_pdf_service.regenerate_invoice_pdfs(fake.invoice_ids, render_pool=_FakeRenderPool())
+
+    assert uploads == []
+    assert [r.pdf_error for r in results] == ["Invoice bucket unavailable: storage down"] * 2
+    assert sorted(iid for iid, _payload in fake.update_calls) == fake.invoice_ids
+
+
+def test_render_pool_inline_mode_surfaces_errors_on_future(monkeypatch):
+    from app.services import invoice_pdf_renderer
+
+    def _boom(_html: str) -> bytes:
+        raise RuntimeError("no pango")
+
+    monkeypatch.setattr(invoice_pdf_renderer, "render_invoice_pdf", _boom)
+    pool = invoice_pdf_renderer.InvoiceRenderPool(workers=0)
+
+    future = pool.submit("<html></html>")
+
+    with pytest.raises(RuntimeError, match="no pango"):
+        future.result()
+    assert pool.metrics()["submitted_total"] == 1
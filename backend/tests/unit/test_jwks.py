@@ -0,0 +1,126 @@
+from __future__ import annotations
+
+import json
+from datetime import datetime, timedelta, timezone
+
+import httpx
+import pytest
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec
+from fastapi import HTTPException
+from fastapi.security import HTTPAuthorizationCredentials
+from jose import jwk, jwt
+
+from app.core import auth_utils, jwks
+from app.lib import supabase_pool
+
+
+def _make_es256_keypair(kid: str) -> tuple[str, dict]:
+    private_key = ec.generate_private_key(ec.SECP256R1())
+    private_pem = private_key.private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.PKCS8,
+        serialization.NoEncryption(),
+    ).decode("utf-8")
+    public_pem = private_key.public_key().public_bytes(
+        serialization.Encoding.PEM,
+        serialization.PublicFormat.SubjectPublicKeyInfo,
+    ).decode("utf-8")
+    public_jwk = jwk.construct(public_pem, algorithm="ES256").to_dict()
+    public_jwk.update({"kid": kid, "alg": "ES256", "use": "sig"})
+    return private_pem, public_jwk
+
+
+def _sign(private_pem: str, kid: str, *, sub: str = "user-1", exp_delta: timedelta = timedelta(hours=1)) -> str:
+    now = datetime.now(timezone.utc)
+    return jwt.encode(
+        {"sub": sub, "email": "u@example.com", "aud": "authenticated", "exp": now + exp_delta, "iat": now},
+        private_pem,
+        algorithm="ES256",
+        headers={"kid": kid},
+    )
+
+
+@pytest.fixture
+def jwks_server(monkeypatch: pytest.MonkeyPatch):
+    state: dict = {"keys": [], "hits": 0}
+
+    def _handler(request: httpx.Request) -> httpx.Response:
+        state["hits"] += 1
+        return httpx.Response(200, content=json.dumps({"keys": state["keys"]}))
+
+    monkeypatch.setattr(supabase_pool, "_http_client", httpx.Client(transport=httpx.MockTransport(_handler)))
+    cache = jwks.JWKSCache(
+        url_provider=lambda: "https://demo.supabase.co/auth/v1/.well-known/jwks.json",
+        ttl_sec=600,
+        min_refresh_interval_sec=0,
+    )
+    monkeypatch.setattr(jwks, "jwks_cache", cache)
+    monkeypatch.setattr(jwks, "verified_token_cache", jwks.VerifiedTokenCache(max_entries=16))
+    yield state
+    supabase_pool._http_client = None
+
+
+def _boom_supabase(monkeypatch: pytest.MonkeyPatch) -> None:
+    class _Auth:
+        def get_user(self, _token):
+            raise AssertionError("Auth API must not be called for locally verifiable tokens")
+
+    monkeypatch.setattr(auth_utils, "supabase", type("S", (), {"auth": _Auth()})())
+
+
+@pytest.mark.asyncio
+async def test_es256_token_verified_locally_and_cached(jwks_server, monkeypatch: pytest.MonkeyPatch) -> None:
+    private_pem, public_jwk = _make_es256_keypair("kid-1")
+    jwks_server["keys"] = [public_jwk]
+    _boom_supabase(monkeypatch)
+    token = _sign(private_pem, "kid-1")
+
+    creds = HTTPAuthorizationCredentials(scheme="Bearer", credentials=token)
+    first = await auth_utils.get_current_user(creds)
+    second = await auth_utils.get_current_user(creds)
+
+    assert first == second == {"id": "user-1", "email": "u@example.com"}
+    assert jwks_server["hits"] == 1
+
+
+@pytest.mark.asyncio
+async def test_rotated_kid_triggers_jwks_refresh(jwks_server, monkeypatch: pytest.MonkeyPatch) -> None:
+    old_pem, old_jwk = _make_es256_keypair("kid-old")
+    new_pem, new_jwk = _make_es256_keypair("kid-new")
+    jwks_server["keys"] = [old_jwk]
+    _boom_supabase(monkeypatch)
+
+    await auth_utils.get_current_user(HTTPAuthorizationCredentials(scheme="Bearer", credentials=_sign(old_pem, "kid-old")))
+    jwks_server["keys"] = [old_jwk, new_jwk]
+    user = await auth_utils.get_current_user(
+        HTTPAuthorizationCredentials(scheme="Bearer", credentials=_sign(new_pem, "kid-new", sub="user-2"))
+    )
+
+    assert user["id"] == "user-2"
+    assert jwks_server["hits"] == 2
+
+
+@pytest.mark.asyncio
+async def test_bad_signature_rejected_without_auth_api(jwks_server, monkeypatch: pytest.MonkeyPatch) -> None:
+    _, public_jwk = _make_es256_keypair("kid-1")
+    attacker_pem, _ = _make_es256_keypair("kid-1")
+    jwks_server["keys"] = [public_jwk]
+    _boom_supabase(monkeypatch)
+
+    with pytest.raises(HTTPException) as exc:
+        await auth_utils.get_current_user(
+            HTTPAuthorizationCredentials(scheme="Bearer", credentials=_sign(attacker_pem, "kid-1"))
+        )
+    assert exc.value.status_code == 401
+
+
+def test_verified_token_cache_expires_at_token_exp() -> None:
+    cache = jwks.VerifiedTokenCache(max_entries=16)
+    cache.set("expired", {"sub": "u", "exp": 1})
+    cache.set("no-exp", {"sub": "u"})
+    cache.set("valid", {"sub": "u", "exp": 4102444800})
+
+    assert cache.get("expired") is None
+    assert cache.get("no-exp") is None
+    assert cache.get("valid") == {"sub": "u", "exp": 4102444800}
@@ -0,0 +1,145 @@
+import smtplib
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from app.core.config import ResendConfig, SMTPConfig
+from app.core.mail import EmailService
+from app.core.mail_dispatcher import SMTPConnectionPool, TemplateEmail
+
+
+def _smtp_config() -> SMTPConfig:
+    return SMTPConfig(
+        host="smtp.example.com",
+        port=587,
+        user="user@example.com",
+        password="secret",
+        from_email="no-reply@example.com",
+        use_starttls=True,
+    )
+
+
+def _message(i: int) -> TemplateEmail:
+    return TemplateEmail(
+        to_email=f"r{i}@example.com",
+        subject="Reminder",
+        template_name="review_reminder.html",
+        context={"manuscript_title": f"Paper {i}"},
+        idempotency_key=f"review-reminder/a{i}",
+        audit_context={"assignment_id": f"a{i}", "scene": "reviewer_assignment"},
+    )
+
+
+def test_pool_reuses_authenticated_connection():
+    pool = SMTPConnectionPool(_smtp_config(), size=2)
+    with patch("app.core.mail_dispatcher.smtplib.SMTP") as smtp:
+        server = smtp.return_value
+        for _ in range(3):
+            pool.sendmail("from@example.com", ["to@example.com"], "msg")
+
+    assert smtp.call_count == 1
+    server.starttls.assert_called_once()
+    server.login.assert_called_once()
+    assert server.sendmail.call_count == 3
+    assert pool.snapshot()["idle"] == 1
+
+
+def test_pool_reconnects_once_after_disconnect():
+    pool = SMTPConnectionPool(_smtp_config(), size=1)
+    stale, fresh = MagicMock(), MagicMock()
+    stale.sendmail.side_effect = [None, smtplib.SMTPServerDisconnected("gone")]
+    with patch("app.core.mail_dispatcher.smtplib.SMTP", side_effect=[stale, fresh]):
+        pool.sendmail("from@example.com", ["a@example.com"], "one")
+        pool.sendmail("from@example.com", ["b@example.com"], "two")
+
+    fresh.sendmail.assert_called_once_with("from@example.com", ["b@example.com"], "two")
+    assert pool.snapshot()["reconnects_total"] == 1
+
+
+def test_pool_probes_idle_connection_with_noop():
+    pool = SMTPConnectionPool(_smtp_config(), size=1, noop_after_sec=0.0)
+    stale, fresh = MagicMock(), MagicMock()
+    stale.noop.side_effect = smtplib.SMTPServerDisconnected("idle timeout")
+    with patch("app.core.mail_dispatcher.smtplib.SMTP", side_effect=[stale, fresh]):
+        pool.sendmail("from@example.com", ["a@example.com"], "one")
+        pool.sendmail("from@example.com", ["b@example.com"], "two")
+
+    stale.sendmail.assert_called_once()
+    fresh.sendmail.assert_called_once()
+    assert pool.snapshot()["stale_total"] == 1
+
+
+def test_pool_keeps_connection_after_recipient_refused():
+    pool = SMTPConnectionPool(_smtp_config(), size=1)
+    with patch("app.core.mail_dispatcher.smtplib.SMTP") as smtp:
+        smtp.return_value.sendmail.side_effect = [smtplib.SMTPRecipientsRefused({}), None]
+        with pytest.raises(smtplib.SMTPRecipientsRefused):
+            pool.sendmail("from@example.com", ["bad@example.com"], "one")
+        pool.sendmail("from@example.com", ["ok@example.com"], "two")
+
+    assert smtp.call_count == 1
+
+
+def test_smtp_batch_sends_concurrently_and_bulk_logs(monkeypatch):
+    monkeypatch.setenv("SMTP_POOL_ENABLED", "1")
+    logs = MagicMock()
+    service = EmailService(smtp_config=_smtp_config(), resend_config=None, supabase_client=logs)
+    pool = SMTPConnectionPool(_smtp_config(), size=3)
+
+    def _sendmail(from_addr, recipients, message):
+        if recipients == ["r3@example.com"]:
+            raise smtplib.SMTPRecipientsRefused({})
+
+    with patch("app.core.mail_dispatcher.smtplib.SMTP") as smtp, patch(
+        "app.core.mail.get_smtp_pool", return_value=pool
+    ):
+        smtp.return_value.sendmail.side_effect = _sendmail
+        results = service.send_template_batch([_message(i) for i in range(6)], concurrency=3)
+
+    assert [r.ok for r in results] == [True, True, True, False, True, True]
+    assert smtp.call_count <= 3
+    logs.table.assert_called_once_with("email_logs")
+    inserted = logs.table.return_value.insert.call_args.args[0]
+    assert len(inserted) == 6
+    assert {row["assignment_id"] for row in inserted} == {f"a{i}" for i in range(6)}
+    assert sum(1 for row in inserted if row["status"] == "failed") == 1
+
+
+def test_resend_batch_maps_permissive_errors():
+    logs = MagicMock()
+    service = EmailService(
+        smtp_config=None,
+        resend_config=ResendConfig(api_key="re_test", sender="ScholarFlow <no-reply@example.com>"),
+        supabase_client=logs,
+    )
+    response = {"data": [{"id": "e0"}, {"id": "e2"}], "errors": [{"index": 1, "message": "invalid to"}]}
+    with patch("app.core.mail.resend.Batch.send", return_value=response) as batch_send:
+        results = service.send_template_batch([_message(i) for i in range(3)])
+
+    params, options = batch_send.call_args.args
+    assert len(params) == 3
+    assert options["batch_validation"] == "permissive"
+    assert options["idempotency_key"].startswith("batch:")
+    assert {"name": "template", "value": "review_reminder_html"} in params[0]["tags"]
+    assert [(r.ok, r.provider_id, r.error) for r in results] == [
+        (True, "e0", None),
+        (False, None, "invalid to"),
+        (True, "e2", None),
+    ]
+    assert len(logs.table.return_value.insert.call_args.args[0]) == 3
+
+
+def test_resend_batch_splits_into_chunks_of_100():
+    service = EmailService(
+        smtp_config=None,
+        resend_config=ResendConfig(api_key="re_test", sender="ScholarFlow <no-reply@example.com>"),
+        supabase_client=None,
+    )
+    with patch(
+        "app.core.mail.resend.Batch.send",
+        side_effect=lambda params, options: {"data": [{"id": str(i)} for i in range(len(params))]},
+    ) as batch_send:
+        results = service.send_template_batch([_message(i) for i in range(230)])
+
+    assert [len(call.args[0]) for call in batch_send.call_args_list] == [100, 100, 30]
+    assert all(r.ok for r in results)
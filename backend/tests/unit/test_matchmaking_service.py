@@ -161,8 +161,9 @@ def test_index_reviewer_skips_when_source_hash_unchanged(monkeypatch):
     # review_reports / manuscripts：不走
     t_rr = MagicMock()
     t_rr.select.return_value = t_rr
-    t_rr.eq.return_value = t_rr
-    t_rr.limit.return_value = t_rr
+    t_rr.in_.return_value = t_rr
+    t_rr.order.return_value = t_rr
+    t_rr.range.return_value = t_rr
     t_rr.execute.return_value = _Resp([])
 
     # reviewer_embeddings：已有相同 hash -> 直接 return，不应触发 embedder/upsert
@@ -211,9 +212,10 @@ def test_index_reviewer_upserts_embedding_when_changed(monkeypatch):
     # review_reports：返回一个稿件 id
     t_rr = MagicMock()
     t_rr.select.return_value = t_rr
-    t_rr.eq.return_value = t_rr
-    t_rr.limit.return_value = t_rr
-    t_rr.execute.return_value = _Resp([{"manuscript_id": "m1"}])
+    t_rr.in_.return_value = t_rr
+    t_rr.order.return_value = t_rr
+    t_rr.range.return_value = t_rr
+    t_rr.execute.return_value = _Resp([{"reviewer_id": "u1", "manuscript_id": "m1"}])
 
     # manuscripts：返回标题
     t_ms = MagicMock()
@@ -251,3 +253,182 @@ def test_index_reviewer_upserts_embedding_when_changed(monkeypatch):
     payload = t_embeddings.upsert.call_args.args[0]
     assert payload["user_id"] == "u1"
     assert payload["embedding"].startswith("[")
+
+
+class _FakeTable:
+    def __init__(self, rows):
+        self.rows = rows
+        self.executions = 0
+        self.upserts = []
+        self._filters = []
+        self._limit = None
+        self._offset = 0
+
+    def select(self, *_args, **_kwargs):
+        self._filters = []
+        self._limit = None
+        self._offset = 0
+        return self
+
+    def contains(self, col, values):
+        self._filters.append(lambda r: set(values) <= set(r.get(col) or []))
+        return self
+
+    def gt(self, col, value):
+        self._filters.append(lambda r: str(r.get(col)) > str(value))
+        return self
+
+    def in_(self, col, values):
+        allowed = {str(v) for v in values}
+        self._filters.append(lambda r: str(r.get(col)) in allowed)
+        return self
+
+    def order(self, *_args, **_kwargs):
+        return self
+
+    def limit(self, n):
+        self._limit = n
+        return self
+
+    def range(self, start, end):
+        # 中文注释: 模拟 PostgREST max-rows 截断前的分页窗口。
+        self._offset, self._limit = start, end - start + 1
+        return self
+
+    def upsert(self, payload):
+        self.upserts.append(payload)
+        return self
+
+    def execute(self):
+        self.executions += 1
+        rows = sorted(
+            [r for r in self.rows if all(f(r) for f in self._filters)],
+            key=lambda r: str(r.get("id") or r.get("user_id") or ""),
+        )
+        if self._limit is not None:
+            rows = rows[self._offset : self._offset + self._limit]
+        return _Resp(rows)
+
+
+def test_reindex_reviewers_batches_and_skips_unchanged():
+    from app.core.ml import hash_source_text
+    from app.services.matchmaking_service import MatchmakingService
+
+    profiles = _FakeTable(
+        [
+            {"id": f"u{i}", "research_interests": f"topic {i}", "roles": ["reviewer"]}
+            for i in range(5)
+        ]
+        + [{"id": "author", "research_interests": "x", "roles": ["author"]}]
+    )
+    reports = _FakeTable([{"reviewer_id": "u1", "manuscript_id": "m1"}])
+    manuscripts = _FakeTable([{"id": "m1", "title": "Old Paper"}])
+    unchanged = hash_source_text("Research interests: topic 0")
+    embeddings = _FakeTable(
+        [
+            {"user_id": "u0", "source_text_hash": unchanged},
+            {"user_id": "u2", "source_text_hash": "stale"},
+        ]
+    )
+    tables = {
+        "user_profiles": profiles,
+        "review_reports": reports,
+        "manuscripts": manuscripts,
+        "reviewer_embeddings": embeddings,
+    }
+    db = MagicMock()
+    db.table.side_effect = lambda name: tables[name]
+
+    batches = []
+
+    def batch_embedder(texts):
+        batches.append(list(texts))
+        return [[0.0] * 384 for _ in texts]
+
+    svc = MatchmakingService(db_client=db, batch_embedder=batch_embedder)
+    stats = svc.reindex_reviewers(batch_size=2)
+
+    assert stats == {"scanned": 5, "skipped": 1, "embedded": 4, "failed": 0}
+    # 3 批（2+2+1），每批最多一次 embed 调用与一次批量 upsert
+    assert len(batches) == 3
+    assert len(embeddings.upserts) == 3
+    upserted = [row["user_id"] for payload in embeddings.upserts for row in payload]
+    assert sorted(upserted) == ["u1", "u2", "u3", "u4"]
+    assert any("Past reviewed manuscripts: Old Paper" in t for batch in batches for t in batch)
+
+
+def test_reindex_reviewers_force_recomputes_all():
+    from app.services.matchmaking_service import MatchmakingService
+
+    profiles = _FakeTable([{"id": "u1", "research_interests": "NLP", "roles": ["reviewer"]}])
+    embeddings = _FakeTable([])
+    tables = {
+        "user_profiles": profiles,
+        "review_reports": _FakeTable([]),
+        "manuscripts": _FakeTable([]),
+        "reviewer_embeddings": embeddings,
+    }
+    db = MagicMock()
+    db.table.side_effect = lambda name: tables[name]
+
+    svc = MatchmakingService(db_client=db, embedder=lambda _: [0.1] * 384)
+    stats = svc.reindex_reviewers(user_ids=["u1"], force=True)
+
+    assert stats["embedded"] == 1
+    assert embeddings.upserts[0][0]["embedding"].startswith("[0.100000")
+
+
+def test_history_titles_identical_for_single_and_bulk_paths():
+    from app.core.ml import hash_source_text
+    from app.services import matchmaking_service as mm
+    from app.services.matchmaking_service import MatchmakingService
+
+    # 中文注释: 数据库返回顺序打乱 + 同一稿件多份报告 + 超过上限，两条路径仍得到相同、稳定的标题列表。
+    report_rows = [
+        {"reviewer_id": "u1", "manuscript_id": f"m{i:02d}"} for i in (30, 5, 12, 5, 27, 1, 22, 9, 18, 3, 25, 14, 7)
+    ] * 2 + [{"reviewer_id": "u1", "manuscript_id": f"m{i:02d}"} for i in range(40, 52)]
+    reports = _FakeTable(list(reversed(report_rows)))
+    manuscripts = _FakeTable([{"id": f"m{i:02d}", "title": f"Paper {i:02d}"} for i in range(60)])
+    profiles = _FakeTable([{"id": "u1", "research_interests": "NLP", "roles": ["reviewer"]}])
+    embeddings = _FakeTable([])
+    tables = {
+        "user_profiles": profiles,
+        "review_reports": reports,
+        "manuscripts": manuscripts,
+        "reviewer_embeddings": embeddings,
+    }
+    db = MagicMock()
+    db.table.side_effect = lambda name: tables[name]
+    svc = MatchmakingService(db_client=db, batch_embedder=lambda texts: [[0.0] * 384 for _ in texts])
+
+    titles = svc._fetch_history_titles(["u1"])["u1"]
+    assert len(titles) == mm._HISTORY_PER_REVIEWER
+    assert titles == sorted(titles)
+    assert titles[0] == "Paper 01"
+
+    svc.reindex_reviewers(batch_size=10)
+    bulk_hash = embeddings.upserts[0][0]["source_text_hash"]
+    single_text = svc._build_reviewer_source_text(interests="NLP", history_titles=titles)
+    assert bulk_hash == hash_source_text(single_text)
+
+
+def test_history_titles_page_past_postgrest_max_rows(monkeypatch):
+    from app.services import matchmaking_service as mm
+    from app.services.matchmaking_service import MatchmakingService
+
+    monkeypatch.setattr(mm, "_HISTORY_PAGE_SIZE", 4)
+    reports = _FakeTable(
+        [{"reviewer_id": "u1", "manuscript_id": f"m{i:02d}"} for i in range(6)]
+        + [{"reviewer_id": "u2", "manuscript_id": f"m{i:02d}"} for i in range(6, 9)]
+    )
+    manuscripts = _FakeTable([{"id": f"m{i:02d}", "title": f"Paper {i:02d}"} for i in range(9)])
+    tables = {"review_reports": reports, "manuscripts": manuscripts}
+    db = MagicMock()
+    db.table.side_effect = lambda name: tables[name]
+    svc = MatchmakingService(db_client=db, batch_embedder=lambda texts: [[0.0] * 384 for _ in texts])
+
+    bulk = svc._fetch_history_titles(["u1", "u2"])
+
+    assert reports.executions == 3
+    assert bulk["u2"] == ["Paper 06", "Paper 07", "Paper 08"]
+    assert bulk["u2"] == svc._fetch_history_titles(["u2"])["u2"]
@@ -22,3 +22,44 @@ def test_embed_text_uses_sentence_transformer(monkeypatch):
     assert isinstance(vec, list)
     assert len(vec) == 384
     fake_model.encode.assert_called_once()
+
+
+def test_embed_texts_encodes_batch_in_one_call(monkeypatch):
+    from app.core import ml as ml_mod
+
+    fake_model = MagicMock()
+
+    def encode(items, **kwargs):
+        rows = []
+        for _ in items:
+            row = MagicMock()
+            row.tolist.return_value = [0.0] * 384
+            rows.append(row)
+        return rows
+
+    fake_model.encode.side_effect = encode
+    monkeypatch.setattr(ml_mod, "_load_sentence_transformer", lambda _: fake_model)
+
+    vectors = ml_mod.embed_texts(["a", "b", "c"], "model", batch_size=2)
+    assert len(vectors) == 3
+    fake_model.encode.assert_called_once()
+    assert fake_model.encode.call_args.args[0] == ["a", "b", "c"]
+    assert fake_model.encode.call_args.kwargs["batch_size"] == 2
+
+
+def test_embed_texts_fallback_matches_single_fallback(monkeypatch):
+    from app.core import ml as ml_mod
+
+    def broken(_):
+        raise RuntimeError("no torch")
+
+    monkeypatch.setattr(ml_mod, "_load_sentence_transformer", broken)
+    texts = ["Deep learning for protein folding", "", "graph neural networks graph"]
+
+    vectors = ml_mod.embed_texts(texts, "model")
+    assert len(vectors) == 3
+    for text, vec in zip(texts, vectors):
+        expected = ml_mod._fallback_embed(text)
+        assert len(vec) == 384
+        assert max(abs(a - b) for a, b in zip(vec, expected)) < 1e-9
+    assert ml_mod.embed_texts([], "model") == []
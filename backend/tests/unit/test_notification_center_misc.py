@@ -73,12 +73,12 @@ async def test_internal_chase_reviews_endpoint_calls_scheduler():
 
 def test_create_user_supabase_client_sets_postgrest_auth():
     from app.lib import api_client as api_client_mod
+    from app.lib import supabase_pool
 
-    fake = MagicMock()
-    fake.postgrest = MagicMock()
-
-    with patch.object(api_client_mod, "create_client", return_value=fake):
+    with patch.object(api_client_mod, "url", "https://demo.supabase.co"), patch.object(api_client_mod, "key", "anon-key"):
         client = api_client_mod.create_user_supabase_client("jwt.token.here")
-        assert client is fake
-        fake.postgrest.auth.assert_called_once_with("jwt.token.here")
+
+    assert client.postgrest.headers["Authorization"] == "Bearer jwt.token.here"
+    assert client.postgrest.headers["apiKey"] == "anon-key"
+    assert client.postgrest.session is supabase_pool.get_shared_http_client()
 
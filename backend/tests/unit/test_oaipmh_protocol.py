@@ -14,39 +14,57 @@ from app.models.oaipmh import OAIPMHRequest, OAIPMHVerb, OAIMetadataPrefix
 class MockSupabaseResponse:
     """Mock Supabase response"""
 
-    def __init__(self, data=None):
+    def __init__(self, data=None, count=None):
         self.data = data
+        self.count = count
 
 
 class MockQueryBuilder:
     """Mock Supabase query builder chain"""
 
-    def __init__(self, return_data=None, raise_error=None):
+    def __init__(self, return_data=None, raise_error=None, count=None):
         self._data = return_data
         self._raise_error = raise_error
+        self._count = count
+        self.calls = []
 
     def select(self, *args, **kwargs):
+        self.calls.append(("select", args, kwargs))
+        return self
+
+    def or_(self, *args):
+        self.calls.append(("or_", args))
+        return self
+
+    def order(self, *args, **kwargs):
+        return self
+
+    def lt(self, *args):
+        self.calls.append(("lt", args))
         return self
 
     def eq(self, *args):
+        self.calls.append(("eq", args))
         return self
 
     def gte(self, *args):
         return self
 
     def lte(self, *args):
+        self.calls.append(("lte", args))
         return self
 
     def single(self):
         return self
 
     def limit(self, n):
+        self.calls.append(("limit", n))
         return self
 
     def execute(self):
         if self._raise_error:
             raise self._raise_error
-        return MockSupabaseResponse(data=self._data)
+        return MockSupabaseResponse(data=self._data, count=self._count)
 
 
 @pytest.fixture
@@ -103,13 +121,30 @@ class TestListSets:
 
     @pytest.mark.asyncio
     async def test_list_sets_returns_no_hierarchy_error(self, protocol):
-        """Test ListSets returns noSetHierarchy error"""
+        """Test ListSets returns noSetHierarchy error when no journals exist"""
         request = OAIPMHRequest(verb=OAIPMHVerb.LIST_SETS)
 
-        result = await protocol.handle_request(request)
+        with patch("app.services.oaipmh.protocol.supabase") as mock_supabase:
+            mock_supabase.table.return_value = MockQueryBuilder(return_data=[])
+
+            result = await protocol.handle_request(request)
 
         assert "noSetHierarchy" in result
 
+    @pytest.mark.asyncio
+    async def test_list_sets_lists_journals(self, protocol):
+        """Test ListSets exposes one set per journal slug"""
+        request = OAIPMHRequest(verb=OAIPMHVerb.LIST_SETS)
+        journals = [{"slug": "med", "title": "Medicine"}, {"slug": "phys", "title": "Physics"}]
+
+        with patch("app.services.oaipmh.protocol.supabase") as mock_supabase:
+            mock_supabase.table.return_value = MockQueryBuilder(return_data=journals)
+
+            result = await protocol.handle_request(request)
+
+        assert "<setSpec>med</setSpec>" in result
+        assert "<setName>Physics</setName>" in result
+
 
 class TestGetRecord:
     """Test GetRecord verb"""
@@ -346,6 +381,175 @@ class TestListRecords:
         assert "ListRecords" in result
 
 
+def _rows(n, start=1):
+    return [
+        {
+            "id": f"article-{i}",
+            "updated_at": f"2024-01-{i:02d}T10:00:00+00:00",
+            "journals": {"slug": "med", "title": "Medicine"},
+        }
+        for i in range(start, start + n)
+    ]
+
+
+def _token_of(xml: str):
+    root = etree.fromstring(xml.encode("utf-8"))
+    return root.find(".//{http://www.openarchives.org/OAI/2.0/}resumptionToken")
+
+
+class TestResumption:
+    """Test keyset pagination with resumption tokens"""
+
+    @pytest.mark.asyncio
+    async def test_first_page_issues_token_with_list_size(self, protocol, monkeypatch):
+        monkeypatch.setenv("OAIPMH_PAGE_SIZE", "2")
+        request = OAIPMHRequest(verb=OAIPMHVerb.LIST_IDENTIFIERS, metadataPrefix="oai_dc")
+        query = MockQueryBuilder(return_data=_rows(3), count=5)
+
+        with patch("app.services.oaipmh.protocol.supabase") as mock_supabase:
+            mock_supabase.table.return_value = query
+            result = await protocol.handle_request(request)
+
+        assert "article-1" in result and "article-2" in result
+        assert "article-3" not in result
+        assert "<setSpec>med</setSpec>" in result
+        token = _token_of(result)
+        assert token is not None and token.text
+        assert token.get("completeListSize") == "5"
+        assert token.get("cursor") == "0"
+        assert ("limit", 3) in query.calls
+        assert ("select", ("id,updated_at,created_at,journal_id,journals(slug)",), {"count": "exact"}) in query.calls
+
+    @pytest.mark.asyncio
+    async def test_follow_token_uses_keyset_and_ends_with_empty_token(self, protocol, monkeypatch):
+        monkeypatch.setenv("OAIPMH_PAGE_SIZE", "2")
+        first = OAIPMHRequest(verb=OAIPMHVerb.LIST_IDENTIFIERS, metadataPrefix="oai_dc")
+        with patch("app.services.oaipmh.protocol.supabase") as mock_supabase:
+            mock_supabase.table.return_value = MockQueryBuilder(return_data=_rows(3), count=3)
+            token = _token_of(await protocol.handle_request(first)).text
+
+        second = OAIPMHRequest(verb=OAIPMHVerb.LIST_IDENTIFIERS, resumptionToken=token)
+        query = MockQueryBuilder(return_data=_rows(1, start=3))
+        with patch("app.services.oaipmh.protocol.supabase") as mock_supabase:
+            mock_supabase.table.return_value = query
+            result = await protocol.handle_request(second)
+
+        assert "article-3" in result
+        keyset = [c for c in query.calls if c[0] == "or_"]
+        assert keyset and 'id.gt."article-2"' in keyset[0][1][0]
+        final = _token_of(result)
+        assert final is not None and not final.text
+        assert final.get("cursor") == "2"
+        assert final.get("completeListSize") == "3"
+
+    @pytest.mark.asyncio
+    async def test_tampered_token_rejected(self, protocol):
+        request = OAIPMHRequest(verb=OAIPMHVerb.LIST_RECORDS, resumptionToken="not-a-token")
+
+        result = await protocol.handle_request(request)
+
+        assert "badResumptionToken" in result
+
+    @pytest.mark.asyncio
+    async def test_token_is_exclusive_argument(self, protocol):
+        request = OAIPMHRequest(
+            verb=OAIPMHVerb.LIST_RECORDS, metadataPrefix="oai_dc", resumptionToken="x"
+        )
+
+        result = await protocol.handle_request(request)
+
+        assert "badArgument" in result
+
+    @pytest.mark.asyncio
+    async def test_token_bound_to_verb(self, protocol, monkeypatch):
+        monkeypatch.setenv("OAIPMH_PAGE_SIZE", "1")
+        first = OAIPMHRequest(verb=OAIPMHVerb.LIST_IDENTIFIERS, metadataPrefix="oai_dc")
+        with patch("app.services.oaipmh.protocol.supabase") as mock_supabase:
+            mock_supabase.table.return_value = MockQueryBuilder(return_data=_rows(2), count=2)
+            token = _token_of(await protocol.handle_request(first)).text
+
+        request = OAIPMHRequest(verb=OAIPMHVerb.LIST_RECORDS, resumptionToken=token)
+        result = await protocol.handle_request(request)
+
+        assert "badResumptionToken" in result
+
+
+class TestSetsAndProjection:
+    """Test set filtering, date bounds and column projection"""
+
+    @pytest.mark.asyncio
+    async def test_unknown_set_no_records(self, protocol):
+        request = OAIPMHRequest(
+            verb=OAIPMHVerb.LIST_IDENTIFIERS, metadataPrefix="oai_dc", set="missing"
+        )
+        with patch("app.services.oaipmh.protocol.supabase") as mock_supabase:
+            mock_supabase.table.return_value = MockQueryBuilder(return_data=[])
+            result = await protocol.handle_request(request)
+
+        assert "noRecordsMatch" in result
+
+    @pytest.mark.asyncio
+    async def test_set_filters_by_journal(self, protocol):
+        request = OAIPMHRequest(
+            verb=OAIPMHVerb.LIST_IDENTIFIERS, metadataPrefix="oai_dc", set="med"
+        )
+        journals = MockQueryBuilder(return_data=[{"id": "journal-1"}])
+        manuscripts = MockQueryBuilder(return_data=_rows(1))
+        with patch("app.services.oaipmh.protocol.supabase") as mock_supabase:
+            mock_supabase.table.side_effect = lambda name: journals if name == "journals" else manuscripts
+            result = await protocol.handle_request(request)
+
+        assert "article-1" in result
+        assert ("eq", ("journal_id", "journal-1")) in manuscripts.calls
+
+    @pytest.mark.asyncio
+    async def test_date_only_until_includes_whole_day(self, protocol):
+        request = OAIPMHRequest(
+            verb=OAIPMHVerb.LIST_IDENTIFIERS, metadataPrefix="oai_dc", until="2024-01-31"
+        )
+        query = MockQueryBuilder(return_data=_rows(1))
+        with patch("app.services.oaipmh.protocol.supabase") as mock_supabase:
+            mock_supabase.table.return_value = query
+            await protocol.handle_request(request)
+
+        assert ("lt", ("updated_at", "2024-02-01")) in query.calls
+
+    @pytest.mark.asyncio
+    async def test_list_records_projects_columns_and_maps_authors(self, protocol):
+        request = OAIPMHRequest(verb=OAIPMHVerb.LIST_RECORDS, metadataPrefix="oai_dc")
+        rows = [
+            {
+                "id": "article-1",
+                "title": "T",
+                "authors": ["Ada Lovelace"],
+                "updated_at": "2024-01-15T10:00:00Z",
+                "journals": {"slug": "med", "title": "Medicine"},
+            }
+        ]
+        query = MockQueryBuilder(return_data=rows)
+        with patch("app.services.oaipmh.protocol.supabase") as mock_supabase:
+            mock_supabase.table.return_value = query
+            result = await protocol.handle_request(request)
+
+        selected = [c[1][0] for c in query.calls if c[0] == "select"]
+        assert selected and "*" not in selected[0]
+        assert "Lovelace, Ada" in result
+        assert "Medicine" in result
+
+    @pytest.mark.asyncio
+    async def test_stream_request_yields_multiple_chunks(self, protocol, monkeypatch):
+        monkeypatch.setenv("OAIPMH_PAGE_SIZE", "50")
+        monkeypatch.setattr("app.services.oaipmh.protocol._STREAM_FLUSH_BYTES", 256)
+        request = OAIPMHRequest(verb=OAIPMHVerb.LIST_RECORDS, metadataPrefix="oai_dc")
+        with patch("app.services.oaipmh.protocol.supabase") as mock_supabase:
+            mock_supabase.table.return_value = MockQueryBuilder(return_data=_rows(20))
+            chunks = [c async for c in protocol.stream_request(request)]
+
+        assert len(chunks) > 1
+        root = etree.fromstring(b"".join(chunks))
+        assert len(root.findall(".//{http://www.openarchives.org/OAI/2.0/}record")) == 20
+
+
 class TestBadVerb:
     """Test bad verb handling"""
 
@@ -431,3 +635,25 @@ class TestExceptionHandling:
             result = await protocol.handle_request(request)
 
         assert "error" in result.lower() or "badArgument" in result
+
+
+def test_resumption_token_secret_is_shared_across_workers(monkeypatch):
+    from app.services.oaipmh import resumption
+
+    monkeypatch.delenv("OAIPMH_RESUMPTION_SECRET", raising=False)
+    monkeypatch.delenv("MAGIC_LINK_JWT_SECRET", raising=False)
+    monkeypatch.setenv("SECRET_KEY", "shared-secret")
+    assert resumption._token_secret() == "shared-secret"
+
+    # 中文注释: 生产环境缺少共享密钥时拒绝签发，而不是每个进程各自随机生成。
+    monkeypatch.delenv("SECRET_KEY")
+    monkeypatch.delenv("PYTEST_CURRENT_TEST", raising=False)
+    monkeypatch.setenv("APP_ENV", "production")
+    with pytest.raises(RuntimeError) as exc:
+        resumption._token_secret()
+    assert "SECRET" not in str(exc.value)
+
+    # 中文注释: 校验 token 时密钥缺失按 badResumptionToken 处理，不抛出未捕获的 RuntimeError。
+    with pytest.raises(resumption.InvalidResumptionToken) as bad:
+        resumption.decode_token("anything")
+    assert "SECRET" not in str(bad.value)
@@ -0,0 +1,68 @@
+import os
+import time
+
+from app.core.parse_cache import ParseCache, parse_cache_key
+
+
+def _key(**overrides):
+    params = {
+        "parser_mode": "pdf",
+        "max_pages": 5,
+        "max_chars": 20000,
+        "layout_max_pages": None,
+        "metadata_strategy": "local",
+    }
+    params.update(overrides)
+    return parse_cache_key("a" * 64, **params)
+
+
+def test_key_depends_on_parser_config():
+    base = _key()
+    assert base == _key()
+    assert base != _key(max_pages=3)
+    assert base != _key(max_chars=100)
+    assert base != _key(layout_max_pages=0)
+    assert base != _key(parser_mode="docx")
+    assert base != _key(metadata_strategy="gemini:model")
+
+
+def test_roundtrip_keeps_layout_lines(tmp_path):
+    cache = ParseCache(root_dir=str(tmp_path))
+    payload = {
+        "text": "Title\nAbstract",
+        "layout_lines": [{"page": 0, "top": 10.0, "size": 18.0, "page_height": 800.0, "text": "Title"}],
+        "metadata": {"title": "Title", "parser_source": "local"},
+    }
+    cache.put("k1", payload)
+
+    assert cache.get("k1") == payload
+    assert cache.get("missing") is None
+
+
+def test_corrupt_entry_is_dropped(tmp_path):
+    cache = ParseCache(root_dir=str(tmp_path))
+    cache.put("k1", {"text": "x"})
+    path = os.path.join(str(tmp_path), "k1"[:2], "k1.json")
+    with open(path, "w", encoding="utf-8") as fh:
+        fh.write("{not json")
+
+    assert cache.get("k1") is None
+    assert not os.path.exists(path)
+
+
+def test_evicts_least_recently_used(tmp_path):
+    blob = "x" * 400
+    cache = ParseCache(root_dir=str(tmp_path), max_bytes=1000)
+    cache.put("old", {"text": blob})
+    cache.put("new", {"text": blob})
+    # 中文注释: 读一次 old，使其成为最近访问；写入第三条时应淘汰 new。
+    past = time.time() - 60
+    os.utime(os.path.join(str(tmp_path), "ne", "new.json"), (past, past))
+    assert cache.get("old") is not None
+
+    cache.put("third", {"text": blob})
+
+    assert cache.get("old") is not None
+    assert cache.get("new") is None
+    assert cache.get("third") is not None
+    assert cache.stats()["bytes"] <= 1000
@@ -0,0 +1,61 @@
+import asyncio
+import math
+import operator
+import time
+
+import pytest
+
+from app.core.parse_pool import ParseJobError, ParsePool, ParsePoolBusy, ParseTimeout
+
+
+@pytest.fixture
+def pool():
+    p = ParsePool(workers=1, max_queue=0)
+    yield p
+    p.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_runs_job_in_worker_process(pool):
+    assert await pool.run(operator.add, 2, 3, timeout_sec=10) == 5
+    metrics = pool.metrics()
+    assert metrics["completed_total"] == 1
+    assert metrics["alive_workers"] == 1
+    assert metrics["p95_ms"] is not None
+
+
+@pytest.mark.asyncio
+async def test_timeout_kills_worker_and_pool_recovers(pool):
+    with pytest.raises(ParseTimeout):
+        await pool.run(time.sleep, 5, timeout_sec=0.5)
+    metrics = pool.metrics()
+    assert metrics["timeouts_total"] == 1
+    assert metrics["kills_total"] == 1
+
+    assert await pool.run(operator.mul, 4, 5, timeout_sec=10) == 20
+
+
+@pytest.mark.asyncio
+async def test_job_exception_surfaces_as_parse_job_error(pool):
+    with pytest.raises(ParseJobError) as exc:
+        await pool.run(math.sqrt, -1, timeout_sec=10)
+    assert "ValueError" in str(exc.value)
+    assert await pool.run(operator.add, 1, 1, timeout_sec=10) == 2
+
+
+@pytest.mark.asyncio
+async def test_rejects_when_queue_full(pool):
+    slow = asyncio.create_task(pool.run(time.sleep, 0.5, timeout_sec=10))
+    await asyncio.sleep(0.05)
+    with pytest.raises(ParsePoolBusy):
+        await pool.run(operator.add, 1, 1, timeout_sec=10)
+    await slow
+    assert pool.metrics()["rejected_total"] == 1
+
+
+@pytest.mark.asyncio
+async def test_unpicklable_callable_runs_inline_with_timeout(pool):
+    assert await pool.run(lambda x: x * 2, 21, timeout_sec=1) == 42
+
+    with pytest.raises(ParseTimeout):
+        await pool.run(lambda: time.sleep(0.3), timeout_sec=0.05)
@@ -0,0 +1,110 @@
+from __future__ import annotations
+
+import asyncio
+from unittest.mock import MagicMock
+
+import pytest
+
+from app.core import journal_scope, profile_cache
+from app.core import roles as roles_mod
+
+
+@pytest.fixture(autouse=True)
+def _clean_cache():
+    profile_cache.clear()
+    yield
+    profile_cache.clear()
+
+
+def _profile_supabase(profile: dict) -> MagicMock:
+    mock = MagicMock()
+    mock.table.return_value = mock
+    mock.select.return_value = mock
+    mock.eq.return_value = mock
+    resp = MagicMock()
+    resp.data = [profile]
+    mock.execute.return_value = resp
+    return mock
+
+
+@pytest.mark.asyncio
+async def test_profile_read_once_per_request_even_without_process_cache(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.delenv("ADMIN_EMAILS", raising=False)
+    monkeypatch.setenv("PROFILE_CACHE_TTL_SEC", "0")
+    fake = _profile_supabase({"id": "u1", "email": "u1@example.com", "roles": ["managing_editor"]})
+    monkeypatch.setattr(roles_mod, "supabase", fake)
+
+    async def _one_request():
+        user = {"id": "u1", "email": "u1@example.com"}
+        first = await roles_mod.get_current_profile(user)
+        second = await roles_mod.get_current_profile(user)
+        return first, second
+
+    first, second = await asyncio.create_task(_one_request())
+    assert first["roles"] == second["roles"] == ["managing_editor"]
+    assert fake.execute.call_count == 1
+
+    # 新请求（新 task / context）且进程级缓存关闭时应重新读取
+    await asyncio.create_task(_one_request())
+    assert fake.execute.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_process_cache_shared_across_requests_until_invalidated(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.delenv("ADMIN_EMAILS", raising=False)
+    monkeypatch.setenv("PROFILE_CACHE_TTL_SEC", "30")
+    fake = _profile_supabase({"id": "u2", "email": "u2@example.com", "roles": ["author"]})
+    monkeypatch.setattr(roles_mod, "supabase", fake)
+    user = {"id": "u2", "email": "u2@example.com"}
+
+    await asyncio.create_task(roles_mod.get_current_profile(user))
+    await asyncio.create_task(roles_mod.get_current_profile(user))
+    assert fake.execute.call_count == 1
+
+    profile_cache.invalidate_user("u2")
+    await asyncio.create_task(roles_mod.get_current_profile(user))
+    assert fake.execute.call_count == 2
+
+
+def test_scope_journal_ids_cached_and_invalidated(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("PROFILE_CACHE_TTL_SEC", "30")
+    fake = MagicMock()
+    fake.table.return_value = fake
+    fake.select.return_value = fake
+    fake.eq.return_value = fake
+    fake.in_.return_value = fake
+    resp = MagicMock()
+    resp.data = [{"journal_id": "j-1", "role": "managing_editor"}]
+    fake.execute.return_value = resp
+    monkeypatch.setattr(journal_scope, "supabase_admin", fake)
+
+    first = journal_scope.get_user_scope_journal_ids(user_id="u3", roles=["managing_editor"])
+    first.add("mutated-by-caller")
+    second = journal_scope.get_user_scope_journal_ids(user_id="u3", roles=["managing_editor"])
+    assert second == {"j-1"}
+    assert fake.execute.call_count == 1
+
+    profile_cache.invalidate_user("u3")
+    journal_scope.get_user_scope_journal_ids(user_id="u3", roles=["managing_editor"])
+    assert fake.execute.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_self_service_profile_update_invalidates_cache(monkeypatch: pytest.MonkeyPatch) -> None:
+    from app.schemas.user import UserProfileUpdate
+    from app.services import user_service
+
+    monkeypatch.delenv("ADMIN_EMAILS", raising=False)
+    monkeypatch.setenv("PROFILE_CACHE_TTL_SEC", "30")
+    fake = _profile_supabase({"id": "u4", "email": "u4@example.com", "roles": ["author"], "full_name": "Old"})
+    fake.update.return_value = fake
+    monkeypatch.setattr(roles_mod, "supabase", fake)
+    monkeypatch.setattr(user_service, "create_user_supabase_client", lambda _token: fake)
+    user = {"id": "u4", "email": "u4@example.com"}
+
+    await asyncio.create_task(roles_mod.get_current_profile(user))
+    user_service.UserService().update_profile("u4", UserProfileUpdate(full_name="New"), "token")
+    fake.execute.reset_mock()
+
+    await asyncio.create_task(roles_mod.get_current_profile(user))
+    assert fake.execute.call_count == 1
@@ -0,0 +1,160 @@
+from unittest.mock import MagicMock, patch
+
+import pytest
+from httpx import AsyncClient
+
+from app.services import public_search_index as psi
+from app.services.public_search_index import (
+    PublicSearchIndex,
+    build_snippet,
+    decode_cursor,
+    project_fields,
+)
+
+
+def _row(doc_id, title, abstract, *, status="published", updated_at="2026-01-01T00:00:00+00:00"):
+    return {
+        "id": doc_id,
+        "title": title,
+        "abstract": abstract,
+        "authors": ["A. Author"],
+        "doi": f"10.1234/{doc_id}",
+        "published_at": "2026-01-01",
+        "updated_at": updated_at,
+        "status": status,
+        "journal_id": "j1",
+        "journals": {"title": "Journal One", "slug": "j1"},
+    }
+
+
+def _index(rows):
+    index = PublicSearchIndex()
+    for row in rows:
+        index.upsert(row)
+    return index
+
+
+def test_bm25_ranks_title_matches_first_and_returns_snippet():
+    index = _index(
+        [
+            _row("a", "Protein folding dynamics", "We study molecular simulation of proteins."),
+            _row("b", "Graph networks", "A protein interaction network is analysed with deep learning."),
+            _row("c", "Education policy", "Survey of governance in schools."),
+        ]
+    )
+
+    results, next_cursor = index.search("protein", limit=10)
+
+    assert [r["id"] for r in results] == ["a", "b"]
+    assert next_cursor is None
+    assert results[0]["score"] > results[1]["score"]
+    assert "protein" in results[1]["snippet"].lower()
+    assert results[0]["journals"] == {"title": "Journal One", "slug": "j1"}
+
+
+def test_prefix_expansion_and_projection():
+    index = _index([_row("a", "Biology of cells", "Cellular biology basics.")])
+
+    results, _ = index.search("biol", limit=5, fields=project_fields("title,doi,unknown"))
+
+    assert len(results) == 1
+    assert set(results[0]) == {"id", "title", "doi", "score", "snippet"}
+
+
+def test_keyset_pagination_walks_all_results_without_duplicates():
+    index = _index([_row(f"id{i:02d}", f"quantum study {i}", "quantum " * (i % 4 + 1)) for i in range(25)])
+
+    seen = []
+    cursor = None
+    while True:
+        page, next_cursor = index.search("quantum", limit=10, cursor=decode_cursor(cursor))
+        seen.extend(r["id"] for r in page)
+        if next_cursor is None:
+            break
+        cursor = next_cursor
+
+    assert len(seen) == 25
+    assert len(set(seen)) == 25
+
+
+def test_unpublish_removes_document_and_updates_subject_counts():
+    index = _index(
+        [
+            _row("a", "Clinical trial outcomes", "patient therapy"),
+            _row("b", "Quantum optics", "photon transport"),
+        ]
+    )
+    assert index.subject_counts()["medicine"] == 1
+
+    index.upsert(_row("a", "Clinical trial outcomes", "patient therapy", status="retracted"))
+
+    assert index.size == 1
+    assert index.search("clinical", limit=5) == ([], None)
+    counts = index.subject_counts()
+    assert counts["medicine"] == 0
+    assert counts["physics"] == 1
+
+
+def test_refresh_applies_rows_after_watermark():
+    db = MagicMock()
+    chain = db.table.return_value.select.return_value
+    chain.eq.return_value.order.return_value.order.return_value.limit.return_value.execute.return_value.data = [
+        _row("a", "Robot control", "algorithm design", updated_at="2026-01-01T00:00:00+00:00")
+    ]
+    index = PublicSearchIndex()
+    assert index.load(db) == 1
+    assert index.ready
+
+    chain.gte.return_value.order.return_value.order.return_value.limit.return_value.execute.return_value.data = [
+        _row("a", "Robot control", "algorithm design", status="rejected", updated_at="2026-01-02T00:00:00+00:00"),
+        _row("b", "Software testing", "computer systems", updated_at="2026-01-02T00:00:00+00:00"),
+    ]
+    assert index.refresh(db) == 2
+
+    chain.gte.assert_called_with("updated_at", "2026-01-01T00:00:00+00:00")
+    assert [r["id"] for r in index.search("software", limit=5)[0]] == ["b"]
+    assert index.search("robot", limit=5)[0] == []
+
+
+def test_build_snippet_windows_around_first_hit():
+    text = "Intro words. " * 20 + "The key finding concerns enzymes. " + "Tail words. " * 20
+
+    snippet = build_snippet(text, ["enzymes"], radius=30)
+
+    assert "enzymes" in snippet
+    assert snippet.startswith("…") and snippet.endswith("…")
+
+
+@pytest.mark.asyncio
+async def test_search_endpoint_uses_ready_index(client: AsyncClient, monkeypatch):
+    index = _index([_row("a", "Deep learning for imaging", "ai methods"), _row("b", "Soil", "farming")])
+    index._loaded = True
+    index._last_refresh = float("inf")
+    monkeypatch.setattr(psi, "_index", index)
+    monkeypatch.setenv("PUBLIC_SEARCH_INDEX_ENABLED", "1")
+
+    resp = await client.get("/api/v1/manuscripts/search", params={"q": "learning", "limit": 1})
+
+    body = resp.json()
+    assert resp.status_code == 200
+    assert body["ranked"] is True
+    assert [r["id"] for r in body["results"]] == ["a"]
+
+    bad = await client.get("/api/v1/manuscripts/search", params={"q": "x", "cursor": "@@"})
+    assert bad.status_code == 422
+
+
+@pytest.mark.asyncio
+async def test_topics_read_counts_from_index(client: AsyncClient, monkeypatch):
+    index = _index([_row("a", "Machine learning systems", "software"), _row("b", "Quantum dots", "optics")])
+    index._loaded = True
+    index._last_refresh = float("inf")
+    monkeypatch.setattr(psi, "_index", index)
+    monkeypatch.setenv("PUBLIC_SEARCH_INDEX_ENABLED", "1")
+
+    with patch("app.api.v1.public.supabase_admin") as mock_supabase:
+        resp = await client.get("/api/v1/public/topics")
+
+    mock_supabase.table.assert_not_called()
+    counts = {item["id"]: item["count"] for item in resp.json()["data"]}
+    assert counts == {"technology": 1, "physics": 1}
@@ -0,0 +1,243 @@
+import base64
+import json
+import time
+from types import SimpleNamespace
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from jose import jwt
+
+from app.core import jwks
+from app.core import rate_limit_backends as backends
+from app.core.rate_limit import RateLimitMiddleware
+from app.core.rate_limit_backends import GCRARateLimiter, RateLimitPolicy, SharedStoreRateLimiter
+
+POLICY = RateLimitPolicy(key="global", max_requests=10, window_sec=60)
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = _Clock()
+    monkeypatch.setattr(backends, "time", fake)
+    return fake
+
+
+class _SharedStore:
+    """模拟 rate_limit_sync：全局 TAT 推进并封顶在 now + window，返回领先秒数与窗口内活跃实例数。"""
+
+    def __init__(self, clock: _Clock, *, error: str | None = None):
+        self.clock = clock
+        self.error = error
+        self.tats: dict[str, float] = {}
+        self.seen: dict[tuple[str, str], float] = {}
+        self.calls = 0
+
+    def rpc(self, name, params):
+        assert name == "rate_limit_sync"
+        store = self
+
+        class _Call:
+            def execute(self):
+                store.calls += 1
+                if store.error:
+                    raise RuntimeError(store.error)
+                now = store.clock.now
+                rows = []
+                for item in sorted(params["p_hits"], key=lambda h: h["bucket"]):
+                    tat = max(store.tats.get(item["bucket"], now), now) + item["hits"] * item["interval_sec"]
+                    store.tats[item["bucket"]] = min(tat, now + item["window_sec"])
+                    store.seen[(item["bucket"], params["p_instance"])] = now
+                    instances = sum(
+                        1
+                        for (bucket, _), seen_at in store.seen.items()
+                        if bucket == item["bucket"] and seen_at > now - item["window_sec"]
+                    )
+                    rows.append(
+                        {
+                            "bucket": item["bucket"],
+                            "ahead_sec": store.tats[item["bucket"]] - now,
+                            "instances": instances,
+                        }
+                    )
+                return SimpleNamespace(data=rows)
+
+        return _Call()
+
+
+def test_gcra_allows_burst_then_spaces_requests(clock):
+    limiter = GCRARateLimiter()
+
+    results = [limiter.hit(bucket="b", policy=POLICY) for _ in range(11)]
+
+    assert [r[0] for r in results] == [True] * 10 + [False]
+    assert [r[1] for r in results[:3]] == [9, 8, 7]
+    assert results[-1] == (False, 0, 6)
+    clock.now += 6
+    assert limiter.hit(bucket="b", policy=POLICY)[0] is True
+    assert limiter.hit(bucket="b", policy=POLICY)[0] is False
+
+
+def test_gcra_has_no_double_burst_at_window_edge(clock):
+    limiter = GCRARateLimiter()
+    clock.now += 59
+    assert all(limiter.hit(bucket="b", policy=POLICY)[0] for _ in range(10))
+
+    # 中文注释: 固定窗口在这里会重置计数再放行 10 个；GCRA 只按速率补充额度。
+    clock.now += 2
+    allowed = sum(limiter.hit(bucket="b", policy=POLICY)[0] for _ in range(10))
+    assert allowed == 0
+
+
+def _simulate(clock, instances, *, ticks: int, flush: bool) -> int:
+    # 中文注释: 每秒每个实例各来 1 个请求，每秒同步一次（对应后台线程的 sync_interval_sec=1）。
+    allowed = 0
+    for _ in range(ticks):
+        for limiter in instances:
+            allowed += limiter.hit(bucket="b", policy=POLICY)[0]
+        if flush:
+            for limiter in instances:
+                limiter.flush()
+        clock.now += 1
+    return allowed
+
+
+def test_shared_store_caps_total_across_instances(clock):
+    store = _SharedStore(clock)
+    shared = [SharedStoreRateLimiter(store, start_thread=False) for _ in range(3)]
+    local = [GCRARateLimiter() for _ in range(3)]
+
+    shared_allowed = _simulate(clock, shared, ticks=120, flush=True)
+    local_allowed = _simulate(clock, local, ticks=120, flush=False)
+
+    # 中文注释: 120s 内单个窗口额度为 10 + 120/6 = 30；实例内限流 3 个副本各放行一份。
+    assert local_allowed >= 85
+    assert shared_allowed <= 30 + 3
+    assert store.calls <= 3 * 120
+
+
+def test_shared_store_hot_path_never_calls_store(clock):
+    store = _SharedStore(clock)
+    limiter = SharedStoreRateLimiter(store, start_thread=False)
+
+    for _ in range(50):
+        limiter.hit(bucket="b", policy=POLICY)
+
+    assert store.calls == 0
+    assert limiter.flush() == 1
+    assert store.calls == 1
+
+
+def test_shared_store_keeps_requests_admitted_during_sync(clock):
+    store = _SharedStore(clock)
+    limiter = SharedStoreRateLimiter(store, start_thread=False)
+    for _ in range(4):
+        limiter.hit(bucket="b", policy=POLICY)
+
+    original_rpc = store.rpc
+
+    def _rpc_with_concurrent_hits(name, params):
+        call = original_rpc(name, params)
+        limiter.hit(bucket="b", policy=POLICY)
+        limiter.hit(bucket="b", policy=POLICY)
+        return call
+
+    store.rpc = _rpc_with_concurrent_hits
+    limiter.flush()
+
+    assert limiter._pending["b"][0] == 2
+    assert limiter._tats["b"] == pytest.approx(clock.now + 6 * POLICY.emission_interval)
+
+
+def test_shared_store_degrades_when_rpc_missing(clock):
+    store = _SharedStore(clock, error="PGRST202: Could not find the function public.rate_limit_sync")
+    limiter = SharedStoreRateLimiter(store, start_thread=False)
+
+    limiter.hit(bucket="b", policy=POLICY)
+    limiter.flush()
+    limiter.hit(bucket="b", policy=POLICY)
+    limiter.flush()
+
+    assert store.calls == 1
+    assert limiter.hit(bucket="b", policy=POLICY)[0] is True
+
+
+_SECRET = "rate-limit-test-secret"
+
+
+def _token(sub: str, *, secret: str = _SECRET) -> str:
+    claims = {"sub": sub, "aud": "authenticated", "exp": int(time.time()) + 600}
+    return f"Bearer {jwt.encode(claims, secret, algorithm='HS256')}"
+
+
+def _forged(sub: str) -> str:
+    payload = base64.urlsafe_b64encode(json.dumps({"sub": sub}).encode()).decode().rstrip("=")
+    return f"Bearer eyJhbGciOiJIUzI1NiJ9.{payload}.sig"
+
+
+def _limited_client(monkeypatch, max_requests: int) -> TestClient:
+    monkeypatch.setenv("RATE_LIMIT_MAX_REQUESTS", str(max_requests))
+    monkeypatch.setenv("SUPABASE_JWT_SECRET", _SECRET)
+    monkeypatch.setattr(jwks, "verified_token_cache", jwks.VerifiedTokenCache())
+    app = FastAPI()
+
+    @app.get("/ok")
+    async def ok():
+        return {"ok": True}
+
+    app.add_middleware(RateLimitMiddleware, limiter=GCRARateLimiter())
+    return TestClient(app)
+
+
+def test_middleware_adds_per_user_bucket(monkeypatch):
+    client = _limited_client(monkeypatch, 3)
+    alice = {"Authorization": _token("alice")}
+
+    for i in range(3):
+        assert client.get("/ok", headers={**alice, "X-Forwarded-For": f"10.0.0.{i}"}).status_code == 200
+
+    # 中文注释: 换 IP 也共享同一用户额度；其他用户与匿名请求不受影响。
+    assert client.get("/ok", headers={**alice, "X-Forwarded-For": "10.0.0.9"}).status_code == 429
+    assert client.get("/ok", headers={"Authorization": _token("bob"), "X-Forwarded-For": "10.0.0.9"}).status_code == 200
+    assert client.get("/ok", headers={"X-Forwarded-For": "10.0.0.8"}).status_code == 200
+    # 中文注释: 不同用户绕不过 IP bucket。
+    for sub in ("m1", "m2", "m3"):
+        client.get("/ok", headers={"Authorization": _token(sub), "X-Forwarded-For": "10.0.0.7"})
+    assert client.get("/ok", headers={"Authorization": _token("m4"), "X-Forwarded-For": "10.0.0.7"}).status_code == 429
+
+
+def test_middleware_ignores_unverified_subjects(monkeypatch):
+    client = _limited_client(monkeypatch, 3)
+
+    # 中文注释: 伪造/错误密钥签名的 token 带着受害者 sub，只能消耗攻击者自己 IP 的额度。
+    for i in range(6):
+        client.get("/ok", headers={"Authorization": _forged("victim"), "X-Forwarded-For": f"10.1.0.{i}"})
+        client.get(
+            "/ok",
+            headers={"Authorization": _token("victim", secret="wrong"), "X-Forwarded-For": f"10.2.0.{i}"},
+        )
+
+    victim = {"Authorization": _token("victim"), "X-Forwarded-For": "10.3.0.1"}
+    assert client.get("/ok", headers=victim).status_code == 200
+
+
+def test_middleware_user_denial_does_not_charge_ip_bucket(monkeypatch):
+    client = _limited_client(monkeypatch, 3)
+    heavy = {"Authorization": _token("heavy"), "X-Forwarded-For": "10.4.0.1"}
+
+    for _ in range(3):
+        assert client.get("/ok", headers=heavy).status_code == 200
+    for _ in range(5):
+        assert client.get("/ok", headers=heavy).status_code == 429
+
+    # 中文注释: 同一 NAT 出口下的其他人只受已放行的 3 次影响，不被 heavy 的被拒请求拖累。
+    neighbour = {"Authorization": _token("neighbour"), "X-Forwarded-For": "10.4.0.2"}
+    assert client.get("/ok", headers=neighbour).status_code == 200
@@ -0,0 +1,87 @@
+import pytest
+
+from app.core import recommender
+from app.core.recommender import ReviewerTfidfIndex
+
+
+def _pool():
+    return [
+        {"id": "1", "email": "a@example.com", "domains": ["machine learning", "ai"]},
+        {"id": "2", "email": "b@example.com", "domains": ["cell biology", "genomics"]},
+        {"id": "3", "email": "c@example.com", "domains": "ai safety, robotics"},
+        {"id": "4", "email": "d@example.com", "domains": []},
+    ]
+
+
+@pytest.fixture(params=["numpy", "pure"])
+def backend(request, monkeypatch):
+    if request.param == "numpy":
+        if recommender.np is None:
+            pytest.skip("numpy not installed")
+    else:
+        monkeypatch.setattr(recommender, "np", None)
+    return request.param
+
+
+def test_index_ranks_like_legacy_implementation(backend):
+    index = ReviewerTfidfIndex(_pool())
+
+    results = index.recommend("ai systems for machine learning")
+    legacy = recommender.recommend_reviewers("ai systems for machine learning", _pool())
+
+    assert [r["reviewer_id"] for r in results] == [r["reviewer_id"] for r in legacy]
+    assert results[0]["email"] == "a@example.com"
+    assert results[-1]["score"] == 0.0
+
+
+def test_index_top_k_and_empty_inputs(backend):
+    index = ReviewerTfidfIndex(_pool())
+
+    assert index.recommend("") == []
+    assert ReviewerTfidfIndex().recommend("ai") == []
+    top = index.recommend("ai robotics", top_k=2)
+    assert [r["reviewer_id"] for r in top] == ["3", "1"]
+
+
+def test_incremental_add_remove_matches_fresh_build(backend):
+    index = ReviewerTfidfIndex(_pool())
+    index.add({"id": "5", "email": "e@example.com", "domains": ["genomics", "ai"]})
+    index.remove("2")
+    index.add({"id": "1", "email": "a2@example.com", "domains": ["quantum chemistry"]})
+
+    assert index.size == 4
+    assert "2" not in index
+
+    fresh = ReviewerTfidfIndex(
+        [
+            _pool()[2],
+            _pool()[3],
+            {"id": "5", "email": "e@example.com", "domains": ["genomics", "ai"]},
+            {"id": "1", "email": "a2@example.com", "domains": ["quantum chemistry"]},
+        ]
+    )
+    query = "ai genomics and quantum chemistry"
+    got = {r["reviewer_id"]: r["score"] for r in index.recommend(query)}
+    want = {r["reviewer_id"]: r["score"] for r in fresh.recommend(query)}
+    assert got == want
+    assert got["1"] > 0
+
+
+def test_compaction_drops_tombstones(backend, monkeypatch):
+    monkeypatch.setattr(ReviewerTfidfIndex, "_COMPACT_MIN_DEAD", 2)
+    index = ReviewerTfidfIndex(_pool())
+    index.remove("1")
+    index.remove("2")
+
+    assert index._dead == 0
+    assert len(index._ids) == 2
+    assert [r["reviewer_id"] for r in index.recommend("ai robotics")] == ["3", "4"]
+
+
+def test_numpy_and_pure_python_scores_agree(monkeypatch):
+    if recommender.np is None:
+        pytest.skip("numpy not installed")
+    query = "machine learning for genomics and robotics"
+    vectorized = ReviewerTfidfIndex(_pool()).recommend(query)
+    monkeypatch.setattr(recommender, "np", None)
+    assert ReviewerTfidfIndex(_pool()).recommend(query) == vectorized
@@ -0,0 +1,133 @@
+import json
+import math
+from unittest.mock import MagicMock
+
+from app.services.reviewer_vector_index import ReviewerVectorIndex
+
+
+class _Resp:
+    def __init__(self, data):
+        self.data = data
+
+
+class _Table:
+    def __init__(self, rows):
+        self.rows = rows
+        self.calls = 0
+        self._filters = []
+
+    def select(self, *_args, **_kwargs):
+        self._filters = []
+        return self
+
+    def gte(self, col, value):
+        self._filters.append(lambda r: str(r.get(col)) >= str(value))
+        return self
+
+    def in_(self, col, values):
+        allowed = {str(v) for v in values}
+        self._filters.append(lambda r: str(r.get(col)) in allowed)
+        return self
+
+    def or_(self, *_args):
+        return self
+
+    def order(self, *_args, **_kwargs):
+        return self
+
+    def limit(self, *_args):
+        return self
+
+    def execute(self):
+        self.calls += 1
+        return _Resp([r for r in self.rows if all(f(r) for f in self._filters)])
+
+
+def _unit(i, j=None, w=1.0):
+    vec = [0.0] * 384
+    vec[i] = 1.0
+    if j is not None:
+        vec[j] = w
+    norm = math.sqrt(sum(v * v for v in vec))
+    return [v / norm for v in vec]
+
+
+def _db(embedding_rows, profile_rows):
+    tables = {"reviewer_embeddings": _Table(embedding_rows), "user_profiles": _Table(profile_rows)}
+    db = MagicMock()
+    db.table.side_effect = lambda name: tables[name]
+    return db, tables
+
+
+def test_search_orders_by_score_and_applies_threshold():
+    index = ReviewerVectorIndex()
+    index.upsert("a", _unit(0))
+    index.upsert("b", _unit(0, 1, 0.5))
+    index.upsert("c", _unit(1))
+
+    hits = index.search(_unit(0), threshold=0.5, top_k=5)
+    assert [uid for uid, _ in hits] == ["a", "b"]
+    assert abs(hits[0][1] - 1.0) < 1e-5
+
+    assert [uid for uid, _ in index.search(_unit(0), threshold=0.0, top_k=1)] == ["a"]
+
+
+def test_upsert_overwrites_and_remove_keeps_rows_consistent():
+    index = ReviewerVectorIndex()
+    for i, uid in enumerate(["a", "b", "c"]):
+        index.upsert(uid, _unit(i))
+    index.upsert("a", _unit(2))
+    index.remove("b")
+
+    assert index.size == 2
+    hits = index.search(_unit(2), threshold=0.9, top_k=5)
+    assert sorted(uid for uid, _ in hits) == ["a", "c"]
+    assert index.search(_unit(1), threshold=0.5, top_k=5) == []
+
+
+def test_load_parses_pgvector_strings_and_caches_profiles():
+    rows = [
+        {"user_id": "u1", "embedding": json.dumps(_unit(3)), "updated_at": "2026-01-01T00:00:00+00:00"},
+        {"user_id": "u2", "embedding": "[1,2]", "updated_at": "2026-01-02T00:00:00+00:00"},
+    ]
+    db, _ = _db(rows, [{"id": "u1", "email": "u1@example.com", "full_name": "U One"}])
+    index = ReviewerVectorIndex()
+
+    assert index.load(db) == 1
+    assert index.ready
+    assert index.profiles_for(["u1"])["u1"]["full_name"] == "U One"
+
+
+def test_refresh_only_pulls_rows_since_watermark():
+    rows = [{"user_id": "u1", "embedding": json.dumps(_unit(0)), "updated_at": "2026-01-01T00:00:00+00:00"}]
+    db, tables = _db(rows, [])
+    index = ReviewerVectorIndex()
+    index.load(db)
+
+    rows.append({"user_id": "u2", "embedding": json.dumps(_unit(1)), "updated_at": "2026-02-01T00:00:00+00:00"})
+    rows.append({"user_id": "old", "embedding": json.dumps(_unit(2)), "updated_at": "2025-12-01T00:00:00+00:00"})
+    index.refresh(db)
+
+    assert index.size == 2
+    assert index.search(_unit(2), threshold=0.5, top_k=5) == []
+
+
+def test_analyze_memory_mode_skips_rpc(monkeypatch):
+    monkeypatch.setenv("MATCHMAKING_INDEX_MODE", "memory")
+    monkeypatch.setenv("MATCHMAKING_MIN_REVIEWERS", "1")
+    monkeypatch.setenv("MATCHMAKING_THRESHOLD", "0.5")
+    from app.services import matchmaking_service as svc_mod
+
+    index = ReviewerVectorIndex()
+    index.upsert("u1", _unit(0), {"email": "expert@example.com", "full_name": "Expert"})
+    index._loaded = True
+    index._last_refresh = float("inf")
+    monkeypatch.setattr(svc_mod, "get_reviewer_index", lambda: index)
+
+    db = MagicMock()
+    svc = svc_mod.MatchmakingService(db_client=db, embedder=lambda _: _unit(0))
+    result = svc.analyze(manuscript_id=None, title="t", abstract="a")
+
+    assert result["recommendations"][0]["name"] == "Expert"
+    assert not db.rpc.called
+    assert not db.table.called
@@ -28,3 +28,17 @@ def test_short_ttl_cache_clear():
     cache.clear()
     assert cache.get("k") is None
 
+
+
+def test_short_ttl_cache_delete_and_delete_prefix():
+    cache: ShortTTLCache[int] = ShortTTLCache(max_entries=64)
+    cache.set("profile:u1", 1, ttl_sec=5)
+    cache.set("scope:u1:ae", 2, ttl_sec=5)
+    cache.set("scope:u1:me", 3, ttl_sec=5)
+    cache.set("scope:u2:me", 4, ttl_sec=5)
+
+    cache.delete("profile:u1")
+    assert cache.get("profile:u1") is None
+    assert cache.delete_prefix("scope:u1:") == 2
+    assert cache.get("scope:u1:ae") is None
+    assert cache.get("scope:u2:me") == 4
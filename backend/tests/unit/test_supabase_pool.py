@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+from unittest.mock import MagicMock
+
+import httpx
+import pytest
+
+from app.lib import supabase_pool
+
+
+@pytest.fixture(autouse=True)
+def _fresh_pool():
+    supabase_pool.close_shared_http_client()
+    yield
+    supabase_pool.close_shared_http_client()
+
+
+def test_shared_http_client_reads_pool_limits_from_env(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("SUPABASE_POOL_MAX_CONNECTIONS", "7")
+    monkeypatch.setenv("SUPABASE_POOL_MAX_KEEPALIVE", "99")
+
+    client = supabase_pool.get_shared_http_client()
+    assert client is supabase_pool.get_shared_http_client()
+
+    metrics = supabase_pool.get_pool_metrics()
+    assert metrics["initialized"] is True
+    assert metrics["max_connections"] == 7
+    # keep-alive 上限不能超过总连接数
+    assert metrics["max_keepalive_connections"] == 7
+    assert metrics["in_use"] == 0
+    assert metrics["waits_total"] == 0
+
+
+def test_get_pooled_client_builds_once_per_url_and_key() -> None:
+    factory = MagicMock(side_effect=lambda *_args, **_kwargs: object())
+
+    first = supabase_pool.get_pooled_client("https://demo.supabase.co", "key-1", factory=factory)
+    second = supabase_pool.get_pooled_client("https://demo.supabase.co", "key-1", factory=factory)
+    other = supabase_pool.get_pooled_client("https://demo.supabase.co", "key-2", factory=factory)
+
+    assert first is second
+    assert other is not first
+    assert factory.call_count == 2
+    options = factory.call_args.kwargs["options"]
+    assert options.httpx_client is supabase_pool.get_shared_http_client()
+
+
+def test_user_scoped_clients_share_pool_but_not_auth_headers() -> None:
+    captured: list[httpx.Request] = []
+
+    def _handler(request: httpx.Request) -> httpx.Response:
+        captured.append(request)
+        return httpx.Response(200, json=[{"id": "n-1"}])
+
+    shared = httpx.Client(transport=httpx.MockTransport(_handler))
+    supabase_pool._http_client = shared
+
+    client_a = supabase_pool.create_user_scoped_client(url="https://demo.supabase.co", anon_key="anon", access_token="token-a")
+    client_b = supabase_pool.create_user_scoped_client(url="https://demo.supabase.co", anon_key="anon", access_token="token-b")
+
+    res = client_a.table("notifications").select("*").execute()
+    client_b.table("notifications").select("*").execute()
+
+    assert res.data == [{"id": "n-1"}]
+    assert str(captured[0].url).startswith("https://demo.supabase.co/rest/v1/notifications")
+    assert captured[0].headers["authorization"] == "Bearer token-a"
+    assert captured[1].headers["authorization"] == "Bearer token-b"
+    assert client_a.postgrest.session is client_b.postgrest.session is shared
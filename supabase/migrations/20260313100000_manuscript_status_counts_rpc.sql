@@ -0,0 +1,37 @@
+-- ============================================================================
+-- Dashboard 计数 RPC: manuscript_status_counts
+-- 功能: /stats/editor 与 /stats/author 一次往返拿到按状态分组的稿件数量，
+--       不再把整张 manuscripts 的 id/status 拉回应用层 len()。
+-- 参数:
+--   p_author_id   仅统计该作者的稿件（NULL = 不限）
+--   p_journal_ids 仅统计这些期刊的稿件（NULL = 不限；空数组 = 0 行）
+--   p_statuses    仅统计这些状态（NULL = 全部状态）
+-- ============================================================================
+
+CREATE OR REPLACE FUNCTION public.manuscript_status_counts(
+    p_author_id uuid DEFAULT NULL,
+    p_journal_ids uuid[] DEFAULT NULL,
+    p_statuses text[] DEFAULT NULL
+)
+RETURNS TABLE (status text, total bigint)
+LANGUAGE sql
+STABLE
+AS $$
+    SELECT m.status::text AS status, COUNT(*)::bigint AS total
+    FROM public.manuscripts m
+    WHERE (p_author_id IS NULL OR m.author_id = p_author_id)
+      AND (p_journal_ids IS NULL OR m.journal_id = ANY (p_journal_ids))
+      AND (p_statuses IS NULL OR m.status::text = ANY (p_statuses))
+    GROUP BY m.status;
+$$;
+
+COMMENT ON FUNCTION public.manuscript_status_counts(uuid, uuid[], text[])
+    IS 'Dashboard 计数：按状态分组的稿件数量（可按作者/期刊/状态过滤）';
+
+GRANT EXECUTE ON FUNCTION public.manuscript_status_counts(uuid, uuid[], text[]) TO authenticated, service_role;
+
+-- 作者维度计数走 (author_id, status) 索引；编辑维度复用 20260224173000 的 status/journal 复合索引。
+CREATE INDEX IF NOT EXISTS idx_manuscripts_author_status
+    ON public.manuscripts (author_id, status);
+
+NOTIFY pgrst, 'reload schema';
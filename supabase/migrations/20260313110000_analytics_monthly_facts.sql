@@ -0,0 +1,185 @@
+-- ============================================================================
+-- Analytics 月度事实汇总（scoped 仪表盘 / 导出）
+-- 功能: 按 (期刊, 投稿月份, 当前状态, 作者国家) 维护稿件计数与首次决定耗时累计，
+--       /analytics 在 journal scope 下一次读取汇总行即可得到 KPI / 趋势 / 流水线 / 决定分布 / 地理分布，
+--       不再把 manuscripts 全表按期刊拉回应用层重复聚合 4~5 次。
+-- 维护方式:
+--   - manuscripts INSERT / UPDATE(status, journal_id, author_id, created_at, updated_at) / DELETE 触发器
+--     对旧行减一、新行加一（状态流转即增量更新）；
+--   - rebuild_analytics_monthly_facts(p_journal_ids) 用于首次回填与漂移修复（作者国家变更等）。
+-- 创建日期: 2026-03-13
+-- ============================================================================
+
+CREATE TABLE IF NOT EXISTS public.analytics_monthly_facts (
+    journal_id uuid NOT NULL,
+    -- 投稿月份（UTC）；created_at 为空的历史数据记为 1900-01-01
+    month date NOT NULL,
+    status text NOT NULL,
+    country text NOT NULL DEFAULT '',
+    manuscript_count integer NOT NULL DEFAULT 0,
+    decision_days_sum double precision NOT NULL DEFAULT 0,
+    decision_samples integer NOT NULL DEFAULT 0,
+    updated_at timestamptz NOT NULL DEFAULT now(),
+    PRIMARY KEY (journal_id, month, status, country)
+);
+
+COMMENT ON TABLE public.analytics_monthly_facts IS 'Analytics 月度事实汇总：按期刊/投稿月/当前状态/作者国家的稿件数与决定耗时累计';
+
+-- 仅 service_role 读写（后端 AnalyticsService 使用 service role key）
+ALTER TABLE public.analytics_monthly_facts ENABLE ROW LEVEL SECURITY;
+
+-- ----------------------------------------------------------------------------
+-- 增量：对单行稿件的贡献加 / 减
+-- ----------------------------------------------------------------------------
+CREATE OR REPLACE FUNCTION public.analytics_monthly_facts_apply(
+    p_journal_id uuid,
+    p_author_id uuid,
+    p_status text,
+    p_created_at timestamptz,
+    p_updated_at timestamptz,
+    p_sign integer
+)
+RETURNS void
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+DECLARE
+    v_status text;
+    v_month date;
+    v_country text := '';
+    v_days double precision := 0;
+    v_samples integer := 0;
+BEGIN
+    IF p_journal_id IS NULL THEN
+        RETURN;
+    END IF;
+
+    v_status := lower(trim(coalesce(p_status, '')));
+    v_month := coalesce(date_trunc('month', p_created_at AT TIME ZONE 'UTC')::date, DATE '1900-01-01');
+
+    IF p_author_id IS NOT NULL THEN
+        SELECT coalesce(trim(up.country), '') INTO v_country
+        FROM public.user_profiles up
+        WHERE up.id = p_author_id;
+        v_country := coalesce(v_country, '');
+    END IF;
+
+    -- 与 AnalyticsService 的口径一致：已到达决定类状态且 updated_at > created_at
+    IF p_created_at IS NOT NULL
+       AND p_updated_at IS NOT NULL
+       AND p_updated_at > p_created_at
+       AND v_status IN ('accepted', 'approved', 'published', 'rejected', 'major_revision', 'minor_revision') THEN
+        v_days := extract(epoch FROM (p_updated_at - p_created_at)) / 86400.0;
+        v_samples := 1;
+    END IF;
+
+    INSERT INTO public.analytics_monthly_facts AS f (
+        journal_id, month, status, country,
+        manuscript_count, decision_days_sum, decision_samples, updated_at
+    )
+    VALUES (
+        p_journal_id, v_month, v_status, v_country,
+        p_sign, p_sign * v_days, p_sign * v_samples, now()
+    )
+    ON CONFLICT (journal_id, month, status, country) DO UPDATE SET
+        manuscript_count = f.manuscript_count + EXCLUDED.manuscript_count,
+        decision_days_sum = f.decision_days_sum + EXCLUDED.decision_days_sum,
+        decision_samples = f.decision_samples + EXCLUDED.decision_samples,
+        updated_at = now();
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION public.analytics_monthly_facts_trigger()
+RETURNS trigger
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        PERFORM public.analytics_monthly_facts_apply(
+            OLD.journal_id, OLD.author_id, OLD.status::text, OLD.created_at, OLD.updated_at, -1
+        );
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        PERFORM public.analytics_monthly_facts_apply(
+            NEW.journal_id, NEW.author_id, NEW.status::text, NEW.created_at, NEW.updated_at, 1
+        );
+    END IF;
+    RETURN NULL;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS trg_manuscripts_analytics_monthly_facts ON public.manuscripts;
+CREATE TRIGGER trg_manuscripts_analytics_monthly_facts
+    AFTER INSERT OR DELETE OR UPDATE OF status, journal_id, author_id, created_at, updated_at
+    ON public.manuscripts
+    FOR EACH ROW
+    EXECUTE FUNCTION public.analytics_monthly_facts_trigger();
+
+-- ----------------------------------------------------------------------------
+-- 回填 / 重建（p_journal_ids 为空 = 全部期刊）；返回写入的汇总行数
+-- ----------------------------------------------------------------------------
+CREATE OR REPLACE FUNCTION public.rebuild_analytics_monthly_facts(p_journal_ids uuid[] DEFAULT NULL)
+RETURNS integer
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+DECLARE
+    v_rows integer;
+BEGIN
+    -- 重建期间阻塞触发器写入，避免并发状态流转的增量被覆盖或重复计入
+    LOCK TABLE public.analytics_monthly_facts IN EXCLUSIVE MODE;
+
+    DELETE FROM public.analytics_monthly_facts
+    WHERE p_journal_ids IS NULL OR journal_id = ANY (p_journal_ids);
+
+    INSERT INTO public.analytics_monthly_facts (
+        journal_id, month, status, country,
+        manuscript_count, decision_days_sum, decision_samples, updated_at
+    )
+    SELECT
+        m.journal_id,
+        coalesce(date_trunc('month', m.created_at AT TIME ZONE 'UTC')::date, DATE '1900-01-01'),
+        lower(trim(coalesce(m.status::text, ''))),
+        coalesce(trim(up.country), ''),
+        COUNT(*)::integer,
+        coalesce(SUM(extract(epoch FROM (m.updated_at - m.created_at)) / 86400.0) FILTER (
+            WHERE m.updated_at > m.created_at
+              AND lower(trim(coalesce(m.status::text, ''))) IN
+                  ('accepted', 'approved', 'published', 'rejected', 'major_revision', 'minor_revision')
+        ), 0),
+        (COUNT(*) FILTER (
+            WHERE m.updated_at > m.created_at
+              AND lower(trim(coalesce(m.status::text, ''))) IN
+                  ('accepted', 'approved', 'published', 'rejected', 'major_revision', 'minor_revision')
+        ))::integer,
+        now()
+    FROM public.manuscripts m
+    LEFT JOIN public.user_profiles up ON up.id = m.author_id
+    WHERE m.journal_id IS NOT NULL
+      AND (p_journal_ids IS NULL OR m.journal_id = ANY (p_journal_ids))
+    GROUP BY 1, 2, 3, 4;
+
+    GET DIAGNOSTICS v_rows = ROW_COUNT;
+    RETURN v_rows;
+END;
+$$;
+
+COMMENT ON FUNCTION public.rebuild_analytics_monthly_facts(uuid[]) IS '回填/重建 analytics_monthly_facts（scripts/analytics_rollups.py backfill）';
+
+-- SECURITY DEFINER 函数只允许服务端调用：Supabase 默认把 public schema 函数的 EXECUTE 授予 anon/authenticated，
+-- 不收回的话任何人都能通过 PostgREST RPC 写入任意汇总值，或反复触发 LOCK EXCLUSIVE 的全量重建。
+REVOKE ALL ON FUNCTION public.analytics_monthly_facts_apply(uuid, uuid, text, timestamptz, timestamptz, integer)
+    FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION public.analytics_monthly_facts_apply(uuid, uuid, text, timestamptz, timestamptz, integer)
+    TO service_role;
+REVOKE ALL ON FUNCTION public.analytics_monthly_facts_trigger() FROM PUBLIC, anon, authenticated;
+REVOKE ALL ON FUNCTION public.rebuild_analytics_monthly_facts(uuid[]) FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION public.rebuild_analytics_monthly_facts(uuid[]) TO service_role;
+
+SELECT public.rebuild_analytics_monthly_facts(NULL);
+
+NOTIFY pgrst, 'reload schema';
@@ -0,0 +1,88 @@
+-- ============================================================================
+-- DOI 任务队列：批量领取 RPC（FOR UPDATE SKIP LOCKED）+ 崩溃 worker 的过期锁回收
+-- 背景:
+--   旧实现每领一个任务要 select + 条件 update 两次往返，多 worker 会争抢同一行（后到者 update 0 行白跑一趟）。
+--   claim_doi_tasks 一次往返领取最多 p_limit 个到期任务：被其他事务锁住的行直接跳过，
+--   多个 worker 并发调用拿到的是互不相交的任务集合。
+-- 过期锁:
+--   status = 'processing' 且 locked_at 早于 now() - p_stale_after_sec 的任务视为 worker 崩溃遗留：
+--   attempts 未用尽的放回 pending，已用尽的标记 failed。每次领取前顺带回收。
+-- ============================================================================
+
+CREATE OR REPLACE FUNCTION public.reap_stale_doi_tasks(
+    p_stale_after_sec integer DEFAULT 600
+)
+RETURNS integer
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    v_count integer;
+BEGIN
+    WITH stale AS (
+        SELECT id
+        FROM public.doi_tasks
+        WHERE status = 'processing'
+          AND locked_at < now() - make_interval(secs => GREATEST(p_stale_after_sec, 1))
+        FOR UPDATE SKIP LOCKED
+    )
+    UPDATE public.doi_tasks t
+    SET status = CASE WHEN t.attempts >= t.max_attempts THEN 'failed'::doi_task_status ELSE 'pending'::doi_task_status END,
+        locked_at = NULL,
+        locked_by = NULL,
+        last_error = 'stale lock reaped (worker ' || COALESCE(t.locked_by, 'unknown') || ')'
+    FROM stale
+    WHERE t.id = stale.id;
+
+    GET DIAGNOSTICS v_count = ROW_COUNT;
+    RETURN v_count;
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION public.claim_doi_tasks(
+    p_worker text,
+    p_limit integer DEFAULT 10,
+    p_stale_after_sec integer DEFAULT 600
+)
+RETURNS SETOF public.doi_tasks
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    PERFORM public.reap_stale_doi_tasks(p_stale_after_sec);
+
+    RETURN QUERY
+    WITH picked AS (
+        SELECT id
+        FROM public.doi_tasks
+        WHERE status = 'pending'
+          AND run_at <= now()
+        ORDER BY priority DESC, run_at ASC
+        LIMIT GREATEST(LEAST(p_limit, 500), 1)
+        FOR UPDATE SKIP LOCKED
+    )
+    UPDATE public.doi_tasks t
+    SET status = 'processing',
+        locked_at = now(),
+        locked_by = p_worker,
+        attempts = t.attempts + 1
+    FROM picked
+    WHERE t.id = picked.id
+    RETURNING t.*;
+END;
+$$;
+
+COMMENT ON FUNCTION public.claim_doi_tasks(text, integer, integer)
+    IS 'DOI 队列：SKIP LOCKED 批量领取到期任务（领取前回收过期锁）';
+COMMENT ON FUNCTION public.reap_stale_doi_tasks(integer)
+    IS 'DOI 队列：回收崩溃 worker 遗留的 processing 任务';
+
+REVOKE ALL ON FUNCTION public.claim_doi_tasks(text, integer, integer) FROM PUBLIC, anon, authenticated;
+REVOKE ALL ON FUNCTION public.reap_stale_doi_tasks(integer) FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION public.claim_doi_tasks(text, integer, integer) TO service_role;
+GRANT EXECUTE ON FUNCTION public.reap_stale_doi_tasks(integer) TO service_role;
+
+-- 领取顺序 (priority DESC, run_at ASC) 的部分索引；旧的 idx_doi_tasks_pending 只覆盖 run_at。
+CREATE INDEX IF NOT EXISTS idx_doi_tasks_pending_priority
+    ON public.doi_tasks (priority DESC, run_at ASC)
+    WHERE status = 'pending';
+
+NOTIFY pgrst, 'reload schema';
@@ -0,0 +1,58 @@
+-- ============================================================================
+-- DOI 序号分配器：按年计数行 + 批量预留 RPC
+-- 背景:
+--   旧实现每次注册都对 doi_registrations 做 count(exact) 取“当年条数 + 1”，
+--   既是整表计数，多 worker 并发时也会算出同一个序号（撞 doi 唯一约束），失败还会退化成时间戳取模。
+-- 方案:
+--   doi_sequences 每年一行，reserve_doi_sequence_block 对该行做一次 UPDATE ... RETURNING，
+--   行锁保证并发调用拿到互不重叠的区间 [last_value - p_count + 1, last_value]。
+--   应用进程一次预留一段（默认 50）在内存中发放；进程退出时未用完的号作废，DOI 序号允许出现空洞。
+-- 初始化:
+--   某年第一次预留时，用该年已有 DOI（…/sf.<year>.<seq>）的最大序号作为起点，避免与历史数据冲突。
+-- ============================================================================
+
+CREATE TABLE IF NOT EXISTS public.doi_sequences (
+    year integer PRIMARY KEY,
+    last_value bigint NOT NULL DEFAULT 0,
+    updated_at timestamptz NOT NULL DEFAULT now()
+);
+
+ALTER TABLE public.doi_sequences ENABLE ROW LEVEL SECURITY;
+
+CREATE OR REPLACE FUNCTION public.reserve_doi_sequence_block(
+    p_year integer,
+    p_count integer DEFAULT 50
+)
+RETURNS bigint
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    v_count integer := GREATEST(LEAST(p_count, 10000), 1);
+    v_last bigint;
+BEGIN
+    IF NOT EXISTS (SELECT 1 FROM public.doi_sequences WHERE year = p_year) THEN
+        INSERT INTO public.doi_sequences (year, last_value)
+        SELECT p_year, COALESCE(MAX(substring(r.doi FROM '/sf\.[0-9]{4}\.([0-9]+)$')::bigint), 0)
+        FROM public.doi_registrations r
+        WHERE r.doi LIKE '%/sf.' || p_year::text || '.%'
+        ON CONFLICT (year) DO NOTHING;
+    END IF;
+
+    UPDATE public.doi_sequences
+    SET last_value = last_value + v_count,
+        updated_at = now()
+    WHERE year = p_year
+    RETURNING last_value INTO v_last;
+
+    RETURN v_last;
+END;
+$$;
+
+COMMENT ON TABLE public.doi_sequences IS 'DOI 序号分配器：每年一行，last_value 为已预留的最大序号';
+COMMENT ON FUNCTION public.reserve_doi_sequence_block(integer, integer)
+    IS 'DOI 序号分配器：原子预留 p_count 个序号，返回区间末尾';
+
+REVOKE ALL ON FUNCTION public.reserve_doi_sequence_block(integer, integer) FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION public.reserve_doi_sequence_block(integer, integer) TO service_role;
+
+NOTIFY pgrst, 'reload schema';
@@ -0,0 +1,86 @@
+-- ============================================================================
+-- 多实例共享限流：UNLOGGED 计数表 + 批量同步 RPC
+-- 背景:
+--   RateLimitMiddleware 原先是实例内固定窗口计数，N 个副本时实际额度是 N 倍，且窗口边界会出现突发。
+--   RATE_LIMIT_BACKEND=postgres 时，各实例本地按 GCRA 判定，后台每秒把新增请求数批量提交到这里，
+--   数据库推进全局 TAT（theoretical arrival time）后把水位返回给实例。
+-- 说明:
+--   - 表为 UNLOGGED：限流状态可丢失（崩溃后清空只是短暂放宽），换取无 WAL 写放大。
+--   - TAT 最多领先当前时间 window_sec（已用满），避免多实例合计超发后把 bucket 锁死太久。
+--   - ahead_sec = 全局 TAT 领先数据库当前时间的秒数；实例用自己的时钟换算，避免依赖跨机器时钟同步。
+--   - instances = 窗口内向该 bucket 提交过请求的实例数；实例按 1/instances 的速率本地放行，饱和时合计不超发。
+-- ============================================================================
+
+CREATE UNLOGGED TABLE IF NOT EXISTS public.rate_limit_buckets (
+    bucket text PRIMARY KEY,
+    tat timestamptz NOT NULL
+);
+
+CREATE UNLOGGED TABLE IF NOT EXISTS public.rate_limit_bucket_instances (
+    bucket text NOT NULL,
+    instance text NOT NULL,
+    seen_at timestamptz NOT NULL,
+    PRIMARY KEY (bucket, instance)
+);
+
+ALTER TABLE public.rate_limit_buckets ENABLE ROW LEVEL SECURITY;
+ALTER TABLE public.rate_limit_bucket_instances ENABLE ROW LEVEL SECURITY;
+
+CREATE OR REPLACE FUNCTION public.rate_limit_sync(p_instance text, p_hits jsonb)
+RETURNS TABLE (bucket text, ahead_sec double precision, instances integer)
+LANGUAGE plpgsql
+AS $$
+#variable_conflict use_column
+DECLARE
+    r record;
+    v_tat timestamptz;
+BEGIN
+    -- 顺带清理早已过期的 bucket（约 1% 的调用触发），表规模只与活跃客户端数相关。
+    IF random() < 0.01 THEN
+        DELETE FROM public.rate_limit_buckets b WHERE b.tat < now() - interval '10 minutes';
+        DELETE FROM public.rate_limit_bucket_instances i WHERE i.seen_at < now() - interval '1 hour';
+    END IF;
+
+    -- 按 bucket 排序逐行 upsert：多个实例同时同步同一批 bucket 时加锁顺序一致，不会死锁。
+    FOR r IN
+        SELECT
+            h->>'bucket' AS name,
+            GREATEST(COALESCE((h->>'hits')::integer, 0), 0)
+                * GREATEST(COALESCE((h->>'interval_sec')::double precision, 0), 0) AS advance_sec,
+            GREATEST(COALESCE((h->>'window_sec')::double precision, 1), 1) AS window_sec
+        FROM jsonb_array_elements(COALESCE(p_hits, '[]'::jsonb)) AS h
+        WHERE COALESCE(h->>'bucket', '') <> ''
+        ORDER BY 1
+    LOOP
+        INSERT INTO public.rate_limit_buckets AS b (bucket, tat)
+        VALUES (r.name, now() + make_interval(secs => LEAST(r.advance_sec, r.window_sec)))
+        ON CONFLICT (bucket) DO UPDATE
+        SET tat = LEAST(
+            GREATEST(b.tat, now()) + make_interval(secs => r.advance_sec),
+            now() + make_interval(secs => r.window_sec)
+        )
+        RETURNING b.tat INTO v_tat;
+
+        INSERT INTO public.rate_limit_bucket_instances AS i (bucket, instance, seen_at)
+        VALUES (r.name, COALESCE(p_instance, 'unknown'), now())
+        ON CONFLICT (bucket, instance) DO UPDATE SET seen_at = now();
+
+        bucket := r.name;
+        ahead_sec := GREATEST(EXTRACT(EPOCH FROM (v_tat - now())), 0);
+        SELECT count(*)::integer INTO instances
+        FROM public.rate_limit_bucket_instances i
+        WHERE i.bucket = r.name
+          AND i.seen_at > now() - make_interval(secs => r.window_sec);
+        RETURN NEXT;
+    END LOOP;
+END;
+$$;
+
+COMMENT ON TABLE public.rate_limit_buckets IS '共享限流：每个 bucket 的全局 TAT（UNLOGGED，可丢失）';
+COMMENT ON TABLE public.rate_limit_bucket_instances IS '共享限流：最近向 bucket 提交过请求的实例（UNLOGGED，可丢失）';
+COMMENT ON FUNCTION public.rate_limit_sync(text, jsonb) IS '共享限流：批量推进 bucket TAT 并返回领先当前时间的秒数';
+
+REVOKE ALL ON FUNCTION public.rate_limit_sync(text, jsonb) FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION public.rate_limit_sync(text, jsonb) TO service_role;
+
+NOTIFY pgrst, 'reload schema';
@@ -0,0 +1,80 @@
+-- ============================================================================
+-- Finance 账单列表：关键词检索列 + keyset 排序索引
+-- 背景:
+--   /editor/finance/invoices 带 q 时原先全量加载 invoices + 作者资料，在 Python 里做子串过滤后再分页，
+--   账单越多越慢。现在关键词/排序/翻页全部下推到数据库。
+-- 方案:
+--   1) invoices.search_text = lower(invoice_number || ' ' || manuscripts.title)，由触发器维护
+--      （invoice 写入/改号/换稿件，以及稿件改标题时同步），pg_trgm GIN 索引支撑 ILIKE '%q%'。
+--   2) 列表排序键 + (created_at, id) 复合索引，配合 keyset 游标翻页。
+-- ============================================================================
+
+CREATE EXTENSION IF NOT EXISTS pg_trgm WITH SCHEMA public;
+
+ALTER TABLE public.invoices
+    ADD COLUMN IF NOT EXISTS search_text text;
+
+CREATE OR REPLACE FUNCTION public.invoices_refresh_search_text()
+RETURNS trigger
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    NEW.search_text := lower(
+        concat_ws(
+            ' ',
+            NULLIF(btrim(NEW.invoice_number), ''),
+            (SELECT m.title FROM public.manuscripts m WHERE m.id = NEW.manuscript_id)
+        )
+    );
+    RETURN NEW;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS trg_invoices_search_text ON public.invoices;
+CREATE TRIGGER trg_invoices_search_text
+    BEFORE INSERT OR UPDATE OF invoice_number, manuscript_id ON public.invoices
+    FOR EACH ROW
+    EXECUTE FUNCTION public.invoices_refresh_search_text();
+
+CREATE OR REPLACE FUNCTION public.manuscripts_sync_invoice_search_text()
+RETURNS trigger
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    UPDATE public.invoices i
+    SET search_text = lower(concat_ws(' ', NULLIF(btrim(i.invoice_number), ''), NEW.title))
+    WHERE i.manuscript_id = NEW.id;
+    RETURN NEW;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS trg_manuscripts_invoice_search_text ON public.manuscripts;
+CREATE TRIGGER trg_manuscripts_invoice_search_text
+    AFTER UPDATE OF title ON public.manuscripts
+    FOR EACH ROW
+    WHEN (OLD.title IS DISTINCT FROM NEW.title)
+    EXECUTE FUNCTION public.manuscripts_sync_invoice_search_text();
+
+-- 回填历史账单
+UPDATE public.invoices i
+SET search_text = lower(concat_ws(' ', NULLIF(btrim(i.invoice_number), ''), m.title))
+FROM public.manuscripts m
+WHERE m.id = i.manuscript_id;
+
+UPDATE public.invoices
+SET search_text = lower(COALESCE(NULLIF(btrim(invoice_number), ''), ''))
+WHERE search_text IS NULL;
+
+CREATE INDEX IF NOT EXISTS idx_invoices_search_text_trgm
+    ON public.invoices
+    USING gin (search_text gin_trgm_ops);
+
+-- keyset 排序索引（与 EditorServiceFinanceMixin._query_finance_invoices 的 ORDER BY 一致）
+CREATE INDEX IF NOT EXISTS idx_invoices_created_at_id
+    ON public.invoices (created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_invoices_amount_created_at_id
+    ON public.invoices (amount, created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_invoices_status_created_at_id
+    ON public.invoices (status, created_at DESC, id DESC);
+
+NOTIFY pgrst, 'reload schema';
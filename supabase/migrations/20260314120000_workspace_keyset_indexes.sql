@@ -0,0 +1,21 @@
+-- Editor workspace keyset pagination indexes.
+-- 目标：
+-- 1) ME / AE Workspace 按 (updated_at, created_at, id) 倒序 keyset 翻页，任意深度的页都只扫描一页数据
+-- 2) 多状态 IN 过滤时 (status, updated_at) 索引无法提供全局顺序，这里补充不带 status 前缀的排序索引
+
+CREATE INDEX IF NOT EXISTS idx_manuscripts_workspace_keyset
+ON public.manuscripts (updated_at DESC, created_at DESC, id DESC);
+
+DO $$
+BEGIN
+  IF EXISTS (
+    SELECT 1
+    FROM information_schema.columns
+    WHERE table_schema = 'public' AND table_name = 'manuscripts' AND column_name = 'assistant_editor_id'
+  ) THEN
+    EXECUTE '
+      CREATE INDEX IF NOT EXISTS idx_manuscripts_ae_workspace_keyset
+      ON public.manuscripts (assistant_editor_id, updated_at DESC, created_at DESC, id DESC)
+    ';
+  END IF;
+END $$;
@@ -0,0 +1,87 @@
+-- ============================================================================
+-- Finance 账单列表：与页面展示一致的排序键
+-- 背景:
+--   20260314110000 把排序下推到数据库后，sort_by=updated_at 退化成了 invoices.created_at，
+--   sort_by=status 按原始 status 排序；但页面展示的 updated_at 是
+--   COALESCE(confirmed_at, manuscripts.updated_at, created_at)，展示的状态是 effective_status
+--   （amount <= 0 视为 waived，status 为空视为 unpaid）。
+-- 方案:
+--   1) invoices.activity_at：由触发器维护（invoice 写入/确认/换稿件，以及稿件 updated_at 变化时同步），回填后 NOT NULL。
+--   2) invoices.effective_status：只依赖本行，使用 STORED 生成列。
+--   3) 两列各自配 (key, created_at DESC, id DESC) 复合索引，配合 keyset 游标翻页。
+-- ============================================================================
+
+ALTER TABLE public.invoices
+    ADD COLUMN IF NOT EXISTS activity_at timestamptz;
+
+ALTER TABLE public.invoices
+    ADD COLUMN IF NOT EXISTS effective_status text
+    GENERATED ALWAYS AS (
+        CASE
+            WHEN amount <= 0 OR lower(btrim(COALESCE(status, ''))) = 'waived' THEN 'waived'
+            WHEN lower(btrim(COALESCE(status, ''))) = 'paid' THEN 'paid'
+            ELSE 'unpaid'
+        END
+    ) STORED;
+
+CREATE OR REPLACE FUNCTION public.invoices_refresh_activity_at()
+RETURNS trigger
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    NEW.activity_at := COALESCE(
+        NEW.confirmed_at,
+        (SELECT m.updated_at FROM public.manuscripts m WHERE m.id = NEW.manuscript_id),
+        NEW.created_at,
+        now()
+    );
+    RETURN NEW;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS trg_invoices_activity_at ON public.invoices;
+CREATE TRIGGER trg_invoices_activity_at
+    BEFORE INSERT OR UPDATE OF confirmed_at, manuscript_id, created_at ON public.invoices
+    FOR EACH ROW
+    EXECUTE FUNCTION public.invoices_refresh_activity_at();
+
+CREATE OR REPLACE FUNCTION public.manuscripts_sync_invoice_activity_at()
+RETURNS trigger
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    UPDATE public.invoices i
+    SET activity_at = COALESCE(i.confirmed_at, NEW.updated_at, i.created_at, now())
+    WHERE i.manuscript_id = NEW.id;
+    RETURN NEW;
+END;
+$$;
+
+-- 中文注释: updated_at 常由 BEFORE 触发器改写，列级 UPDATE OF 不会触发，这里用 WHEN 比较最终值。
+DROP TRIGGER IF EXISTS trg_manuscripts_invoice_activity_at ON public.manuscripts;
+CREATE TRIGGER trg_manuscripts_invoice_activity_at
+    AFTER UPDATE ON public.manuscripts
+    FOR EACH ROW
+    WHEN (OLD.updated_at IS DISTINCT FROM NEW.updated_at)
+    EXECUTE FUNCTION public.manuscripts_sync_invoice_activity_at();
+
+-- 回填历史账单
+UPDATE public.invoices i
+SET activity_at = COALESCE(i.confirmed_at, m.updated_at, i.created_at, now())
+FROM public.manuscripts m
+WHERE m.id = i.manuscript_id;
+
+UPDATE public.invoices
+SET activity_at = COALESCE(confirmed_at, created_at, now())
+WHERE activity_at IS NULL;
+
+ALTER TABLE public.invoices
+    ALTER COLUMN activity_at SET NOT NULL;
+
+-- keyset 排序索引（与 EditorServiceFinanceMixin._query_finance_invoices 的 ORDER BY 一致）
+CREATE INDEX IF NOT EXISTS idx_invoices_activity_at_created_at_id
+    ON public.invoices (activity_at DESC, created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_invoices_effective_status_created_at_id
+    ON public.invoices (effective_status, created_at DESC, id DESC);
+
+NOTIFY pgrst, 'reload schema';